@@ -0,0 +1,79 @@
+"""
+Compares the time of one control loop cycle, reading 60 indicators and
+writing 20 controls, done one register at a time by name, with
+AccessPlan.read() and AccessPlan.write() in every output type.
+
+No hardware is needed, the register entry points are replaced by stubs
+that just return success, so the numbers are the cost of nifpga-python
+itself.
+
+Usage:
+    python benchmarks/access_plan.py [number of cycles]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+
+import numpy
+
+from nifpga.accessplan import AccessPlan
+
+from benchmark_helpers import FXP_XML, best_of, bitfile_register, create_register, stub_library
+
+# a mix of types like a typical control loop's, cycled through
+TYPES = [
+    ("<I32><Name></Name></I32>", -32),
+    ("<DBL><Name></Name></DBL>", 2.5),
+    ("<Boolean><Name></Name></Boolean>", True),
+    ("<U16><Name></Name></U16>", 16),
+    ("<SGL><Name></Name></SGL>", 1.5),
+    (FXP_XML % ("", 24, 8), 1.5),
+]
+
+
+def create_registers(prefix, count, library):
+    registers = {}
+    values = {}
+    for index in range(count):
+        type_xml, value = TYPES[index % len(TYPES)]
+        name = "%s %d" % (prefix, index)
+        registers[name] = create_register(library, bitfile_register(name, type_xml, offset=4 * index))
+        values[name] = value
+    return registers, values
+
+
+def main(cycles):
+    library = stub_library()
+    indicators, _ = create_registers("Indicator", 60, library)
+    controls, control_values = create_registers("Control", 20, library)
+    registers = dict(indicators)
+    registers.update(controls)
+    indicator_names = list(indicators)
+
+    def naive_cycle():
+        results = {}
+        for name in indicator_names:
+            results[name] = registers[name].read()
+        for name, value in control_values.items():
+            registers[name].write(value)
+        return results
+
+    read_plan = AccessPlan(registers, indicator_names)
+    write_plan = AccessPlan(registers, list(control_values))
+    write_values = list(control_values.values())
+
+    cases = [("naive loop", naive_cycle)]
+    for output_type in (dict, tuple, numpy.ndarray):
+        cases.append(("plan, %s" % output_type.__name__,
+                      lambda output_type=output_type: (read_plan.read(output_type),
+                                                       write_plan.write(write_values))))
+    print("%-20s %12s %10s" % ("method", "us/cycle", "speedup"))
+    naive = None
+    for name, cycle in cases:
+        seconds = best_of(cycle, cycles)
+        naive = naive or seconds
+        print("%-20s %12.1f %9.2fx" % (name, seconds * 1e6, naive / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,90 @@
+"""
+Compares the cost of reading and writing a large array register as a list,
+a numpy array and an array.array, and of polling it with read_into(), plus
+the memory each read allocates.
+
+No hardware is needed, the ReadArrayI32 and WriteArrayI32 entry points are
+replaced by Python functions backed by memory.
+
+Usage:
+    python benchmarks/array_register.py [number of elements]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import array
+import ctypes
+import sys
+import tracemalloc
+
+import numpy
+
+from nifpga.statuscheckedlibrary import FunctionInfo, StatusCheckedFunctions
+
+from benchmark_helpers import best_of, bitfile_register, create_register
+
+ARRAY_XML = """
+<Array>
+    <Name>Array I32</Name>
+    <Size>%d</Size>
+    <Type><I32><Name></Name></I32></Type>
+</Array>
+"""
+
+
+class MemoryBackedLibrary(object):
+    """ Array register entry points that copy to and from memory. """
+    def __init__(self, number_of_elements):
+        self.memory = (ctypes.c_int32 * number_of_elements)(*range(number_of_elements))
+
+    def read_array(self, session, indicator, array, size):
+        ctypes.memmove(array, self.memory, 4 * size)
+        return 0
+
+    def write_array(self, session, control, array, size):
+        ctypes.memmove(self.memory, array, 4 * size)
+        return 0
+
+    def functions(self):
+        argument_names = ["session", "resource", "array", "size"]
+        return StatusCheckedFunctions([
+            FunctionInfo(self.read_array, "ReadArrayI32", argument_names),
+            FunctionInfo(self.write_array, "WriteArrayI32", argument_names),
+        ])
+
+
+def allocated_per_call(function, number=100):
+    function()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        results = [function() for _ in range(number)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del results
+    return (after - before) / float(number)
+
+
+def main(number_of_elements):
+    library = MemoryBackedLibrary(number_of_elements)
+    register = create_register(library.functions(),
+                               bitfile_register("Array I32", ARRAY_XML % number_of_elements, indicator=True))
+    ndarray = numpy.zeros(number_of_elements, dtype=numpy.int32)
+    values = list(range(number_of_elements))
+
+    cases = [
+        ("read() list", lambda: register.read()),
+        ("read() ndarray", lambda: register.read(output_type=numpy.ndarray)),
+        ("read() array", lambda: register.read(output_type=array.array)),
+        ("read_into()", lambda: register.read_into(ndarray)),
+        ("write(list)", lambda: register.write(values)),
+        ("write(ndarray)", lambda: register.write(ndarray)),
+    ]
+    print("%-16s %12s %16s" % ("operation", "us/call", "bytes kept/call"))
+    for name, function in cases:
+        print("%-16s %12.2f %16.0f" % (name, best_of(function, 1000) * 1e6,
+                                       allocated_per_call(function)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4096)
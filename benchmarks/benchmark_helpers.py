@@ -0,0 +1,98 @@
+"""
+Scaffolding shared by the benchmarks that measure the cost of nifpga-python
+itself, without hardware: a library whose register entry points are stubs
+that just return success, session registers created from a type's XML as a
+Session would, clusters of many members of mixed types, and timing::
+
+    from benchmark_helpers import (best_of, bitfile_register, create_register,
+                                   mixed_cluster, stub_library)
+    datatype, value = mixed_cluster(64)
+    register = create_register(stub_library(), bitfile_register("Settings", datatype))
+    print(best_of(lambda: register.write(value), 1000))
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import ctypes
+import time
+import timeit
+import xml.etree.ElementTree as ElementTree
+from decimal import Decimal
+
+from nifpga import DataType
+from nifpga.bitfile import Register
+from nifpga.session import _ArrayRegister, _DataConvertingRegister, _Register
+from nifpga.statuscheckedlibrary import FunctionInfo, StatusCheckedFunctions
+
+REGISTER_XML = """
+<Register>
+    <Name>%(name)s</Name>
+    <Indicator>%(indicator)s</Indicator>
+    <Datatype>%(datatype)s</Datatype>
+    <Offset>%(offset)d</Offset>
+    <Internal>false</Internal>
+    <AccessMayTimeout>false</AccessMayTimeout>
+</Register>
+"""
+
+FXP_XML = ("<FXP><Name>%s</Name><Signed>true</Signed><WordLength>%d</WordLength>"
+           "<IntegerWordLength>%d</IntegerWordLength></FXP>")
+
+# the members of mixed_cluster(), cycled through, and a value of each
+MEMBER_TYPES = [
+    ("<U16><Name>%s</Name></U16>", 16),
+    (FXP_XML % ("%s", 24, 8), Decimal("1.5")),
+    ("<Boolean><Name>%s</Name></Boolean>", True),
+    ("<I32><Name>%s</Name></I32>", -32),
+]
+
+
+def stub_library(delay=0):
+    """ Returns a library of the Read, Write, ReadArray and WriteArray entry
+    points of every DataType, which return success after sleeping for delay
+    seconds, standing in for the bus access, or at once for 0. """
+    def stub(*args):
+        if delay:
+            time.sleep(delay)
+        return 0
+    function_infos = []
+    for datatype in DataType:
+        for access in ("Read", "Write"):
+            for kind in ("", "Array"):
+                function_infos.append(FunctionInfo(stub, "%s%s%s" % (access, kind, datatype),
+                                                   ["session", "resource", "value", "size"][:4 if kind else 3]))
+    return StatusCheckedFunctions(function_infos)
+
+
+def bitfile_register(name, datatype, indicator=False, offset=0):
+    """ Returns the bitfile.Register called name of the <Datatype> contents
+    datatype. """
+    return Register(ElementTree.fromstring(REGISTER_XML % {
+        "name": name, "datatype": datatype, "indicator": "true" if indicator else "false", "offset": offset}))
+
+
+def create_register(library, bitfile_register, base_address_on_device=0):
+    """ Creates the register a Session would for bitfile_register. """
+    if not bitfile_register.type.is_c_api_type:
+        register_class = _DataConvertingRegister
+    elif bitfile_register.is_array():
+        register_class = _ArrayRegister
+    else:
+        register_class = _Register
+    return register_class(ctypes.c_uint32(0), library, bitfile_register, base_address_on_device)
+
+
+def mixed_cluster(members):
+    """ Returns the <Datatype> contents of a cluster of members members,
+    called "member 0" and so on, cycling through MEMBER_TYPES, and a value
+    of it. """
+    type_list = "".join(MEMBER_TYPES[index % len(MEMBER_TYPES)][0] % ("member %d" % index)
+                        for index in range(members))
+    value = dict(("member %d" % index, MEMBER_TYPES[index % len(MEMBER_TYPES)][1])
+                 for index in range(members))
+    return "<Cluster><Name></Name><TypeList>%s</TypeList></Cluster>" % type_list, value
+
+
+def best_of(function, number):
+    """ Returns the seconds a call of function takes, the best of a few
+    runs of number calls, since timings are noisy. """
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
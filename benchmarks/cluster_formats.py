@@ -0,0 +1,54 @@
+"""
+Compares the time and memory of a cluster round trip (read, then write the
+value back) in each ClusterFormat, and of writing a dict, a tuple and a
+Record, for a cluster of 16 members of mixed types.  Memory is the peak
+traced by tracemalloc during one round trip, which is mostly the value
+read.
+
+No hardware is needed, the ReadArrayU32 and WriteArrayU32 entry points
+are replaced by stubs that just return success, so the numbers are the
+cost of nifpga-python itself.
+
+Usage:
+    python benchmarks/cluster_formats.py [number of round trips]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+import tracemalloc
+
+from nifpga import ClusterFormat
+
+from benchmark_helpers import best_of, bitfile_register, create_register, mixed_cluster, stub_library
+
+MEMBERS = 16
+
+
+def peak_bytes(function):
+    function()
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(number):
+    datatype, _ = mixed_cluster(MEMBERS)
+    register = create_register(stub_library(), bitfile_register("Sample", datatype))
+    cases = []
+    for cluster_format in ClusterFormat:
+        cases.append(("round trip, %s" % cluster_format,
+                      lambda cluster_format=cluster_format: register.write(register.read(cluster_format=cluster_format))))
+    as_dict = register.read()
+    as_tuple = tuple(as_dict.values())
+    as_record = register.read(cluster_format=ClusterFormat.Record)
+    for name, value in (("dict", as_dict), ("tuple", as_tuple), ("Record", as_record)):
+        cases.append(("write, %s" % name, lambda value=value: register.write(value)))
+    print("%-24s %10s %12s" % ("case", "us", "peak bytes"))
+    for name, function in cases:
+        print("%-24s %10.1f %12d" % (name, best_of(function, number) * 1e6, peak_bytes(function)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
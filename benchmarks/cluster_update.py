@@ -0,0 +1,44 @@
+"""
+Compares changing one or a few members of a large cluster control by
+reading, modifying and writing the whole value, with writing the whole
+value modified, and with register.update(), for clusters of 8 to 128
+members of mixed types.
+
+No hardware is needed, the ReadArrayU32 and WriteArrayU32 entry points
+are replaced by stubs that just return success, so the numbers are the
+cost of nifpga-python itself.
+
+Usage:
+    python benchmarks/cluster_update.py [number of updates]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+
+from benchmark_helpers import best_of, bitfile_register, create_register, mixed_cluster, stub_library
+
+
+def main(number):
+    print("%-8s %-8s %16s %12s %12s %9s" % ("members", "changed", "read+write us", "write us", "update us", "speedup"))
+    for members in (8, 32, 128):
+        datatype, value = mixed_cluster(members)
+        register = create_register(stub_library(), bitfile_register("Settings", datatype))
+        register.write(value)
+        for changed in (1, 4):
+            changes = dict(("member %d" % (2 * index), 7) for index in range(changed))
+
+            def read_modify_write():
+                current = register.read()
+                current.update(changes)
+                register.write(current)
+
+            def write():
+                value.update(changes)
+                register.write(value)
+            times = [best_of(function, number) * 1e6
+                     for function in (read_modify_write, write, lambda: register.update(changes))]
+            print("%-8d %-8d %16.1f %12.1f %12.1f %8.1fx" % ((members, changed) + tuple(times) + (times[0] / times[2],)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,93 @@
+"""
+Compares decoding and encoding blocks of cluster FIFO elements one element
+at a time, with unpack_data and pack_data, against converting whole blocks
+with ElementLayout, as composite FIFO reads and writes do.
+
+No hardware is needed, the blocks are random words.
+
+Usage:
+    python benchmarks/composite_fifo.py [number of elements]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import ctypes
+import random
+import sys
+import xml.etree.ElementTree as ElementTree
+
+from nifpga.bitfile import Fifo
+from nifpga.layout import ElementLayout
+
+from benchmark_helpers import best_of
+
+FIFO_XML = """
+<Channel name="Cluster FIFO">
+    <DataType>
+        <Cluster>
+            <Name>Cluster FIFO</Name>
+            <TypeList>
+                <Boolean><Name>valid</Name></Boolean>
+                <I16><Name>channel</Name></I16>
+                <FXP>
+                    <Name>sample</Name>
+                    <Signed>true</Signed>
+                    <WordLength>24</WordLength>
+                    <IntegerWordLength>4</IntegerWordLength>
+                </FXP>
+                <U32><Name>ticks</Name></U32>
+                <SGL><Name>gain</Name></SGL>
+            </TypeList>
+        </Cluster>
+    </DataType>
+    <Number>0</Number>
+</Channel>
+"""
+
+
+def per_element_unpack(data_type, words, words_per_element):
+    values = []
+    for start in range(0, len(words), words_per_element):
+        value = 0
+        for word in words[start:start + words_per_element]:
+            value = (value << 32) | word
+        if words_per_element > 1:
+            value >>= 32 * words_per_element - data_type.size_in_bits
+        values.append(data_type.unpack_data(value))
+    return values
+
+
+def per_element_pack(data_type, values, words_per_element):
+    words = []
+    shift = 32 * words_per_element - data_type.size_in_bits if words_per_element > 1 else 0
+    for value in values:
+        packed = data_type.pack_data(value, 0) << shift
+        words.extend((packed >> (32 * index)) & 0xffffffff
+                     for index in reversed(range(words_per_element)))
+    return words
+
+
+def main(number_of_elements):
+    data_type = Fifo(ElementTree.fromstring(FIFO_XML))._type
+    layout = ElementLayout(data_type)
+    words_per_element = layout.words_per_element
+    values = per_element_unpack(
+        data_type, [random.getrandbits(32) for _ in range(number_of_elements * words_per_element)],
+        words_per_element)
+    # round trip so that every value is representable, e.g. no NaN gains
+    words = per_element_pack(data_type, values, words_per_element)
+    buf = (ctypes.c_uint32 * len(words))(*words)
+    elements = layout.unpack(buf)
+
+    print("%-14s %16s %16s" % ("method", "unpack el/s", "pack el/s"))
+    unpack = best_of(lambda: per_element_unpack(data_type, buf, words_per_element), 1)
+    pack = best_of(lambda: per_element_pack(data_type, values, words_per_element), 1)
+    print("%-14s %16.0f %16.0f" % ("per element", number_of_elements / unpack,
+                                   number_of_elements / pack))
+    unpack = best_of(lambda: layout.unpack(buf), 3)
+    pack = best_of(lambda: layout.pack(elements), 3)
+    print("%-14s %16.0f %16.0f" % ("ElementLayout", number_of_elements / unpack,
+                                   number_of_elements / pack))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,75 @@
+"""
+Compares the polling rate of _FIFO.read(n, timeout_ms=0) when every call
+times out, with and without raising FifoTimeoutError.
+
+No hardware is needed, the ReadFifo entry point is replaced by a Python
+function that always returns the FifoTimeout status.
+
+Usage:
+    python benchmarks/fifo_timeout_polling.py [number of polls]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import ctypes
+import sys
+import xml.etree.ElementTree as ElementTree
+
+import nifpga
+from nifpga.bitfile import Fifo
+from nifpga.session import _FIFO
+from nifpga.statuscheckedlibrary import FunctionInfo, StatusCheckedFunctions
+
+from benchmark_helpers import best_of
+
+FIFO_XML = """
+<Channel name="U32 FIFO">
+    <DataType>
+        <SubType>U32</SubType>
+    </DataType>
+    <Number>0</Number>
+</Channel>
+"""
+
+
+def always_times_out(session, fifo, data, number_of_elements, timeout_ms, elements_remaining):
+    return nifpga.FifoTimeoutError.CODE
+
+
+def succeed(*args):
+    return 0
+
+
+def create_fifo():
+    argument_names = ["session", "fifo", "data", "number of elements",
+                      "timeout ms", "elements remaining"]
+    functions = StatusCheckedFunctions([
+        FunctionInfo(always_times_out, "ReadFifoU32", argument_names),
+        FunctionInfo(always_times_out, "WriteFifoU32", argument_names),
+        FunctionInfo(succeed, "AcquireFifoReadElementsU32", []),
+        FunctionInfo(succeed, "AcquireFifoWriteElementsU32", []),
+        FunctionInfo(succeed, "ReleaseFifoElements", []),
+    ])
+    return _FIFO(ctypes.c_uint32(0), functions, Fifo(ElementTree.fromstring(FIFO_XML)))
+
+
+def poll_raising(fifo):
+    try:
+        fifo.read(16, timeout_ms=0)
+    except nifpga.FifoTimeoutError:
+        pass
+
+
+def poll_not_raising(fifo):
+    fifo.read(16, timeout_ms=0, raise_on_timeout=False)
+
+
+def main(polls):
+    fifo = create_fifo()
+    for name, poll in (("raising", poll_raising), ("not raising", poll_not_raising)):
+        seconds = best_of(lambda: poll(fifo), polls)
+        print("%-12s %10.0f polls/s  %8.2f us/poll"
+              % (name, 1 / seconds, seconds * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,70 @@
+"""
+Compares decoding a U64 FIFO buffer of FXP values one element at a time
+with _FXP.unpack_data against _FXP.unpack_batch, with and without the
+lookup tables used for narrow types.
+
+Usage:
+    python benchmarks/fxp_decode.py [number of elements]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import ctypes
+import random
+import sys
+import xml.etree.ElementTree as ElementTree
+
+from nifpga import FxpFormat
+from nifpga import bitfile
+from nifpga.bitfile import _parse_type
+
+from benchmark_helpers import best_of
+
+FXP_XML = """
+<DataType>
+    <IntegerWordLength>%d</IntegerWordLength>
+    <Signed>true</Signed>
+    <SubType>FXP</SubType>
+    <WordLength>%d</WordLength>
+    <IncludeOverflowStatus>true</IncludeOverflowStatus>
+</DataType>
+"""
+
+
+def unpack_each(buf, output_format):
+    unpack_data = unpack_each.fxp.unpack_data
+    return [unpack_data(element, output_format) for element in buf]
+
+
+def with_lookup_tables(enabled, function, *args):
+    bitfile.fxp_lookup_tables.enabled = enabled
+    function(*args)  # builds the lookup tables, if enabled
+    return best_of(lambda: function(*args), 1)
+
+
+def benchmarks(fxp, buf):
+    results = []
+    for name, function, output_format in (
+            ("unpack_data Decimal", unpack_each, FxpFormat.Decimal),
+            ("unpack_batch Decimal", fxp.unpack_batch, FxpFormat.Decimal),
+            ("unpack_batch Float", fxp.unpack_batch, FxpFormat.Float),
+            ("unpack_batch Mantissa", fxp.unpack_batch, FxpFormat.Mantissa)):
+        for enabled in (False, True):
+            results.append(("%s%s" % (name, " LUT" if enabled else ""),
+                            with_lookup_tables(enabled, function, buf, output_format)))
+    return results
+
+
+def main(number_of_elements):
+    for word_length, integer_word_length in ((8, 4), (16, 8), (40, 20)):
+        fxp = _parse_type(ElementTree.fromstring(FXP_XML % (integer_word_length, word_length)))
+        unpack_each.fxp = fxp
+        buf = (ctypes.c_uint64 * number_of_elements)(
+            *[random.getrandbits(fxp.size_in_bits) for _ in range(number_of_elements)])
+        print("%d bit word, %d bit integer" % (word_length, integer_word_length))
+        for name, seconds in benchmarks(fxp, buf):
+            print("  %-28s %8.3f s  %12.0f elements/s"
+                  % (name, seconds, number_of_elements / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,55 @@
+"""
+Compares encoding FXP values for a U64 FIFO write one element at a time with
+_FXP.pack_data against _FXP.pack_batch, for a list and a numpy array.
+
+Usage:
+    python benchmarks/fxp_encode.py [number of elements]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+import warnings
+import xml.etree.ElementTree as ElementTree
+
+from nifpga.bitfile import _parse_type
+
+from benchmark_helpers import best_of
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FXP_XML = """
+<DataType>
+    <IntegerWordLength>8</IntegerWordLength>
+    <Signed>true</Signed>
+    <SubType>FXP</SubType>
+    <WordLength>24</WordLength>
+    <IncludeOverflowStatus>true</IncludeOverflowStatus>
+</DataType>
+"""
+
+
+def pack_each(fxp, values):
+    return [fxp.pack_data(value, 0) for value in values]
+
+
+def main(number_of_elements):
+    fxp = _parse_type(ElementTree.fromstring(FXP_XML))
+    # multiples of the delta, plus a few values that need coercion
+    values = [(i % 60000 - 30000) / 256.0 for i in range(number_of_elements)]
+    values[::1000] = [1000.0] * len(values[::1000])
+    warnings.simplefilter("ignore")
+    results = [("pack_data per element", best_of(lambda: pack_each(fxp, values), 1)),
+               ("pack_batch(list)", best_of(lambda: fxp.pack_batch(values), 1))]
+    if numpy is not None:
+        array = numpy.array(values)
+        results.append(("pack_batch(ndarray)", best_of(lambda: fxp.pack_batch(array), 1)))
+    for name, seconds in results:
+        print("%-24s %8.3f s  %10.0f elements/s"
+              % (name, seconds, number_of_elements / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
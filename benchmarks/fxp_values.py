@@ -0,0 +1,105 @@
+"""
+Compares the throughput of FXP register and FIFO reads and writes with
+Decimal values against nifpga.FixedPoint values (and floats, for
+reference), plus comparing and summing the values read.
+
+No hardware is needed, the ReadArrayU32, WriteArrayU32, ReadFifoU64 and
+WriteFifoU64 entry points are replaced by Python functions backed by
+memory.
+
+Usage:
+    python benchmarks/fxp_values.py [number of FIFO elements]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import ctypes
+import random
+import sys
+import xml.etree.ElementTree as ElementTree
+
+from nifpga import FxpFormat
+from nifpga.bitfile import Fifo
+from nifpga.session import _FxpFIFO
+from nifpga.statuscheckedlibrary import FunctionInfo, StatusCheckedFunctions
+
+from benchmark_helpers import FXP_XML, best_of, bitfile_register, create_register
+
+FIFO_XML = """
+<Channel name="FXP FIFO">
+    <DataType>
+        <IntegerWordLength>8</IntegerWordLength>
+        <Signed>true</Signed>
+        <SubType>FXP</SubType>
+        <WordLength>16</WordLength>
+    </DataType>
+    <Number>0</Number>
+</Channel>
+"""
+
+
+class MemoryBackedLibrary(object):
+    """ Register and FIFO entry points that copy to and from memory. """
+    def __init__(self, number_of_elements):
+        self.register = [0]
+        self.fifo = [random.getrandbits(16) for _ in range(number_of_elements)]
+
+    def read_array(self, session, indicator, array, size):
+        array[0] = self.register[0]
+        return 0
+
+    def write_array(self, session, control, array, size):
+        self.register[0] = array[0]
+        return 0
+
+    def read_fifo(self, session, fifo, data, number_of_elements, timeout_ms, elements_remaining):
+        ctypes.memmove(data, (ctypes.c_uint64 * number_of_elements)(*self.fifo),
+                       8 * number_of_elements)
+        return 0
+
+    def write_fifo(self, session, fifo, data, number_of_elements, timeout_ms, elements_remaining):
+        return 0
+
+    def succeed(self, *args):
+        return 0
+
+    def functions(self):
+        array_args = ["session", "resource", "array", "size"]
+        fifo_args = ["session", "fifo", "data", "number of elements",
+                     "timeout ms", "elements remaining"]
+        return StatusCheckedFunctions([
+            FunctionInfo(self.read_array, "ReadArrayU32", array_args),
+            FunctionInfo(self.write_array, "WriteArrayU32", array_args),
+            FunctionInfo(self.read_fifo, "ReadFifoU64", fifo_args),
+            FunctionInfo(self.write_fifo, "WriteFifoU64", fifo_args),
+            FunctionInfo(self.succeed, "AcquireFifoReadElementsU64", []),
+            FunctionInfo(self.succeed, "AcquireFifoWriteElementsU64", []),
+            FunctionInfo(self.succeed, "ReleaseFifoElements", []),
+        ])
+
+
+def main(number_of_elements):
+    library = MemoryBackedLibrary(number_of_elements)
+    functions = library.functions()
+    register = create_register(functions, bitfile_register("FXP Register", FXP_XML % ("FXP Register", 16, 8)))
+    fifo = _FxpFIFO(ctypes.c_uint32(0), functions, Fifo(ElementTree.fromstring(FIFO_XML)))
+
+    print("%-12s %14s %14s %16s %16s %16s"
+          % ("format", "reg read us", "reg write us", "FIFO read el/s",
+             "FIFO write el/s", "sort+sum el/s"))
+    for output_format in (FxpFormat.Decimal, FxpFormat.FixedPoint, FxpFormat.Float):
+        value = register.read(output_format=output_format)
+        values = fifo.read(number_of_elements, output_format=output_format).data
+        values = list(values)
+        register_read = best_of(lambda: register.read(output_format=output_format), 20000)
+        register_write = best_of(lambda: register.write(value), 20000)
+        fifo_read = best_of(lambda: fifo.read(number_of_elements, output_format=output_format), 3)
+        fifo_write = best_of(lambda: fifo.write(values), 3)
+        arithmetic = best_of(lambda: (sorted(values), sum(values[1:], values[0])), 3)
+        print("%-12s %14.2f %14.2f %16.0f %16.0f %16.0f"
+              % (output_format, register_read * 1e6, register_write * 1e6,
+                 number_of_elements / fifo_read, number_of_elements / fifo_write,
+                 number_of_elements / arithmetic))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,156 @@
+"""
+Measures how parsing a bitfile, opening a session on it and looking up
+registers by name scale with the size of the bitfile, on synthetic
+bitfiles from synthetic_bitfile.py.  For each number of registers, reports:
+
+    file MB          the size of the .lvbitx file
+    parse s          the time Bitfile() takes to parse it from disk
+    peak MB          the most memory parsing it allocates at once
+    B/reg            the memory the parsed Bitfile keeps, per register
+    open ms          the time Session() takes on the parsed Bitfile
+    first us         the time of each first lookup of a register by name,
+                     which creates the session's register object
+    lookup ns        the time of each later lookup
+
+Sessions are opened on a simulated FPGA, nifpga.SimulatedNiFpga, so no
+hardware or driver is needed.  Times are the best of --repeat runs, memory is what
+tracemalloc counts in a separate run.  With --json, the results are also
+written as JSON, with the parameters and the Python and platform they were
+measured on, for comparing across releases.
+
+Usage:
+    python benchmarks/metadata_scaling.py [--sizes 1000,10000,100000]
+        [--fifos N] [--cluster-depth N] [--array-size N]
+        [--bitstream-bytes N] [--repeat N] [--json PATH]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import timeit
+import tracemalloc
+import warnings
+
+import nifpga
+
+from synthetic_bitfile import write
+
+
+def open_session(bitfile, simulation):
+    return nifpga.Session(bitfile, "RIO0", library=simulation)
+
+
+def parse(path):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return nifpga.Bitfile(path)
+
+
+def best_time(function, repeat):
+    """ Returns the shortest of repeat runs of function, in seconds. """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.time()
+        function()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def memory(function):
+    """ Returns (peak, retained) bytes allocated by function(). """
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def measure(path, registers, repeat):
+    # before keeping a Bitfile, which would share its types with the
+    # Bitfiles parsed here
+    parse_seconds = best_time(lambda: parse(path), repeat)
+    peak, retained = memory(lambda: parse(path))
+    bitfile = parse(path)
+    simulation = nifpga.SimulatedNiFpga(bitfile)
+    names = sorted(bitfile.registers)[::max(1, registers // 1000)]
+
+    def first_lookups():
+        session = open_session(bitfile, simulation)
+        start = time.time()
+        for name in names:
+            session.registers[name]
+        return (time.time() - start) / len(names)
+
+    session = open_session(bitfile, simulation)
+    for name in names:
+        session.registers[name]
+    lookups = timeit.Timer(lambda: [session.registers[name] for name in names])
+    lookup_seconds = min(lookups.repeat(repeat=repeat, number=10)) / 10 / len(names)
+    return {
+        "registers": registers,
+        "file_bytes": os.path.getsize(path),
+        "parse_seconds": parse_seconds,
+        "parse_peak_bytes": peak,
+        "bitfile_bytes_per_register": float(retained) / registers,
+        "session_open_seconds": best_time(lambda: open_session(bitfile, simulation), repeat),
+        "first_lookup_seconds": min(first_lookups() for _ in range(repeat)),
+        "lookup_seconds": lookup_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures how bitfile metadata paths scale.")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma separated numbers of registers")
+    parser.add_argument("--fifos", type=int, default=16)
+    parser.add_argument("--cluster-depth", type=int, default=2)
+    parser.add_argument("--array-size", type=int, default=16)
+    parser.add_argument("--bitstream-bytes", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file, as JSON")
+    arguments = parser.parse_args()
+    sizes = [int(size) for size in arguments.sizes.split(",")]
+
+    print("%-10s %8s %8s %8s %8s %8s %8s %10s" % (
+        "registers", "file MB", "parse s", "peak MB", "B/reg", "open ms", "first us", "lookup ns"))
+    results = []
+    directory = tempfile.mkdtemp()
+    try:
+        for registers in sizes:
+            path = os.path.join(directory, "synthetic.lvbitx")
+            write(path, registers=registers, fifos=arguments.fifos, cluster_depth=arguments.cluster_depth,
+                  array_size=arguments.array_size, bitstream_bytes=arguments.bitstream_bytes)
+            result = measure(path, registers, arguments.repeat)
+            results.append(result)
+            print("%-10d %8.1f %8.2f %8.1f %8.0f %8.2f %8.1f %10.0f" % (
+                registers, result["file_bytes"] / 1e6, result["parse_seconds"],
+                result["parse_peak_bytes"] / 1e6, result["bitfile_bytes_per_register"],
+                result["session_open_seconds"] * 1e3, result["first_lookup_seconds"] * 1e6,
+                result["lookup_seconds"] * 1e9))
+    finally:
+        shutil.rmtree(directory)
+
+    if arguments.json:
+        parameters = dict(vars(arguments), sizes=sizes)
+        del parameters["json"]
+        with open(arguments.json, "w") as output:
+            json.dump({"benchmark": "metadata_scaling",
+                       "python": platform.python_version(),
+                       "implementation": platform.python_implementation(),
+                       "platform": platform.platform(),
+                       "parameters": parameters,
+                       "results": results}, output, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures how decoding a large FXP FIFO buffer with nifpga.ParallelDecoder
+scales with the number of workers, for each output format, and how decoding
+a large buffer of clusters into a numpy structured array does.
+
+Usage:
+    python benchmarks/parallel_decode.py [number of elements] [max workers]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+Speedups depend on the number of CPUs, which is printed first.
+"""
+import ctypes
+import multiprocessing
+import random
+import sys
+import xml.etree.ElementTree as ElementTree
+
+from nifpga import Bitfile, FxpFormat, ParallelDecoder
+from nifpga.bitfile import _parse_type
+from nifpga.layout import ElementLayout
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from benchmark_helpers import best_of
+from synthetic_bitfile import generate
+
+FXP_XML = """
+<DataType>
+    <IntegerWordLength>8</IntegerWordLength>
+    <Signed>true</Signed>
+    <SubType>FXP</SubType>
+    <WordLength>24</WordLength>
+    <IncludeOverflowStatus>false</IncludeOverflowStatus>
+</DataType>
+"""
+
+
+def main(number_of_elements, max_workers):
+    fxp = _parse_type(ElementTree.fromstring(FXP_XML))
+    buf = (ctypes.c_uint64 * number_of_elements)(
+        *[random.getrandbits(fxp.size_in_bits) for _ in range(number_of_elements)])
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+
+    print("%d CPUs, %d elements" % (multiprocessing.cpu_count(), number_of_elements))
+    print("%-12s %8s %16s %8s" % ("format", "workers", "elements/s", "speedup"))
+    for output_format in (FxpFormat.Float, FxpFormat.Mantissa, FxpFormat.Decimal,
+                          FxpFormat.FixedPoint):
+        baseline = None
+        for workers in worker_counts:
+            with ParallelDecoder(max_workers=workers, min_elements=0) as decoder:
+                decoder.unpack_batch(fxp, buf, output_format)  # start the pool
+                seconds = best_of(lambda: decoder.unpack_batch(fxp, buf, output_format), 1)
+            baseline = baseline or seconds
+            print("%-12s %8d %16.0f %7.2fx"
+                  % (output_format, workers, number_of_elements / seconds, baseline / seconds))
+
+    if numpy is None:
+        return
+    # FIFO 4 of a synthetic bitfile is of clusters, see synthetic_bitfile.py
+    cluster = Bitfile(generate(registers=0, fifos=5, cluster_depth=2), parse_contents=True).fifos["FIFO 4"].type
+    layout = ElementLayout(cluster)
+    words = numpy.random.randint(0, 1 << 32, number_of_elements * layout.words_per_element,
+                                 dtype=numpy.uint64).astype(numpy.uint32)
+    baseline = None
+    for workers in worker_counts:
+        with ParallelDecoder(max_workers=workers, min_elements=0) as decoder:
+            decoder.unpack_elements(layout, words)  # start the pool
+            seconds = best_of(lambda: decoder.unpack_elements(layout, words), 1)
+        baseline = baseline or seconds
+        print("%-12s %8d %16.0f %7.2fx"
+              % ("cluster", workers, number_of_elements / seconds, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else multiprocessing.cpu_count())
@@ -0,0 +1,67 @@
+"""
+Polls three groups of indicators, of 40 registers at 1 kHz, 20 at 100 Hz
+and 5 at 10 Hz, with one Poller for a few seconds, and prints each group's
+PollStatistics: how late polls started (jitter), how long they took, and how
+many were overrun.  Then measures how long retrieving the last N samples of
+a register takes.
+
+No hardware is needed, the register entry points are replaced by stubs
+that just return success, so the numbers are the cost of nifpga-python
+itself, and of the operating system's thread scheduling.
+
+Usage:
+    python benchmarks/poller.py [seconds]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+import time
+
+from nifpga import Poller
+from nifpga.accessplan import AccessPlan
+
+from benchmark_helpers import best_of, bitfile_register, create_register, stub_library
+
+GROUPS = [("Fast", 40, 1000), ("Medium", 20, 100), ("Slow", 5, 10)]
+
+
+class _StubSession(object):
+    """ Just enough of a Session for a Poller. """
+    def __init__(self, registers):
+        self.registers = registers
+
+    def access_plan(self, names):
+        return AccessPlan(self.registers, names)
+
+
+def main(seconds):
+    library = stub_library()
+    registers = {}
+    for prefix, count, _ in GROUPS:
+        for index in range(count):
+            name = "%s %d" % (prefix, index)
+            registers[name] = create_register(library, bitfile_register(
+                name, "<I32><Name></Name></I32>", indicator=True, offset=4 * len(registers)))
+    poller = Poller(_StubSession(registers))
+    for prefix, count, rate_hz in GROUPS:
+        poller.add_group(["%s %d" % (prefix, index) for index in range(count)], rate_hz, capacity=4096)
+    with poller:
+        poller.start()
+        time.sleep(seconds)
+    print("%-8s %8s %8s %8s %8s %12s %12s %12s %12s" % (
+        "group", "rate Hz", "samples", "overruns", "skipped",
+        "jitter us", "max jit us", "std jit us", "read us"))
+    for (prefix, count, rate_hz), group in zip(GROUPS, poller.groups):
+        statistics = group.statistics()
+        print("%-8s %8d %8d %8d %8d %12.1f %12.1f %12.1f %12.1f" % (
+            prefix, rate_hz, statistics.samples, statistics.overruns, statistics.skipped,
+            statistics.mean_jitter_ns / 1e3, statistics.max_jitter_ns / 1e3,
+            statistics.stddev_jitter_ns / 1e3, statistics.mean_duration_ns / 1e3))
+    print()
+    print("%-12s %12s" % ("last N", "us"))
+    for count in (1, 100, 4096):
+        print("%-12d %12.1f" % (count, best_of(lambda: poller.last("Fast 0", count), 1000) * 1e6))
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3)
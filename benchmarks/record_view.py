@@ -0,0 +1,35 @@
+"""
+Compares reading a large status cluster and checking one member of it,
+decoded into an OrderedDict (ClusterFormat.Dict) and as a RecordView
+(ClusterFormat.View), and the cost of converting the whole view to a
+dictionary, for clusters of 16 to 256 members of mixed types.
+
+No hardware is needed, the ReadArrayU32 entry point is replaced by a stub
+that just returns success, so the numbers are the cost of nifpga-python
+itself.
+
+Usage:
+    python benchmarks/record_view.py [number of reads]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+
+from nifpga import ClusterFormat
+
+from benchmark_helpers import best_of, bitfile_register, create_register, mixed_cluster, stub_library
+
+
+def main(number):
+    print("%-8s %12s %12s %9s %14s" % ("members", "dict us", "view us", "speedup", "to_dict() us"))
+    for members in (16, 64, 256):
+        datatype, _ = mixed_cluster(members)
+        register = create_register(stub_library(), bitfile_register("Status", datatype, indicator=True))
+        dict_us = best_of(lambda: register.read(cluster_format=ClusterFormat.Dict)["member 0"], number) * 1e6
+        view_us = best_of(lambda: register.read(cluster_format=ClusterFormat.View)["member 0"], number) * 1e6
+        to_dict_us = best_of(lambda: register.read(cluster_format=ClusterFormat.View).to_dict(), number) * 1e6
+        print("%-8d %12.1f %12.1f %8.1fx %14.1f" % (members, dict_us, view_us, dict_us / view_us, to_dict_us))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,67 @@
+"""
+Measures the overhead, in nanoseconds per call, of reading and writing a
+register of every DataType through the Session register wrappers.
+
+No hardware is needed, every entry point is replaced by a stub that just
+returns success, so the numbers are the cost of nifpga-python itself.  FXP
+and cluster registers go through ReadArrayU32 and WriteArrayU32, so they
+are measured for a narrow and a wide (multi-word) type each.
+
+Usage:
+    python benchmarks/register_access.py [number of calls]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+from decimal import Decimal
+
+from nifpga import DataType
+
+from benchmark_helpers import FXP_XML, best_of, bitfile_register, create_register, stub_library
+
+CLUSTER_XML = """
+<Cluster>
+    <Name></Name>
+    <TypeList>%s</TypeList>
+</Cluster>
+"""
+
+SCALAR_TYPES = {
+    DataType.Bool: ("<Boolean><Name></Name></Boolean>", True),
+    DataType.I8: ("<I8><Name></Name></I8>", -8),
+    DataType.U8: ("<U8><Name></Name></U8>", 8),
+    DataType.I16: ("<I16><Name></Name></I16>", -16),
+    DataType.U16: ("<U16><Name></Name></U16>", 16),
+    DataType.I32: ("<I32><Name></Name></I32>", -32),
+    DataType.U32: ("<U32><Name></Name></U32>", 32),
+    DataType.I64: ("<I64><Name></Name></I64>", -64),
+    DataType.U64: ("<U64><Name></Name></U64>", 64),
+    DataType.Sgl: ("<SGL><Name></Name></SGL>", 1.5),
+    DataType.Dbl: ("<DBL><Name></Name></DBL>", 2.5),
+}
+
+CONVERTED_TYPES = [
+    ("FXP 16 bit", FXP_XML % ("", 16, 8), Decimal("1.5")),
+    ("FXP 64 bit", FXP_XML % ("", 64, 32), Decimal("1.5")),
+    ("Cluster 32 bit", CLUSTER_XML % ("<U16><Name>a</Name></U16><I16><Name>b</Name></I16>"),
+     {"a": 1, "b": -1}),
+    ("Cluster 96 bit", CLUSTER_XML % ("<U32><Name>a</Name></U32><I64><Name>b</Name></I64>"),
+     {"a": 1, "b": -1}),
+]
+
+
+def main(number):
+    library = stub_library()
+    print("%-16s %12s %12s" % ("type", "read ns", "write ns"))
+    for datatype, (type_xml, value) in SCALAR_TYPES.items():
+        register = create_register(library, bitfile_register(str(datatype), type_xml))
+        print("%-16s %12.0f %12.0f" % (datatype, best_of(register.read, number) * 1e9,
+                                       best_of(lambda: register.write(value), number) * 1e9))
+    for name, type_xml, value in CONVERTED_TYPES:
+        register = create_register(library, bitfile_register(name, type_xml))
+        print("%-16s %12.0f %12.0f" % (name, best_of(register.read, number) * 1e9,
+                                       best_of(lambda: register.write(value), number) * 1e9))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
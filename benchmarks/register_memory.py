@@ -0,0 +1,68 @@
+"""
+Measures the memory a parsed bitfile holds per register, and what a
+session's register objects add, for synthetic bitfiles of 10,000 and
+100,000 registers from synthetic_bitfile.py: a mix of scalars, FXPs,
+arrays and clusters, written as LabVIEW writes them, so that e.g. every
+cluster repeats the XML of its members' types.
+
+Memory is what tracemalloc counts as still allocated once the bitfile's
+XML has been parsed and freed, divided by the number of registers, and
+times are of separate runs without tracemalloc.  A Session
+creates its register objects as they're first used; "used B/reg" is what
+each adds, measured by creating them all through stub entry points, so no
+hardware or driver is needed.
+
+Usage:
+    python benchmarks/register_memory.py [number of registers ...]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from nifpga.bitfile import Bitfile
+
+from benchmark_helpers import create_register, stub_library
+from synthetic_bitfile import generate
+
+
+def bitfile_xml(count):
+    return generate(registers=count, fifos=0, cluster_depth=1)
+
+
+def measure(function):
+    """ Returns (result, seconds, bytes still allocated) of function(),
+    timed in a run without tracemalloc, which slows allocation down. """
+    gc.collect()
+    start = time.time()
+    function()
+    seconds = time.time() - start
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, seconds, allocated
+
+
+def main(counts):
+    library = stub_library()
+    print("%-10s %12s %14s %12s %14s" % ("registers", "parse s", "bitfile B/reg", "create s", "used B/reg"))
+    for count in counts:
+        xml = bitfile_xml(count)
+        bitfile, parse_seconds, bitfile_bytes = measure(lambda: Bitfile(xml, parse_contents=True))
+        base_address = bitfile.base_address_on_device()
+        _, create_seconds, register_bytes = measure(
+            lambda: dict((name, create_register(library, register, base_address))
+                         for name, register in bitfile.registers.items()))
+        print("%-10d %12.2f %14.0f %12.2f %14.0f" % (
+            count, parse_seconds, float(bitfile_bytes) / count, create_seconds, float(register_bytes) / count))
+        # free them, with the types they intern, before the next count
+        bitfile = None
+
+
+if __name__ == "__main__":
+    main([int(count) for count in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,47 @@
+"""
+Measures the cost, in nanoseconds, of writing a control the value it
+already holds, and of reading it back, with and without a shadow cache,
+for a scalar, an FXP and a multi-word cluster control.
+
+No hardware is needed, the register entry points are replaced by stubs
+that sleep for the given number of microseconds (0 by default), standing
+in for the bus access that a suppressed write saves.
+
+Usage:
+    python benchmarks/shadow_cache.py [number of calls] [microseconds per entry point call]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+from decimal import Decimal
+
+from nifpga.shadow import ShadowCache
+
+from benchmark_helpers import FXP_XML, best_of, bitfile_register, create_register, stub_library
+
+TYPES = [
+    ("I32", "<I32><Name></Name></I32>", -32),
+    ("FXP 24 bit", FXP_XML % ("", 24, 8), Decimal("1.5")),
+    ("Cluster 96 bit", "<Cluster><Name></Name><TypeList><U32><Name>a</Name></U32>"
+                       "<I64><Name>b</Name></I64></TypeList></Cluster>", {"a": 1, "b": -1}),
+]
+
+
+def main(number, delay_us):
+    library = stub_library(delay_us / 1e6)
+    print("%-16s %12s %12s %12s %12s" % ("type", "write ns", "cached ns", "read ns", "cached ns"))
+    for name, type_xml, value in TYPES:
+        register = create_register(library, bitfile_register(name, type_xml))
+        times = []
+        for cache in (None, ShadowCache(serve_reads=True)):
+            register._set_shadow_cache(cache)
+            register.write(value)
+            times.append((best_of(lambda: register.write(value), number),
+                          best_of(register.read, number)))
+        print("%-16s %12.0f %12.0f %12.0f %12.0f" % (name, times[0][0] * 1e9, times[1][0] * 1e9,
+                                                     times[0][1] * 1e9, times[1][1] * 1e9))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0)
@@ -0,0 +1,233 @@
+"""
+Measures how fast sessions stream data, per API path, on a simulated FPGA
+(nifpga.SimulatedNiFpga) that fills and drains its FIFOs as fast as the host
+reads and writes them, so what's measured is the host side: nifpga's own
+cost of each call, with the C API's reduced to copying memory.  Reports:
+
+    FIFO reads and writes   million elements per second, for each
+                            element type and output format, for each
+                            number of elements per call
+    registers               reads and writes per second, for each kind of
+                            register and format
+    IRQs                    waits per second on an IRQ already asserted,
+                            and the median and 99th percentile latency of
+                            waking a wait from another thread
+
+Sessions are opened on a synthetic bitfile from synthetic_bitfile.py.  Rates
+are the best of --repeat runs of at least --seconds each.  With --json, the
+results are also written as JSON, with the Python and platform they were
+measured on, for comparing across releases.
+
+Usage:
+    python benchmarks/simulated_throughput.py [--elements 1000,100000]
+        [--seconds S] [--repeat N] [--irq-wakes N] [--json PATH]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import nifpga
+from nifpga import ClusterFormat, FxpFormat
+from nifpga.nifpga import INFINITE_TIMEOUT
+from nifpga._util import _monotonic
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from synthetic_bitfile import write
+
+# FIFO n of a synthetic bitfile is target to host if n is even, and of
+# synthetic_bitfile.FIFO_TYPES[n % 5]
+READ_FIFOS = OrderedDict([("U32", "FIFO 0"), ("FXP", "FIFO 2"), ("cluster", "FIFO 4")])
+WRITE_FIFOS = OrderedDict([("I16", "FIFO 1"), ("U64", "FIFO 3"), ("FXP", "FIFO 7"), ("cluster", "FIFO 9")])
+
+
+def calls_per_second(function, seconds, repeat):
+    """ Returns the most times per second function() was called, of repeat
+    runs calling it for at least seconds. """
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        start = _monotonic()
+        elapsed = 0.0
+        while elapsed < seconds:
+            function()
+            calls += 1
+            elapsed = _monotonic() - start
+        best = max(best, calls / elapsed)
+    return best
+
+
+def fifo_paths(session, elements):
+    """ Returns (name, function) of each way to read or write elements
+    elements of a FIFO. """
+    paths = []
+    u32 = session.fifos[READ_FIFOS["U32"]]
+    paths.append(("read U32", lambda: u32.read(elements)))
+    paths.append(("read U32, no raise", lambda: u32.read(elements, raise_on_timeout=False)))
+    fxp = session.fifos[READ_FIFOS["FXP"]]
+    for output_format in FxpFormat:
+        if output_format in (FxpFormat.Float, FxpFormat.Mantissa) and numpy is None:
+            continue
+        paths.append(("read FXP %s" % output_format,
+                      lambda output_format=output_format: fxp.read(elements, output_format=output_format)))
+    cluster = session.fifos[READ_FIFOS["cluster"]]
+    paths.append(("read cluster", lambda: cluster.read(elements)))
+
+    for name in ("I16", "U64"):
+        fifo = session.fifos[WRITE_FIFOS[name]]
+        paths.append(("write %s list" % name, lambda fifo=fifo, data=[1] * elements: fifo.write(data)))
+    fxp_out = session.fifos[WRITE_FIFOS["FXP"]]
+    paths.append(("write FXP floats", lambda data=[0.5] * elements: fxp_out.write(data)))
+    if numpy is not None:
+        paths.append(("write FXP ndarray", lambda data=numpy.full(elements, 0.5): fxp_out.write(data)))
+    cluster_out = session.fifos[WRITE_FIFOS["cluster"]]
+    element = cluster_out._unpack_element([0] * cluster_out._words_per_element)
+    paths.append(("write cluster dicts", lambda data=[element] * elements: cluster_out.write(data)))
+    if numpy is not None:
+        paths.append(("write cluster ndarray",
+                      lambda data=numpy.zeros(elements, dtype=cluster_out.dtype): cluster_out.write(data)))
+    return paths
+
+
+def first_register(bitfile, predicate):
+    return next(name for name, register in sorted(bitfile.registers.items()) if predicate(register))
+
+
+def register_paths(session, bitfile):
+    """ Returns (name, function) of each way to read or write a register. """
+    def named(type_name):
+        return first_register(bitfile, lambda register: not register.is_array() and str(register.datatype) == type_name)
+    u32 = session.registers[named("U32")]
+    boolean = session.registers[named("Bool")]
+    fxp = session.registers[named("Fxp")]
+    array = session.registers[first_register(bitfile, lambda register: register.is_array()
+                                             and str(register.datatype) == "U16")]
+    cluster = session.registers[named("Cluster")]
+    many = [first_register(bitfile, lambda register, type_name=type_name: str(register.datatype) == type_name
+                           and not register.is_array())
+            for type_name in ("U8", "I16", "U32", "I64", "Sgl", "Dbl", "Bool", "Fxp")]
+    array_values = array.read()
+    cluster_value = cluster.read()
+    paths = [
+        ("read U32", u32.read),
+        ("write U32", lambda: u32.write(7)),
+        ("read Boolean", boolean.read),
+        ("read FXP Decimal", fxp.read),
+        ("read FXP Float", lambda: fxp.read(output_format=FxpFormat.Float)),
+        ("write FXP", lambda: fxp.write(0.5)),
+        ("read U16 array", array.read),
+        ("write U16 array", lambda: array.write(array_values)),
+        ("read cluster Dict", cluster.read),
+        ("read cluster View", lambda: cluster.read(cluster_format=ClusterFormat.View)),
+        ("read cluster Record", lambda: cluster.read(cluster_format=ClusterFormat.Record)),
+        ("write cluster", lambda: cluster.write(cluster_value)),
+        ("read_many 8 registers", lambda: session.read_many(many)),
+    ]
+    if numpy is not None:
+        paths.insert(7, ("read U16 array ndarray", lambda: array.read(output_type=numpy.ndarray)))
+    return paths
+
+
+def irq_latencies(session, simulation, wakes):
+    """ Returns the seconds from asserting an IRQ on another thread to
+    wait_on_irqs() returning, for each of wakes waits. """
+    asserted_at = [None]
+    ready = threading.Event()
+    latencies = []
+
+    def assert_irq():
+        for _ in range(wakes):
+            ready.wait()
+            ready.clear()
+            # let the waiter block
+            time.sleep(0.0005)
+            asserted_at[0] = _monotonic()
+            simulation.assert_irqs(0)
+
+    asserter = threading.Thread(target=assert_irq)
+    asserter.start()
+    for _ in range(wakes):
+        ready.set()
+        session.wait_on_irqs(0, INFINITE_TIMEOUT)
+        latencies.append(_monotonic() - asserted_at[0])
+        session.acknowledge_irqs([0])
+    asserter.join()
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures session throughput on a simulated FPGA.")
+    parser.add_argument("--elements", default="1000,100000",
+                        help="comma separated numbers of elements per FIFO read or write")
+    parser.add_argument("--seconds", type=float, default=0.2,
+                        help="the least time to call each path for, per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--irq-wakes", type=int, default=1000)
+    parser.add_argument("--json", help="also write the results to this file, as JSON")
+    arguments = parser.parse_args()
+    sizes = [int(size) for size in arguments.elements.split(",")]
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "synthetic.lvbitx")
+        write(path, registers=200, fifos=10, cluster_depth=2, array_size=16)
+        bitfile = nifpga.Bitfile(path)
+        simulation = nifpga.SimulatedNiFpga(bitfile, fifo_rate=float("inf"))
+        with nifpga.Session(bitfile, "RIO0", library=simulation) as session:
+            results = {"fifos": [], "registers": [], "irqs": {}}
+            print("%-28s %12s %10s" % ("FIFO path", "elements", "MS/s"))
+            for fifo in session.fifos.values():
+                # room for the largest read of clusters of several words
+                fifo.configure(8 * max(sizes))
+            for elements in sizes:
+                for name, function in fifo_paths(session, elements):
+                    rate = calls_per_second(function, arguments.seconds, arguments.repeat) * elements
+                    results["fifos"].append({"path": name, "elements": elements, "elements_per_second": rate})
+                    print("%-28s %12d %10.2f" % (name, elements, rate / 1e6))
+
+            print("\n%-28s %12s" % ("register path", "ops/s"))
+            for name, function in register_paths(session, bitfile):
+                rate = calls_per_second(function, arguments.seconds, arguments.repeat)
+                results["registers"].append({"path": name, "operations_per_second": rate})
+                print("%-28s %12.0f" % (name, rate))
+
+            def wait_asserted():
+                simulation.assert_irqs(0)
+                session.wait_on_irqs(0, 0)
+                session.acknowledge_irqs([0])
+            rate = calls_per_second(wait_asserted, arguments.seconds, arguments.repeat)
+            latencies = irq_latencies(session, simulation, arguments.irq_wakes)
+            results["irqs"] = {"asserted_waits_per_second": rate,
+                               "wake_latency_median_seconds": latencies[len(latencies) // 2],
+                               "wake_latency_p99_seconds": latencies[int(len(latencies) * 0.99)]}
+            print("\n%-28s %12.0f" % ("IRQ waits/s, asserted", rate))
+            print("%-28s %12.1f" % ("IRQ wake median us", results["irqs"]["wake_latency_median_seconds"] * 1e6))
+            print("%-28s %12.1f" % ("IRQ wake p99 us", results["irqs"]["wake_latency_p99_seconds"] * 1e6))
+    finally:
+        shutil.rmtree(directory)
+
+    if arguments.json:
+        parameters = dict(vars(arguments), elements=sizes)
+        del parameters["json"]
+        with open(arguments.json, "w") as output:
+            json.dump({"benchmark": "simulated_throughput",
+                       "python": platform.python_version(),
+                       "implementation": platform.python_implementation(),
+                       "platform": platform.platform(),
+                       "numpy": numpy.__version__ if numpy is not None else None,
+                       "parameters": parameters,
+                       "results": results}, output, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Generates synthetic .lvbitx files, valid as far as nifpga.Bitfile is
+concerned, of any size, for measuring how parsing a bitfile and opening a
+session scale, and for benchmarks that need more than the test bitfile's
+registers and FIFOs.
+
+Registers cycle through every scalar type, FXPs, arrays and nested
+clusters, alternating between controls and indicators, at non-overlapping
+offsets.  FIFOs cycle through scalar, FXP and cluster elements, alternating
+between target to host and host to target.  Everything is written the way
+LabVIEW writes it, including elements nifpga ignores, so parsing costs what
+it would for a real bitfile of that size.  The same arguments always
+generate the same file.
+
+Usage:
+    python benchmarks/synthetic_bitfile.py OUTPUT [--registers N] [--fifos N]
+        [--cluster-depth N] [--array-size N] [--bitstream-bytes N]
+
+or, from other benchmarks::
+
+    from synthetic_bitfile import generate
+    bitfile = nifpga.Bitfile(generate(registers=10000), parse_contents=True)
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import argparse
+import base64
+import hashlib
+import random
+
+BITFILE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Bitfile>
+   <BitfileVersion>4.0</BitfileVersion>
+   <Documentation>
+      <BuildSpecVersion>1.0.0</BuildSpecVersion>
+      <BuildSpecDescription></BuildSpecDescription>
+   </Documentation>
+   <SignatureRegister>%(signature)s</SignatureRegister>
+   <SignatureGuids>%(signature)s</SignatureGuids>
+   <SignatureNames>%(signature)s</SignatureNames>
+   <TimeStamp></TimeStamp>
+   <CompilationStatus></CompilationStatus>
+   <BitstreamVersion>2</BitstreamVersion>
+   <VI>
+      <Name>Synthetic.vi</Name>
+      <RegisterList>
+%(registers)s
+      </RegisterList>
+   </VI>
+   <Project>
+      <TargetClass>cRIO-9068</TargetClass>
+      <AutoRunWhenDownloaded>false</AutoRunWhenDownloaded>
+      <CompilationResultsTree>
+         <CompilationResults>
+            <NiFpga>
+               <BaseAddressOnDevice>0</BaseAddressOnDevice>
+               <DmaChannelAllocationList>
+%(fifos)s
+               </DmaChannelAllocationList>
+               <RegisterBlockList></RegisterBlockList>
+               <UsedBaseClockList></UsedBaseClockList>
+               <version>1</version>
+            </NiFpga>
+         </CompilationResults>
+      </CompilationResultsTree>
+      <MultipleUserClocks>false</MultipleUserClocks>
+      <AllowImplicitEnableRemoval>false</AllowImplicitEnableRemoval>
+   </Project>
+   <ClientData></ClientData>
+   <BitstreamMD5>%(bitstream_md5)s</BitstreamMD5>
+   <Bitstream>%(bitstream)s</Bitstream>
+</Bitfile>
+"""
+
+REGISTER_XML = """         <Register>
+            <Name>%(name)s</Name>
+            <Hidden>false</Hidden>
+            <Indicator>%(indicator)s</Indicator>
+            <Datatype>
+%(datatype)s
+            </Datatype>
+            <FlattenedType>%(flattened)s</FlattenedType>
+            <Grouping></Grouping>
+            <Offset>%(offset)d</Offset>
+            <SizeInBits>%(size_in_bits)d</SizeInBits>
+            <Class>14</Class>
+            <Internal>false</Internal>
+            <TypedefPath></TypedefPath>
+            <TypedefRelativePath></TypedefRelativePath>
+            <ID>%(id)d</ID>
+            <Bidirectional>true</Bidirectional>
+            <Synchronous>false</Synchronous>
+            <MechanicalAction>Switch When Pressed</MechanicalAction>
+            <AccessMayTimeout>false</AccessMayTimeout>
+            <RegisterNode>false</RegisterNode>
+            <SubControlList></SubControlList>
+         </Register>"""
+
+FIFO_XML = """                  <Channel name="%(name)s">
+                     <BaseAddressTag>NiLvFpga%(name)s</BaseAddressTag>
+                     <ControlSet>0</ControlSet>
+                     <DataType>
+%(datatype)s
+                     </DataType>
+                     <Direction>%(direction)s</Direction>
+                     <Implementation>niFpga%(direction)s</Implementation>
+                     <Number>%(number)d</Number>
+                     <NumberOfElements>1023</NumberOfElements>
+                     <UserVisible>true</UserVisible>
+                  </Channel>"""
+
+FXP_XML = """<FXP>
+<Name>%s</Name>
+<Delta>0.000015258789062500000000000000000000000000000000000000</Delta>
+<IntegerWordLength>8</IntegerWordLength>
+<Maximum>127.9999847412109375000000000000000000000000000000000</Maximum>
+<Minimum>-128.0000000000000000000000000000000000000000000000000</Minimum>
+<Signed>true</Signed>
+<WordLength>24</WordLength>
+<IncludeOverflowStatus>true</IncludeOverflowStatus>
+</FXP>"""
+FXP_SIZE_IN_BITS = 25
+
+FXP_SUBTYPE_XML = """<Delta>0.000015258789062500000000000000000000000000000000000000</Delta>
+<IntegerWordLength>8</IntegerWordLength>
+<Maximum>127.9999847412109375000000000000000000000000000000000</Maximum>
+<Minimum>-128.0000000000000000000000000000000000000000000000000</Minimum>
+<Signed>true</Signed>
+<SubType>FXP</SubType>
+<WordLength>24</WordLength>"""
+
+# (type name, size in bits) of every scalar type registers cycle through
+SCALAR_TYPES = [("Boolean", 1), ("I8", 8), ("U8", 8), ("I16", 16), ("U16", 16), ("I32", 32),
+                ("U32", 32), ("I64", 64), ("U64", 64), ("SGL", 32), ("DBL", 64)]
+ARRAY_ELEMENT_TYPES = [("Boolean", 1), ("U16", 16), ("I32", 32), ("DBL", 64)]
+FIFO_TYPES = ["U32", "I16", "FXP", "U64", "Cluster"]
+
+
+def scalar_type(type_name, name):
+    return "<%s><Name>%s</Name></%s>" % (type_name, name, type_name)
+
+
+def cluster_type(name, depth, array_size):
+    """ Returns (XML, size in bits) of a cluster of a Boolean, an I32, an
+    FXP, an array and, unless depth is 1, a cluster of depth - 1. """
+    members = [scalar_type("Boolean", "Valid"), scalar_type("I32", "Count"), FXP_XML % "Value",
+               array_type("Samples", ("U16", 16), array_size)[0]]
+    size_in_bits = 1 + 32 + FXP_SIZE_IN_BITS + 16 * array_size
+    if depth > 1:
+        nested, nested_size = cluster_type("Level %d" % (depth - 1), depth - 1, array_size)
+        members.append(nested)
+        size_in_bits += nested_size
+    return ("<Cluster>\n<Name>%s</Name>\n<TypeList>\n%s\n</TypeList>\n</Cluster>" % (name, "\n".join(members)),
+            size_in_bits)
+
+
+def array_type(name, element_type, array_size):
+    type_name, element_size = element_type
+    return ("<Array>\n<Name>%s</Name>\n<Size>%d</Size>\n<Type>\n%s\n</Type>\n</Array>"
+            % (name, array_size, scalar_type(type_name, "")), element_size * array_size)
+
+
+def register_type(index, name, cluster_depth, array_size):
+    """ Returns (XML, size in bits) of the type of the index'th register. """
+    kinds = len(SCALAR_TYPES) + 3
+    kind = index % kinds
+    if kind < len(SCALAR_TYPES):
+        type_name, size_in_bits = SCALAR_TYPES[kind]
+        return scalar_type(type_name, name), size_in_bits
+    if kind == len(SCALAR_TYPES):
+        return FXP_XML % name, FXP_SIZE_IN_BITS
+    if kind == len(SCALAR_TYPES) + 1 or cluster_depth < 1:
+        element_type = ARRAY_ELEMENT_TYPES[(index // kinds) % len(ARRAY_ELEMENT_TYPES)]
+        return array_type(name, element_type, array_size)
+    return cluster_type(name, cluster_depth, array_size)
+
+
+def fifo_type(index, name, array_size):
+    type_name = FIFO_TYPES[index % len(FIFO_TYPES)]
+    if type_name == "FXP":
+        return FXP_SUBTYPE_XML
+    if type_name == "Cluster":
+        return cluster_type(name, 1, min(array_size, 4))[0]
+    return "<SubType>%s</SubType>" % type_name
+
+
+def bitstream(size, seed):
+    """ Returns size pseudo-random bytes. """
+    rng = random.Random(seed)
+    block = bytes(bytearray(rng.getrandbits(8) for _ in range(min(size, 4096))))
+    return (block * (size // max(len(block), 1) + 1))[:size]
+
+
+def generate(registers=100, fifos=4, cluster_depth=2, array_size=16, bitstream_bytes=0, seed=0):
+    """ Returns the XML of a synthetic bitfile, as a str.
+
+    Args:
+        registers (int): the number of registers.
+        fifos (int): the number of DMA FIFOs.
+        cluster_depth (int): how deeply clusters nest, or 0 for none.
+        array_size (int): the number of elements of array registers, and
+            of arrays in clusters.
+        bitstream_bytes (int): the size of the bitstream, base 64 encoded
+            in the bitfile as LabVIEW does.
+        seed (int): seeds the bitstream's and the signature's bytes.
+    """
+    register_xml = []
+    offset = 0
+    for index in range(registers):
+        name = "Register %d" % index
+        datatype, size_in_bits = register_type(index, name, cluster_depth, array_size)
+        register_xml.append(REGISTER_XML % {
+            "name": name,
+            "indicator": "true" if index % 2 else "false",
+            "datatype": datatype,
+            "flattened": "%08X" % (index * 2654435761 & 0xFFFFFFFF),
+            "offset": offset,
+            "size_in_bits": size_in_bits,
+            "id": index,
+        })
+        # 8 byte aligned, as 64 bit registers must be
+        offset += ((size_in_bits + 63) // 64) * 8
+    fifo_xml = [FIFO_XML % {"name": "FIFO %d" % index,
+                            "datatype": fifo_type(index, "FIFO %d" % index, array_size),
+                            "direction": "HostToTarget" if index % 2 else "TargetToHost",
+                            "number": index}
+                for index in range(fifos)]
+    data = bitstream(bitstream_bytes, seed)
+    return BITFILE_XML % {
+        "signature": hashlib.md5(("%r" % ((registers, fifos, cluster_depth, array_size, seed),)).encode("ascii"))
+        .hexdigest().upper(),
+        "registers": "\n".join(register_xml),
+        "fifos": "\n".join(fifo_xml),
+        "bitstream_md5": hashlib.md5(data).hexdigest(),
+        "bitstream": base64.b64encode(data).decode("ascii"),
+    }
+
+
+def write(path, **options):
+    """ Writes a synthetic bitfile, generated with options as generate()'s
+    arguments, to path. """
+    with open(path, "w") as bitfile:
+        bitfile.write(generate(**options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates a synthetic .lvbitx file.")
+    parser.add_argument("output", help="the path of the .lvbitx file to write")
+    parser.add_argument("--registers", type=int, default=100)
+    parser.add_argument("--fifos", type=int, default=4)
+    parser.add_argument("--cluster-depth", type=int, default=2)
+    parser.add_argument("--array-size", type=int, default=16)
+    parser.add_argument("--bitstream-bytes", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    write(arguments.output, registers=arguments.registers, fifos=arguments.fifos,
+          cluster_depth=arguments.cluster_depth, array_size=arguments.array_size,
+          bitstream_bytes=arguments.bitstream_bytes, seed=arguments.seed)
+
+
+if __name__ == "__main__":
+    main()
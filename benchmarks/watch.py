@@ -0,0 +1,49 @@
+"""
+Compares the cost, in nanoseconds, of polling an unchanged register by
+reading and comparing its value, with a Watch's poll, which compares the
+value as it comes off the wire and only decodes it when it changes, for a
+scalar, an FXP and a multi-word cluster register.
+
+No hardware is needed, the register entry points are replaced by stubs
+that just return success, so the numbers are the cost of nifpga-python
+itself.
+
+Usage:
+    python benchmarks/watch.py [number of polls]
+
+Run from the repository root with nifpga installed, e.g. "pip install -e .".
+"""
+import sys
+
+from nifpga.poller import Watch
+
+from benchmark_helpers import FXP_XML, best_of, bitfile_register, create_register, stub_library
+
+TYPES = [
+    ("I32", "<I32><Name></Name></I32>"),
+    ("FXP 24 bit", FXP_XML % ("", 24, 8)),
+    ("Cluster 96 bit", "<Cluster><Name></Name><TypeList><U32><Name>a</Name></U32>"
+                       "<I64><Name>b</Name></I64></TypeList></Cluster>"),
+]
+
+
+def main(number):
+    library = stub_library()
+    print("%-16s %14s %14s %9s" % ("type", "read ns", "watch poll ns", "speedup"))
+    for name, type_xml in TYPES:
+        register = create_register(library, bitfile_register(name, type_xml, indicator=True))
+        last = [register.read()]
+
+        def read_and_compare():
+            value = register.read()
+            if value != last[0]:
+                last[0] = value
+        watch = Watch(register, lambda name, value: None, 1)
+        watch._poll(0)
+        read_ns = best_of(read_and_compare, number) * 1e9
+        watch_ns = best_of(lambda: watch._poll(0), number) * 1e9
+        print("%-16s %14.0f %14.0f %8.2fx" % (name, read_ns, watch_ns, read_ns / watch_ns))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
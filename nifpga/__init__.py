@@ -3,5 +3,17 @@ from .statuscheckedlibrary import FunctionInfo, StatusCheckedLibrary
 from .nifpga import *
 from .session import Session
 from .bitfile import Bitfile
+from .fixedpoint import FixedPoint, FixedPointType
+from .paralleldecode import ParallelDecoder
+from .poller import Poller, PollStatistics, WatchStatistics
+from .shadow import ShadowCache, ShadowCacheStatistics
+from .simulation import SimulatedNiFpga, SimulatedFifo
+from .recording import (Recorder, ReplayedNiFpga, ReplayError, RecordedCall, RecordedBuffer,
+                        read_recording)
+from .tracing import Tracer
+from .slowcalls import SlowCallDetector, SlowCall
+from .records import Record, RecordView
+from .warningaggregator import (WarningAggregator, SuppressedWarningsSummary,
+                                warning_aggregator)
 
 # flake8: noqa
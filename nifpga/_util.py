@@ -0,0 +1,55 @@
+"""
+Helpers shared by the modules that time NiFpga calls or stand in for the
+NiFpga library: a monotonic clock that works on Python 2, and building
+entry points that look like the library's to StatusCheckedFunctions.
+
+Copyright (c) 2017 National Instruments
+"""
+import ctypes
+import time
+
+# Python 2 has no monotonic clock, so falls back to the wall clock
+_monotonic = getattr(time, "monotonic", time.time)
+try:
+    _monotonic_ns = time.monotonic_ns
+except AttributeError:
+    def _monotonic_ns():
+        return int(_monotonic() * 1e9)
+
+
+class _Status(Exception):
+    """ Raised by entry points to return the status code. """
+    def __init__(self, code):
+        super(_Status, self).__init__(code)
+        self.code = code
+
+
+def _out(argument):
+    """ Returns the ctypes value an output argument points to, passed
+    either as a pointer or as the value, which ctypes passes by reference. """
+    if isinstance(argument, ctypes._Pointer):
+        return argument.contents
+    return argument
+
+
+def _address(argument):
+    """ Returns the address of a ctypes buffer, passed as a pointer to it or
+    as the buffer itself. """
+    if isinstance(argument, ctypes._Pointer):
+        return ctypes.cast(argument, ctypes.c_void_p).value
+    return ctypes.addressof(argument)
+
+
+def _entry_point(library_function_info, handler):
+    """ Returns a function calling handler that looks like the library's
+    entry point to check_status: it has the same name and argtypes, so
+    statuses mention it and calls with the wrong number of arguments fail
+    the same way.  handler may raise _Status to return a status. """
+    def entry_point(*args):
+        try:
+            return handler(*args) or 0
+        except _Status as e:
+            return e.code
+    entry_point.__name__ = str(library_function_info.name_in_library)
+    entry_point.argtypes = [named_argtype.argtype for named_argtype in library_function_info.named_argtypes]
+    return entry_point
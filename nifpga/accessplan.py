@@ -0,0 +1,186 @@
+"""
+Reading and writing many registers at once.
+
+A control loop that reads dozens of indicators per cycle by name pays for a
+dictionary lookup, method dispatch and result bookkeeping per register.  An
+AccessPlan resolves a list of register names once, to the entry points and
+buffers that read and write each of them, so a cycle is just a call per
+register::
+
+    plan = session.access_plan(["Temperature", "Pressure", "Valve Open"])
+    while running:
+        temperature, pressure, valve_open = plan.read(tuple)
+        ...
+        plan.write([temperature_setpoint, pressure_setpoint, True])
+
+session.read_many() and session.write_many() do the same with a plan that
+the session builds, and caches, for each list of names.
+
+Copyright (c) 2017 National Instruments
+"""
+import functools
+import threading
+from nifpga import DataType
+from nifpga.bitfile import _Array, _Cluster, _String
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class AccessPlan(object):
+    """
+    The registers named when it was created, in order, and how to read and
+    write them.  Created by Session.access_plan().
+    """
+    def __init__(self, registers, names):
+        """
+        Args:
+            registers (dict): register name to _Register, e.g.
+                session.registers.
+            names (list): the names of the registers to access.
+        """
+        self._names = tuple(names)
+        self._registers = tuple(registers[name] for name in self._names)
+        # Scalar registers are read by calling their entry points directly,
+        # into buffers of each thread's own, and written by partials of
+        # their entry points.  Anything else, including controls behind a
+        # shadow cache, goes through its reader or writer.
+        self._scalars = tuple(register._scalar and register._shadow_cache is None
+                              for register in self._registers)
+        self._bool_indices = tuple(index for index, register in enumerate(self._registers)
+                                   if self._scalars[index] and register._datatype is DataType.Bool)
+        self._writers = tuple(functools.partial(register._write_func, register._session, register._resource)
+                              if scalar else register._writer()
+                              for register, scalar in zip(self._registers, self._scalars))
+        self._thread_state = threading.local()
+        self._dtype = None
+        self._has_clusters = any(_is_cluster(register._type) for register in self._registers)
+
+    def _create_thread_state(self):
+        """ Returns this thread's (entry point calls, buffers): a buffer per
+        register, with a value attribute, in order, and the (read function,
+        session, resource, buffer) to call to fill the buffers of scalar
+        registers. """
+        calls = []
+        buffers = []
+        for register, scalar in zip(self._registers, self._scalars):
+            if scalar:
+                buf = register._ctype_type()
+                calls.append((register._read_func, register._session, register._resource, buf))
+            else:
+                buf = _ReadOnAccess(register._reader())
+            buffers.append(buf)
+        self._thread_state.value = (tuple(calls), tuple(buffers))
+        return self._thread_state.value
+
+    @property
+    def names(self):
+        return self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def dtype(self):
+        """ The numpy structured dtype of read(numpy.ndarray), with a field
+        per register of its to_dtype(), so that rows of a larger array of
+        it can be filled from read(tuple). """
+        if self._dtype is None:
+            if numpy is None:
+                raise ImportError("numpy is required to read registers into a numpy array")
+            self._dtype = numpy.dtype([(name, register._type.to_dtype())
+                                       for name, register in zip(self._names, self._registers)])
+        return self._dtype
+
+    def read(self, output_type=dict):
+        """ Reads every register, scalar registers first.
+
+        Args:
+            output_type (type): dict for a dictionary of name to value,
+                tuple for a tuple of values, or numpy.ndarray for a zero
+                dimensional array of dtype.  Cluster values are converted
+                to tuples for numpy.ndarray.
+
+        Returns:
+            The values, as an output_type.
+        """
+        try:
+            calls, buffers = self._thread_state.value
+        except AttributeError:
+            calls, buffers = self._create_thread_state()
+        for read_func, session, resource, buf in calls:
+            read_func(session, resource, buf)
+        values = [buf.value for buf in buffers]
+        for index in self._bool_indices:
+            values[index] = values[index] != 0
+        values = tuple(values)
+        if output_type is tuple:
+            return values
+        if output_type is dict:
+            return dict(zip(self._names, values))
+        if numpy is not None and output_type is numpy.ndarray:
+            if self._has_clusters:
+                values = tuple([_as_record(register._type, value)
+                                for register, value in zip(self._registers, values)])
+            return numpy.array(values, dtype=self.dtype)
+        raise TypeError("Unsupported output_type %r" % (output_type,))
+
+    def read_into(self, records, index=()):
+        """ Reads every register into records[index], e.g. a row of a
+        preallocated numpy array of dtype, without creating an array per
+        read. """
+        values = self.read(tuple)
+        if self._has_clusters:
+            values = tuple([_as_record(register._type, value)
+                            for register, value in zip(self._registers, values)])
+        records[index] = values
+
+    def write(self, values):
+        """ Writes every register, in order.
+
+        Args:
+            values: a mapping of every name to its value, or a sequence of
+                values in the order of names, e.g. what read(tuple) returns.
+        """
+        if hasattr(values, "keys"):
+            values = [values[name] for name in self._names]
+        if len(values) != len(self._writers):
+            raise ValueError("%d values for %d registers" % (len(values), len(self._writers)))
+        for write, value in zip(self._writers, values):
+            write(value)
+
+
+class _ReadOnAccess(object):
+    """ Stands in for the buffer of a register that isn't read by calling
+    its entry point directly: reads it when its value is accessed. """
+    __slots__ = ("_read",)
+
+    def __init__(self, read):
+        self._read = read
+
+    @property
+    def value(self):
+        return self._read()
+
+
+def _is_cluster(data_type):
+    """ Whether values of data_type need converting by _as_record. """
+    if isinstance(data_type, _Array):
+        data_type = data_type.subtype
+    return isinstance(data_type, _Cluster)
+
+
+def _as_record(data_type, value):
+    """ Converts the value of a register of data_type to what numpy accepts
+    for its to_dtype(): clusters, in any ClusterFormat, become tuples,
+    without their strings. """
+    if isinstance(data_type, _Cluster):
+        if hasattr(value, "keys"):
+            value = [value[child.name] for child in data_type._children]
+        return tuple(_as_record(child, member)
+                     for child, member in zip(data_type._children, value)
+                     if not isinstance(child, _String))
+    if isinstance(data_type, _Array) and isinstance(data_type.subtype, _Cluster):
+        return [_as_record(data_type.subtype, element) for element in value]
+    return value
@@ -1,11 +1,21 @@
 import os
 import xml.etree.ElementTree as ElementTree
-from collections import OrderedDict
+from collections import namedtuple, OrderedDict
 from decimal import Decimal
-from nifpga import DataType
+from nifpga import DataType, FxpFormat
+from nifpga.fixedpoint import FixedPoint, FixedPointType
+from nifpga.fxplookuptables import FxpLookupTables
+from nifpga.warningaggregator import warning_aggregator
 from numbers import Number
 from warnings import warn
 import ctypes
+import hashlib
+import math
+import weakref
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class Bitfile(object):
@@ -89,7 +99,32 @@ class UnsupportedTypeError(RuntimeError):
     pass
 
 
+# digest of _type_key() of type XML to the type parsed from it.  Identical
+# types, e.g. the members of a cluster used by many registers, are parsed
+# once and shared, along with everything cached on them.  Types are
+# immutable once parsed, so sharing them is safe.
+_interned_types = weakref.WeakValueDictionary()
+
+
+def _type_key(type_xml):
+    """ Returns a string that's equal for type XML elements that describe
+    the same type, with the same names. """
+    return "%s%r%r(%s)" % (type_xml.tag, (type_xml.text or "").strip(),
+                           sorted(type_xml.attrib.items()),
+                           ",".join(_type_key(child) for child in type_xml))
+
+
 def _parse_type(type_xml):
+    """ Returns the type the XML given describes, parsing it with
+    _create_type() unless an identical one has been parsed already. """
+    key = hashlib.sha1(_type_key(type_xml).encode("utf-8")).digest()
+    parsed = _interned_types.get(key)
+    if parsed is None:
+        parsed = _interned_types.setdefault(key, _create_type(type_xml))
+    return parsed
+
+
+def _create_type(type_xml):
     """ Parses the XML given and creates the appropriate type class for it.
 
     Type XML comes in 2 flavors and we need to handle both.
@@ -124,21 +159,87 @@ def _parse_type(type_xml):
     return _Numeric(name, type_name)
 
 
+BitField = namedtuple("BitField", ["path", "type", "kind", "offset", "size_in_bits"])
+""" Where a scalar within a value is on the wire.  path is the sequence of
+cluster member names (str) and array indices (int) leading to the scalar,
+as they index the value's numpy dtype, offset is the number of bits before
+it, counting from the most significant bit, and kind is how its bits are
+interpreted: "bool", "unsigned", "signed", "float", "fxp" (the
+word_length bits of a fixed point mantissa) or "fxp overflow". """
+
+
 class _BaseType(object):
+    # types are shared by every register and FIFO that has them, see
+    # _parse_type(), so keep them small
+    __slots__ = ("_name", "_dtype", "_bit_fields", "_members", "__weakref__")
+
     def __init__(self, name):
         if name is None:
             self._name = ""
         else:
             self._name = name
+        # built on first use, then shared by every user of this type
+        self._dtype = None
+        self._bit_fields = None
+        self._members = None
 
     @property
     def name(self):
         return self._name
 
+    def to_dtype(self):
+        """ Returns the numpy dtype of values of this type on the host.
+
+        Clusters become structured dtypes with a field per member, except
+        strings, arrays become subarray dtypes, and FXP values become
+        float64, or a structured dtype of an "overflow" bool and a "value"
+        float64 if they include overflow status.  The dtype's
+        metadata["bit_fields"] is bit_fields(), the layout of the same value
+        on the wire.
+        """
+        if self._dtype is None:
+            if numpy is None:
+                raise ImportError("numpy is required to describe values as numpy dtypes")
+            self._dtype = numpy.dtype(self._host_dtype(),
+                                      metadata={"bit_fields": self.bit_fields()})
+        return self._dtype
+
+    def bit_fields(self):
+        """ Returns a tuple of a BitField for each scalar in a value of this
+        type, in wire order, with offsets from the most significant of the
+        type's size_in_bits bits. """
+        if self._bit_fields is None:
+            fields = []
+            self._add_bit_fields(fields, (), 0)
+            self._bit_fields = tuple(fields)
+        return self._bit_fields
+
+    def _member_offsets(self):
+        """ Returns a dictionary of the path (as in BitField) of the value,
+        and of every cluster member and array element within it, however
+        deeply nested, to (type, offset), where offset is the number of
+        bits before it, counting from the most significant bit. """
+        if self._members is None:
+            members = {}
+            self._add_members(members, (), 0)
+            self._members = members
+        return self._members
+
+    def _host_dtype(self):
+        raise TypeError("%s values have no numpy dtype" % type(self).__name__)
+
+    def _add_bit_fields(self, fields, path, offset):
+        raise TypeError("%s values have no bit fields" % type(self).__name__)
+
+    def _add_members(self, members, path, offset):
+        members[path] = (self, offset)
+
 
 class _String(_BaseType):
     """ Handles ignoring string types on the FPGA.  Strings are not supported
     on the FPGA, but sometimes show up in error clusters. """
+    __slots__ = ()
+
     def __init__(self, name):
         super(_String, self).__init__(name)
 
@@ -160,9 +261,14 @@ class _String(_BaseType):
     def pack_data(self, data_to_pack, packed_data):
         return packed_data  # don't pack anything for a string
 
+    def _add_bit_fields(self, fields, path, offset):
+        pass  # takes no bits
+
 
 class _Numeric(_BaseType):
     """ Handles packing and unpacking Numerics such as U8, I8, EnumU8, etc"""
+    __slots__ = ("_datatype", "_signed", "_size_in_bits", "_data_mask", "_signed_bit_mask", "_unpack")
+
     def __init__(self, name, type_name):
         super(_Numeric, self).__init__(name)
         type_name = type_name.replace("Enum", "")
@@ -209,9 +315,18 @@ class _Numeric(_BaseType):
         packed_data = packed_data << self._size_in_bits
         return packed_data | (data_to_pack & self._data_mask)
 
+    def _host_dtype(self):
+        return numpy.dtype("%s%d" % ("i" if self._signed else "u", self._size_in_bits // 8))
+
+    def _add_bit_fields(self, fields, path, offset):
+        kind = "signed" if self._signed else "unsigned"
+        fields.append(BitField(path, self, kind, offset, self._size_in_bits))
+
 
 class _Float(_BaseType):
     """ Handles packing and unpacking floating point values from the FPGA. """
+    __slots__ = ("_size_in_bits", "_datatype", "_data_mask")
+
     def __init__(self, name, type_name):
         super(_Float, self).__init__(name)
         if "SGL" == type_name:
@@ -248,9 +363,17 @@ class _Float(_BaseType):
             bits_to_pack = ctypes.c_ulonglong.from_buffer(ctypes.c_double(data_to_pack)).value
         return (packed_data << self._size_in_bits) | bits_to_pack
 
+    def _host_dtype(self):
+        return numpy.dtype(numpy.float32 if self._datatype == DataType.Sgl else numpy.float64)
+
+    def _add_bit_fields(self, fields, path, offset):
+        fields.append(BitField(path, self, "float", offset, self._size_in_bits))
+
 
 class _Bool(_BaseType):
     """ Handles packing and unpacking bools. """
+    __slots__ = ()
+
     def __init__(self, name):
         super(_Bool, self).__init__(name)
 
@@ -273,6 +396,12 @@ class _Bool(_BaseType):
         bit_to_pack = 1 if data_to_pack else 0
         return (packed_data << 1) | bit_to_pack
 
+    def _host_dtype(self):
+        return numpy.dtype(numpy.bool_)
+
+    def _add_bit_fields(self, fields, path, offset):
+        fields.append(BitField(path, self, "bool", offset, 1))
+
 
 class ClusterMustContainUniqueNames(RuntimeError):
     """ For the FPGA Interface Python API, we have chosen to represent clusters
@@ -283,9 +412,14 @@ class ClusterMustContainUniqueNames(RuntimeError):
 
 class _Cluster(_BaseType):
     """ Handles packing and unpacking clusters. """
+    __slots__ = ("_datatype", "_children", "_size_in_bits", "_shifts", "_record_classes")
+
     def __init__(self, name, type_xml):
         super(_Cluster, self).__init__(name)
         self._datatype = DataType.Cluster
+        self._shifts = None
+        # ClusterFormat to the class of values in it, see records._record_class
+        self._record_classes = None
         member_types = type_xml.find("TypeList")
         self._children = []
         names = set()
@@ -294,7 +428,7 @@ class _Cluster(_BaseType):
             if child_type.name in names:
                 raise ClusterMustContainUniqueNames("Cluster: '%s', contains multiple members with the name: '%s'" % (self._name, child_type.name))
             names.add(child_type.name)
-            self._children.append(_parse_type(child))
+            self._children.append(child_type)
         self._size_in_bits = sum(child.size_in_bits for child in self._children)
 
     @property
@@ -328,16 +462,56 @@ class _Cluster(_BaseType):
         self._unpack_data_recursive(data, result, reversed(self._children))
         return result
 
+    def _child_shifts(self):
+        """ Returns an OrderedDict of member name to (type, shift, mask), to
+        extract the member's packed bits from the cluster's by
+        (bits >> shift) & mask. """
+        if self._shifts is None:
+            shifts = OrderedDict()
+            shift = self._size_in_bits
+            for child in self._children:
+                shift -= child.size_in_bits
+                shifts[child.name] = (child, shift, (1 << child.size_in_bits) - 1)
+            self._shifts = shifts
+        return self._shifts
+
     def pack_data(self, data_to_pack, packed_data):
-        i = 0
-        for child in self._children:
-            packed_data = child.pack_data(data_to_pack[child.name], packed_data)
-            i += 1
+        if getattr(data_to_pack, "_type", None) is self:
+            # a RecordView of this type, which holds its packed bits
+            return (packed_data << self._size_in_bits) | data_to_pack._bits
+        if hasattr(data_to_pack, "keys"):
+            for child in self._children:
+                packed_data = child.pack_data(data_to_pack[child.name], packed_data)
+            return packed_data
+        # a sequence of member values, e.g. a tuple, namedtuple or Record
+        if len(data_to_pack) != len(self._children):
+            raise ValueError("Cluster '%s' has %d members, got %d values"
+                             % (self._name, len(self._children), len(data_to_pack)))
+        for child, value in zip(self._children, data_to_pack):
+            packed_data = child.pack_data(value, packed_data)
         return packed_data
 
+    def _host_dtype(self):
+        return numpy.dtype([(child.name, child._host_dtype())
+                            for child in self._children
+                            if not isinstance(child, _String)])
+
+    def _add_bit_fields(self, fields, path, offset):
+        for child in self._children:
+            child._add_bit_fields(fields, path + (child.name,), offset)
+            offset += child.size_in_bits
+
+    def _add_members(self, members, path, offset):
+        members[path] = (self, offset)
+        for child in self._children:
+            child._add_members(members, path + (child.name,), offset)
+            offset += child.size_in_bits
+
 
 class _Array(_BaseType):
     """ Handles packing and unpacking arrays. """
+    __slots__ = ("_subtype", "_size", "_size_in_bits")
+
     def __init__(self, name, type_xml):
         super(_Array, self).__init__(name)
         self._subtype = _parse_type(list(type_xml.find("Type"))[0])
@@ -360,10 +534,18 @@ class _Array(_BaseType):
     def is_c_api_type(self):
         return self._subtype.is_c_api_type
 
+    @property
+    def subtype(self):
+        return self._subtype
+
     def unpack_data(self, data):
+        return [self._subtype.unpack_data(element) for element in self._split_elements(data)]
+
+    def _split_elements(self, data):
+        """ Returns the packed bits of each element, in array order. """
         results = [0] * self._size
         for i in range(0, self._size):
-            results[i] = self._subtype.unpack_data(data)
+            results[i] = data
             data = data >> self._subtype.size_in_bits
         # Arrays are packed in order, which means that as we are grabbing out values
         # and shifting data, we are grabbing from the back of the array.  So reverse it.
@@ -375,12 +557,31 @@ class _Array(_BaseType):
             packed_data = self._subtype.pack_data(data_to_pack[i], packed_data)
         return packed_data
 
+    def _host_dtype(self):
+        return numpy.dtype((self._subtype._host_dtype(), (self._size,)))
+
+    def _add_bit_fields(self, fields, path, offset):
+        for index in range(self._size):
+            self._subtype._add_bit_fields(fields, path + (index,), offset)
+            offset += self._subtype.size_in_bits
+
+    def _add_members(self, members, path, offset):
+        members[path] = (self, offset)
+        for index in range(self._size):
+            self._subtype._add_members(members, path + (index,), offset)
+            offset += self._subtype.size_in_bits
+
 
 class _FXP(_BaseType):
     """ Handles packing and unpacking FXP values from the FPGA. """
+    __slots__ = ("_datatype", "_signed", "_overflow_enabled", "_word_length", "_integer_word_length",
+                 "_delta", "_minimum", "_maximum", "_size_in_bits", "_data_mask", "_word_length_mask",
+                 "_signed_bit_mask", "_fixed_point_type")
+
     def __init__(self, name, type_xml):
         super(_FXP, self).__init__(name)
         self._datatype = DataType.Fxp
+        self._fixed_point_type = None
         signed_tag = type_xml.find("Signed")
         if signed_tag is None:
             raise UnsupportedTypeError("Unsupported FXP type encountered. This bitfile "
@@ -417,6 +618,15 @@ class _FXP(_BaseType):
     def is_c_api_type(self):
         return False
 
+    @property
+    def fixed_point_type(self):
+        """ The nifpga.FixedPointType shared by all FixedPoint values of
+        this type. """
+        if self._fixed_point_type is None:
+            self._fixed_point_type = FixedPointType(self._signed, self._word_length,
+                                                    self._integer_word_length)
+        return self._fixed_point_type
+
     def _calculate_delta(self):
         """ Determines the fixed point delta value, the value of the register
         is only allowed to be an integer multiple of the delta. For example if
@@ -461,10 +671,19 @@ class _FXP(_BaseType):
             bits_required += 1
         return bits_required
 
-    def unpack_data(self, data):
+    @property
+    def delta(self):
+        """ The value of the least significant bit, as a Decimal.  Values are
+        always an integer multiple (the mantissa) of delta. """
+        return self._delta
+
+    def unpack_data(self, data, output_format=FxpFormat.Decimal):
         """ This method converts value from hardware and returns the respective
         decimal value or a tuple with the overflow status and the decimal
         value.
+
+        output_format (FxpFormat): returns a float, the integer mantissa, or
+            a FixedPoint instead of a Decimal.
         """
         data = data & self._data_mask
         overflow = None
@@ -472,13 +691,114 @@ class _FXP(_BaseType):
             overflow = self._get_overflow_value(data)
             data = self._remove_overflow_bit(data)
 
+        table = fxp_lookup_tables.get(self, output_format)
+        if table is not None:
+            value = table[data]
+        else:
+            value = self._decode_word(data, output_format)
+        if self._overflow_enabled:
+            return (overflow, value)
+        else:
+            return value
+
+    def _decode_word(self, data, output_format):
+        """ Decodes data, which must not have an overflow bit. """
         if self._signed:
             data = self._integer_twos_comp(data)
-        decimal_value = data * self._delta
+        if output_format is FxpFormat.Decimal:
+            return data * self._delta
+        elif output_format is FxpFormat.Float:
+            return math.ldexp(data, self._integer_word_length - self._word_length)
+        elif output_format is FxpFormat.FixedPoint:
+            return self.fixed_point_type.from_mantissa(data)
+        else:
+            return data
+
+    def unpack_batch(self, data, output_format=FxpFormat.Float):
+        """ Unpacks many values at once, e.g. a buffer read from a U64 FIFO.
+
+        When numpy is installed and output_format is FxpFormat.Float or
+        FxpFormat.Mantissa, all values are masked, sign extended and scaled
+        in one vectorized pass, and numpy arrays are returned.  Otherwise
+        lists are returned.  Either way, narrow types are decoded with
+        lookup tables from fxp_lookup_tables once they are built.
+
+        Args:
+            data: a sequence, ctypes array, or numpy array of packed values.
+            output_format (FxpFormat): how to represent the values.
+
+        Returns:
+            The values, or if overflow status is enabled, a tuple of
+            (overflows, values) where overflows holds a bool per value.
+        """
+        vectorizable = output_format is FxpFormat.Float or output_format is FxpFormat.Mantissa
+        if numpy is not None and vectorizable and self._size_in_bits <= 64:
+            return self._unpack_batch_vectorized(data, output_format)
+
+        table = fxp_lookup_tables.get(self, output_format, len(data))
+        if table is None:
+            results = [self.unpack_data(element, output_format) for element in data]
+            if self._overflow_enabled:
+                return ([overflow for overflow, _ in results],
+                        [value for _, value in results])
+            return results
+
+        word_length_mask = self._word_length_mask
+        if self._overflow_enabled:
+            overflow_bit = 1 << self._word_length
+            return ([element & overflow_bit != 0 for element in data],
+                    [table[element & word_length_mask] for element in data])
+        return [table[element & word_length_mask] for element in data]
+
+    def _unpack_batch_vectorized(self, data, output_format):
+        raw = _as_uint64_array(data)
+        if self._size_in_bits < 64:
+            raw = raw & numpy.uint64(self._data_mask)
+        overflows = None
+        if self._overflow_enabled:
+            overflows = (raw >> numpy.uint64(self._word_length)).astype(bool)
+            raw = raw & numpy.uint64(self._word_length_mask)
+
+        table = fxp_lookup_tables.get(self, output_format, len(raw), ndarray=True)
+        if table is not None:
+            values = table.take(raw.astype(numpy.intp))
+        else:
+            values = self._decode_words_vectorized(raw, output_format)
         if self._overflow_enabled:
-            return (overflow, decimal_value)
+            return (overflows, values)
+        return values
+
+    def _decode_words_vectorized(self, raw, output_format):
+        """ Decodes a uint64 array of values without overflow bits. """
+        if self._word_length == 64:
+            mantissas = raw.view(numpy.int64) if self._signed else raw
         else:
-            return decimal_value
+            mantissas = raw.astype(numpy.int64)
+            if self._signed:
+                signed_bit = numpy.int64(self._signed_bit_mask)
+                mantissas = (mantissas ^ signed_bit) - signed_bit
+
+        if output_format is FxpFormat.Float:
+            return numpy.ldexp(mantissas.astype(numpy.float64),
+                               self._integer_word_length - self._word_length)
+        return mantissas
+
+    def _lookup_table_sample(self, output_format, ndarray=False):
+        """ Returns a table like _build_lookup_table()'s, of just the
+        decoded value of the largest code, to estimate its size from. """
+        if ndarray:
+            codes = numpy.array([self._word_length_mask], dtype=numpy.uint64)
+            return self._decode_words_vectorized(codes, output_format)
+        return [self._decode_word(self._word_length_mask, output_format)]
+
+    def _build_lookup_table(self, output_format, ndarray=False):
+        """ Returns the decoded value of every word length bit code, indexed
+        by code, as a list or as a numpy array. """
+        if ndarray:
+            codes = numpy.arange(1 << self._word_length, dtype=numpy.uint64)
+            return self._decode_words_vectorized(codes, output_format)
+        return [self._decode_word(code, output_format)
+                for code in range(1 << self._word_length)]
 
     def _get_overflow_value(self, data):
         """ Mask out all the data within the word length, leaving the overflow
@@ -504,27 +824,148 @@ class _FXP(_BaseType):
         return data
 
     def pack_data(self, data_to_pack, packed_data):
-        (overflow, data) = self._validate_and_parse_user_input(data_to_pack)
+        (fxp_representation, coerced) = self._pack_value(data_to_pack)
+        if coerced:
+            self.warn_coerced_data()
+        packed_data <<= self._size_in_bits
+        packed_data |= fxp_representation
+        return packed_data
 
+    def _pack_value(self, data_to_pack):
+        """ Returns the FXP representation of a single user input and whether
+        it had to be coerced, without warning. """
+        (overflow, data) = self._validate_and_parse_user_input(data_to_pack)
+        if isinstance(data, FixedPoint):
+            if data.fxp_type is self.fixed_point_type:
+                # exact, and a valid mantissa if it's in range, which
+                # offsetting signed mantissas makes 0 to the word length mask
+                mantissa = data.mantissa
+                if self._signed:
+                    mantissa += self._signed_bit_mask
+                if 0 <= mantissa <= self._word_length_mask:
+                    fxp_representation = data.mantissa & self._word_length_mask
+                    if overflow:
+                        fxp_representation += 2**(self._word_length)
+                    return (fxp_representation, False)
+            data = data.to_decimal()
+
+        coerced = False
         fxp_representation = 0
         if data < self._minimum:
-            fxp_representation = self._convert_value_to_fxp(self._minimum)
-            self.warn_coerced_data()
+            fxp_representation, _ = self._convert_value_to_fxp(self._minimum)
+            coerced = True
         elif data > self._maximum:
-            fxp_representation = self._convert_value_to_fxp(self._maximum)
-            self.warn_coerced_data()
+            fxp_representation, _ = self._convert_value_to_fxp(self._maximum)
+            coerced = True
         else:
-            fxp_representation = self._convert_value_to_fxp(data)
+            fxp_representation, coerced = self._convert_value_to_fxp(data)
 
         if self._signed and data < 0:
             fxp_representation = self._integer_twos_comp(fxp_representation)
 
         if overflow:
             fxp_representation += 2**(self._word_length)
-
-        packed_data <<= self._size_in_bits
-        packed_data |= fxp_representation
-        return packed_data
+        return (fxp_representation, coerced)
+
+    def pack_batch(self, data):
+        """ Packs many values at once into a buffer ready to be written to a
+        U64 FIFO, e.g. with WriteFifoU64.
+
+        Produces exactly what calling pack_data(value, 0) on each value
+        would, but warns at most once with the number of coerced values.
+        When numpy is installed, float arrays and sequences of floats and
+        small integers are scaled, truncated, saturated, two's complemented,
+        and tagged with the overflow bit in one vectorized pass.  Other
+        inputs, e.g. Decimals, are packed one by one.
+
+        Args:
+            data: a sequence or numpy array of numbers.  If overflow status
+                is enabled, sequence elements can also be (overflow, number)
+                tuples, just like pack_data.
+
+        Returns:
+            (buffer, coerced): buffer is a ctypes c_uint64 array with one
+            packed value per element (bits above 64 are dropped, as when
+            assigning to a U64 FIFO buffer), and coerced is the number of
+            values that had to be coerced.
+        """
+        values, overflows = self._split_overflow(data)
+        packed = None
+        if numpy is not None:
+            packed = self._pack_batch_vectorized(values, overflows)
+        if packed is None:
+            if numpy is not None and isinstance(data, numpy.ndarray):
+                data = data.tolist()  # Decimal doesn't accept numpy scalars
+            packed = self._pack_batch_scalar(data)
+        buf, coerced = packed
+        if coerced:
+            self.warn_coerced_data(coerced)
+        return buf, coerced
+
+    def _split_overflow(self, data):
+        """ Splits (overflow, value) tuples in a sequence into a sequence of
+        values and a list of overflow bits, or None if there are no tuples. """
+        if not self._overflow_enabled or (numpy is not None and isinstance(data, numpy.ndarray)):
+            return data, None
+        if not any(isinstance(item, tuple) for item in data):
+            return data, None
+        values = []
+        overflows = []
+        for item in data:
+            if isinstance(item, tuple):
+                overflows.append(item[0])
+                values.append(item[1])
+            else:
+                overflows.append(False)
+                values.append(item)
+        if not all(isinstance(overflow, bool) for overflow in overflows):
+            # let pack_data raise the usual error
+            return data, None
+        return values, overflows
+
+    def _pack_batch_scalar(self, data):
+        buf = (ctypes.c_uint64 * len(data))()
+        coerced = 0
+        for i, item in enumerate(data):
+            buf[i], item_coerced = self._pack_value(item)
+            coerced += item_coerced
+        return buf, coerced
+
+    def _pack_batch_vectorized(self, values, overflows):
+        """ Returns (buffer, coerced), or None if values can't be converted
+        to float64 without losing precision, in which case the scalar path
+        must be used. """
+        values = _as_exact_float64_array(values)
+        if values is None:
+            return None
+        # multiplying by a power of two is exact, unless the result
+        # underflows, which is caught by the 'truncated to zero' check below
+        scaled = values * (2.0 ** (self._word_length - self._integer_word_length))
+        truncated = numpy.trunc(scaled)
+        magnitude_bits = self._word_length - 1 if self._signed else self._word_length
+        # floats can't represent the largest codes of long words, so compare
+        # against the first code out of range instead, which is a power of 2
+        over = truncated >= 2.0 ** magnitude_bits
+        minimum_code = -(1 << magnitude_bits) if self._signed else 0
+        under = truncated < minimum_code
+        inexact = (scaled != truncated) | ((truncated == 0) & (values != 0))
+        saturated = over | under
+        coerced = int(numpy.count_nonzero(saturated | inexact))
+
+        truncated[saturated] = 0
+        if self._signed:
+            codes = truncated.astype(numpy.int64).view(numpy.uint64)
+        else:
+            codes = truncated.astype(numpy.uint64)
+        codes[over] = (1 << magnitude_bits) - 1
+        codes[under] = minimum_code & 0xFFFFFFFFFFFFFFFF
+        if self._word_length < 64:
+            codes &= numpy.uint64(self._word_length_mask)
+            if overflows is not None:
+                overflow_bits = numpy.asarray(overflows, dtype=numpy.uint64)
+                codes |= overflow_bits << numpy.uint64(self._word_length)
+        buf = (ctypes.c_uint64 * len(codes)).from_buffer(codes)
+        return buf, coerced
 
     def _validate_and_parse_user_input(self, user_input):
         overflow = None
@@ -544,20 +985,93 @@ class _FXP(_BaseType):
         return (overflow, data)
 
     def _convert_value_to_fxp(self, data):
+        """ Returns the fixed point representation of data and whether it had
+        to be coerced. """
         calculated_fxp = Decimal(data) / Decimal(self._delta)
         fxp_representation = int(calculated_fxp)
         """ If the result of the division is not an integer, we lost some of
         the input data. In this case we warn the user that we had to coerce the
         value to the nearest fixed point representation. """
-        if fxp_representation != calculated_fxp:
-            self.warn_coerced_data()
-        return fxp_representation
+        return fxp_representation, fxp_representation != calculated_fxp
+
+    def _host_dtype(self):
+        if self._overflow_enabled:
+            return numpy.dtype([("overflow", numpy.bool_), ("value", numpy.float64)])
+        return numpy.dtype(numpy.float64)
+
+    def _add_bit_fields(self, fields, path, offset):
+        if self._overflow_enabled:
+            fields.append(BitField(path + ("overflow",), self, "fxp overflow", offset, 1))
+            offset += 1
+            path = path + ("value",)
+        fields.append(BitField(path, self, "fxp", offset, self._word_length))
+
+    @property
+    def _type_signature(self):
+        """ Identifies FXP types that pack and unpack identically. """
+        return (self._signed, self._overflow_enabled, self._word_length,
+                self._integer_word_length)
+
+    def warn_coerced_data(self, count=1):
+        """ Warns that 'count' values had to be coerced.  Counted, and
+        possibly rate-limited, by nifpga.warning_aggregator with the key
+        ("FXP coerced", signed, overflow enabled, word length,
+        integer word length). """
+        warning_aggregator.warn(("FXP coerced",) + self._type_signature,
+                                _create_coerced_data_warning,
+                                count)
+
+
+fxp_lookup_tables = FxpLookupTables()
+
+
+def _create_coerced_data_warning():
+    return UserWarning("The inputed value was not able to be converted to FXP, without coercion. ")
+
+
+def _as_exact_float64_array(values):
+    """ Converts values to a float64 numpy array, or returns None if that would
+    change any value, e.g. for Decimals, NaN, or integers of 2**53 or more. """
+    try:
+        array = numpy.asarray(values)
+    except (TypeError, ValueError):
+        return None
+    if array.ndim != 1 or array.dtype.kind not in "biuf":
+        return None
+    if array.dtype.kind == "f":
+        array = array.astype(numpy.float64, copy=False)
+    else:
+        array = array.astype(numpy.float64)
+    if len(array) and not numpy.all(numpy.abs(array) < 2.0 ** 53):
+        # NaN and infinity fail this check too. Large floats are fine, but
+        # integers that big may have been rounded when converting to float
+        if numpy.asarray(values).dtype.kind != "f" or not _all_floats(values):
+            return None
+        if numpy.isnan(array).any():
+            return None
+    return array
+
 
-    def warn_coerced_data(self):
-        warn("The inputed value was not able to be converted to FXP, without coercion. ")
+def _as_uint64_array(data):
+    """ Returns data as a uint64 numpy array, without copying it if it is
+    already a buffer of 64 bit values. """
+    if isinstance(data, numpy.ndarray):
+        return data.astype(numpy.uint64, copy=False)
+    if isinstance(data, ctypes.Array) and ctypes.sizeof(data._type_) == 8:
+        return numpy.frombuffer(data, dtype=numpy.uint64)
+    return numpy.array(data, dtype=numpy.uint64)
+
+
+def _all_floats(values):
+    if isinstance(values, numpy.ndarray):
+        return values.dtype.kind == "f"
+    return all(isinstance(value, float) for value in values)
 
 
 class Register(object):
+    __slots__ = ("_name", "_offset", "_indicator", "_access_may_timeout", "_internal", "_type",
+                 "_num_elements", "_bit_fields")
+
     def __init__(self, reg_xml):
         """
         A control or indicator from the front panel of the top level FPGA VI
@@ -597,14 +1111,18 @@ class Register(object):
         """
         self._name = reg_xml.find("Name").text
         self._offset = int(reg_xml.find("Offset").text)
+        self._indicator = reg_xml.find("Indicator").text.lower() == 'true'
         self._access_may_timeout = True if reg_xml.find("AccessMayTimeout").text.lower() == 'true' else False
         self._internal = True if reg_xml.find("Internal").text.lower() == 'true' else False
         datatype = reg_xml.find("Datatype")
-        self._type = _parse_type(list(datatype)[0])
+        # named after the register, so unlike its members, never the same as
+        # another register's type and not worth interning
+        self._type = _create_type(list(datatype)[0])
         if self.is_array():
             self._num_elements = self._type.size
         else:
             self._num_elements = 1
+        self._bit_fields = None
 
     def __len__(self):
         """ Returns the number of elements in this register. """
@@ -633,6 +1151,11 @@ class Register(object):
         """ Returns the offset of this register from the base address. """
         return self._offset
 
+    def is_indicator(self):
+        """ Returns whether this register is an indicator, rather than a
+        control. """
+        return self._indicator
+
     def access_may_timeout(self):
         """ Returns Whether or not this register access could timeout.
         This could happen if the register is in an external clock domain.
@@ -643,6 +1166,22 @@ class Register(object):
         """ Returns whether or not this register is for internal use. """
         return self._internal
 
+    def to_dtype(self):
+        """ Returns the numpy dtype of this register's value on the host, see
+        _BaseType.to_dtype. """
+        return self._type.to_dtype()
+
+    def bit_fields(self):
+        """ Returns the BitFields of this register's value as it is
+        transferred as U32 words, with offsets from the most significant bit
+        of the first word.  C API types are transferred as C values, which
+        to_dtype() already describes, so for them these are the fields of
+        the type. """
+        if self._bit_fields is None:
+            self._bit_fields = _shift_bit_fields(self._type.bit_fields(),
+                                                 _u32_word_padding(self._type))
+        return self._bit_fields
+
     def __str__(self):
         return ("Register '%s'\n" % self._name +
                 "\tType: %s\n" % self._datatype +
@@ -651,14 +1190,18 @@ class Register(object):
 
 
 class Fifo(object):
+    __slots__ = ("_name", "_number", "_host_to_target", "_type", "_bit_fields")
+
     def __init__(self, channel_xml):
         self._name = channel_xml.attrib["name"]
         self._number = int(channel_xml.find("Number").text)
+        self._host_to_target = channel_xml.findtext("Direction") == "HostToTarget"
         datatype_xml = channel_xml.find("DataType")
         if datatype_xml.find("SubType") is not None:
             self._type = _parse_type(datatype_xml)
         else:
             self._type = _parse_type(list(datatype_xml)[0])
+        self._bit_fields = None
 
     @property
     def datatype(self):
@@ -681,8 +1224,47 @@ class Fifo(object):
     def type(self):
         return self._type
 
+    def is_host_to_target(self):
+        """ Returns whether the host writes the FIFO and the FPGA reads it,
+        rather than the other way around. """
+        return self._host_to_target
+
     def is_fxp(self):
         return isinstance(self._type, _FXP)
 
     def is_composite(self):
         return isinstance(self._type, _Cluster) or isinstance(self._type, _Array)
+
+    def to_dtype(self):
+        """ Returns the numpy dtype of this FIFO's elements on the host, see
+        _BaseType.to_dtype. """
+        return self._type.to_dtype()
+
+    def bit_fields(self):
+        """ Returns the BitFields of an element of this FIFO as it is
+        transferred, FXP elements as a U64 and composite elements as U32
+        words, with offsets from the most significant bit of the first word.
+        C API types are transferred as C values, which to_dtype() already
+        describes, so for them these are the fields of the type. """
+        if self._bit_fields is None:
+            if self.is_fxp():
+                padding = 64 - self._type.size_in_bits
+            else:
+                padding = _u32_word_padding(self._type)
+            self._bit_fields = _shift_bit_fields(self._type.bit_fields(), padding)
+        return self._bit_fields
+
+
+def _u32_word_padding(data_type):
+    """ Returns how many bits precede a value of data_type transferred as U32
+    words: values of one word are right justified, longer ones left
+    justified.  C API types aren't transferred as words, so have none. """
+    if data_type.is_c_api_type or data_type.size_in_bits > 32:
+        return 0
+    return 32 - data_type.size_in_bits
+
+
+def _shift_bit_fields(fields, padding):
+    if not padding:
+        return fields
+    return tuple(field._replace(offset=field.offset + padding) for field in fields)
@@ -0,0 +1,404 @@
+"""
+A compact, exact fixed point number.
+
+FixedPoint stores just the integer mantissa of a value and a FixedPointType
+shared by all values of the same FXP type, so it is cheaper to create and
+compare than a Decimal, while staying exact.  It is returned when reading
+FXP registers and FIFOs with FxpFormat.FixedPoint, and FXP registers and
+FIFOs accept it when writing.  Like the Decimals read with
+FxpFormat.Decimal, values print with as many decimal places as delta has::
+
+    >>> fxp_type = FixedPointType(signed=True, word_length=16, integer_word_length=8)
+    >>> value = fxp_type.from_mantissa(-384)
+    >>> value
+    FixedPoint('-1.50000000', FixedPointType(signed=True, word_length=16, integer_word_length=8))
+    >>> float(value), "%.2f" % value.to_decimal(), "{:.1f}".format(value * 2)
+    (-1.5, '-1.50', '-3.0')
+    >>> value < 0 and value == fractions.Fraction(-3, 2) == decimal.Decimal("-1.5")
+    True
+
+Copyright (c) 2017 National Instruments
+"""
+import decimal
+import fractions
+import math
+import numbers
+import operator
+import threading
+import weakref
+
+
+class FixedPointType(object):
+    """
+    Describes the values of an FXP type: signedness, word length and
+    integer word length.  Instances are interned, so every FixedPoint of the
+    same type shares one FixedPointType, and types can be compared with
+    'is'.
+
+    The results of arithmetic on FixedPoints have an unbounded type with
+    the exponent needed to represent them exactly, and a word length and
+    integer word length of None.
+    """
+    __slots__ = ("signed", "word_length", "integer_word_length", "exponent",
+                 "_arithmetic_type", "__weakref__")
+
+    # types are only kept while something refers to them
+    _interned = weakref.WeakValueDictionary()
+    _lock = threading.RLock()
+
+    def __new__(cls, signed, word_length, integer_word_length):
+        key = (bool(signed), word_length, integer_word_length)
+        self = cls._interned.get(key)
+        if self is not None:
+            return self
+        with cls._lock:
+            self = cls._interned.get(key)
+            if self is None:
+                self = super(FixedPointType, cls).__new__(cls)
+                self.signed, self.word_length, self.integer_word_length = key
+                if word_length is None:
+                    self.exponent = integer_word_length
+                    self._arithmetic_type = self
+                else:
+                    self.exponent = integer_word_length - word_length
+                    self._arithmetic_type = cls._unbounded(self.exponent)
+                cls._interned[key] = self
+        return self
+
+    @classmethod
+    def _unbounded(cls, exponent):
+        """ The type of arithmetic results, which are values of
+        mantissa * 2**exponent for any integer mantissa. """
+        return cls(True, None, exponent)
+
+    @property
+    def is_bounded(self):
+        return self.word_length is not None
+
+    @property
+    def delta(self):
+        """ The value of the least significant bit. """
+        return _power_of_two(self.exponent)
+
+    def from_mantissa(self, mantissa):
+        """ Returns the FixedPoint of mantissa * delta. """
+        value = _new_fixed_point(FixedPoint)
+        value._mantissa = mantissa
+        value._type = self
+        return value
+
+    def __reduce__(self):
+        return (FixedPointType, (self.signed, self.word_length, self.integer_word_length))
+
+    def __repr__(self):
+        if not self.is_bounded:
+            return "FixedPointType(exponent=%d)" % self.exponent
+        return ("FixedPointType(signed=%r, word_length=%d, integer_word_length=%d)"
+                % (self.signed, self.word_length, self.integer_word_length))
+
+
+class FixedPoint(object):
+    """
+    An exact fixed point value, mantissa * 2**fxp_type.exponent.
+
+    Supports exact comparisons with any rational number (ints, Fractions,
+    Decimals, floats and other FixedPoints), exact +, -, *, %, abs and **
+    to a non-negative integer with ints and other FixedPoints, which return
+    FixedPoints, // which returns an int, and / which returns a Fraction.
+    math.floor(), math.ceil() and round() work as they do for a Fraction.
+    Mixing in floats returns floats, and Decimals, Decimals.
+    float(), int(), str() and format() work as they do for a Decimal of the
+    same value, and to_decimal() returns that Decimal, exactly.
+    """
+    __slots__ = ("_mantissa", "_type")
+
+    def __init__(self, mantissa, fxp_type):
+        self._mantissa = mantissa
+        self._type = fxp_type
+
+    @property
+    def mantissa(self):
+        return self._mantissa
+
+    @property
+    def fxp_type(self):
+        return self._type
+
+    @property
+    def numerator(self):
+        return self._as_fraction().numerator
+
+    @property
+    def denominator(self):
+        return self._as_fraction().denominator
+
+    def _as_fraction(self):
+        exponent = self._type.exponent
+        if exponent >= 0:
+            return fractions.Fraction(self._mantissa << exponent)
+        return fractions.Fraction(self._mantissa, 1 << -exponent)
+
+    def to_decimal(self):
+        """ Returns the exact Decimal of this value, regardless of the
+        decimal context's precision. """
+        exponent = self._type.exponent
+        if exponent >= 0:
+            return decimal.Decimal(self._mantissa << exponent)
+        # m * 2**-k == m * 5**k * 10**-k
+        digits = abs(self._mantissa) * 5 ** -exponent
+        return decimal.Decimal((int(self._mantissa < 0),
+                                tuple(int(digit) for digit in str(digits)),
+                                exponent))
+
+    def __float__(self):
+        return math.ldexp(self._mantissa, self._type.exponent)
+
+    def __int__(self):
+        exponent = self._type.exponent
+        if exponent >= 0:
+            return self._mantissa << exponent
+        # truncate towards zero, like int(Decimal)
+        magnitude = abs(self._mantissa) >> -exponent
+        return -magnitude if self._mantissa < 0 else magnitude
+
+    __trunc__ = __int__
+
+    def __bool__(self):
+        return self._mantissa != 0
+
+    __nonzero__ = __bool__
+
+    def __str__(self):
+        return str(self.to_decimal())
+
+    def __repr__(self):
+        return "FixedPoint('%s', %r)" % (self, self._type)
+
+    def __format__(self, format_spec):
+        return format(self.to_decimal(), format_spec)
+
+    def __reduce__(self):
+        return (FixedPoint, (self._mantissa, self._type))
+
+    def __hash__(self):
+        exponent = self._type.exponent
+        if exponent >= 0:
+            return hash(self._mantissa << exponent)
+        return hash(self._as_fraction())
+
+    def _aligned(self, other):
+        """ Returns the mantissas of self and other (a FixedPoint or an int)
+        scaled to a common exponent, and that exponent. """
+        if isinstance(other, FixedPoint):
+            other_mantissa = other._mantissa
+            other_exponent = other._type.exponent
+        else:
+            other_mantissa = other
+            other_exponent = 0
+        exponent = self._type.exponent
+        if exponent == other_exponent:
+            return self._mantissa, other_mantissa, exponent
+        if exponent < other_exponent:
+            return self._mantissa, other_mantissa << (other_exponent - exponent), exponent
+        return self._mantissa << (exponent - other_exponent), other_mantissa, other_exponent
+
+    def _compare(self, other, compare):
+        if isinstance(other, numbers.Integral):
+            other = int(other)
+        if isinstance(other, (FixedPoint, numbers.Integral)):
+            mantissa, other_mantissa, _ = self._aligned(other)
+            return compare(mantissa, other_mantissa)
+        if isinstance(other, float):
+            if math.isnan(other) or math.isinf(other):
+                return compare(0.0, other)
+            return compare(self._as_fraction(), fractions.Fraction(other))
+        if isinstance(other, (numbers.Rational, decimal.Decimal)):
+            return compare(self._as_fraction(), other)
+        return NotImplemented
+
+    # Comparing and adding values of the same type is by far the most
+    # common case, so it skips the generic paths.
+
+    def __eq__(self, other):
+        if other.__class__ is FixedPoint and other._type is self._type:
+            return self._mantissa == other._mantissa
+        return self._compare(other, operator.eq)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __lt__(self, other):
+        if other.__class__ is FixedPoint and other._type is self._type:
+            return self._mantissa < other._mantissa
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        if other.__class__ is FixedPoint and other._type is self._type:
+            return self._mantissa <= other._mantissa
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        if other.__class__ is FixedPoint and other._type is self._type:
+            return self._mantissa > other._mantissa
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        if other.__class__ is FixedPoint and other._type is self._type:
+            return self._mantissa >= other._mantissa
+        return self._compare(other, operator.ge)
+
+    def _unbounded(self, mantissa, exponent):
+        if exponent == self._type.exponent:
+            return self._type._arithmetic_type.from_mantissa(mantissa)
+        return FixedPointType._unbounded(exponent).from_mantissa(mantissa)
+
+    def _arithmetic(self, other, exact, inexact):
+        """ Applies exact(self mantissa, other mantissa, exponent) for
+        FixedPoints and ints, otherwise inexact(self, other) after converting
+        self to other's type. """
+        if isinstance(other, numbers.Integral):
+            other = int(other)
+        if isinstance(other, (FixedPoint, numbers.Integral)):
+            return exact(*self._aligned(other))
+        if isinstance(other, float):
+            return inexact(float(self), other)
+        if isinstance(other, decimal.Decimal):
+            return inexact(self.to_decimal(), other)
+        if isinstance(other, numbers.Rational):
+            return inexact(self._as_fraction(), other)
+        return NotImplemented
+
+    def __add__(self, other):
+        if other.__class__ is FixedPoint and other._type.exponent == self._type.exponent:
+            return self._type._arithmetic_type.from_mantissa(self._mantissa + other._mantissa)
+        return self._arithmetic(other,
+                                lambda a, b, exponent: self._unbounded(a + b, exponent),
+                                lambda a, b: a + b)
+
+    def __radd__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: self._unbounded(b + a, exponent),
+                                lambda a, b: b + a)
+
+    def __sub__(self, other):
+        if other.__class__ is FixedPoint and other._type.exponent == self._type.exponent:
+            return self._type._arithmetic_type.from_mantissa(self._mantissa - other._mantissa)
+        return self._arithmetic(other,
+                                lambda a, b, exponent: self._unbounded(a - b, exponent),
+                                lambda a, b: a - b)
+
+    def __rsub__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: self._unbounded(b - a, exponent),
+                                lambda a, b: b - a)
+
+    def __mul__(self, other):
+        if isinstance(other, FixedPoint):
+            return self._unbounded(self._mantissa * other._mantissa,
+                                   self._type.exponent + other._type.exponent)
+        if isinstance(other, numbers.Integral):
+            return self._unbounded(self._mantissa * int(other), self._type.exponent)
+        return self._arithmetic(other, None, lambda a, b: a * b)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, (FixedPoint, numbers.Integral)):
+            return self._as_fraction() / _as_rational(other)
+        return self._arithmetic(other, None, lambda a, b: a / b)
+
+    def __rtruediv__(self, other):
+        if isinstance(other, (FixedPoint, numbers.Integral)):
+            return _as_rational(other) / self._as_fraction()
+        return self._arithmetic(other, None, lambda a, b: b / a)
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __floordiv__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: a // b,
+                                lambda a, b: a // b)
+
+    def __rfloordiv__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: b // a,
+                                lambda a, b: b // a)
+
+    def __mod__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: self._unbounded(a % b, exponent),
+                                lambda a, b: a % b)
+
+    def __rmod__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: self._unbounded(b % a, exponent),
+                                lambda a, b: b % a)
+
+    def __divmod__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: (a // b, self._unbounded(a % b, exponent)),
+                                divmod)
+
+    def __rdivmod__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: (b // a, self._unbounded(b % a, exponent)),
+                                lambda a, b: divmod(b, a))
+
+    def __pow__(self, other):
+        if isinstance(other, numbers.Integral) and other >= 0:
+            return self._unbounded(self._mantissa ** int(other), self._type.exponent * int(other))
+        return self._arithmetic(other,
+                                lambda a, b, exponent: self._as_fraction() ** other,
+                                lambda a, b: a ** b)
+
+    def __rpow__(self, other):
+        return self._arithmetic(other,
+                                lambda a, b, exponent: other ** self._as_fraction(),
+                                lambda a, b: b ** a)
+
+    def __floor__(self):
+        exponent = self._type.exponent
+        if exponent >= 0:
+            return self._mantissa << exponent
+        return self._mantissa >> -exponent
+
+    def __ceil__(self):
+        exponent = self._type.exponent
+        if exponent >= 0:
+            return self._mantissa << exponent
+        return -(-self._mantissa >> -exponent)
+
+    def __round__(self, ndigits=None):
+        """ Rounds half to even, like round() of a Fraction, returning an
+        int, or with ndigits, a Fraction. """
+        if ndigits is None:
+            return round(self._as_fraction())
+        return round(self._as_fraction(), ndigits)
+
+    def __neg__(self):
+        return self._unbounded(-self._mantissa, self._type.exponent)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self._unbounded(abs(self._mantissa), self._type.exponent)
+
+
+numbers.Rational.register(FixedPoint)
+
+_new_fixed_point = object.__new__
+
+
+def _as_rational(value):
+    if isinstance(value, FixedPoint):
+        return value._as_fraction()
+    return fractions.Fraction(int(value))
+
+
+def _power_of_two(exponent):
+    if exponent >= 0:
+        return FixedPointType._unbounded(0).from_mantissa(1 << exponent)
+    return FixedPointType._unbounded(exponent).from_mantissa(1)
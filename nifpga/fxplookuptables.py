@@ -0,0 +1,119 @@
+"""
+Lookup tables for decoding narrow fixed point values.
+
+Decoding an FXP value normally masks it, strips the overflow bit, sign
+extends it, and multiplies it by delta, which for Decimals is slow.  For
+word lengths of up to 16 bits, there are few enough codes that decoding
+every one of them up front is cheap, after which decoding is just indexing
+a table.  Tables are shared by every FXP type with the same signedness,
+overflow status, word length and integer word length, and are only built
+for types that decode enough values to pay for building them::
+
+    nifpga.bitfile.fxp_lookup_tables.max_bytes = 64 * 1024 * 1024
+    print(nifpga.bitfile.fxp_lookup_tables.memory_usage())
+
+Copyright (c) 2017 National Instruments
+"""
+import ctypes
+import sys
+import threading
+from collections import OrderedDict
+
+
+class FxpLookupTables(object):
+    """
+    Caches, per FXP type signature and output format, the decoded value of
+    every word length bit code.
+
+    A table is built for a type once it has decoded at least
+    1 / build_threshold as many values as the table has entries, if its
+    word length is at most max_word_length bits.  The oldest tables are
+    evicted to keep the estimated size of all tables under max_bytes, and
+    types whose table alone would be larger are never given one.
+    """
+    def __init__(self, max_word_length=16, max_bytes=32 * 1024 * 1024, build_threshold=8):
+        self.enabled = True
+        self.max_word_length = max_word_length
+        self.max_bytes = max_bytes
+        self.build_threshold = build_threshold
+        self._lock = threading.Lock()
+        # key to (table, size in bytes), oldest first
+        self._tables = OrderedDict()
+        # key to the number of values decoded without a table
+        self._decodes = {}
+        # keys whose tables would be larger than max_bytes, which are
+        # decoded arithmetically from then on
+        self._rejected = set()
+
+    def get(self, fxp, output_format, count=1, ndarray=False):
+        """ Returns the table for fxp's type and output_format, or None if
+        there isn't one (yet), in which case count more decodes are counted
+        towards building it.
+
+        Args:
+            fxp (_FXP): the type to decode.
+            output_format (FxpFormat): the type of the values in the table.
+            count (int): how many values are about to be decoded.
+            ndarray (bool): whether to return a numpy array instead of a
+                list.
+        """
+        if not self.enabled or fxp._word_length > self.max_word_length:
+            return None
+        # Enum hashing is slow, so key by value
+        key = (fxp._type_signature, output_format._value_, ndarray)
+        entry = self._tables.get(key)
+        if entry is not None:
+            return entry[0]
+        if key in self._rejected:
+            return None
+        entries = 1 << fxp._word_length
+        decodes = self._decodes.get(key, 0) + count
+        if decodes * self.build_threshold < entries:
+            self._decodes[key] = decodes
+            return None
+        if _estimate_size(fxp._lookup_table_sample(output_format, ndarray), entries) > self.max_bytes:
+            with self._lock:
+                self._decodes.pop(key, None)
+                self._rejected.add(key)
+            return None
+        table = fxp._build_lookup_table(output_format, ndarray)
+        size = _estimate_size(table)
+        with self._lock:
+            self._decodes.pop(key, None)
+            self._tables[key] = (table, size)
+            self._evict_locked()
+        return table
+
+    def memory_usage(self):
+        """ Returns the estimated size, in bytes, of all cached tables. """
+        with self._lock:
+            return sum(size for _, size in self._tables.values())
+
+    def __len__(self):
+        return len(self._tables)
+
+    def clear(self):
+        """ Drops all tables, decode counts and rejections. """
+        with self._lock:
+            self._tables.clear()
+            self._decodes.clear()
+            self._rejected.clear()
+
+    def _evict_locked(self):
+        total = sum(size for _, size in self._tables.values())
+        while total > self.max_bytes and self._tables:
+            _, (_, size) = self._tables.popitem(last=False)
+            total -= size
+
+
+def _estimate_size(table, entries=None):
+    """ Returns the estimated size of table, or of a table of entries
+    entries like it. """
+    if entries is None:
+        entries = len(table)
+    nbytes = getattr(table, "nbytes", None)
+    if nbytes is not None:
+        return nbytes // len(table) * entries
+    # values of one table are all of the same type and about the same size
+    return (sys.getsizeof(table) + (entries - len(table)) * ctypes.sizeof(ctypes.c_void_p)
+            + entries * sys.getsizeof(table[-1]))
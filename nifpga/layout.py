@@ -0,0 +1,163 @@
+"""
+Vectorized packing and unpacking of composite (cluster and array) values.
+
+Composite values are transferred as U32 words, just like cluster and array
+registers: an element of N bits takes ceil(N / 32) words, most significant
+word first, and if it takes more than one word, its bits are left justified
+in them.  Within an element, cluster members and array elements are packed
+in order, starting at the most significant bit.
+
+ElementLayout places the bit fields of a _Cluster or _Array type (see
+bitfile.BitField) within those words, so that a block of elements can be
+converted between words and a numpy structured array one field at a time,
+for all elements at once, instead of one element at a time with
+unpack_data.
+
+Copyright (c) 2017 National Instruments
+"""
+from nifpga import DataType, FxpFormat
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ElementLayout(object):
+    """ The bit layout of a composite type, and the numpy dtype of its values
+    on the host. """
+    def __init__(self, composite_type):
+        if numpy is None:
+            raise ImportError("numpy is required to pack and unpack composite values in blocks")
+        self._type = composite_type
+        self._words_per_element = max(1, -(-composite_type.size_in_bits // 32))
+        padded_bits = 32 * self._words_per_element
+        # a single word isn't left justified
+        padding = padded_bits - composite_type.size_in_bits if self._words_per_element == 1 else 0
+        self._fields = [field._replace(offset=field.offset + padding)
+                        for field in composite_type.bit_fields()]
+        # wrapped in a single field so that the root can be an array too
+        self._dtype = numpy.dtype([("root", composite_type.to_dtype())])
+
+    @property
+    def words_per_element(self):
+        return self._words_per_element
+
+    @property
+    def dtype(self):
+        """ The numpy dtype of an element on the host: a structured dtype for
+        clusters, or a subarray dtype for arrays. """
+        return self._dtype.fields["root"][0]
+
+    @property
+    def fields(self):
+        return list(self._fields)
+
+    def unpack(self, words):
+        """ Unpacks a buffer of U32 words (a ctypes array, numpy array or
+        sequence), a whole number of elements long, into a numpy array of
+        elements of dtype. """
+        words = _as_words(words, self._words_per_element)
+        number_of_elements = words.shape[0]
+        result = numpy.zeros(number_of_elements, dtype=self._dtype)
+        columns = [words[:, index].astype(numpy.uint64) for index in range(self._words_per_element)]
+        for field in self._fields:
+            raw = self._extract(columns, field, number_of_elements)
+            _view(result, field.path)[...] = _decode(field, raw)
+        return result["root"]
+
+    def pack(self, elements):
+        """ Packs a numpy array of elements of dtype, or anything that can be
+        converted to one, into a uint32 numpy array of words. """
+        dtype = self.dtype
+        # a subarray dtype would add a dimension, rather than describe one
+        elements = numpy.asarray(elements, dtype=dtype.base if dtype.subdtype else dtype)
+        number_of_elements = len(elements)
+        wrapped = numpy.zeros(number_of_elements, dtype=self._dtype)
+        wrapped["root"] = elements
+        columns = [numpy.zeros(number_of_elements, dtype=numpy.uint64)
+                   for _ in range(self._words_per_element)]
+        for field in self._fields:
+            raw = _encode(field, _view(wrapped, field.path))
+            self._deposit(columns, field, raw)
+        words = numpy.empty((number_of_elements, self._words_per_element), dtype=numpy.uint32)
+        for index, column in enumerate(columns):
+            words[:, index] = column
+        return words.reshape(-1)
+
+    def _word_segments(self, field):
+        """ Yields (word index, shift in word, shift in field, mask) for each
+        word that field's bits are in. """
+        end = field.offset + field.size_in_bits
+        for word in range(field.offset // 32, (end - 1) // 32 + 1):
+            low = max(field.offset, 32 * word)
+            high = min(end, 32 * word + 32)
+            yield (word, 32 * word + 32 - high, end - high,
+                   numpy.uint64((1 << (high - low)) - 1))
+
+    def _extract(self, columns, field, number_of_elements):
+        raw = numpy.zeros(number_of_elements, dtype=numpy.uint64)
+        for word, word_shift, field_shift, mask in self._word_segments(field):
+            raw |= ((columns[word] >> numpy.uint64(word_shift)) & mask) << numpy.uint64(field_shift)
+        return raw
+
+    def _deposit(self, columns, field, raw):
+        for word, word_shift, field_shift, mask in self._word_segments(field):
+            columns[word] |= ((raw >> numpy.uint64(field_shift)) & mask) << numpy.uint64(word_shift)
+
+
+def _view(elements, path):
+    """ Returns a view of the field at path in a wrapped array of elements,
+    with one value per element. """
+    view = elements["root"]
+    for step in path:
+        if isinstance(step, int):
+            view = view[:, step]
+        else:
+            view = view[step]
+    return view
+
+
+def _decode(field, raw):
+    data_type = field.type
+    if field.kind == "fxp":
+        return data_type._decode_words_vectorized(raw, FxpFormat.Float)
+    if field.kind == "bool" or field.kind == "fxp overflow":
+        return raw != 0
+    if field.kind == "float":
+        if data_type.datatype == DataType.Sgl:
+            return raw.astype(numpy.uint32).view(numpy.float32)
+        return raw.view(numpy.float64)
+    unsigned = raw.astype("u%d" % (field.size_in_bits // 8))
+    if field.kind == "signed":
+        return unsigned.view("i%d" % (field.size_in_bits // 8))
+    return unsigned
+
+
+def _encode(field, values):
+    data_type = field.type
+    if field.kind == "fxp":
+        buf, _ = data_type.pack_batch(numpy.ascontiguousarray(values))
+        return numpy.frombuffer(buf, dtype=numpy.uint64) & numpy.uint64(data_type._word_length_mask)
+    if field.kind == "bool" or field.kind == "fxp overflow":
+        return values.astype(numpy.uint64)
+    if field.kind == "float":
+        if data_type.datatype == DataType.Sgl:
+            return numpy.ascontiguousarray(values, dtype=numpy.float32).view(numpy.uint32).astype(numpy.uint64)
+        return numpy.ascontiguousarray(values, dtype=numpy.float64).view(numpy.uint64)
+    size_in_bytes = field.size_in_bits // 8
+    unsigned = numpy.ascontiguousarray(values).view("u%d" % size_in_bytes)
+    return unsigned.astype(numpy.uint64)
+
+
+def _as_words(words, words_per_element):
+    if isinstance(words, numpy.ndarray):
+        words = words.astype(numpy.uint32, copy=False)
+    else:
+        try:
+            words = numpy.frombuffer(words, dtype=numpy.uint32)
+        except (TypeError, ValueError):
+            words = numpy.array(words, dtype=numpy.uint32)
+    if len(words) % words_per_element:
+        raise ValueError("%d words are not a whole number of %d word elements"
+                         % (len(words), words_per_element))
+    return words.reshape(-1, words_per_element)
@@ -52,6 +52,51 @@ class DataType(Enum):
         return _datatype_ctype[self]
 
 
+class FxpFormat(Enum):
+    """ How fixed point values read from the FPGA are represented. """
+    Decimal = 1
+    """ A decimal.Decimal per value, or an (overflow, Decimal) tuple when the
+    FXP type includes overflow status.  Exact, but slow. """
+    Float = 2
+    """ A float per value, or for FIFOs and arrays, a float64 numpy array of
+    all values (when numpy is installed).  Word lengths over 53 bits are
+    rounded to the nearest float. """
+    Mantissa = 3
+    """ The integer mantissa of each value, i.e. the value divided by the FXP
+    type's delta.  For FIFOs and arrays, an int64 (or uint64 for unsigned
+    64 bit words) numpy array (when numpy is installed).  Exact. """
+    FixedPoint = 4
+    """ A nifpga.FixedPoint per value, which holds the integer mantissa and a
+    type descriptor shared by all values of the FXP type.  Exact, and
+    cheaper to create and compare than a Decimal. """
+
+    def __str__(self):
+        return self.name
+
+
+class ClusterFormat(Enum):
+    """ How cluster values read from the FPGA are represented. """
+    Dict = 1
+    """ An OrderedDict of member name to value, with nested clusters
+    decoded the same way.  Every member is decoded on every read. """
+    View = 2
+    """ A read-only nifpga.RecordView, a mapping that decodes each member
+    only when it's first accessed, by key or attribute.  Reading a large
+    cluster to check a few members is nearly free. """
+    NamedTuple = 3
+    """ An instance of a namedtuple class generated for the cluster type,
+    with a field per member in order.  Member names that aren't valid
+    identifiers are changed, e.g. "Input U8" to "Input_U8", see the class's
+    _member_names for the originals.  Cheaper to create than a dict. """
+    Record = 4
+    """ An instance of a mutable nifpga.Record class with __slots__,
+    generated for the cluster type, with fields named as for NamedTuple.
+    Cheaper to create than a dict, and can be modified and written back. """
+
+    def __str__(self):
+        return self.name
+
+
 class FifoPropertyType(Enum):
     """ Types of FIFO Properties, intended to abstract away the C Type. """
     I32 = 1
@@ -164,7 +209,11 @@ class _NiFpga(StatusCheckedLibrary):
     more convenient API that is better-suited for most users.
     """
 
-    def __init__(self):
+    @staticmethod
+    def _library_function_infos():
+        """ Returns a LibraryFunctionInfo for every entry point _NiFpga
+        loads, which also describes the entry points to backends that
+        stand in for the library, e.g. simulation.SimulatedNiFpga. """
         library_function_infos = [
             LibraryFunctionInfo(
                 pretty_name="Open",
@@ -480,10 +529,12 @@ class _NiFpga(StatusCheckedLibrary):
                         NamedArgtype("value", type_ctype),
                     ]),
             ])
+        return library_function_infos
 
+    def __init__(self):
         try:
             super(_NiFpga, self).__init__(library_name="NiFpga",
-                                          library_function_infos=library_function_infos)
+                                          library_function_infos=self._library_function_infos())
         except LibraryNotFoundError as e:
             import platform
             system = platform.system().lower()
@@ -0,0 +1,228 @@
+"""
+Decoding large FXP and composite FIFO reads on several cores.
+
+Decoding millions of FXP values is limited by a single core, even when
+vectorized.  ParallelDecoder splits large raw buffers into one chunk per
+worker.  Vectorized decodes (FxpFormat.Float and FxpFormat.Mantissa with
+numpy installed) run on a thread pool, since numpy releases the GIL.
+Pure-Python decodes (Decimal and FixedPoint values) run on a process pool
+that reads the raw buffer from shared memory, so only the decoded values
+are sent between processes::
+
+    with nifpga.ParallelDecoder(max_workers=4) as decoder:
+        fifo.decoder = decoder
+        data = fifo.read(4 * 1024 * 1024).data
+
+Reads of cluster and array FIFOs, which are decoded into numpy structured
+arrays one field at a time, are split into chunks of whole elements on the
+thread pool too.  Without numpy, they are decoded on the calling thread.
+
+Needs Python 3: on Python 2, or for buffers smaller than min_elements,
+values are decoded on the calling thread.
+
+Copyright (c) 2017 National Instruments
+"""
+import ctypes
+import multiprocessing
+import os
+import threading
+from nifpga import FxpFormat
+from nifpga.bitfile import _as_uint64_array
+from nifpga.layout import _as_words
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = ThreadPoolExecutor = None
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    resource_tracker = shared_memory = None
+
+
+class ParallelDecoder(object):
+    """
+    Decodes raw FXP buffers, splitting ones of at least min_elements values
+    among max_workers threads or processes.
+
+    Pools are created on first use and reused until close() is called.
+    """
+    def __init__(self, max_workers=None, min_elements=256 * 1024, use_processes=True):
+        """
+        Args:
+            max_workers (int): the number of chunks to decode in parallel,
+                defaults to the number of CPUs.
+            min_elements (int): buffers with fewer values are decoded on
+                the calling thread, where the overhead of splitting them
+                would outweigh the gain.
+            use_processes (bool): whether to decode pure-Python formats on
+                a process pool.  If False, they are decoded on the calling
+                thread, since the GIL would serialize them on threads.
+        """
+        self._max_workers = max_workers or multiprocessing.cpu_count()
+        self._min_elements = min_elements
+        self._use_processes = use_processes
+        self._lock = threading.Lock()
+        self._thread_pool = None
+        self._process_pool = None
+        self._shared = None
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    @property
+    def min_elements(self):
+        return self._min_elements
+
+    def unpack_batch(self, fxp, data, output_format=FxpFormat.Float):
+        """ Returns exactly what fxp.unpack_batch(data, output_format) does.
+
+        Args:
+            fxp (bitfile._FXP): the type of the values.
+            data: a ctypes c_uint64 array, or numpy uint64 array, of packed
+                values, e.g. from a U64 FIFO read.
+            output_format (FxpFormat): how to represent the values.
+        """
+        if len(data) < self._min_elements or self._max_workers < 2:
+            return fxp.unpack_batch(data, output_format)
+        vectorizable = output_format is FxpFormat.Float or output_format is FxpFormat.Mantissa
+        if numpy is not None and vectorizable and fxp.size_in_bits <= 64:
+            if ThreadPoolExecutor is None:
+                return fxp.unpack_batch(data, output_format)
+            return self._unpack_on_threads(fxp, data, output_format)
+        if ProcessPoolExecutor is None or shared_memory is None or not self._use_processes:
+            return fxp.unpack_batch(data, output_format)
+        return self._unpack_on_processes(fxp, data, output_format)
+
+    def unpack_elements(self, layout, words):
+        """ Returns exactly what layout.unpack(words) does.
+
+        Args:
+            layout (layout.ElementLayout): the layout of the elements, e.g.
+                a composite FIFO's.
+            words: a ctypes c_uint32 array, numpy array or sequence of
+                packed words, a whole number of elements long.
+        """
+        number_of_elements = len(words) // layout.words_per_element
+        if (number_of_elements < self._min_elements or self._max_workers < 2
+                or ThreadPoolExecutor is None):
+            return layout.unpack(words)
+        rows = _as_words(words, layout.words_per_element)
+        results = list(self._get_thread_pool().map(
+            lambda bounds: layout.unpack(rows[bounds[0]:bounds[1]].reshape(-1)),
+            self._chunks(number_of_elements)))
+        return numpy.concatenate(results)
+
+    def _get_thread_pool(self):
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(self._max_workers)
+            return self._thread_pool
+
+    def _chunks(self, number_of_elements):
+        chunk_size = -(-number_of_elements // self._max_workers)
+        return [(start, min(start + chunk_size, number_of_elements))
+                for start in range(0, number_of_elements, chunk_size)]
+
+    def _unpack_on_threads(self, fxp, data, output_format):
+        raw = _as_uint64_array(data)
+        results = list(self._get_thread_pool().map(
+            lambda bounds: fxp.unpack_batch(raw[bounds[0]:bounds[1]], output_format),
+            self._chunks(len(raw))))
+        if fxp._overflow_enabled:
+            return (numpy.concatenate([overflows for overflows, _ in results]),
+                    numpy.concatenate([values for _, values in results]))
+        return numpy.concatenate(results)
+
+    def _unpack_on_processes(self, fxp, data, output_format):
+        number_of_elements = len(data)
+        # one decode at a time may use the shared block
+        with self._lock:
+            if self._process_pool is None:
+                if os.name == "posix":
+                    # workers started before the resource tracker get ones of
+                    # their own, which warn of and unlink the shared block
+                    # when the workers exit, so start it for them to share
+                    resource_tracker.ensure_running()
+                self._process_pool = ProcessPoolExecutor(self._max_workers)
+            shared = self._shared_block(8 * number_of_elements)
+            _copy_into(shared, data, number_of_elements)
+            futures = [self._process_pool.submit(_unpack_shared_chunk, shared.name,
+                                                 start, stop, fxp, output_format)
+                       for start, stop in self._chunks(number_of_elements)]
+            results = [future.result() for future in futures]
+        if fxp._overflow_enabled:
+            return ([overflow for overflows, _ in results for overflow in overflows],
+                    [value for _, values in results for value in values])
+        return [value for values in results for value in values]
+
+    def _shared_block(self, size):
+        """ Returns a shared memory block of at least size bytes, reusing the
+        previous one if it is big enough. """
+        if self._shared is not None and self._shared.size < size:
+            self._release_shared_block()
+        if self._shared is None:
+            self._shared = shared_memory.SharedMemory(create=True, size=size)
+        return self._shared
+
+    def _release_shared_block(self):
+        self._shared.close()
+        self._shared.unlink()
+        self._shared = None
+
+    def close(self):
+        """ Shuts down the pools and frees the shared memory. """
+        with self._lock:
+            for pool in (self._thread_pool, self._process_pool):
+                if pool is not None:
+                    pool.shutdown()
+            self._thread_pool = self._process_pool = None
+            if self._shared is not None:
+                self._release_shared_block()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_val, trace):
+        self.close()
+
+
+def _copy_into(shared, data, number_of_elements):
+    if numpy is not None and isinstance(data, numpy.ndarray):
+        numpy.frombuffer(shared.buf, dtype=numpy.uint64, count=number_of_elements)[:] = data
+        return
+    if not isinstance(data, ctypes.Array):
+        data = (ctypes.c_uint64 * number_of_elements)(*data)
+    ctypes.memmove(ctypes.addressof(ctypes.c_char.from_buffer(shared.buf)),
+                   data, 8 * number_of_elements)
+
+
+def _attach(name):
+    """ Opens the shared memory block called name in a worker process,
+    leaving tracking it to the process that created and unlinks it. """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13 it's registered with the worker's resource
+        # tracker, which is the parent's, so unregistering it here would
+        # unregister the parent's
+        return shared_memory.SharedMemory(name=name)
+
+
+def _unpack_shared_chunk(name, start, stop, fxp, output_format):
+    """ Runs in a worker process: decodes elements start to stop of the
+    packed values in the shared memory block called name. """
+    shared = _attach(name)
+    try:
+        view = shared.buf.cast("Q")
+        try:
+            raw = view[start:stop].tolist()
+        finally:
+            view.release()
+    finally:
+        shared.close()
+    return fxp.unpack_batch(raw, output_format)
@@ -0,0 +1,410 @@
+"""
+Polling indicators in the background.
+
+A Poller reads groups of registers at fixed rates, all on one thread, and
+keeps the last samples of each group, stamped with time.monotonic_ns() as
+they are read, in preallocated ring buffers::
+
+    with nifpga.Poller(session) as poller:
+        poller.add_group(["Temperature", "Pressure"], rate_hz=100, capacity=1000)
+        poller.add_group(["Status"], rate_hz=10)
+        poller.start()
+        ...
+        timestamps, temperatures = poller.last("Temperature", 100)
+        print(poller.statistics("Status"))
+
+Groups are scheduled on a fixed grid of start times, so a late poll doesn't
+delay the ones after it.  How late each poll starts (jitter), how long it
+takes, and how many polls were skipped because the previous one ran past
+them (overruns), are counted per group.
+
+With numpy, ring buffers are numpy arrays of the group's AccessPlan.dtype,
+and last() returns numpy arrays.  Without it, they are lists.
+
+Session.watch() schedules Watches, which call back when a register
+changes, on a Poller of the session's own.
+
+Copyright (c) 2017 National Instruments
+"""
+import heapq
+import itertools
+import math
+import threading
+from collections import namedtuple
+from ._util import _monotonic_ns
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+PollStatistics = namedtuple("PollStatistics",
+                            ["samples", "overruns", "skipped", "errors",
+                             "mean_jitter_ns", "max_jitter_ns", "stddev_jitter_ns",
+                             "mean_duration_ns", "max_duration_ns"])
+""" Counters of a poll group.  samples is the number of polls that
+succeeded, overruns how many polls ran past the start of the next one,
+skipped the number of polls that were dropped because of that, and errors
+how many polls raised.  Jitter is how late polls started, and duration how
+long they took, in nanoseconds. """
+
+WatchStatistics = namedtuple("WatchStatistics",
+                             ["polls", "changes", "decodes_saved", "callback_errors", "interval"])
+""" Counters of a Watch.  decodes_saved is the number of polls that found
+the register unchanged, so didn't decode its value, and interval the
+current time between polls, in seconds. """
+
+
+class Poller(object):
+    """
+    Reads groups of registers of a session at fixed rates on a background
+    thread.
+
+    Groups can be added while polling.  Every register may be in only one
+    group.
+    """
+    def __init__(self, session):
+        """
+        Args:
+            session (Session): the session whose registers to poll.
+        """
+        self._session = session
+        self._lock = threading.Lock()
+        self._groups = []
+        self._groups_by_name = {}
+        # (next poll time, entry number, group or watch) for everything
+        # polled, where entries have a _poll(due) method returning when
+        # they're next due, or None to stop polling them
+        self._schedule = []
+        self._entry_numbers = itertools.count()
+        self._changed = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def add_group(self, names, rate_hz, capacity=1024):
+        """ Polls the named registers together, rate_hz times a second,
+        keeping their last capacity samples.
+
+        Args:
+            names (list): names of registers in session.registers.
+            rate_hz (float): how many times a second to read them.
+            capacity (int): how many samples to keep.
+
+        Returns:
+            PollGroup: the group.
+        """
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        with self._lock:
+            for name in names:
+                if name in self._groups_by_name:
+                    raise ValueError("Register '%s' is already polled" % name)
+            group = PollGroup(self._session.access_plan(names), int(round(1e9 / rate_hz)), capacity)
+            self._groups.append(group)
+            for name in names:
+                self._groups_by_name[name] = group
+        self._add_entry(group)
+        return group
+
+    def _add_entry(self, entry):
+        """ Polls entry, starting now. """
+        with self._lock:
+            heapq.heappush(self._schedule, (_monotonic_ns(), next(self._entry_numbers), entry))
+        self._changed.set()
+
+    @property
+    def groups(self):
+        return list(self._groups)
+
+    def group(self, name):
+        """ Returns the PollGroup that polls the register called name. """
+        return self._groups_by_name[name]
+
+    def last(self, name, count):
+        """ Returns (timestamps, values) of the last count samples, or fewer
+        if there aren't as many yet, of the register called name, oldest
+        first.  See PollGroup.last(). """
+        return self._groups_by_name[name].last(count, name)
+
+    def statistics(self, name):
+        """ Returns the PollStatistics of the group of the register called
+        name. """
+        return self._groups_by_name[name].statistics()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        """ Starts polling, on a new daemon thread. """
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="nifpga Poller")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """ Stops polling, waiting for the current poll to finish. """
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping = True
+        self._changed.set()
+        thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_val, trace):
+        self.stop()
+
+    def _run(self):
+        while not self._stopping:
+            with self._lock:
+                delay = None
+                if self._schedule:
+                    due, number, entry = self._schedule[0]
+                    delay = due - _monotonic_ns()
+                    if delay <= 0:
+                        heapq.heappop(self._schedule)
+                self._changed.clear()
+            if delay is None or delay > 0:
+                # woken early when entries are added, or to stop
+                self._changed.wait(None if delay is None else delay / 1e9)
+                continue
+            next_due = entry._poll(due)
+            if next_due is not None:
+                with self._lock:
+                    heapq.heappush(self._schedule, (next_due, number, entry))
+
+
+class PollGroup(object):
+    """
+    Registers that a Poller reads together, with their last samples.
+    Created by Poller.add_group().
+    """
+    def __init__(self, plan, period_ns, capacity):
+        self._plan = plan
+        self._period_ns = period_ns
+        self._ring = _RingBuffer(plan, capacity)
+        self._statistics = _Statistics()
+        self.last_error = None
+
+    @property
+    def names(self):
+        return self._plan.names
+
+    @property
+    def period_ns(self):
+        return self._period_ns
+
+    @property
+    def capacity(self):
+        return self._ring.capacity
+
+    def _poll(self, due):
+        """ Reads the group, which was due at monotonic time due, and returns
+        when the next poll is due. """
+        started = _monotonic_ns()
+        try:
+            self._ring.append(started, self._plan)
+        except Exception as e:
+            self.last_error = e
+            self._statistics.errors += 1
+        finished = _monotonic_ns()
+        self._statistics.add(started - due, finished - started)
+        next_due = due + self._period_ns
+        if finished > next_due:
+            skipped = (finished - next_due) // self._period_ns + 1
+            self._statistics.overruns += 1
+            self._statistics.skipped += skipped
+            next_due += skipped * self._period_ns
+        return next_due
+
+    def last(self, count, name=None):
+        """ Returns (timestamps, values) of the last count samples, or fewer
+        if there aren't as many yet, oldest first.
+
+        Args:
+            count (int): the number of samples.
+            name (str): the register whose values to return, or None for
+                every register's.
+
+        Returns:
+            With numpy, an int64 array of monotonic timestamps in
+            nanoseconds, and an array of the register's to_dtype() values,
+            or without name, of records of the group's AccessPlan.dtype.
+            Without numpy, lists of timestamps and of values, or of tuples
+            of values.
+        """
+        return self._ring.last(count, name)
+
+    def statistics(self):
+        """ Returns the PollStatistics of this group so far. """
+        return self._statistics.snapshot()
+
+    def reset_statistics(self):
+        self._statistics = _Statistics()
+
+
+class Watch(object):
+    """
+    Calls back when a register changes.  Created by Session.watch().
+    """
+    # polls without a change after which the interval doubles
+    _backoff_after = 4
+
+    def __init__(self, register, callback, min_interval, max_interval=None):
+        if min_interval <= 0:
+            raise ValueError("min_interval must be positive")
+        if max_interval is None:
+            max_interval = 32 * min_interval
+        if max_interval < min_interval:
+            raise ValueError("max_interval must be at least min_interval")
+        self._register = register
+        self._callback = callback
+        self._min_interval_ns = int(round(min_interval * 1e9))
+        self._max_interval_ns = int(round(max_interval * 1e9))
+        self._interval_ns = self._min_interval_ns
+        self._read_raw = register._raw_reader()
+        self._raw = None
+        self._quiet_polls = 0
+        self._cancelled = False
+        self._polls = 0
+        self._changes = 0
+        self._callback_errors = 0
+        self.last_error = None
+
+    @property
+    def name(self):
+        return self._register.name
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        """ Stops watching, at the latest after a callback in progress
+        returns. """
+        self._cancelled = True
+
+    def statistics(self):
+        """ Returns the WatchStatistics of this watch so far. """
+        return WatchStatistics(polls=self._polls,
+                               changes=self._changes,
+                               decodes_saved=self._polls - self._changes,
+                               callback_errors=self._callback_errors,
+                               interval=self._interval_ns / 1e9)
+
+    def _poll(self, due):
+        if self._cancelled:
+            return None
+        try:
+            raw = self._read_raw()
+        except Exception as e:
+            # a failed read is neither a change nor quiet
+            self.last_error = e
+            return max(due + self._interval_ns, _monotonic_ns())
+        self._polls += 1
+        if self._changes and raw == self._raw:
+            self._quiet_polls += 1
+            if self._quiet_polls >= self._backoff_after:
+                self._quiet_polls = 0
+                self._interval_ns = min(2 * self._interval_ns, self._max_interval_ns)
+        else:
+            self._raw = raw
+            self._changes += 1
+            self._quiet_polls = 0
+            self._interval_ns = self._min_interval_ns
+            try:
+                self._callback(self._register.name, self._register._decode(raw))
+            except Exception as e:
+                self.last_error = e
+                self._callback_errors += 1
+        # unlike a PollGroup, a watch doesn't try to catch up
+        return max(due + self._interval_ns, _monotonic_ns())
+
+
+class _RingBuffer(object):
+    """ The last capacity samples of an AccessPlan's registers, and when they
+    were read. """
+    def __init__(self, plan, capacity):
+        self._plan = plan
+        self._names = plan.names
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        # number of samples ever appended
+        self._count = 0
+        if numpy is not None:
+            self._timestamps = numpy.zeros(capacity, dtype=numpy.int64)
+            self._values = numpy.zeros(capacity, dtype=plan.dtype)
+        else:
+            self._timestamps = [0] * capacity
+            self._values = [None] * capacity
+
+    def append(self, timestamp, plan):
+        """ Reads plan into the next slot. """
+        index = self._count % self.capacity
+        with self._lock:
+            if numpy is not None:
+                plan.read_into(self._values, index)
+            else:
+                self._values[index] = plan.read(tuple)
+            self._timestamps[index] = timestamp
+            self._count += 1
+
+    def last(self, count, name=None):
+        with self._lock:
+            count = max(0, min(count, self._count, self.capacity))
+            end = self._count % self.capacity
+            if numpy is not None:
+                indices = numpy.arange(end - count, end) % self.capacity
+                values = self._values if name is None else self._values[name]
+                return self._timestamps.take(indices), values.take(indices, axis=0)
+            indices = [(end - count + i) % self.capacity for i in range(count)]
+            values = [self._values[i] for i in indices]
+            if name is not None:
+                position = self._names.index(name)
+                values = [value[position] for value in values]
+            return [self._timestamps[i] for i in indices], values
+
+
+class _Statistics(object):
+    """ Running counts and moments of jitter and duration. """
+    def __init__(self):
+        self.samples = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.errors = 0
+        self._jitter_mean = 0.0
+        self._jitter_m2 = 0.0
+        self._jitter_max = 0
+        self._duration_total = 0
+        self._duration_max = 0
+
+    def add(self, jitter, duration):
+        # Welford's algorithm, for a stable running variance
+        self.samples += 1
+        delta = jitter - self._jitter_mean
+        self._jitter_mean += delta / self.samples
+        self._jitter_m2 += delta * (jitter - self._jitter_mean)
+        self._jitter_max = max(self._jitter_max, jitter)
+        self._duration_total += duration
+        self._duration_max = max(self._duration_max, duration)
+
+    def snapshot(self):
+        samples = self.samples
+        return PollStatistics(
+            samples=samples - self.errors,
+            overruns=self.overruns,
+            skipped=self.skipped,
+            errors=self.errors,
+            mean_jitter_ns=self._jitter_mean,
+            max_jitter_ns=self._jitter_max,
+            stddev_jitter_ns=math.sqrt(self._jitter_m2 / samples) if samples else 0.0,
+            mean_duration_ns=self._duration_total / float(samples) if samples else 0.0,
+            max_duration_ns=self._duration_max)
@@ -0,0 +1,348 @@
+"""
+Recording the calls sessions make into NiFpga, and replaying them.
+
+A Recorder is a library to open sessions with, which calls NiFpga and logs
+every call to a file: which entry point, on which thread, when, for how
+long, with what arguments, and what it returned, including what it wrote to
+its output arguments::
+
+    with nifpga.Recorder("calls.nirec") as recorder:
+        with nifpga.Session(bitfile, "RIO0", library=recorder) as session:
+            ...
+
+ReplayedNiFpga is a library that returns the recorded results instead, as
+fast as they're asked for, so an application's Python side can be profiled
+offline, on a machine without the hardware::
+
+    library = nifpga.ReplayedNiFpga("calls.nirec")
+    with nifpga.Session(bitfile, "RIO0", library=library) as session:
+        ...
+
+The calls of each entry point are replayed in the order they were recorded,
+whatever the order of calls to different entry points, so the application
+only has to make the same calls to each.  read_recording() reads a
+recording's calls for analysis.
+
+The data of FIFO reads and writes, which can be far larger than everything
+else, is only recorded when asked for.  Without it, replayed FIFO reads
+leave their buffer as it was, all zeros for sessions'.  Zero copy FIFO
+access (AcquireFifoReadElements and the like) can be recorded but not
+replayed, since the pointers it returns are into the recording process:
+replaying it raises a ReplayError.
+
+Copyright (c) 2017 National Instruments
+"""
+from .nifpga import _NiFpga
+from .statuscheckedlibrary import FunctionInfo, StatusCheckedFunctions, _WrappedFunctions
+from ._util import _address, _entry_point, _monotonic_ns, _out
+from collections import deque, namedtuple
+import ctypes
+import functools
+import struct
+import threading
+import time
+
+_MAGIC = b"NIFPGARC"
+_VERSION = 1
+# magic, version, and the number of entry points, each then named by a
+# length and that many bytes of UTF-8 in the order of their ids
+_HEADER = struct.Struct("<8sHH")
+_NAME_LENGTH = struct.Struct("<H")
+
+# a record is one of these kinds, then what its struct says, then for calls
+# their arguments
+_KIND = struct.Struct("<B")
+_THREAD = 1
+_CALL = 2
+# kind, thread id, name length
+_THREAD_RECORD = struct.Struct("<BHH")
+# kind, entry point id, thread id, start and duration in nanoseconds, status,
+# argument count
+_CALL_RECORD = struct.Struct("<BHHQQiB")
+# arguments are a type code, then what it says
+_ARGUMENT = dict((code, struct.Struct("<c" + format)) for code, format in (
+    (b"i", "q"),   # an int
+    (b"u", "Q"),   # an int of 2 ** 63 or more
+    (b"f", "d"),   # a float
+    (b"n", ""),    # None
+    (b"s", "I"),   # bytes, the length then the bytes
+    (b"b", "I"),   # a ctypes buffer after the call, the size then its bytes
+    (b"z", "I"),   # a ctypes buffer whose data isn't recorded, its size
+))
+
+_OMITTED = _ARGUMENT[b"z"]
+
+
+def _is_output(entry_point, named_argtype):
+    """ Whether the entry point of that name returns results through its
+    argument of named_argtype, so replaying it copies what it recorded there
+    back.  Other pointers are to what the call is given, e.g. the data
+    WriteFifoU32 writes, which replaying mustn't change. """
+    if not issubclass(named_argtype.argtype, ctypes._Pointer):
+        return False
+    if entry_point.startswith(("WriteArray", "WriteFifo")) and named_argtype.name in ("array", "data"):
+        return False
+    if named_argtype.name == "context":
+        return entry_point == "ReserveIrqContext"
+    return entry_point != "AddResources"
+
+
+def _encoder(argument_type):
+    """ Returns a function that encodes an argument of argument_type. """
+    if issubclass(argument_type, ctypes._Pointer):
+        buffer = _ARGUMENT[b"b"]
+        return lambda argument: buffer.pack(b"b", ctypes.sizeof(argument.contents)) + bytes(argument.contents)
+    if issubclass(argument_type, (ctypes._SimpleCData, ctypes.Array, ctypes.Structure, ctypes.Union)):
+        buffer = _ARGUMENT[b"b"]
+        return lambda argument: buffer.pack(b"b", ctypes.sizeof(argument)) + bytes(argument)
+    if issubclass(argument_type, bytes):
+        string = _ARGUMENT[b"s"]
+        return lambda argument: string.pack(b"s", len(argument)) + argument
+    if issubclass(argument_type, float):
+        return functools.partial(_ARGUMENT[b"f"].pack, b"f")
+    if argument_type is type(None):
+        return lambda argument: b"n"
+    signed = functools.partial(_ARGUMENT[b"i"].pack, b"i")
+    unsigned = functools.partial(_ARGUMENT[b"u"].pack, b"u")
+    return lambda argument: unsigned(argument) if argument >= 1 << 63 else signed(argument)
+
+
+RecordedCall = namedtuple("RecordedCall",
+                          ["name", "thread", "start_ns", "duration_ns", "status", "arguments"])
+""" A call in a recording.  name is the entry point's, e.g. "ReadFifoU32",
+thread the name of the thread that called it, start_ns when it was called,
+in nanoseconds since recording started, and status what it returned.
+arguments are the values it was passed, with each ctypes object, e.g. an
+output argument, as a RecordedBuffer. """
+
+RecordedBuffer = namedtuple("RecordedBuffer", ["size", "data"])
+""" A ctypes argument of a recorded call: its size in bytes, and its bytes
+after the call, or None if they weren't recorded. """
+
+
+class ReplayError(RuntimeError):
+    pass
+
+
+class Recorder(_WrappedFunctions):
+    """
+    A library that calls another, NiFpga by default, recording every call
+    to a file.  Pass it to Session() as library.
+
+    Calls are encoded into memory and written out in blocks, from whichever
+    thread fills the block, so recording costs a few microseconds a call.
+    Close the Recorder, or use it as a context manager, to write the last
+    block.
+    """
+    def __init__(self, path, library=None, fifo_data=False, block_size=1 << 16):
+        """
+        Args:
+            path (str): the file to record to, which is overwritten.
+            library (StatusCheckedFunctions): the library to call, or None
+                to load NiFpga.
+            fifo_data (bool): whether to record the data FIFO reads and
+                writes transfer, rather than only its size.
+            block_size (int): how many bytes to encode before writing them
+                to the file.
+        """
+        if library is None:
+            library = _NiFpga()
+        self._file = open(path, "wb")
+        self._fifo_data = fifo_data
+        self._block_size = block_size
+        self._block = bytearray()
+        self._lock = threading.Lock()
+        self._threads = threading.local()
+        self._thread_count = 0
+        self._start_ns = _monotonic_ns()
+        self._function_ids = {}
+        # argument type to its _encoder()
+        self._encoders = {}
+        super(Recorder, self).__init__(library, self._recording)
+        names = [name.encode("utf-8") for name in self._function_ids]
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, len(names)))
+        for name in names:
+            self._file.write(_NAME_LENGTH.pack(len(name)) + name)
+
+    def _recording(self, function_info):
+        function = function_info.function
+        function_id = self._function_ids.setdefault(function_info.name, len(self._function_ids))
+        # buffers whose data isn't recorded
+        omitted = frozenset()
+        if not self._fifo_data and function_info.name.startswith(("ReadFifo", "WriteFifo")):
+            omitted = frozenset(index for index, name in enumerate(function_info.argument_names)
+                                if name == "data")
+        record = self._record
+
+        def recording(*args):
+            start = _monotonic_ns()
+            status = function(*args)
+            record(function_id, start, _monotonic_ns() - start, status, args, omitted)
+            return status
+        return recording
+
+    def _thread_id(self):
+        try:
+            return self._threads.id
+        except AttributeError:
+            pass
+        name = threading.current_thread().name.encode("utf-8")
+        with self._lock:
+            thread_id = self._threads.id = self._thread_count
+            self._thread_count += 1
+            self._block += _THREAD_RECORD.pack(_THREAD, thread_id, len(name)) + name
+        return thread_id
+
+    def _record(self, function_id, start, duration, status, args, omitted):
+        encoded = [_CALL_RECORD.pack(_CALL, function_id, self._thread_id(), start - self._start_ns,
+                                     duration, status or 0, len(args))]
+        encoders = self._encoders
+        for index, argument in enumerate(args):
+            if index in omitted:
+                encoded.append(_OMITTED.pack(b"z", ctypes.sizeof(_out(argument))))
+                continue
+            try:
+                encode = encoders[type(argument)]
+            except KeyError:
+                encode = encoders[type(argument)] = _encoder(type(argument))
+            encoded.append(encode(argument))
+        encoded = b"".join(encoded)
+        with self._lock:
+            self._block += encoded
+            if len(self._block) >= self._block_size:
+                self._write_block()
+
+    def _write_block(self):
+        if not self._file.closed:
+            self._file.write(self._block)
+        del self._block[:]
+
+    def flush(self):
+        """ Writes everything recorded so far to the file. """
+        with self._lock:
+            self._write_block()
+            self._file.flush()
+
+    def close(self):
+        """ Writes everything recorded to the file, and closes it.  Calls
+        are no longer recorded. """
+        with self._lock:
+            self._write_block()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_val, trace):
+        self.close()
+
+
+def read_recording(path):
+    """ Yields each RecordedCall of the recording at path, in the order
+    they were recorded. """
+    with open(path, "rb") as recording:
+        data = recording.read()
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise ReplayError("%s is not a recording of NiFpga calls" % path)
+    if version != _VERSION:
+        raise ReplayError("%s is a recording of version %d, only version %d is supported"
+                          % (path, version, _VERSION))
+    offset = _HEADER.size
+    names = []
+    for _ in range(count):
+        length, = _NAME_LENGTH.unpack_from(data, offset)
+        offset += _NAME_LENGTH.size
+        names.append(data[offset:offset + length].decode("utf-8"))
+        offset += length
+    threads = {}
+    end = len(data)
+    while offset < end:
+        kind, = _KIND.unpack_from(data, offset)
+        if kind == _THREAD:
+            _, thread_id, length = _THREAD_RECORD.unpack_from(data, offset)
+            offset += _THREAD_RECORD.size
+            threads[thread_id] = data[offset:offset + length].decode("utf-8")
+            offset += length
+            continue
+        _, function_id, thread_id, start, duration, status, count = _CALL_RECORD.unpack_from(data, offset)
+        offset += _CALL_RECORD.size
+        arguments = []
+        for _ in range(count):
+            code = data[offset:offset + 1]
+            argument = _ARGUMENT[code]
+            value = argument.unpack_from(data, offset)[1:]
+            offset += argument.size
+            if code == b"s":
+                value = data[offset:offset + value[0]]
+                offset += len(value)
+            elif code == b"b":
+                value = RecordedBuffer(value[0], data[offset:offset + value[0]])
+                offset += value.size
+            elif code == b"z":
+                value = RecordedBuffer(value[0], None)
+            else:
+                value = value[0] if value else None
+            arguments.append(value)
+        yield RecordedCall(names[function_id], threads[thread_id], start, duration, status, arguments)
+
+
+class ReplayedNiFpga(StatusCheckedFunctions):
+    """
+    A library that returns what a Recorder recorded, rather than calling
+    NiFpga.  Pass it to Session() as library.
+
+    Each call of an entry point returns the status of the next recorded
+    call of it, having copied what the recorded call wrote into its output
+    arguments into the new call's, so sessions read the values that were
+    read when recording.  A call with no recorded call left, or a different
+    number of arguments, or of zero copy FIFO access, raises a ReplayError.
+    """
+    def __init__(self, path, speed=None):
+        """
+        Args:
+            path (str): the recording to replay.
+            speed (float): how many times faster than recorded calls take,
+                e.g. 1 for as long as they did, or None (the default) to
+                return at once.
+        """
+        self._speed = speed
+        # entry point name to a deque of its RecordedCalls
+        self._calls = {}
+        for call in read_recording(path):
+            self._calls.setdefault(call.name, deque()).append(call)
+        function_infos = []
+        for library_function_info in _NiFpga._library_function_infos():
+            name = library_function_info.pretty_name
+            outputs = tuple(index for index, named_argtype in enumerate(library_function_info.named_argtypes)
+                            if _is_output(name, named_argtype))
+            function_infos.append(FunctionInfo(
+                function=_entry_point(library_function_info, functools.partial(self._replay, name, outputs)),
+                name=name,
+                argument_names=[named_argtype.name for named_argtype in library_function_info.named_argtypes]))
+        super(ReplayedNiFpga, self).__init__(function_infos)
+
+    @property
+    def calls_remaining(self):
+        """ The number of recorded calls not yet replayed. """
+        return sum(len(calls) for calls in self._calls.values())
+
+    def _replay(self, name, outputs, *args):
+        if name.startswith("AcquireFifo") or name == "ReleaseFifoElements":
+            raise ReplayError("%s can't be replayed, the elements it acquired "
+                              "were in the recording process" % name)
+        try:
+            call = self._calls[name].popleft()
+        except (KeyError, IndexError):
+            raise ReplayError("No recorded call of %s left to replay" % name)
+        if len(call.arguments) != len(args):
+            raise ReplayError("%s was recorded with %d arguments, but called with %d"
+                              % (name, len(call.arguments), len(args)))
+        for index in outputs:
+            argument, recorded = args[index], call.arguments[index]
+            if isinstance(recorded, RecordedBuffer) and recorded.data is not None:
+                size = ctypes.sizeof(_out(argument))
+                ctypes.memmove(_address(argument), recorded.data, min(size, recorded.size))
+        if self._speed:
+            time.sleep(call.duration_ns / 1e9 / self._speed)
+        return call.status
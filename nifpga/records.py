@@ -0,0 +1,241 @@
+"""
+Representations of cluster values other than an OrderedDict.
+
+A RecordView is what reading a cluster register with ClusterFormat.View
+returns: it keeps the packed bits of the value as they were read, and only
+decodes a member when it's first accessed::
+
+    register.cluster_format = nifpga.ClusterFormat.View
+    status = register.read()
+    if status["Fault"]:             # decodes just this member
+        report(status.to_dict())    # decodes the rest
+
+ClusterFormat.NamedTuple and ClusterFormat.Record decode every member, but
+into an instance of a class generated for the cluster type, a namedtuple or
+a Record with __slots__, which is cheaper to create than a dict.  Either
+can be written back as it is, as can any sequence of member values in
+order::
+
+    register.cluster_format = nifpga.ClusterFormat.Record
+    limits = register.read()
+    limits.Upper = 10
+    register.write(limits)
+    register.write((0, 10))
+
+Copyright (c) 2017 National Instruments
+"""
+import keyword
+import re
+from collections import namedtuple, OrderedDict
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+from nifpga import ClusterFormat
+from nifpga.bitfile import _Array, _Cluster
+
+
+class RecordView(Mapping):
+    """
+    A read-only mapping of member name to value, over the packed bits of a
+    cluster value.  Members are decoded on first access, by key or, for
+    names that are identifiers, attribute, and then cached.  Nested
+    clusters are RecordViews too, and arrays of clusters lists of them.
+
+    Compares equal to the OrderedDict that ClusterFormat.Dict would have
+    read, and can be written back to a register of the same type without
+    encoding it again.
+    """
+    __slots__ = ("_type", "_bits", "_values")
+
+    def __init__(self, cluster_type, bits):
+        """
+        Args:
+            cluster_type (_Cluster): the type of the value.
+            bits (int): the value's cluster_type.size_in_bits packed bits.
+        """
+        object.__setattr__(self, "_type", cluster_type)
+        object.__setattr__(self, "_bits", bits)
+        object.__setattr__(self, "_values", {})
+
+    def __getitem__(self, name):
+        values = self._values
+        try:
+            return values[name]
+        except KeyError:
+            pass
+        child, shift, mask = self._type._child_shifts()[name]
+        value = values[name] = _unpack_view(child, (self._bits >> shift) & mask)
+        return value
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError("Cluster '%s' has no member '%s'" % (self._type.name, name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RecordView is read-only, use to_dict() for a value to modify")
+
+    def __iter__(self):
+        return iter(self._type._child_shifts())
+
+    def __len__(self):
+        return len(self._type._child_shifts())
+
+    def __contains__(self, name):
+        return name in self._type._child_shifts()
+
+    def to_dict(self):
+        """ Returns the value as an OrderedDict, as ClusterFormat.Dict would
+        have read it, with nested views converted too. """
+        return OrderedDict((name, _to_dict(self[name])) for name in self)
+
+    def __repr__(self):
+        return "RecordView(%s)" % ", ".join("%r: %r" % item for item in self.items())
+
+    def __reduce__(self):
+        return (RecordView, (self._type, self._bits))
+
+
+def _unpack_view(data_type, data):
+    """ Unpacks data of data_type, with clusters as RecordViews. """
+    if isinstance(data_type, _Cluster):
+        return RecordView(data_type, data)
+    if isinstance(data_type, _Array) and isinstance(data_type.subtype, _Cluster):
+        return [RecordView(data_type.subtype, element) for element in data_type._split_elements(data)]
+    return data_type.unpack_data(data)
+
+
+def _to_dict(value):
+    """ Converts views and records within value to OrderedDicts. """
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, list) and value and hasattr(value[0], "to_dict"):
+        return [element.to_dict() for element in value]
+    return value
+
+
+class Record(object):
+    """
+    Base class of the classes generated for cluster types by
+    ClusterFormat.Record: a mutable sequence of member values, with an
+    attribute per member.
+    """
+    __slots__ = ()
+    # attribute names of the members, in order
+    _fields = ()
+    # member names as they are in the cluster, in order
+    _member_names = ()
+
+    def __iter__(self):
+        for field in self._fields:
+            yield getattr(self, field)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [getattr(self, field) for field in self._fields[index]]
+        return getattr(self, self._fields[index])
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__,
+                           ", ".join("%s=%r" % (field, value) for field, value in zip(self._fields, self)))
+
+    def to_dict(self):
+        """ Returns the value as an OrderedDict of member name to value, as
+        ClusterFormat.Dict would have read it. """
+        return _record_to_dict(self)
+
+
+def _record_to_dict(record):
+    return OrderedDict((name, _to_dict(value)) for name, value in zip(record._member_names, record))
+
+
+# names that fields can't have, besides keywords
+_reserved_names = frozenset(["self", "to_dict"])
+
+
+def _field_name(name):
+    """ Returns name made into an identifier, or None if it can't be. """
+    field = re.sub(r"\W+", "_", name).strip("_")
+    if not field or field[0].isdigit() or keyword.iskeyword(field) or field in _reserved_names:
+        return None
+    return field
+
+
+def _field_names(member_names):
+    """ Returns an identifier for each member name, unique among them. """
+    fields = []
+    for index, name in enumerate(member_names):
+        field = _field_name(name)
+        if field is None or field in fields:
+            field = "member_%d" % index
+        fields.append(field)
+    return fields
+
+
+def _record_class(cluster_type, cluster_format):
+    """ Returns the class of cluster_type values in cluster_format,
+    generating it the first time. """
+    classes = cluster_type._record_classes
+    if classes is None:
+        classes = cluster_type._record_classes = {}
+    try:
+        return classes[cluster_format]
+    except KeyError:
+        pass
+    member_names = tuple(child.name for child in cluster_type._children)
+    fields = _field_names(member_names)
+    name = _field_name(cluster_type.name) or "Cluster"
+    if cluster_format is ClusterFormat.NamedTuple:
+        namespace = {"__slots__": (), "_member_names": member_names, "to_dict": _record_to_dict}
+        record_class = type(name, (namedtuple(name, fields),), namespace)
+    else:
+        # an __init__ of positional arguments, like namedtuple's
+        source = "def __init__(self, %s):\n" % ", ".join(fields)
+        source += "".join("    self.%s = %s\n" % (field, field) for field in fields) or "    pass\n"
+        namespace = {}
+        exec(source, namespace)
+        record_class = type(name, (Record,), {"__slots__": tuple(fields),
+                                              "_fields": tuple(fields),
+                                              "_member_names": member_names,
+                                              "__init__": namespace["__init__"]})
+    classes[cluster_format] = record_class
+    return record_class
+
+
+def _unpack_record(data_type, data, cluster_format):
+    """ Unpacks data of data_type, with clusters as instances of their
+    _record_class(cluster_format). """
+    if isinstance(data_type, _Cluster):
+        values = [_unpack_record(child, (data >> shift) & mask, cluster_format)
+                  for child, shift, mask in data_type._child_shifts().values()]
+        return _record_class(data_type, cluster_format)(*values)
+    if isinstance(data_type, _Array) and isinstance(data_type.subtype, _Cluster):
+        return [_unpack_record(data_type.subtype, element, cluster_format)
+                for element in data_type._split_elements(data)]
+    return data_type.unpack_data(data)
+
+
+def _unpack_cluster(data_type, data, cluster_format):
+    """ Unpacks data of data_type, a cluster or array of clusters, in
+    cluster_format. """
+    if cluster_format is ClusterFormat.View:
+        return _unpack_view(data_type, data)
+    if cluster_format is ClusterFormat.Dict:
+        return data_type.unpack_data(data)
+    return _unpack_record(data_type, data, cluster_format)
@@ -8,14 +8,31 @@ from .nifpga import (_SessionType, _IrqContextType, _NiFpga, DataType,
                      OPEN_ATTRIBUTE_NO_RUN, RUN_ATTRIBUTE_WAIT_UNTIL_DONE,
                      CLOSE_ATTRIBUTE_NO_RESET_IF_LAST_SESSION, FifoProperty,
                      _fifo_properties_to_types, FlowControl, DmaBufferType,
-                     FpgaViState)
-from .bitfile import Bitfile
-from .status import InvalidSessionError
+                     FpgaViState, FxpFormat, ClusterFormat)
+from .accessplan import AccessPlan
+from .poller import Poller, Watch
+from .records import _unpack_cluster
+from .shadow import ShadowCache
+from .bitfile import Bitfile, _FXP, _Array, _Cluster
+from .layout import ElementLayout
+from .status import InvalidSessionError, FifoTimeoutError
 from collections import namedtuple
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+import array
 import ctypes
+import struct
+import sys
+import threading
 from builtins import bytes
 from math import ceil
 from future.utils import iteritems
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class Session(object):
@@ -67,6 +84,7 @@ class Session(object):
                  resource,
                  no_run=False,
                  reset_if_last_session_on_exit=False,
+                 library=None,
                  **kwargs):
         """Creates a session to the specified resource with the specified
         bitfile.
@@ -80,12 +98,16 @@ class Session(object):
                 session.
             reset_if_last_session_on_exit (bool): Passed into Close on
                 exit. Unused if not using this session as a context guard.
+            library: What to call the FPGA Interface C API through, instead
+                of loading the NiFpga library, e.g. a
+                simulation.SimulatedNiFpga to use the session without
+                hardware.  None loads NiFpga.
             **kwargs: Additional arguments that edit the session.
         """
         if not isinstance(bitfile, Bitfile):
             """ The bitfile we were passed is a path to an lvbitx."""
             bitfile = Bitfile(bitfile)
-        self._nifpga = _NiFpga()
+        self._nifpga = _NiFpga() if library is None else library
         self._session = _SessionType()
 
         open_attribute = 0
@@ -109,18 +131,17 @@ class Session(object):
                               self._session)
 
         self._reset_if_last_session_on_exit = reset_if_last_session_on_exit
-        self._registers = {}
-        self._internal_registers_dict = {}
-        base_address_on_device = bitfile.base_address_on_device()
-        for name, bitfile_register in iteritems(bitfile.registers):
-            assert name not in self._registers, \
-                "One or more registers have the same name '%s', this is not supported" % name
-            register = self._create_register(bitfile_register,
-                                             base_address_on_device)
-            if bitfile_register.is_internal():
-                self._internal_registers_dict[name] = register
-            else:
-                self._registers[name] = register
+        self._shadow_cache = None
+        # registers are created as they're first used, from the bitfile's,
+        # which every session on the bitfile shares
+        self._base_address_on_device = bitfile.base_address_on_device()
+        self._registers = _RegisterTable(bitfile.registers, False, self._add_register)
+        self._internal_registers_dict = _RegisterTable(bitfile.registers, True, self._add_register)
+
+        # tuple of names to the AccessPlan of read_many and write_many
+        self._access_plans = {}
+        # the Poller of watch(), created by the first call
+        self._poller = None
 
         self._fifos = {}
         for name, bitfile_fifo in iteritems(bitfile.fifos):
@@ -145,6 +166,8 @@ class Session(object):
                 last close. If true, does not reset the FPGA on the last
                 session close.
         """
+        if self._poller is not None:
+            self._poller.stop()
         close_attr = CLOSE_ATTRIBUTE_NO_RESET_IF_LAST_SESSION if reset_if_last_session is False else 0
         self._nifpga.Close(self._session, close_attr)
 
@@ -160,16 +183,63 @@ class Session(object):
 
     def abort(self):
         """ Aborts the FPGA VI. """
+        self._forget_register_values()
         self._nifpga.Abort(self._session)
 
     def download(self):
         """ Re-downloads the FPGA bitstream to the target. """
+        self._forget_register_values()
         self._nifpga.Download(self._session)
 
     def reset(self):
         """ Resets the FPGA VI. """
+        self._forget_register_values()
         self._nifpga.Reset(self._session)
 
+    def _forget_register_values(self):
+        """ Forgets what this session knows of its registers' values, which
+        resetting, aborting or downloading the FPGA VI changes. """
+        if self._shadow_cache is not None:
+            self._shadow_cache.invalidate()
+        for table in (self._registers, self._internal_registers_dict):
+            for register in table.created():
+                if isinstance(register, _DataConvertingRegister):
+                    register._last_bits = None
+
+    @property
+    def shadow_cache(self):
+        """ The ShadowCache of this session, or None if it isn't enabled. """
+        return self._shadow_cache
+
+    def enable_shadow_cache(self, serve_reads=False):
+        """ Skips writes to controls of values they already hold, as far as
+        this session knows, see :mod:`nifpga.shadow`.
+
+        Only enable it when nothing but this session writes the controls.
+        AccessPlans created before enabling or disabling it keep writing as
+        they did.
+
+        Args:
+            serve_reads (bool): whether reads of a control that has been
+                written return what was written, without reading the FPGA.
+
+        Returns:
+            ShadowCache: the cache.
+        """
+        self._set_shadow_cache(ShadowCache(serve_reads))
+        return self._shadow_cache
+
+    def disable_shadow_cache(self):
+        """ Writes and reads controls directly again. """
+        self._set_shadow_cache(None)
+
+    def _set_shadow_cache(self, cache):
+        self._shadow_cache = cache
+        for register in self._registers.created():
+            if not register._indicator:
+                register._set_shadow_cache(cache)
+        self._access_plans.clear()
+
     @property
     def fpga_vi_state(self):
         """ Returns the current state of the FPGA VI. """
@@ -253,6 +323,78 @@ class Session(object):
         """
         return self._registers
 
+    def access_plan(self, names):
+        """ Returns an AccessPlan that reads and writes the named registers,
+        in order, with as little overhead per cycle as possible.
+
+        Args:
+            names (list): names of registers in :attr:`Session.registers`.
+        """
+        return AccessPlan(self._registers, names)
+
+    def _cached_access_plan(self, names):
+        names = tuple(names)
+        plan = self._access_plans.get(names)
+        if plan is None:
+            if len(self._access_plans) >= 64:
+                self._access_plans.clear()
+            plan = self._access_plans[names] = self.access_plan(names)
+        return plan
+
+    def read_many(self, names, output_type=dict):
+        """ Reads the named registers, in order.
+
+        Args:
+            names (list): names of registers in :attr:`Session.registers`.
+            output_type (type): dict, tuple or numpy.ndarray, see
+                :meth:`AccessPlan.read`.
+
+        Returns:
+            The values, as an output_type.
+        """
+        return self._cached_access_plan(names).read(output_type)
+
+    def write_many(self, values):
+        """ Writes registers, in the order of values.
+
+        Args:
+            values (dict): register name to the value to write.
+        """
+        self._cached_access_plan(values.keys()).write(list(values.values()))
+
+    def watch(self, name, callback, min_interval=0.01, max_interval=None):
+        """ Calls callback(name, value) from a background thread whenever the
+        value of the register called name changes, and once with its value
+        when first read.
+
+        Every watch of the session is polled by one shared Poller thread.
+        Reads are compared as they come off the wire, so FXP and cluster
+        values are only decoded when they change.  A register is polled
+        every min_interval seconds while it changes, and half as often
+        after every few polls that find it unchanged, down to once every
+        max_interval seconds.
+
+        Args:
+            name (str): the name of a register in :attr:`Session.registers`.
+            callback: a function of (name, value).  Exceptions it raises
+                are counted in the watch's statistics, and otherwise
+                ignored.
+            min_interval (float): the shortest time between polls, in
+                seconds.
+            max_interval (float): the longest time between polls, in
+                seconds.  Defaults to 32 times min_interval.
+
+        Returns:
+            Watch: the watch, for cancel() and statistics().
+        """
+        register = self._registers[name]
+        if self._poller is None:
+            self._poller = Poller(self)
+        watch = Watch(register, callback, min_interval, max_interval)
+        self._poller._add_entry(watch)
+        self._poller.start()
+        return watch
+
     @property
     def _internal_registers(self):
         """ This property contains internal registers"""
@@ -266,42 +408,131 @@ class Session(object):
         """
         return self._fifos
 
-    def _create_register(self, bitfile_register, base_address_on_device):
+    def _add_register(self, bitfile_register):
+        """ Creates the register of this session for bitfile_register, when
+        it's first used. """
+        register = self._create_register(bitfile_register, self._base_address_on_device, self._nifpga)
+        if self._shadow_cache is not None and not register._indicator:
+            register._set_shadow_cache(self._shadow_cache)
+        return register
+
+    def _create_register(self, bitfile_register, base_address_on_device, nifpga):
         # simple C type registers use the same entrypoint as the C API
         if bitfile_register.type.is_c_api_type:
             if bitfile_register.is_array():
                 return _ArrayRegister(self._session,
-                                      self._nifpga,
+                                      nifpga,
                                       bitfile_register,
                                       base_address_on_device)
             else:
                 return _Register(self._session,
-                                 self._nifpga,
+                                 nifpga,
                                  bitfile_register,
                                  base_address_on_device)
         else:  # register that handles conversion for more complex types
             return _DataConvertingRegister(self._session,
-                                           self._nifpga,
+                                           nifpga,
                                            bitfile_register,
                                            base_address_on_device)
 
     def _create_fifo(self, bitfile_fifo):
         if bitfile_fifo.is_fxp():
             return _FxpFIFO(self._session, self._nifpga, bitfile_fifo)
+        elif bitfile_fifo.is_composite():
+            return _CompositeFIFO(self._session, self._nifpga, bitfile_fifo)
         else:
             return _FIFO(self._session, self._nifpga, bitfile_fifo)
 
 
+class _RegisterTable(Mapping):
+    """
+    The registers of a session, or its internal registers, by name.
+
+    A read-only view of the bitfile's registers that creates the session's
+    register for one the first time it's looked up, so opening a session
+    costs nothing per register, which matters for bitfiles with tens of
+    thousands of them.  Looking up a register that's been created is a
+    plain dict lookup.  Iterating over the table, or its values or items,
+    covers every register, creating them all, as do copy() and comparing
+    the table.
+    """
+    def __init__(self, bitfile_registers, internal, create):
+        """
+        Args:
+            bitfile_registers (dict): the Bitfile's registers by name.
+            internal (bool): whether this table holds the internal
+                registers, or all the others.
+            create: a function of a bitfile.Register that returns the
+                session's register for it.
+        """
+        self._bitfile_registers = bitfile_registers
+        self._internal = internal
+        self._create = create
+        self._cache = {}
+        self._length = None
+
+    def __getitem__(self, name):
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        bitfile_register = self._bitfile_registers[name]
+        if bitfile_register.is_internal() != self._internal:
+            raise KeyError(name)
+        # another thread may have created it meanwhile
+        return self._cache.setdefault(name, self._create(bitfile_register))
+
+    def __contains__(self, name):
+        bitfile_register = self._bitfile_registers.get(name)
+        return bitfile_register is not None and bitfile_register.is_internal() == self._internal
+
+    def __iter__(self):
+        internal = self._internal
+        return (name for name, bitfile_register in iteritems(self._bitfile_registers)
+                if bitfile_register.is_internal() == internal)
+
+    def __len__(self):
+        if self._length is None:
+            self._length = sum(1 for _ in self)
+        return self._length
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def copy(self):
+        """ Returns a dict of every register by name. """
+        return dict(self.items())
+
+    def created(self):
+        """ Returns the registers created so far. """
+        return list(self._cache.values())
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+
 class _Register(object):
     """ _Register is a private class that is a wrapper of logic that is
     associated with controls and indicators.
 
-    All Registers will exists in a sessions session.registers property. This
-    means that all possible registers for a given session are created during
-    session initialization; a user should never need to create a new instance
-    of this class.
+    All Registers are available from a session's session.registers
+    property, which creates each the first time it's used; a user should
+    never need to create a new instance of this class.
 
     """
+    # whether the register is read and written by passing a single value of
+    # _ctype_type to _read_func and _write_func, so AccessPlans can call them
+    # directly
+    _scalar = True
+    # the session's ShadowCache, for controls when it's enabled
+    _shadow_cache = None
+
     def __init__(self,
                  session,
                  nifpga,
@@ -322,9 +553,12 @@ class _Register(object):
             self._write_func = write_func
         self._ctype_type = self._datatype._return_ctype()
         self._type = bitfile_register.type
+        self._indicator = bitfile_register.is_indicator()
         self._resource = bitfile_register.offset + base_address_on_device
         if bitfile_register.access_may_timeout():
             self._resource = self._resource | 0x80000000
+        # out-buffers reused by every read from the same thread
+        self._buffers = threading.local()
 
     def __len__(self):
         """ A single register will always have one and only one element.
@@ -340,7 +574,7 @@ class _Register(object):
         Args:
             data (DataType.value): The data to be written into the register
         """
-        self._write_func(self._session, self._resource, data)
+        self._write_value(data)
 
     def read(self):
         """ Reads a single element from the control or indicator
@@ -348,11 +582,109 @@ class _Register(object):
         Returns:
             data (DataType.value): The data inside the register.
         """
-        data = self._ctype_type()
-        self._read_func(self._session, self._resource, data)
+        return self._read_value()
+
+    # read() and write() call closures specialized for the register's type,
+    # which bind everything they need up front.  They are created on first
+    # use, by these methods, which replace themselves on the instance.
+
+    def _read_value(self):
+        self._read_value, self._write_value = self._create_accessors()
+        return self._read_value()
+
+    def _reader(self):
+        """ Returns a function of no arguments that returns what read()
+        does, for callers that read the register repeatedly. """
+        if "_read_value" not in self.__dict__:
+            self._read_value, self._write_value = self._create_accessors()
+        return self._read_value
+
+    def _writer(self):
+        """ Returns a function of the value that does what write() does. """
+        if "_write_value" not in self.__dict__:
+            self._read_value, self._write_value = self._create_accessors()
+        return self._write_value
+
+    def _write_value(self, data):
+        self._read_value, self._write_value = self._create_accessors()
+        self._write_value(data)
+
+    def _create_accessors(self):
+        """ Returns (read, write) functions for this register's value. """
+        read_func = self._read_func
+        write_func = self._write_func
+        session = self._session
+        resource = self._resource
+        ctype_type = self._ctype_type
+        buffers = self._buffers
+
+        if self._datatype is DataType.Bool:
+            def read():
+                try:
+                    buf = buffers.value
+                except AttributeError:
+                    buf = buffers.value = ctype_type()
+                read_func(session, resource, buf)
+                return buf.value != 0
+        else:
+            def read():
+                try:
+                    buf = buffers.value
+                except AttributeError:
+                    buf = buffers.value = ctype_type()
+                read_func(session, resource, buf)
+                return buf.value
+
+        def write(data):
+            write_func(session, resource, data)
+
+        if self._shadow_cache is not None:
+            if self._datatype in (DataType.Sgl, DataType.Dbl):
+                # compared as the bytes sent, so that 0.0 and -0.0 differ
+                return self._shadow_cache._wrap(
+                    self._name, read, write,
+                    encode=lambda data: bytes(ctype_type(data)),
+                    decode=lambda wire: ctype_type.from_buffer_copy(wire).value)
+            return self._shadow_cache._wrap(
+                self._name, read, write,
+                encode=lambda data: ctype_type(data).value,
+                decode=self._decode)
+        return read, write
+
+    def _set_shadow_cache(self, cache):
+        """ Reads and writes through cache, or directly if it's None. """
+        self._shadow_cache = cache
+        # recreated by the next access
+        self.__dict__.pop("_read_value", None)
+        self.__dict__.pop("_write_value", None)
+
+    def _raw_reader(self):
+        """ Returns a function of no arguments that reads the register as it
+        comes off the wire, before any conversion, into a buffer of its own,
+        so that successive reads can be compared cheaply.  _decode()
+        converts what it returns into what read() would have. """
+        read_func = self._read_func
+        session = self._session
+        resource = self._resource
+        buf = self._ctype_type()
+
+        if self._datatype in (DataType.Sgl, DataType.Dbl):
+            # compared as the bytes read, since NaN never equals itself
+            def read_raw():
+                read_func(session, resource, buf)
+                return bytes(buf)
+        else:
+            def read_raw():
+                read_func(session, resource, buf)
+                return buf.value
+        return read_raw
+
+    def _decode(self, raw):
         if self._datatype is DataType.Bool:
-            return bool(data.value)
-        return data.value
+            return raw != 0
+        if self._datatype in (DataType.Sgl, DataType.Dbl):
+            return self._ctype_type.from_buffer_copy(raw).value
+        return raw
 
     @property
     def name(self):
@@ -372,6 +704,8 @@ class _ArrayRegister(_Register):
     _ArryRegister is a private class that inherits from _Register with
     additional interfaces unique to the logic of array controls and indicators.
     """
+    _scalar = False
+
     def __init__(self,
                  session,
                  nifpga,
@@ -384,7 +718,13 @@ class _ArrayRegister(_Register):
                                              read_func=nifpga["ReadArray%s" % bitfile_register.datatype],
                                              write_func=nifpga["WriteArray%s" % bitfile_register.datatype])
         self._num_elements = len(bitfile_register)
+        self._buffer_kinds = _buffer_kinds(self._datatype)
+        self._array_typecode = self._ctype_type._type_
         self._ctype_type = self._ctype_type * self._num_elements
+        # (the last buffer passed to read_into() or write(), a ctypes array
+        # sharing its memory), so that polling with the same buffer
+        # allocates nothing
+        self._buffer_view = (None, None)
 
     def __len__(self):
         """ Returns the length of the array.
@@ -394,34 +734,149 @@ class _ArrayRegister(_Register):
         """
         return self._num_elements
 
+    def _reader(self):
+        return self.read
+
+    def _writer(self):
+        return self.write
+
     def write(self, data):
         """ Writes the specified array of data to the control or indicator
 
             Args:
                 data (list): The data "array" to be written into the registers
-                wrapped into a python list.
+                wrapped into a python list.  Anything supporting the buffer
+                protocol that holds exactly len(self) values of the
+                register's C type, e.g. a numpy array of
+                register.to_dtype().base or an array.array, is passed to
+                WriteArray<Type> directly, without converting its values.
         """
-        # if data is not iterable make it iterable
-        try:
-            iter(data)
-        except TypeError:
-            data = [data]
-        assert len(data) == len(self), \
-            "Bad data length %d for register '%s', expected %s" \
-            % (len(data), self._name, len(self))
-        buf = self._ctype_type(*data)
-        self._write_func(self._session, self._resource, buf, len(self))
+        buf = self._ctypes_view(data)
+        if buf is None:
+            # if data is not iterable make it iterable
+            try:
+                iter(data)
+            except TypeError:
+                data = [data]
+            assert len(data) == len(self), \
+                "Bad data length %d for register '%s', expected %s" \
+                % (len(data), self._name, len(self))
+            buf = self._ctype_type(*data)
+        if self._shadow_cache is not None:
+            self._shadow_cache._write_through(self._name, bytes(buf), self._write_func,
+                                              self._session, self._resource, buf, len(self))
+        else:
+            self._write_func(self._session, self._resource, buf, len(self))
+
+    def _read_buffer(self, buf):
+        """ Reads the array into the ctypes array buf, or copies it from the
+        shadow cache when that serves reads. """
+        if self._shadow_cache is not None:
+            wire = self._shadow_cache._lookup(self._name)
+            if wire is not None:
+                ctypes.memmove(buf, wire, len(wire))
+                return
+        self._read_func(self._session, self._resource, buf, len(self))
 
-    def read(self):
+    def read(self, output_type=list):
         """ Reads the entire array from the control or indicator.
 
+        Args:
+            output_type (type): list, numpy.ndarray for an array of the
+                register's to_dtype().base, or array.array for an array of
+                the register's C type (0 or 1 for Booleans).
+
+        Returns:
+            (list): The data in the register in a python list, or an
+            output_type.
+        """
+        if output_type is list:
+            buf = self._ctype_type()
+            self._read_buffer(buf)
+            if self._datatype is DataType.Bool:
+                return [elem != 0 for elem in buf]
+            return buf[:]
+        if numpy is not None and output_type is numpy.ndarray:
+            data = numpy.empty(self._num_elements, dtype=self._type.to_dtype().base)
+        elif output_type is array.array:
+            data = array.array(self._array_typecode, [0]) * self._num_elements
+        else:
+            raise TypeError("Unsupported output_type %r for register '%s'" % (output_type, self._name))
+        self._read_buffer(self._ctype_type.from_buffer(data))
+        return data
+
+    def read_into(self, buffer):
+        """ Reads the entire array from the control or indicator directly into
+        buffer, without converting or copying its values.
+
+        Reading into the same buffer again allocates nothing, which makes
+        this the cheapest way to poll an array indicator.  A reference to
+        the last buffer is kept until another one is used, which for a
+        bytearray prevents resizing it.
+
+        Args:
+            buffer: a writable, contiguous object supporting the buffer
+                protocol that holds exactly len(self) values of the
+                register's C type, e.g. a numpy array of
+                register.to_dtype().base or an array.array.
+
         Returns:
-            (list): The data in the register in a python list.
+            buffer
         """
+        buf = self._ctypes_view(buffer, writable=True)
+        if buf is None:
+            raise TypeError("read_into() needs a writable, contiguous buffer of %d %s values for register '%s'"
+                            % (len(self), self._datatype, self._name))
+        self._read_buffer(buf)
+        return buffer
+
+    def _raw_reader(self):
+        read_func = self._read_func
+        session = self._session
+        resource = self._resource
         buf = self._ctype_type()
-        self._read_func(self._session, self._resource, buf, len(self))
-        val = [bool(elem) if self._datatype is DataType.Bool else elem for elem in buf]
-        return val
+        num_elements = self._num_elements
+
+        def read_raw():
+            read_func(session, resource, buf, num_elements)
+            return bytes(buf)
+        return read_raw
+
+    def _decode(self, raw):
+        values = self._ctype_type.from_buffer_copy(raw)
+        if self._datatype is DataType.Bool:
+            return [elem != 0 for elem in values]
+        return values[:]
+
+    def _ctypes_view(self, buffer, writable=False):
+        """ Returns a ctypes array of buffer's values, or None if buffer
+        doesn't support the buffer protocol or doesn't hold exactly this
+        register's values.  The array shares buffer's memory, unless buffer
+        is read only and writable is False, in which case it's a copy. """
+        cached_buffer, view = self._buffer_view
+        if cached_buffer is buffer:
+            return view
+        if isinstance(buffer, (list, tuple)):
+            return None
+        try:
+            memory = memoryview(buffer)
+        except TypeError:
+            return None
+        try:
+            if (not memory.c_contiguous
+                    or memory.nbytes != ctypes.sizeof(self._ctype_type)
+                    or _buffer_kind(memory.format) not in self._buffer_kinds):
+                return None
+            if memory.readonly:
+                return None if writable else self._ctype_type.from_buffer_copy(memory)
+            view = self._ctype_type.from_buffer(buffer)
+        finally:
+            # memoryviews are only context managers, and releasable, on
+            # Python 3
+            if hasattr(memory, "release"):
+                memory.release()
+        self._buffer_view = (buffer, view)
+        return view
 
 
 class _DataConvertingRegister(_Register):
@@ -443,6 +898,10 @@ class _DataConvertingRegister(_Register):
         A value is to be coerced if it is not a multiple of the delta value, or
         if it exceeds the minimum or maximum values.
     """
+    _scalar = False
+    # the packed bits last written or read, for update()
+    _last_bits = None
+
     def __init__(self,
                  session,
                  nifpga,
@@ -457,35 +916,101 @@ class _DataConvertingRegister(_Register):
             write_func=nifpga["WriteArray%s" % DataType.U32])
         self._transfer_len = int(ceil(self._type.size_in_bits / 32.0))
         self._ctype_type = self._ctype_type * self._transfer_len
+        self._output_format = FxpFormat.Decimal
+        self._cluster_format = ClusterFormat.Dict
 
-    def read(self):
+    @property
+    def output_format(self):
+        """ How :meth:`_DataConvertingRegister.read()` represents fixed point
+        values, an nifpga.FxpFormat.
+
+        Defaults to FxpFormat.Decimal.  Other formats are only supported by
+        FXP registers and arrays of FXP, which are then decoded into a
+        float, integer mantissa or nifpga.FixedPoint, or for arrays a numpy
+        array or list (or an (overflows, values) tuple of them), see
+        bitfile._FXP.unpack_batch().
+        """
+        return self._output_format
+
+    @output_format.setter
+    def output_format(self, value):
+        if not isinstance(value, FxpFormat):
+            raise TypeError("output_format must be set to an nifpga.FxpFormat")
+        if value is not FxpFormat.Decimal and self._fxp_type() is None:
+            raise TypeError("output_format is only supported by FXP registers")
+        self._output_format = value
+
+    @property
+    def cluster_format(self):
+        """ How :meth:`_DataConvertingRegister.read()` represents cluster
+        values, an nifpga.ClusterFormat.
+
+        Defaults to ClusterFormat.Dict.  Other formats are only supported by
+        cluster registers and arrays of clusters, whose elements are then
+        each represented that way.
+        """
+        return self._cluster_format
+
+    @cluster_format.setter
+    def cluster_format(self, value):
+        if not isinstance(value, ClusterFormat):
+            raise TypeError("cluster_format must be set to an nifpga.ClusterFormat")
+        if value is not ClusterFormat.Dict and not self._is_cluster():
+            raise TypeError("cluster_format is only supported by cluster registers")
+        self._cluster_format = value
+
+    def _is_cluster(self):
+        """ Whether this is a cluster register or an array of clusters. """
+        data_type = self._type.subtype if isinstance(self._type, _Array) else self._type
+        return isinstance(data_type, _Cluster)
+
+    def _fxp_type(self):
+        """ Returns the _FXP type of an FXP register or array of FXP. """
+        if isinstance(self._type, _Array):
+            subtype = self._type.subtype
+            return subtype if isinstance(subtype, _FXP) else None
+        return self._type if isinstance(self._type, _FXP) else None
+
+    def read(self, output_format=None, cluster_format=None):
         """ Reads the value from the control or indicator
 
+        Args:
+            output_format (FxpFormat): Overrides
+                :attr:`_DataConvertingRegister.output_format` for this call.
+                None uses the register's setting.
+            cluster_format (ClusterFormat): Overrides
+                :attr:`_DataConvertingRegister.cluster_format` for this
+                call.  None uses the register's setting.
+
         Returns:
             data (value_type): The data inside the register.
         """
-        buf = self._ctype_type()
-        self._read_func(self._session, self._resource, buf, self._transfer_len)
-        read_array = [elem for elem in buf]
-        fpga_representation = self._combine_array_of_u32_into_one_value(read_array)
-        return self._type.unpack_data(fpga_representation)
-
-    def _combine_array_of_u32_into_one_value(self, data):
-        """ This method is a helper to convert the array read from hardware
-        and return a single value removing any excessive bits. Whenever
-        the array is longer than 1 element, the data is left justified, we need
-        to shift the combined data to the right before doing the conversion.
-        For example, if the register had a word length of 54, the 54 MSB would
-        be the fixed point bits. The 10 LSB of the combinedData must be shifted
-        off in order to not mess up further calculations.
-
-        """
-        combinedData = 0
-        for index in range(0, self._transfer_len):
-            combinedData = (combinedData << 32) + data[index]
-        if self._transfer_len > 1:
-            combinedData = combinedData >> (32 * self._transfer_len - self._type.size_in_bits)
-        return combinedData
+        fpga_representation = self._read_value()
+        self._last_bits = fpga_representation
+        return self._decode(fpga_representation, output_format, cluster_format)
+
+    def _raw_reader(self):
+        # the packed bits, as an int
+        return self._create_accessors()[0]
+
+    def _decode(self, fpga_representation, output_format=None, cluster_format=None):
+        if output_format is None:
+            output_format = self._output_format
+        if cluster_format is None:
+            cluster_format = self._cluster_format
+        if cluster_format is not ClusterFormat.Dict:
+            if not self._is_cluster():
+                raise TypeError("cluster_format is only supported by cluster registers")
+            return _unpack_cluster(self._type, fpga_representation, cluster_format)
+        if output_format is FxpFormat.Decimal:
+            return self._type.unpack_data(fpga_representation)
+        fxp = self._fxp_type()
+        if fxp is None:
+            raise TypeError("output_format is only supported by FXP registers")
+        if fxp is self._type:
+            return fxp.unpack_data(fpga_representation, output_format)
+        return fxp.unpack_batch(self._type._split_elements(fpga_representation),
+                                output_format)
 
     def write(self, user_input):
         """ Writes the user's the users input into the register as a fixed
@@ -500,21 +1025,146 @@ class _DataConvertingRegister(_Register):
                                 point.
         """
         fpga_representation = self._type.pack_data(user_input, 0)
-        arrayData = self._convert_to_u32_array(fpga_representation)
-        buf = self._ctype_type(*arrayData)
-        self._write_func(self._session, self._resource, buf, self._transfer_len)
+        self._write_value(fpga_representation)
+        self._last_bits = fpga_representation
+
+    def update(self, members=None, **named_members):
+        """ Writes new values of some members of a cluster, or elements of an
+        array, leaving the rest as this register last wrote or read them,
+        or if it hasn't, as they are read first.
 
-    def _convert_to_u32_array(self, data):
-        if self._transfer_len > 1:
-            data = data << (32 * self._transfer_len - self._type.size_in_bits)
+        Only the given members are encoded, into their bits of the last
+        value, which is then written with a single WriteArrayU32, so the
+        cost depends on how many members change rather than on the size of
+        the cluster.  Since the rest of the value isn't read again, this is
+        meant for controls that nothing but this register writes.
 
-        mask_32bit = (2**32) - 1
-        extracted_array = []
-        for index in range(0, self._transfer_len):
-            extracted_array.append(data & mask_32bit)
-            data = data >> 32
-        extracted_array.reverse()
-        return extracted_array
+        Args:
+            members (dict): the path of each member to change to its new
+                value.  A path is a member name, an array index, or a tuple
+                of them leading into nested clusters and arrays, e.g.
+                ("Limits", "Upper") or ("Channels", 3, "Gain").
+            **named_members: new values of members of the outermost
+                cluster, by name, e.g. register.update(code=5).
+        """
+        if not isinstance(self._type, (_Cluster, _Array)):
+            raise TypeError("update() is only supported by cluster and array registers")
+        changes = list(members.items()) if members else []
+        changes.extend(named_members.items())
+        offsets = self._type._member_offsets()
+        size_in_bits = self._type.size_in_bits
+        fpga_representation = self._last_bits
+        if fpga_representation is None:
+            fpga_representation = self._read_value()
+        for path, value in changes:
+            try:
+                member, offset = offsets[path if isinstance(path, tuple) else (path,)]
+            except KeyError:
+                raise KeyError("Register '%s' has no member %r" % (self._name, path))
+            shift = size_in_bits - offset - member.size_in_bits
+            mask = ((1 << member.size_in_bits) - 1) << shift
+            fpga_representation = ((fpga_representation & ~mask)
+                                   | (member.pack_data(value, 0) << shift))
+        self._write_value(fpga_representation)
+        self._last_bits = fpga_representation
+
+    def _reader(self):
+        return self.read
+
+    def _writer(self):
+        return self.write
+
+    def _create_accessors(self):
+        """ Returns (read, write) functions for the packed bits of this
+        register's value, as an int.
+
+        Whenever the value takes more than one U32, it is left justified in
+        them.  For example, if the register had a word length of 54, the 54
+        MSB would be the fixed point bits, and the 10 LSB padding.
+        """
+        read_func = self._read_func
+        write_func = self._write_func
+        session = self._session
+        resource = self._resource
+        ctype_type = self._ctype_type
+        buffers = self._buffers
+        transfer_len = self._transfer_len
+
+        if transfer_len == 1:
+            def read():
+                try:
+                    buf = buffers.value
+                except AttributeError:
+                    buf = buffers.value = ctype_type()
+                read_func(session, resource, buf, 1)
+                return buf[0]
+
+            def write(data):
+                try:
+                    buf = buffers.value
+                except AttributeError:
+                    buf = buffers.value = ctype_type()
+                buf[0] = data
+                write_func(session, resource, buf, 1)
+            return self._shadowed(read, write)
+
+        padding = 32 * transfer_len - self._type.size_in_bits
+        shifts = [32 * index for index in reversed(range(transfer_len))]
+
+        if transfer_len > 4 and hasattr(int, "from_bytes"):
+            # For long values, reverse the order of the words in C and
+            # convert them to an int at once, rather than shifting in one
+            # word at a time.
+            typecode = ctypes.c_uint32._type_
+            size = 4 * transfer_len
+
+            def read():
+                try:
+                    buf = buffers.value
+                except AttributeError:
+                    buf = buffers.value = ctype_type()
+                read_func(session, resource, buf, transfer_len)
+                words = array.array(typecode, bytes(buf))
+                words.reverse()
+                return int.from_bytes(words.tobytes(), sys.byteorder) >> padding
+
+            def write(data):
+                try:
+                    buf = buffers.value
+                except AttributeError:
+                    buf = buffers.value = ctype_type()
+                words = array.array(typecode, (data << padding).to_bytes(size, sys.byteorder))
+                words.reverse()
+                ctypes.memmove(buf, words.tobytes(), size)
+                write_func(session, resource, buf, transfer_len)
+            return self._shadowed(read, write)
+
+        def read():
+            try:
+                buf = buffers.value
+            except AttributeError:
+                buf = buffers.value = ctype_type()
+            read_func(session, resource, buf, transfer_len)
+            data = 0
+            for word in buf:
+                data = (data << 32) | word
+            return data >> padding
+
+        def write(data):
+            try:
+                buf = buffers.value
+            except AttributeError:
+                buf = buffers.value = ctype_type()
+            data <<= padding
+            buf[:] = [(data >> shift) & 0xffffffff for shift in shifts]
+            write_func(session, resource, buf, transfer_len)
+        return self._shadowed(read, write)
+
+    def _shadowed(self, read, write):
+        # read and write take packed bits, which are compared as they are
+        if self._shadow_cache is not None:
+            return self._shadow_cache._wrap(self._name, read, write)
+        return read, write
 
 
 class _FIFO(object):
@@ -544,6 +1194,84 @@ class _FIFO(object):
         self._nifpga = nifpga
         self._ctype_type = self._datatype._return_ctype()
         self._name = bitfile_fifo.name
+        self._raise_on_timeout = True
+        self._write_func_no_raise = nifpga.tolerating("WriteFifo%s" % self._datatype,
+                                                      [FifoTimeoutError.CODE])
+        self._read_func_no_raise = nifpga.tolerating("ReadFifo%s" % self._datatype,
+                                                     [FifoTimeoutError.CODE])
+
+    @property
+    def raise_on_timeout(self):
+        """ Whether :meth:`_FIFO.read()` and :meth:`_FIFO.write()` raise
+        FifoTimeoutError when they time out.
+
+        Defaults to True.  When set to False, timeouts are reported in the
+        returned value instead (see :meth:`_FIFO.read()` and
+        :meth:`_FIFO.write()`), and no exception is constructed.  This is
+        much cheaper for polling loops that expect to time out most of the
+        time, e.g. reading with timeout_ms=0.
+        """
+        return self._raise_on_timeout
+
+    @raise_on_timeout.setter
+    def raise_on_timeout(self, value):
+        self._raise_on_timeout = bool(value)
+
+    def _raises_on_timeout(self, raise_on_timeout):
+        if raise_on_timeout is None:
+            return self._raise_on_timeout
+        return raise_on_timeout
+
+    WriteValues = namedtuple("WriteValues", ["elements_remaining", "timed_out"])
+
+    def _write_buffer(self, buf, number_of_elements, timeout_ms, raise_on_timeout):
+        empty_elements_remaining = ctypes.c_size_t()
+        if self._raises_on_timeout(raise_on_timeout):
+            self._write_func(self._session,
+                             self._number,
+                             buf,
+                             number_of_elements,
+                             timeout_ms,
+                             empty_elements_remaining)
+            return empty_elements_remaining.value
+        status = self._write_func_no_raise(self._session,
+                                           self._number,
+                                           buf,
+                                           number_of_elements,
+                                           timeout_ms,
+                                           empty_elements_remaining)
+        return self.WriteValues(elements_remaining=empty_elements_remaining.value,
+                                timed_out=status == FifoTimeoutError.CODE)
+
+    def _read_buffer(self, number_of_elements, timeout_ms, raise_on_timeout):
+        """ Reads into a new buffer and returns (buf, elements remaining,
+        timed out).  timed out is always False when raising on timeout. """
+        buf_type = self._ctype_type * number_of_elements
+        buf = buf_type()
+        elements_remaining = ctypes.c_size_t()
+        if self._raises_on_timeout(raise_on_timeout):
+            self._read_func(self._session,
+                            self._number,
+                            buf,
+                            number_of_elements,
+                            timeout_ms,
+                            elements_remaining)
+            return buf, elements_remaining.value, False
+        status = self._read_func_no_raise(self._session,
+                                          self._number,
+                                          buf,
+                                          number_of_elements,
+                                          timeout_ms,
+                                          elements_remaining)
+        return buf, elements_remaining.value, status == FifoTimeoutError.CODE
+
+    def _make_read_values(self, data, elements_remaining, timed_out, raise_on_timeout):
+        if self._raises_on_timeout(raise_on_timeout):
+            return self.ReadValues(data=data,
+                                   elements_remaining=elements_remaining)
+        return self.TimeoutReadValues(data=data,
+                                      elements_remaining=elements_remaining,
+                                      timed_out=timed_out)
 
     def configure(self, requested_depth):
         """ Specifies the depth of the host memory part of the DMA FIFO.
@@ -570,7 +1298,7 @@ class _FIFO(object):
         """ Stops the FIFO. """
         self._nifpga.StopFifo(self._session, self._number)
 
-    def write(self, data, timeout_ms=0):
+    def write(self, data, timeout_ms=0, raise_on_timeout=None):
         """ Writes the specified data to the FIFO.
 
         NOTE:
@@ -581,10 +1309,19 @@ class _FIFO(object):
         Args:
             data (list): Data to be written to the FIFO.
             timeout_ms (int): The timeout to wait in milliseconds.
+            raise_on_timeout (bool): Overrides :attr:`_FIFO.raise_on_timeout`
+                for this call.  None uses the FIFO's setting.
 
         Returns:
             elements_remaining (int): The number of elements remaining in the
             host memory part of the DMA FIFO.
+
+            If not raising on timeout, returns a WriteValues (namedtuple)::
+
+                WriteValues.elements_remaining (int): The number of elements
+                    remaining in the host memory part of the DMA FIFO.
+                WriteValues.timed_out (bool): Whether the write timed out,
+                    in which case no data was written.
         """
         # if data is not iterable make it iterable
         try:
@@ -593,18 +1330,13 @@ class _FIFO(object):
             data = [data]
         buf_type = self._ctype_type * len(data)
         buf = buf_type(*data)
-        empty_elements_remaining = ctypes.c_size_t()
-        self._write_func(self._session,
-                         self._number,
-                         buf,
-                         len(data),
-                         timeout_ms,
-                         empty_elements_remaining)
-        return empty_elements_remaining.value
+        return self._write_buffer(buf, len(data), timeout_ms, raise_on_timeout)
 
     ReadValues = namedtuple("ReadValues", ["data", "elements_remaining"])
+    TimeoutReadValues = namedtuple("TimeoutReadValues",
+                                   ["data", "elements_remaining", "timed_out"])
 
-    def read(self, number_of_elements, timeout_ms=0):
+    def read(self, number_of_elements, timeout_ms=0, raise_on_timeout=None):
         """ Read the specified number of elements from the FIFO.
 
         NOTE:
@@ -616,6 +1348,8 @@ class _FIFO(object):
             number_of_elements (int): The number of elements to read from the
                                       FIFO.
             timeout_ms (int): The timeout to wait in milliseconds.
+            raise_on_timeout (bool): Overrides :attr:`_FIFO.raise_on_timeout`
+                for this call.  None uses the FIFO's setting.
 
         Returns:
             ReadValues (namedtuple)::
@@ -624,22 +1358,24 @@ class _FIFO(object):
                     the FIFO.
                 ReadValues.elements_remaining (int): The amount of elements
                     remaining in the FIFO.
+
+            If not raising on timeout, returns a TimeoutReadValues
+            (namedtuple) with the same members plus::
+
+                TimeoutReadValues.timed_out (bool): Whether the read timed
+                    out, in which case data is empty.
         """
-        buf_type = self._ctype_type * number_of_elements
-        buf = buf_type()
-        elements_remaining = ctypes.c_size_t()
-        self._read_func(self._session,
-                        self._number,
-                        buf,
-                        number_of_elements,
-                        timeout_ms,
-                        elements_remaining)
-        if self._datatype is DataType.Bool:
+        buf, elements_remaining, timed_out = self._read_buffer(number_of_elements,
+                                                               timeout_ms,
+                                                               raise_on_timeout)
+        if timed_out:
+            data = []
+        elif self._datatype is DataType.Bool:
             data = [bool(elem) for elem in buf]
         else:
             data = [elem for elem in buf]
-        return self.ReadValues(data=data,
-                               elements_remaining=elements_remaining.value)
+        return self._make_read_values(data, elements_remaining, timed_out,
+                                      raise_on_timeout)
 
     AcquireWriteValues = namedtuple("AcquireWriteValues",
                                     ["data", "elements_acquired",
@@ -846,12 +1582,43 @@ class _FxpFIFO(_FIFO):
                                        bitfile_fifo,
                                        datatype=DataType.U64)
         self._fxp = bitfile_fifo.type
+        self._output_format = FxpFormat.Decimal
+        self._decoder = None
 
     @property
     def datatype(self):
         return DataType.Fxp
 
-    def write(self, data, timeout_ms=0):
+    @property
+    def output_format(self):
+        """ How :meth:`_FxpFIFO.read()` represents values, an
+        nifpga.FxpFormat.
+
+        Defaults to FxpFormat.Decimal, a list of Decimals (or of
+        (overflow, Decimal) tuples).  FxpFormat.Float and FxpFormat.Mantissa
+        decode the whole read in one vectorized pass into a numpy array (or
+        an (overflows, values) tuple of arrays), and FxpFormat.FixedPoint
+        into a list of nifpga.FixedPoint, see bitfile._FXP.unpack_batch().
+        """
+        return self._output_format
+
+    @output_format.setter
+    def output_format(self, value):
+        if not isinstance(value, FxpFormat):
+            raise TypeError("output_format must be set to an nifpga.FxpFormat")
+        self._output_format = value
+
+    @property
+    def decoder(self):
+        """ An nifpga.ParallelDecoder that decodes large reads on several
+        cores, or None (the default) to decode on the calling thread. """
+        return self._decoder
+
+    @decoder.setter
+    def decoder(self, value):
+        self._decoder = value
+
+    def write(self, data, timeout_ms=0, raise_on_timeout=None):
         """ Writes the specified data to the FIFO.
 
         NOTE:
@@ -860,32 +1627,29 @@ class _FxpFIFO(_FIFO):
             continue to work as expected.
 
         Args:
-            data (list): Data to be written to the FIFO.
+            data (list): Data to be written to the FIFO.  A numpy float
+                array is encoded in one vectorized pass, see
+                bitfile._FXP.pack_batch(), and nifpga.FixedPoint values of
+                the FIFO's type are written without conversion.
             timeout_ms (int): The timeout to wait in milliseconds.
+            raise_on_timeout (bool): Overrides :attr:`_FIFO.raise_on_timeout`
+                for this call.  None uses the FIFO's setting.
 
         Returns:
             elements_remaining (int): The number of elements remaining in the
-            host memory part of the DMA FIFO.
+            host memory part of the DMA FIFO, or a WriteValues (namedtuple)
+            if not raising on timeout.  See :meth:`_FIFO.write()`.
         """
         # if data is not iterable make it iterable
         try:
             iter(data)
         except TypeError:
             data = [data]
-        buf_type = self._ctype_type * len(data)
-        buf = buf_type()
-        for i, item in enumerate(data):
-            buf[i] = self._fxp.pack_data(item, 0)
-        empty_elements_remaining = ctypes.c_size_t()
-        self._write_func(self._session,
-                         self._number,
-                         buf,
-                         len(data),
-                         timeout_ms,
-                         empty_elements_remaining)
-        return empty_elements_remaining.value
-
-    def read(self, number_of_elements, timeout_ms=0):
+        buf, _ = self._fxp.pack_batch(data)
+        return self._write_buffer(buf, len(buf), timeout_ms, raise_on_timeout)
+
+    def read(self, number_of_elements, timeout_ms=0, raise_on_timeout=None,
+             output_format=None):
         """ Read the specified number of elements from the FIFO.
 
         NOTE:
@@ -897,6 +1661,11 @@ class _FxpFIFO(_FIFO):
             number_of_elements (int): The number of elements to read from the
                                       FIFO.
             timeout_ms (int): The timeout to wait in milliseconds.
+            raise_on_timeout (bool): Overrides :attr:`_FIFO.raise_on_timeout`
+                for this call.  None uses the FIFO's setting.
+            output_format (FxpFormat): Overrides
+                :attr:`_FxpFIFO.output_format` for this call.  None uses the
+                FIFO's setting.
 
         Returns:
             ReadValues (namedtuple)::
@@ -905,16 +1674,196 @@ class _FxpFIFO(_FIFO):
                     the FIFO.
                 ReadValues.elements_remaining (int): The amount of elements
                     remaining in the FIFO.
+
+            or a TimeoutReadValues (namedtuple) if not raising on timeout.
+            See :meth:`_FIFO.read()`.
         """
-        buf_type = self._ctype_type * number_of_elements
-        buf = buf_type()
-        elements_remaining = ctypes.c_size_t()
-        self._read_func(self._session,
-                        self._number,
-                        buf,
-                        number_of_elements,
-                        timeout_ms,
-                        elements_remaining)
-        data = [self._fxp.unpack_data(elem) for elem in buf]
-        return self.ReadValues(data=data,
-                               elements_remaining=elements_remaining.value)
+        if output_format is None:
+            output_format = self._output_format
+        buf, elements_remaining, timed_out = self._read_buffer(number_of_elements,
+                                                               timeout_ms,
+                                                               raise_on_timeout)
+        if timed_out:
+            buf = buf[:0]
+        if self._decoder is not None and len(buf) >= self._decoder.min_elements:
+            data = self._decoder.unpack_batch(self._fxp, buf, output_format)
+            if output_format is FxpFormat.Decimal and self._fxp._overflow_enabled:
+                data = list(zip(*data))
+        elif output_format is FxpFormat.Decimal:
+            data = [self._fxp.unpack_data(elem) for elem in buf]
+        else:
+            data = self._fxp.unpack_batch(buf, output_format)
+        return self._make_read_values(data, elements_remaining, timed_out,
+                                      raise_on_timeout)
+
+
+class _CompositeFIFO(_FIFO):
+    """ A FIFO of clusters or arrays.
+
+    Each element is transferred as whole U32 words, packed like a cluster or
+    array register.  When numpy is installed, reads return a numpy
+    structured array with one record per element (see
+    layout.ElementLayout), decoded one field at a time for all elements at
+    once.  Otherwise, reads return a list of the same values a register of
+    the FIFO's type would.
+
+    Zero copy access isn't supported, since the acquired words would have
+    to be copied to be decoded into elements.
+    """
+    def __init__(self,
+                 session,
+                 nifpga,
+                 bitfile_fifo):
+        super(_CompositeFIFO, self).__init__(session,
+                                             nifpga,
+                                             bitfile_fifo,
+                                             datatype=DataType.U32)
+        self._type = bitfile_fifo.type
+        self._words_per_element = max(1, int(ceil(self._type.size_in_bits / 32.0)))
+        self._layout = ElementLayout(self._type) if numpy is not None else None
+        self._decoder = None
+
+    @property
+    def datatype(self):
+        return self._type.datatype
+
+    @property
+    def decoder(self):
+        """ An nifpga.ParallelDecoder that decodes large reads on several
+        threads, or None (the default) to decode on the calling thread.
+        Only used when numpy is installed. """
+        return self._decoder
+
+    @decoder.setter
+    def decoder(self, value):
+        self._decoder = value
+
+    @property
+    def dtype(self):
+        """ The numpy dtype of the elements returned by
+        :meth:`_CompositeFIFO.read()`, or None if numpy isn't installed. """
+        return self._layout.dtype if self._layout is not None else None
+
+    def write(self, data, timeout_ms=0, raise_on_timeout=None):
+        """ Writes the specified data to the FIFO.
+
+        Args:
+            data: a numpy array of elements of :attr:`_CompositeFIFO.dtype`,
+                which is packed for all elements at once, or a list of the
+                values a register of the FIFO's type accepts, e.g. a list of
+                dictionaries for a FIFO of clusters.
+            timeout_ms (int): The timeout to wait in milliseconds.
+            raise_on_timeout (bool): Overrides :attr:`_FIFO.raise_on_timeout`
+                for this call.  None uses the FIFO's setting.
+
+        Returns:
+            elements_remaining (int): see :meth:`_FIFO.write()`, in
+            elements rather than words.
+        """
+        if self._layout is not None and isinstance(data, numpy.ndarray):
+            words = self._layout.pack(data)
+            buf = (self._ctype_type * len(words)).from_buffer(words)
+        else:
+            words = []
+            for element in data:
+                words.extend(self._pack_element(element))
+            buf = (self._ctype_type * len(words))(*words)
+        result = self._write_buffer(buf, len(buf), timeout_ms, raise_on_timeout)
+        if isinstance(result, _FIFO.WriteValues):
+            return result._replace(
+                elements_remaining=result.elements_remaining // self._words_per_element)
+        return result // self._words_per_element
+
+    def read(self, number_of_elements, timeout_ms=0, raise_on_timeout=None):
+        """ Read the specified number of elements from the FIFO.
+
+        Args:
+            number_of_elements (int): The number of elements to read from the
+                                      FIFO.
+            timeout_ms (int): The timeout to wait in milliseconds.
+            raise_on_timeout (bool): Overrides :attr:`_FIFO.raise_on_timeout`
+                for this call.  None uses the FIFO's setting.
+
+        Returns:
+            ReadValues (namedtuple), or TimeoutReadValues if not raising on
+            timeout, see :meth:`_FIFO.read()`.  data is a numpy structured
+            array when numpy is installed, otherwise a list, and
+            elements_remaining is in elements rather than words.
+        """
+        words_per_element = self._words_per_element
+        buf, elements_remaining, timed_out = self._read_buffer(number_of_elements * words_per_element,
+                                                               timeout_ms,
+                                                               raise_on_timeout)
+        if timed_out:
+            buf = buf[:0]
+        if self._layout is not None and self._decoder is not None:
+            data = self._decoder.unpack_elements(self._layout, buf)
+        elif self._layout is not None:
+            data = self._layout.unpack(buf)
+        else:
+            data = [self._unpack_element(buf[index:index + words_per_element])
+                    for index in range(0, len(buf), words_per_element)]
+        return self._make_read_values(data, elements_remaining // words_per_element,
+                                      timed_out, raise_on_timeout)
+
+    def _acquire_write(self, number_of_elements, timeout_ms=0):
+        raise TypeError("FIFOs of clusters and arrays don't support acquiring "
+                        "elements, use write() instead")
+
+    def _acquire_read(self, number_of_elements, timeout_ms=0):
+        raise TypeError("FIFOs of clusters and arrays don't support acquiring "
+                        "elements, use read() instead")
+
+    def _release_elements(self, number_of_elements):
+        raise TypeError("FIFOs of clusters and arrays don't support acquiring "
+                        "elements")
+
+    def _unpack_element(self, words):
+        """ Like _DataConvertingRegister, combines left justified words. """
+        combined = 0
+        for word in words:
+            combined = (combined << 32) + word
+        if self._words_per_element > 1:
+            combined >>= 32 * self._words_per_element - self._type.size_in_bits
+        return self._type.unpack_data(combined)
+
+    def _pack_element(self, element):
+        combined = self._type.pack_data(element, 0)
+        if self._words_per_element > 1:
+            combined <<= 32 * self._words_per_element - self._type.size_in_bits
+        words = []
+        for _ in range(self._words_per_element):
+            words.append(combined & 0xffffffff)
+            combined >>= 32
+        words.reverse()
+        return words
+
+
+def _buffer_kind(format):
+    """ Returns (kind, size in bytes) of the values of a native struct
+    format, e.g. a memoryview's, kind being "i" for signed integers, "u" for
+    unsigned ones, "f" for floats and "b" for bools, or None if they aren't
+    native single values. """
+    if format[:1] in ("<", ">", "!"):
+        if (format[0] == "<") != (sys.byteorder == "little"):
+            return None
+        format = "=" + format[1:]
+    code = format.lstrip("@=")
+    if len(code) != 1:
+        return None
+    for kind, codes in (("i", "bhilqn"), ("u", "BHILQN"), ("f", "efd"), ("b", "?")):
+        if code in codes:
+            try:
+                return kind, struct.calcsize(format)
+            except struct.error:
+                return None
+    return None
+
+
+def _buffer_kinds(datatype):
+    """ Returns the buffer kinds (see _buffer_kind) that hold values of
+    datatype's C type. """
+    kind = _buffer_kind(datatype._return_ctype()._type_)
+    if datatype is DataType.Bool:
+        return (kind, ("b", 1))
+    return (kind,)
@@ -0,0 +1,138 @@
+"""
+A write-through cache of the values last written to controls.
+
+Control loops often write the same setpoints every cycle.  With a
+session's shadow cache enabled, every write to a control first encodes the
+value as it would be sent to the FPGA, and when that's what was last
+written, skips calling into NiFpga at all::
+
+    cache = session.enable_shadow_cache(serve_reads=True)
+    while running:
+        session.registers["Setpoint"].write(setpoint)   # usually skipped
+        ...
+    print(cache.statistics())
+
+The cache only knows what was written through the session, so it must not
+be enabled when anything else, like the FPGA VI itself or another session,
+writes the same controls.  It's invalidated by Session.reset(), abort() and
+download(), which reset controls to their defaults.
+
+Copyright (c) 2017 National Instruments
+"""
+from collections import namedtuple
+
+
+ShadowCacheStatistics = namedtuple("ShadowCacheStatistics",
+                                   ["writes", "suppressed_writes", "reads_served", "invalidations"])
+""" Counters of a ShadowCache.  writes is the number of writes passed on to
+the FPGA, suppressed_writes how many were skipped because the control
+already held their value, and reads_served how many reads of controls
+returned the cached value without reading the FPGA. """
+
+
+class ShadowCache(object):
+    """
+    The encoded value last written to each control of a session.  Created
+    by Session.enable_shadow_cache().
+
+    Counters are updated without locking, so they may undercount when
+    several threads write at once.
+    """
+    def __init__(self, serve_reads=False):
+        """
+        Args:
+            serve_reads (bool): whether reads of a control that has been
+                written return what was written, without reading the FPGA.
+        """
+        self.serve_reads = serve_reads
+        # register name to its encoded value
+        self._values = {}
+        self._writes = 0
+        self._suppressed_writes = 0
+        self._reads_served = 0
+        self._invalidations = 0
+
+    def __contains__(self, name):
+        """ Whether the value of the control called name is cached. """
+        return name in self._values
+
+    def invalidate(self, name=None):
+        """ Forgets the value of the control called name, or of every
+        control, so the next write to it goes to the FPGA. """
+        if name is None:
+            self._values.clear()
+        else:
+            self._values.pop(name, None)
+        self._invalidations += 1
+
+    def statistics(self):
+        """ Returns the ShadowCacheStatistics so far. """
+        return ShadowCacheStatistics(writes=self._writes,
+                                     suppressed_writes=self._suppressed_writes,
+                                     reads_served=self._reads_served,
+                                     invalidations=self._invalidations)
+
+    def reset_statistics(self):
+        self._writes = 0
+        self._suppressed_writes = 0
+        self._reads_served = 0
+        self._invalidations = 0
+
+    def _write_through(self, name, wire, write, *args):
+        """ Calls write(*args), unless wire, the encoded value it writes to
+        the control called name, is what was last written. """
+        values = self._values
+        if values.get(name) == wire:
+            self._suppressed_writes += 1
+            return
+        values.pop(name, None)
+        write(*args)
+        values[name] = wire
+        self._writes += 1
+
+    def _lookup(self, name):
+        """ Returns the encoded value last written to the control called
+        name if reads are served and it's cached, otherwise None. """
+        if self.serve_reads:
+            wire = self._values.get(name)
+            if wire is not None:
+                self._reads_served += 1
+            return wire
+        return None
+
+    def _wrap(self, name, read, write, encode=None, decode=None):
+        """ Returns (read, write) functions that do what read and write do,
+        through this cache.
+
+        Args:
+            name (str): the control's name.
+            read: a function of no arguments that reads the control.
+            write: a function of the value that writes the control.
+            encode: a function of a value passed to write, that returns it
+                as sent to the FPGA, for comparing with what was last
+                written.  None for values that are already encoded.
+            decode: a function of an encoded value that returns what read
+                returns.  None for reads that return encoded values.
+        """
+        # _write_through() and _lookup(), inlined
+        values = self._values
+
+        def shadowed_write(data):
+            wire = data if encode is None else encode(data)
+            if values.get(name) == wire:
+                self._suppressed_writes += 1
+                return
+            # forget the old value first, in case writing fails
+            values.pop(name, None)
+            write(data)
+            values[name] = wire
+            self._writes += 1
+
+        def shadowed_read():
+            if self.serve_reads:
+                wire = values.get(name)
+                if wire is not None:
+                    self._reads_served += 1
+                    return wire if decode is None else decode(wire)
+            return read()
+        return shadowed_read, shadowed_write
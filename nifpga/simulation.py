@@ -0,0 +1,769 @@
+"""
+A simulated FPGA, to use sessions without hardware.
+
+SimulatedNiFpga stands in for the NiFpga library, implementing its entry
+points in Python on a model of a bitfile's FPGA VI: its registers, its DMA
+FIFOs and its IRQs.  Sessions are opened on it by passing it as their
+library::
+
+    simulation = nifpga.SimulatedNiFpga(bitfile, fifo_rate=1e6)
+    with nifpga.Session(bitfile, "RIO0", library=simulation) as session:
+        simulation.registers["Temperature"].write(21)
+        print(session.registers["Temperature"].read())
+        print(session.fifos["Samples"].read(1000, timeout_ms=100).data)
+
+Entry points return the statuses NiFpga would, which sessions raise and
+warn as usual: reading a FIFO with nothing in it times out after
+timeout_ms, a closed session is an InvalidSessionError, and so on.  This
+makes the simulation useful for testing code on top of sessions, and for
+measuring how fast the host side of an application is, see
+benchmarks/simulated_throughput.py.
+
+What the FPGA VI does is up to the caller, who plays the FPGA through:
+
+    registers: the registers as the FPGA VI sees them, to read what the
+        host wrote to controls and write indicators for it to read.
+    fifos: a SimulatedFifo per DMA FIFO, to push elements for the host to
+        read and pop those it wrote, by hand or at a fixed rate.
+    assert_irqs(): asserts IRQs that sessions wait on.
+
+Zero copy FIFO access (AcquireFifoReadElements and the like), peer to peer
+FIFOs, resources and other entry points sessions don't otherwise use return
+FeatureNotSupported.
+
+Copyright (c) 2017 National Instruments
+"""
+from .nifpga import (_NiFpga, _SessionType, DataType, FifoPropertyType, FifoProperty,
+                     _fifo_properties_to_types, FlowControl, DmaBufferType, FpgaViState,
+                     OPEN_ATTRIBUTE_NO_RUN, RUN_ATTRIBUTE_WAIT_UNTIL_DONE,
+                     CLOSE_ATTRIBUTE_NO_RESET_IF_LAST_SESSION, INFINITE_TIMEOUT)
+from .session import Session
+from .status import (BadDepthError, BadReadWriteCountError, FeatureNotSupportedError,
+                     FifoTimeoutError, FpgaAlreadyRunningWarning, InvalidParameterError,
+                     InvalidSessionError, OperationNotSupportedWhileStartedError,
+                     ResourceNotFoundError, SignatureMismatchError, TypesDoNotMatchError)
+from .statuscheckedlibrary import FunctionInfo, StatusCheckedFunctions
+from ._util import _Status, _address, _entry_point, _monotonic, _out
+import ctypes
+import functools
+import itertools
+import threading
+from math import ceil
+
+# the bit of a register's resource that marks it as one whose access may time out
+_ACCESS_MAY_TIME_OUT = 0x80000000
+
+
+def _value(argument):
+    """ Returns the value of an argument passed either as a ctypes value or
+    as a Python one, as ctypes converts both. """
+    return getattr(argument, "value", argument)
+
+
+def _not_supported(*args):
+    return FeatureNotSupportedError.CODE
+
+
+def _transfer_size(bitfile_register):
+    """ Returns the number of bytes sessions read and write register in. """
+    if not bitfile_register.type.is_c_api_type:
+        return 4 * int(ceil(bitfile_register.type.size_in_bits / 32.0))
+    return ctypes.sizeof(bitfile_register.datatype._return_ctype()) * len(bitfile_register)
+
+
+class SimulatedNiFpga(StatusCheckedFunctions):
+    """
+    The entry points of the NiFpga library, simulating an FPGA running a
+    bitfile's VI.  Pass it to Session() as library.
+
+    Register memory is addressed as sessions address it, so registers
+    sharing an offset share memory, and is zeroed on reset and download, as
+    controls are reset to their defaults, whatever the bitfile says those
+    are.  The VI runs when opened or run, but does nothing by itself;
+    running it until done stops it naturally at once.
+
+    Entry points may be called from several threads, as NiFpga's may.
+    """
+    DEFAULT_DEPTH = 10000
+    """ The depth of a FIFO's host buffer until it's configured. """
+
+    def __init__(self, bitfile, fifo_rate=0):
+        """
+        Args:
+            bitfile (Bitfile): the bitfile whose VI to simulate.  Sessions
+                must be opened with a bitfile of the same signature.
+            fifo_rate (float): the rate, in elements per second, at which
+                the FPGA fills every target to host FIFO and drains every
+                host to target FIFO while they're started and the VI runs,
+                or 0 for only moving the elements pushed and popped.  See
+                SimulatedFifo.rate.
+        """
+        self._bitfile = bitfile
+        self._lock = threading.Lock()
+        self._handles = itertools.count(1)
+        self._sessions = set()
+        # the session behind registers, and its handle, which is never closed
+        self._fpga_session = None
+        self._fpga_handle = None
+        self._state = FpgaViState.NotRunning
+        base_address = bitfile.base_address_on_device()
+        # resource to the number of bytes of memory behind it, allocated
+        # into _memory on first access
+        self._memory_sizes = {}
+        for bitfile_register in bitfile.registers.values():
+            resource = bitfile_register.offset + base_address
+            self._memory_sizes[resource] = max(self._memory_sizes.get(resource, 0),
+                                               _transfer_size(bitfile_register))
+        self._memory = {}
+        self._fifos = {}
+        self._fifos_by_number = {}
+        for name, bitfile_fifo in bitfile.fifos.items():
+            fifo = SimulatedFifo(bitfile_fifo, self._running, fifo_rate)
+            self._fifos[name] = fifo
+            self._fifos_by_number[fifo.number] = fifo
+        self._irq_condition = threading.Condition()
+        self._asserted_irqs = 0
+        self._irq_contexts = itertools.count(1)
+
+        handlers = {
+            "Open": self._open,
+            "Run": self._run,
+            "Close": self._close,
+            "Reset": self._reset,
+            "Abort": self._abort,
+            "Download": self._download,
+            "GetFpgaViState": self._get_fpga_vi_state,
+            "ReserveIrqContext": self._reserve_irq_context,
+            "UnreserveIrqContext": self._unreserve_irq_context,
+            "WaitOnIrqs": self._wait_on_irqs,
+            "AcknowledgeIrqs": self._acknowledge_irqs,
+            "ConfigureFifo": self._configure_fifo,
+            "ConfigureFifo2": self._configure_fifo2,
+            "StartFifo": self._start_fifo,
+            "StopFifo": self._stop_fifo,
+            "CommitFifoConfiguration": self._commit_fifo_configuration,
+        }
+        for datatype in DataType:
+            if datatype == DataType.Fxp:
+                continue
+            type_ctype = datatype._return_ctype()
+            handlers["Read%s" % datatype] = functools.partial(self._read_array, type_ctype, size=1)
+            handlers["Write%s" % datatype] = functools.partial(self._write, type_ctype)
+            handlers["ReadArray%s" % datatype] = functools.partial(self._read_array, type_ctype)
+            handlers["WriteArray%s" % datatype] = functools.partial(self._write_array, type_ctype)
+            handlers["ReadFifo%s" % datatype] = functools.partial(self._read_fifo, datatype)
+            handlers["WriteFifo%s" % datatype] = functools.partial(self._write_fifo, datatype)
+        for property_type in FifoPropertyType:
+            handlers["GetFifoProperty%s" % property_type] = functools.partial(self._get_fifo_property,
+                                                                              property_type)
+            handlers["SetFifoProperty%s" % property_type] = functools.partial(self._set_fifo_property,
+                                                                              property_type)
+        function_infos = []
+        for library_function_info in _NiFpga._library_function_infos():
+            handler = handlers.get(library_function_info.pretty_name, _not_supported)
+            function_infos.append(FunctionInfo(
+                function=_entry_point(library_function_info, handler),
+                name=library_function_info.pretty_name,
+                argument_names=[named_argtype.name for named_argtype in library_function_info.named_argtypes]))
+        super(SimulatedNiFpga, self).__init__(function_infos)
+
+    @property
+    def registers(self):
+        """ The registers, as a session's registers, through which to read
+        and write them as the FPGA VI does, e.g. to write an indicator.
+        They're read and written through a session that isn't counted as
+        one of the host's, so closing the host's last one still resets the
+        VI. """
+        if self._fpga_session is None:
+            with self._lock:
+                if self._fpga_session is None:
+                    self._fpga_handle = next(self._handles)
+                    self._sessions.add(self._fpga_handle)
+                    self._fpga_session = Session(self._bitfile, _SessionType(self._fpga_handle), library=self)
+        return self._fpga_session.registers
+
+    @property
+    def fifos(self):
+        """ A dictionary of FIFO name to its SimulatedFifo. """
+        return self._fifos
+
+    @property
+    def state(self):
+        """ The FpgaViState of the simulated VI. """
+        return self._state
+
+    def assert_irqs(self, irqs):
+        """ Asserts an IRQ or list of IRQs, by ordinal 0-31, waking the
+        sessions waiting on any of them.  They stay asserted until
+        acknowledged. """
+        if not isinstance(irqs, list):
+            irqs = [irqs]
+        with self._irq_condition:
+            for irq in irqs:
+                assert 0 <= irq <= 31, "Valid IRQs are 0-31: %d is invalid" % irq
+                self._asserted_irqs |= 1 << irq
+            self._irq_condition.notify_all()
+
+    @property
+    def asserted_irqs(self):
+        """ The list of the ordinals of the IRQs asserted and not yet
+        acknowledged. """
+        return [irq for irq in range(32) if self._asserted_irqs & (1 << irq)]
+
+    def _running(self):
+        return self._state is FpgaViState.Running
+
+    def _set_state(self, state):
+        self._state = state
+        # FIFOs moving elements at a rate start or stop doing so
+        for fifo in self._fifos.values():
+            fifo._notify()
+
+    def _check_session(self, session):
+        if _value(session) not in self._sessions:
+            raise _Status(InvalidSessionError.CODE)
+
+    def _reset_vi(self):
+        self._set_state(FpgaViState.NotRunning)
+        self._memory.clear()
+        for fifo in self._fifos.values():
+            fifo._reset()
+        with self._irq_condition:
+            self._asserted_irqs = 0
+
+    def _open(self, bitfile_path, signature, resource, attribute, session):
+        signature = _value(signature)
+        if not isinstance(signature, str):
+            signature = signature.decode("ascii")
+        if signature.upper() != self._bitfile.signature:
+            return SignatureMismatchError.CODE
+        with self._lock:
+            handle = next(self._handles)
+            self._sessions.add(handle)
+        _out(session).value = handle
+        if not _value(attribute) & OPEN_ATTRIBUTE_NO_RUN and not self._running():
+            self._set_state(FpgaViState.Running)
+
+    def _run(self, session, attribute):
+        self._check_session(session)
+        if self._running():
+            return FpgaAlreadyRunningWarning.CODE
+        if _value(attribute) & RUN_ATTRIBUTE_WAIT_UNTIL_DONE:
+            self._set_state(FpgaViState.NaturallyStopped)
+        else:
+            self._set_state(FpgaViState.Running)
+
+    def _close(self, session, attribute):
+        self._check_session(session)
+        with self._lock:
+            self._sessions.discard(_value(session))
+            last = not self._sessions - set([self._fpga_handle])
+        if last and not _value(attribute) & CLOSE_ATTRIBUTE_NO_RESET_IF_LAST_SESSION:
+            self._reset_vi()
+
+    def _reset(self, session):
+        self._check_session(session)
+        self._reset_vi()
+
+    def _abort(self, session):
+        self._check_session(session)
+        self._set_state(FpgaViState.NotRunning)
+
+    def _download(self, session):
+        self._check_session(session)
+        self._reset_vi()
+
+    def _get_fpga_vi_state(self, session, state):
+        self._check_session(session)
+        _out(state).value = self._state.value
+
+    def _register_memory(self, resource):
+        resource = _value(resource) & ~_ACCESS_MAY_TIME_OUT
+        memory = self._memory.get(resource)
+        if memory is None:
+            if resource not in self._memory_sizes:
+                raise _Status(ResourceNotFoundError.CODE)
+            memory = self._memory.setdefault(resource, ctypes.create_string_buffer(self._memory_sizes[resource]))
+        return memory
+
+    def _read_array(self, type_ctype, session, indicator, array, size):
+        self._check_session(session)
+        memory = self._register_memory(indicator)
+        size = ctypes.sizeof(type_ctype) * _value(size)
+        if size > len(memory):
+            return InvalidParameterError.CODE
+        ctypes.memmove(_address(array), memory, size)
+
+    def _write(self, type_ctype, session, control, value):
+        if not isinstance(value, type_ctype):
+            value = type_ctype(value)
+        return self._write_array(type_ctype, session, control, value, 1)
+
+    def _write_array(self, type_ctype, session, control, array, size):
+        self._check_session(session)
+        memory = self._register_memory(control)
+        size = ctypes.sizeof(type_ctype) * _value(size)
+        if size > len(memory):
+            return InvalidParameterError.CODE
+        ctypes.memmove(memory, _address(array), size)
+
+    def _fifo(self, session, fifo):
+        self._check_session(session)
+        try:
+            return self._fifos_by_number[_value(fifo)]
+        except KeyError:
+            raise _Status(ResourceNotFoundError.CODE)
+
+    def _read_fifo(self, datatype, session, fifo, data, number_of_elements, timeout_ms, elements_remaining):
+        fifo = self._fifo(session, fifo)
+        if fifo.host_to_target:
+            return InvalidParameterError.CODE
+        if datatype is not fifo.datatype:
+            return TypesDoNotMatchError.CODE
+        return fifo._read(_address(data), _value(number_of_elements), _value(timeout_ms),
+                          _out(elements_remaining))
+
+    def _write_fifo(self, datatype, session, fifo, data, number_of_elements, timeout_ms, empty_elements_remaining):
+        fifo = self._fifo(session, fifo)
+        if not fifo.host_to_target:
+            return InvalidParameterError.CODE
+        if datatype is not fifo.datatype:
+            return TypesDoNotMatchError.CODE
+        return fifo._write(_address(data), _value(number_of_elements), _value(timeout_ms),
+                           _out(empty_elements_remaining))
+
+    def _configure_fifo(self, session, fifo, depth):
+        return self._fifo(session, fifo)._configure(_value(depth))
+
+    def _configure_fifo2(self, session, fifo, requested_depth, actual_depth):
+        fifo = self._fifo(session, fifo)
+        status = fifo._configure(_value(requested_depth))
+        if not status:
+            _out(actual_depth).value = fifo.depth
+        return status
+
+    def _start_fifo(self, session, fifo):
+        self._fifo(session, fifo)._start()
+
+    def _stop_fifo(self, session, fifo):
+        self._fifo(session, fifo)._stop()
+
+    def _commit_fifo_configuration(self, session, fifo):
+        self._fifo(session, fifo)
+
+    def _get_fifo_property(self, property_type, session, fifo, fifo_property, value):
+        fifo = self._fifo(session, fifo)
+        fifo_property = self._fifo_property(property_type, fifo_property)
+        _out(value).value = fifo._get_property(fifo_property)
+
+    def _set_fifo_property(self, property_type, session, fifo, fifo_property, value):
+        fifo = self._fifo(session, fifo)
+        return fifo._set_property(self._fifo_property(property_type, fifo_property), _value(value))
+
+    def _fifo_property(self, property_type, fifo_property):
+        try:
+            fifo_property = FifoProperty(_value(fifo_property))
+        except ValueError:
+            raise _Status(InvalidParameterError.CODE)
+        if _fifo_properties_to_types[fifo_property] is not property_type:
+            raise _Status(TypesDoNotMatchError.CODE)
+        return fifo_property
+
+    def _reserve_irq_context(self, session, context):
+        self._check_session(session)
+        _out(context).value = next(self._irq_contexts)
+
+    def _unreserve_irq_context(self, session, context):
+        self._check_session(session)
+
+    def _wait_on_irqs(self, session, context, irqs, timeout_ms, irqs_asserted, timed_out):
+        self._check_session(session)
+        irqs = _value(irqs)
+        deadline = _deadline(_value(timeout_ms))
+        with self._irq_condition:
+            while not self._asserted_irqs & irqs:
+                timeout = _remaining(deadline)
+                if timeout is not None and timeout <= 0:
+                    break
+                self._irq_condition.wait(timeout)
+            asserted = self._asserted_irqs & irqs
+        _out(irqs_asserted).value = asserted
+        _out(timed_out).value = not asserted
+
+    def _acknowledge_irqs(self, session, irqs):
+        self._check_session(session)
+        with self._irq_condition:
+            self._asserted_irqs &= ~_value(irqs)
+
+
+def _deadline(timeout_ms):
+    """ Returns the _monotonic() time a wait of timeout_ms ends, or None
+    for an infinite timeout. """
+    if timeout_ms == INFINITE_TIMEOUT:
+        return None
+    return _monotonic() + timeout_ms / 1000.0
+
+
+def _remaining(deadline):
+    """ Returns the seconds left until deadline, or None for no deadline. """
+    if deadline is None:
+        return None
+    return deadline - _monotonic()
+
+
+class SimulatedFifo(object):
+    """
+    A DMA FIFO of a SimulatedNiFpga, through which to play the FPGA's end
+    of it.
+
+    The FIFO is modelled as its host buffer, a ring buffer of elements of
+    the C type sessions transfer: 64 bit words for FXP FIFOs, and 32 bit
+    words for FIFOs of clusters and arrays, each element taking several.
+    Counts, depths and rates are all in those elements.
+
+    The FPGA fills target to host FIFOs, which the host reads, and drains
+    host to target FIFOs, which the host writes, either by hand, with
+    push() and pop(), or at a fixed rate.  When the host buffer has no room,
+    the FPGA waits, unless flow control is disabled, in which case a target
+    to host FIFO overwrites the oldest elements.  Host reads and writes
+    wait for elements or room until their timeout, as NiFpga's do.
+
+    Stopping a FIFO, or resetting the VI, discards its elements.
+    """
+    def __init__(self, bitfile_fifo, running, rate=0):
+        self._name = bitfile_fifo.name
+        self._number = bitfile_fifo.number
+        self._host_to_target = bitfile_fifo.is_host_to_target()
+        if bitfile_fifo.is_fxp():
+            self._datatype = DataType.U64
+        elif bitfile_fifo.is_composite():
+            self._datatype = DataType.U32
+        else:
+            self._datatype = bitfile_fifo.datatype
+        self._ctype_type = self._datatype._return_ctype()
+        self._element_size = ctypes.sizeof(self._ctype_type)
+        # a function returning whether the VI runs
+        self._running = running
+        self._condition = threading.Condition()
+        self._rate = float(rate)
+        self._properties = {
+            FifoProperty.BufferAllocationGranularityElements: 1,
+            FifoProperty.MirroredElements: 0,
+            FifoProperty.DmaBufferType: DmaBufferType.AllocatedByRIO.value,
+            FifoProperty.DmaBuffer: None,
+            FifoProperty.FlowControl: FlowControl.EnableFlowControl.value,
+        }
+        self._started = False
+        self._allocate(SimulatedNiFpga.DEFAULT_DEPTH)
+
+    def _allocate(self, depth):
+        """ Allocates an empty host buffer of depth elements.  Elements
+        produced at a rate are whatever their slot holds, which starts as
+        its index. """
+        self._depth = depth
+        self._buffer = (self._ctype_type * depth)(*range(depth))
+        self._buffer_address = ctypes.addressof(self._buffer)
+        self._first = 0
+        self._count = 0
+        self._credit = 0.0
+        self._last_advanced = _monotonic()
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def number(self):
+        return self._number
+
+    @property
+    def datatype(self):
+        """ The DataType of the elements sessions transfer. """
+        return self._datatype
+
+    @property
+    def host_to_target(self):
+        """ Whether the host writes the FIFO and the FPGA reads it. """
+        return self._host_to_target
+
+    @property
+    def depth(self):
+        """ The number of elements the host buffer holds. """
+        return self._depth
+
+    @property
+    def started(self):
+        return self._started
+
+    def __len__(self):
+        """ Returns the number of elements in the host buffer. """
+        with self._condition:
+            self._advance()
+            return self._count
+
+    @property
+    def rate(self):
+        """ The rate, in elements per second, at which the FPGA fills the
+        FIFO if it's target to host, or drains it if it's host to target,
+        while it's started and the VI runs.  float("inf") moves as many
+        elements as possible whenever the host reads or writes, and 0
+        (the default) none, leaving it to push() and pop().
+
+        Elements are moved as time passes, in whole elements, so a read
+        waits for as long as producing what it's missing takes.  Target to
+        host FIFOs produce the index of the slot of the host buffer each
+        element goes to, so that every read continues the sequence 0, 1,
+        ..., depth - 1, 0, 1, ... (truncated to the element type).
+        """
+        return self._rate
+
+    @rate.setter
+    def rate(self, value):
+        with self._condition:
+            self._advance()
+            self._rate = float(value)
+            if self._rate and not self._host_to_target:
+                # pushed elements may have overwritten slots
+                self._buffer[:] = range(self._depth)
+            self._condition.notify_all()
+
+    def push(self, data, timeout=0):
+        """ Adds elements to a target to host FIFO, as the FPGA would, for
+        the host to read.  Without flow control, elements that don't fit
+        overwrite the oldest ones.
+
+        Args:
+            data: the elements to add, a list of values of the FIFO's C type,
+                or a ctypes array of them.
+            timeout (float): how long to wait for room for them, in
+                seconds, or None to wait forever.
+
+        Returns:
+            (int): the number of elements added, fewer than given if there
+            wasn't room for them all by the timeout.
+        """
+        if self._host_to_target:
+            raise ValueError("Only the host writes to host to target FIFO '%s'" % self._name)
+        if not isinstance(data, ctypes.Array):
+            data = (self._ctype_type * len(data))(*data)
+        address = ctypes.addressof(data)
+        remaining = len(data)
+        deadline = None if timeout is None else _monotonic() + timeout
+        with self._condition:
+            if self._rate:
+                raise ValueError("FIFO '%s' is filled at a rate, elements can't also be pushed" % self._name)
+            while True:
+                room = self._depth if not self._flow_control() else self._depth - self._count
+                count = min(remaining, room)
+                if count:
+                    self._produce(address, count)
+                    address += count * self._element_size
+                    remaining -= count
+                    self._condition.notify_all()
+                wait = _remaining(deadline)
+                if not remaining or (wait is not None and wait <= 0):
+                    return len(data) - remaining
+                self._condition.wait(wait)
+
+    def pop(self, number_of_elements, timeout=0):
+        """ Removes elements the host wrote to a host to target FIFO, as the
+        FPGA would.
+
+        Args:
+            number_of_elements (int): the most elements to remove.
+            timeout (float): how long to wait for that many, in seconds, or
+                None to wait forever.
+
+        Returns:
+            (list): the elements removed, fewer than number_of_elements if
+            the host hadn't written that many by the timeout.
+        """
+        if not self._host_to_target:
+            raise ValueError("Only the host reads from target to host FIFO '%s'" % self._name)
+        data = (self._ctype_type * number_of_elements)()
+        address = ctypes.addressof(data)
+        popped = 0
+        deadline = None if timeout is None else _monotonic() + timeout
+        with self._condition:
+            if self._rate:
+                raise ValueError("FIFO '%s' is drained at a rate, elements can't also be popped" % self._name)
+            while True:
+                count = min(number_of_elements - popped, self._count)
+                if count:
+                    self._consume(address, count)
+                    address += count * self._element_size
+                    popped += count
+                    self._condition.notify_all()
+                wait = _remaining(deadline)
+                if popped == number_of_elements or (wait is not None and wait <= 0):
+                    return data[:popped]
+                self._condition.wait(wait)
+
+    def _flow_control(self):
+        """ Whether the FPGA waits for room, rather than overwriting the
+        oldest elements.  Only target to host FIFOs overwrite. """
+        return (self._host_to_target
+                or self._properties[FifoProperty.FlowControl] != FlowControl.DisableFlowControl.value)
+
+    def _copy_in(self, index, address, count):
+        """ Copies count elements from address into the host buffer from
+        slot index on, wrapping around its end. """
+        size = self._element_size
+        first = min(count, self._depth - index)
+        ctypes.memmove(self._buffer_address + index * size, address, first * size)
+        ctypes.memmove(self._buffer_address, address + first * size, (count - first) * size)
+
+    def _copy_out(self, address, index, count):
+        """ Copies count elements of the host buffer, from slot index on,
+        to address. """
+        size = self._element_size
+        first = min(count, self._depth - index)
+        ctypes.memmove(address, self._buffer_address + index * size, first * size)
+        ctypes.memmove(address + first * size, self._buffer_address, (count - first) * size)
+
+    def _produce(self, address, count):
+        """ Adds count elements, copied from address unless it's None,
+        overwriting the oldest elements without room for them. """
+        overwritten = max(0, self._count + count - self._depth)
+        if overwritten:
+            self._first = (self._first + overwritten) % self._depth
+            self._count -= overwritten
+        last = (self._first + self._count) % self._depth
+        if address is not None:
+            self._copy_in(last, address, count)
+        self._count += count
+
+    def _consume(self, address, count):
+        """ Removes the oldest count elements, copying them to address
+        unless it's None. """
+        if address is not None:
+            self._copy_out(address, self._first, count)
+        self._first = (self._first + count) % self._depth
+        self._count -= count
+
+    def _advance(self):
+        """ Moves the elements the FPGA would have since the last call. """
+        now = _monotonic()
+        elapsed = now - self._last_advanced
+        self._last_advanced = now
+        if not self._rate or not self._started or not self._running():
+            self._credit = 0.0
+            return
+        if self._host_to_target:
+            available = self._count
+        elif self._flow_control():
+            available = self._depth - self._count
+        else:
+            available = self._depth
+        if self._rate == float("inf"):
+            count = available
+        else:
+            # the FPGA waits while it can't move elements, rather than
+            # catching up on them later
+            self._credit = min(self._credit + elapsed * self._rate, available)
+            count = int(self._credit)
+            self._credit -= count
+        if count:
+            if self._host_to_target:
+                self._consume(None, count)
+            else:
+                self._produce(None, count)
+
+    def _wait(self, missing, deadline):
+        """ Waits until the host side might have missing more elements or
+        room, or deadline. """
+        timeout = _remaining(deadline)
+        if self._rate and self._rate != float("inf") and self._started and self._running():
+            needed = max(missing - self._credit, 0) / self._rate
+            timeout = needed if timeout is None else min(needed, timeout)
+        self._condition.wait(timeout)
+
+    def _notify(self):
+        with self._condition:
+            self._advance()
+            self._condition.notify_all()
+
+    def _start_locked(self):
+        if not self._started:
+            self._started = True
+            self._credit = 0.0
+            self._last_advanced = _monotonic()
+
+    def _read(self, address, number_of_elements, timeout_ms, elements_remaining):
+        if number_of_elements > self._depth:
+            return BadReadWriteCountError.CODE
+        deadline = _deadline(timeout_ms)
+        with self._condition:
+            self._start_locked()
+            while True:
+                self._advance()
+                if self._count >= number_of_elements:
+                    break
+                timeout = _remaining(deadline)
+                if timeout is not None and timeout <= 0:
+                    elements_remaining.value = self._count
+                    return FifoTimeoutError.CODE
+                self._wait(number_of_elements - self._count, deadline)
+            self._consume(address, number_of_elements)
+            elements_remaining.value = self._count
+            self._condition.notify_all()
+
+    def _write(self, address, number_of_elements, timeout_ms, empty_elements_remaining):
+        if number_of_elements > self._depth:
+            return BadReadWriteCountError.CODE
+        deadline = _deadline(timeout_ms)
+        with self._condition:
+            self._start_locked()
+            while True:
+                self._advance()
+                if self._depth - self._count >= number_of_elements:
+                    break
+                timeout = _remaining(deadline)
+                if timeout is not None and timeout <= 0:
+                    empty_elements_remaining.value = self._depth - self._count
+                    return FifoTimeoutError.CODE
+                self._wait(number_of_elements - (self._depth - self._count), deadline)
+            self._produce(address, number_of_elements)
+            empty_elements_remaining.value = self._depth - self._count
+            self._condition.notify_all()
+
+    def _configure(self, depth):
+        if depth == 0:
+            return BadDepthError.CODE
+        with self._condition:
+            if self._started:
+                return OperationNotSupportedWhileStartedError.CODE
+            self._allocate(depth)
+
+    def _start(self):
+        with self._condition:
+            self._start_locked()
+            self._condition.notify_all()
+
+    def _stop(self):
+        with self._condition:
+            self._started = False
+            self._first = 0
+            self._count = 0
+            self._credit = 0.0
+            self._condition.notify_all()
+
+    def _reset(self):
+        self._stop()
+
+    def _get_property(self, fifo_property):
+        if fifo_property is FifoProperty.BytesPerElement:
+            return self._element_size
+        if fifo_property is FifoProperty.BufferSizeElements:
+            return self._depth
+        return self._properties[fifo_property]
+
+    def _set_property(self, fifo_property, value):
+        if fifo_property is FifoProperty.BytesPerElement:
+            return InvalidParameterError.CODE
+        if fifo_property is FifoProperty.BufferSizeElements:
+            return self._configure(value)
+        with self._condition:
+            if self._started:
+                return OperationNotSupportedWhileStartedError.CODE
+            self._properties[fifo_property] = value
@@ -0,0 +1,184 @@
+"""
+Catching calls into NiFpga that take too long.
+
+A SlowCallDetector is a library to open sessions with, which calls NiFpga
+and times each call of the entry points given a threshold.  Calls that take
+longer are logged as SlowCalls, with when and on which thread they were
+made, their arguments, and the register or FIFO they accessed::
+
+    detector = nifpga.SlowCallDetector({"ReadFifo*": 0.05, "Read*": 0.01},
+                                       bitfile=bitfile)
+    with nifpga.Session(bitfile, "RIO0", library=detector) as session:
+        ...
+        for call in detector.slow_calls(resource="Samples"):
+            print(call)
+
+Thresholds are in seconds, per entry point name (e.g. "ReadU32"), or per
+pattern of names as fnmatch matches them (e.g. "ReadFifo*"), of which the
+longest that matches applies.  Entry points no threshold applies to are
+called as they would be without the detector.
+
+The log keeps the last capacity slow calls.  Arguments are noted as they
+were after the call: ctypes values as their values, as Status.get_args()
+gives them, and arrays, e.g. FIFOs' data, by their type and length.
+
+Copyright (c) 2017 National Instruments
+"""
+from .nifpga import _NiFpga
+from ._util import _monotonic_ns
+from .statuscheckedlibrary import _WrappedFunctions
+from .status import _picklable_value
+from collections import OrderedDict, deque, namedtuple
+import ctypes
+import fnmatch
+import threading
+import time
+
+SlowCall = namedtuple("SlowCall", ["time", "thread", "name", "function_name", "duration",
+                                   "status", "arguments", "resource"])
+""" A call that took longer than its threshold.  time is when it was made,
+as time.time() gives it, thread the name of the thread that made it, name
+the entry point's, e.g. "ReadU32", and function_name the C function's, e.g.
+"NiFpgaDll_ReadU32".  duration is in seconds, status is what the call
+returned, and arguments an OrderedDict of the arguments' names to their
+values.  resource is the name of the register or FIFO accessed, if a
+bitfile was given and the call accessed one, or else None. """
+
+# the names of arguments that are registers, and FIFOs
+_REGISTER_ARGUMENTS = frozenset(["indicator", "control"])
+_FIFO_ARGUMENTS = frozenset(["fifo"])
+# set on a register's resource when its access may time out
+_TIMEOUT_BIT = 0x80000000
+
+
+def _snapshot(arg):
+    """ Converts an argument to a value that doesn't refer to its buffer. """
+    if isinstance(arg, ctypes.Array):
+        return "%s[%d]" % (arg._type_.__name__, len(arg))
+    if isinstance(arg, ctypes._Pointer):
+        arg = arg.contents
+    return _picklable_value(arg)
+
+
+class SlowCallDetector(_WrappedFunctions):
+    """
+    A library that calls another, NiFpga by default, logging calls that take
+    longer than their thresholds.  Pass it to Session() as library.
+    """
+    def __init__(self, thresholds, library=None, bitfile=None, capacity=1000):
+        """
+        Args:
+            thresholds (dict): entry point names or patterns to the seconds
+                their calls may take before they're logged.
+            library (StatusCheckedFunctions): the library to call, or None
+                to load NiFpga.
+            bitfile (Bitfile): the bitfile sessions are opened on, to name
+                the registers and FIFOs of slow calls.
+            capacity (int): the most slow calls to keep.
+        """
+        if library is None:
+            library = _NiFpga()
+        self._slow_calls = deque(maxlen=capacity)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._patterns = {}
+        # entry point name to its threshold in nanoseconds, read by each
+        # call, so thresholds can change while sessions are open
+        self._thresholds_ns = {}
+        self._resources = {}
+        if bitfile is not None:
+            base_address = bitfile.base_address_on_device()
+            for name, register in bitfile.registers.items():
+                self._resources[("register", base_address + register.offset)] = name
+            for name, fifo in bitfile.fifos.items():
+                self._resources[("fifo", fifo.number)] = name
+        super(SlowCallDetector, self).__init__(library, self._detecting)
+        self.set_thresholds(thresholds)
+
+    def set_thresholds(self, thresholds):
+        """ Sets the thresholds of the entry points the given names or
+        patterns match, as in __init__.  A threshold of None stops timing
+        the calls it applies to. """
+        self._patterns.update(thresholds)
+        for name in self._function_infos:
+            matching = [pattern for pattern in self._patterns if fnmatch.fnmatchcase(name, pattern)]
+            threshold = self._patterns[max(matching, key=len)] if matching else None
+            if threshold is None:
+                self._thresholds_ns.pop(name, None)
+            else:
+                self._thresholds_ns[name] = int(threshold * 1e9)
+
+    @property
+    def thresholds(self):
+        """ A dictionary of each timed entry point's name to its threshold,
+        in seconds. """
+        return dict((name, threshold / 1e9) for name, threshold in self._thresholds_ns.items())
+
+    def _detecting(self, function_info):
+        function = function_info.function
+        name = function_info.name
+        thresholds_ns = self._thresholds_ns
+        log = self._log
+
+        def detecting(*args):
+            threshold = thresholds_ns.get(name)
+            if threshold is None:
+                return function(*args)
+            start = _monotonic_ns()
+            status = function(*args)
+            duration = _monotonic_ns() - start
+            if duration > threshold:
+                log(function_info, duration, status, args)
+            return status
+        return detecting
+
+    def _log(self, function_info, duration, status, args):
+        arguments = OrderedDict()
+        resource = None
+        for argument_name, arg in zip(function_info.argument_names, args):
+            value = arguments[argument_name] = _snapshot(arg)
+            if argument_name in _REGISTER_ARGUMENTS:
+                resource = self._resources.get(("register", value & ~_TIMEOUT_BIT), resource)
+            elif argument_name in _FIFO_ARGUMENTS:
+                resource = self._resources.get(("fifo", value), resource)
+        slow_call = SlowCall(
+            time=time.time() - duration / 1e9,
+            thread=threading.current_thread().name,
+            name=function_info.name,
+            function_name=function_info.function.__name__,
+            duration=duration / 1e9,
+            status=status or 0,
+            arguments=arguments,
+            resource=resource)
+        with self._lock:
+            self._slow_calls.append(slow_call)
+            self._count += 1
+
+    @property
+    def count(self):
+        """ The number of slow calls logged, including those no longer
+        kept. """
+        return self._count
+
+    def slow_calls(self, name=None, resource=None, since=None):
+        """
+        Returns the slow calls kept, oldest first.
+
+        Args:
+            name (str): only those of entry points this name or pattern
+                matches, e.g. "ReadFifo*".
+            resource (str): only those that accessed this register or FIFO.
+            since (float): only those made at or after this time.time().
+        """
+        with self._lock:
+            slow_calls = list(self._slow_calls)
+        return [call for call in slow_calls
+                if (name is None or fnmatch.fnmatchcase(call.name, name))
+                and (resource is None or call.resource == resource)
+                and (since is None or call.time >= since)]
+
+    def clear(self):
+        """ Forgets the slow calls logged so far. """
+        with self._lock:
+            self._slow_calls.clear()
+            self._count = 0
@@ -37,8 +37,10 @@ Or handle a warning like this:
 
 Copyright (c) 2017 National Instruments
 """
+from .warningaggregator import warning_aggregator
+import ctypes
 import functools
-import warnings
+import warnings  # noqa: F401, used by the doctests above
 
 
 def _raise_or_warn_if_nonzero_status(status, function_name, argument_names, *args):
@@ -57,6 +59,9 @@ def _raise_or_warn_if_nonzero_status(status, function_name, argument_names, *arg
     'argument_names' and 'args' are used to make the exception message
     more useful, and to find the arguments after catching an exception if
     the function fails (e.g. 'e.get_args()["session"]').
+
+    Warnings are counted, and may be rate-limited, by warning_aggregator
+    with the key (status, function_name).
     """
     if status == 0:
         return
@@ -65,16 +70,19 @@ def _raise_or_warn_if_nonzero_status(status, function_name, argument_names, *arg
         if status < 0:
             raise codes_to_exception_classes[status](function_name, argument_names, *args)
         else:
-            warning = codes_to_exception_classes[status](function_name, argument_names, *args)
-            warnings.warn(warning)
+            warning_aggregator.warn((status, function_name),
+                                    functools.partial(codes_to_exception_classes[status],
+                                                      function_name, argument_names, *args))
     else:
         if status < 0:
             raise UnknownError(status, function_name, argument_names, *args)
         else:
-            warnings.warn(UnknownWarning(status, function_name, argument_names, *args))
+            warning_aggregator.warn((status, function_name),
+                                    functools.partial(UnknownWarning, status,
+                                                      function_name, argument_names, *args))
 
 
-def check_status(function_name, argument_names):
+def check_status(function_name, argument_names, tolerated_statuses=()):
     """
     Decorator (that takes arguments) to call a function and raise
     an appropriate subclass of Status if the
@@ -89,14 +97,28 @@ def check_status(function_name, argument_names):
         Used to make the exception message more useful, and to find the
         arguments after catching an exception if the function fails
         (e.g. 'e.get_args()["session"]').
+    tolerated_statuses: status codes that are returned to the caller
+        instead of being raised or warned, e.g. [FifoTimeoutError.CODE].
+        No exception object is ever constructed for these codes, which
+        matters for callers that expect them on a hot path.  Other
+        statuses are checked as usual and None is returned.
     """
     def decorator(function):
+        # argtypes are set before functions are wrapped, so count them once
+        argtypes = getattr(function, "argtypes", None)
+        argument_count = None if argtypes is None else len(argtypes)
+
         @functools.wraps(function)
         def internal(*args):
-            if hasattr(function, "argtypes") and len(args) != len(function.argtypes):
+            if argument_count is not None and len(args) != argument_count:
                 raise TypeError("%s takes exactly %u arguments (%u given)"
-                                % (function_name, len(function.argtypes), len(args)))
+                                % (function_name, argument_count, len(args)))
             status = function(*args)
+            # most calls succeed, so skip the checks for them
+            if not status:
+                return None
+            if status in tolerated_statuses:
+                return status
             _raise_or_warn_if_nonzero_status(status, function_name, argument_names, args)
         return internal
     return decorator
@@ -122,20 +144,34 @@ class Status(BaseException):
         self._code = code
         self._code_string = code_string
         self._function_name = function_name
+        # Pairing names with values and formatting them is deferred to
+        # get_args() and __str__, since errors are often caught and ignored.
+        self._argument_names = argument_names
+        self._function_args = function_args
+        super(Status, self).__init__(code,
+                                     code_string,
+                                     function_name,
+                                     argument_names,
+                                     function_args)
+
+    def __reduce__(self):
+        """
+        Makes Status exceptions picklable, e.g. to pass them between
+        processes.
 
-        self._named_args = []
-        for i, arg in enumerate(function_args):
-            self._named_args.append(
-                {
-                    "name": argument_names[i],
-                    "value": arg
-                })
-        # this is also necessary to properly reconstruct the object when
-        # passing it between processes
-        super(Status, self).__init__(self._code,
-                                     self._code_string,
-                                     self._function_name,
-                                     self._named_args)
+        The auto-generated subclasses have a different __init__ signature
+        than the arguments stored in 'args', so they are rebuilt through
+        Status.__init__ instead.  ctypes arguments are converted to their
+        values since pointers and buffers cannot be pickled.
+        """
+        function_args = tuple(_picklable_value(arg) for arg in self._function_args)
+        return (_unpickle_status,
+                (type(self),
+                 self._code,
+                 self._code_string,
+                 self._function_name,
+                 list(self._argument_names),
+                 function_args))
 
     def get_code(self):
         return self._code
@@ -167,10 +203,9 @@ class Status(BaseException):
 
         """
         arg_dict = {}
-        for arg in self._named_args:
+        for name, arg in zip(self._argument_names, self._function_args):
             # ctypes types all have a member named 'value'.
-            value = arg["value"].value if hasattr(arg["value"], "value") else arg["value"]
-            arg_dict[arg["name"]] = value
+            arg_dict[name] = arg.value if hasattr(arg, "value") else arg
         return arg_dict
 
     def _stringify_arg(self, arg):
@@ -212,8 +247,8 @@ class Status(BaseException):
                 a bogus string argument: 'I am a string'
         """
         arg_string = ""
-        for arg in self._named_args:
-            arg_string += "\n\t%s: %s" % (arg["name"], self._stringify_arg(arg["value"]))
+        for name, arg in zip(self._argument_names, self._function_args):
+            arg_string += "\n\t%s: %s" % (name, self._stringify_arg(arg))
         return "%s: %s (%d) when calling '%s' with arguments:%s" \
             % ("Error" if self._code < 0 else "Warning",
                self._code_string,
@@ -222,6 +257,25 @@ class Status(BaseException):
                arg_string)
 
 
+def _picklable_value(arg):
+    """ Converts a function argument to something that can be pickled. """
+    # ctypes types all have a member named 'value'.
+    if hasattr(arg, "value"):
+        arg = arg.value
+    if isinstance(arg, (ctypes.Array, ctypes._Pointer)):
+        return str(arg)
+    return arg
+
+
+def _unpickle_status(cls, code, code_string, function_name, argument_names,
+                     function_args):
+    """ Rebuilds a Status exception pickled by Status.__reduce__. """
+    status = cls.__new__(cls)
+    Status.__init__(status, code, code_string, function_name, argument_names,
+                    function_args)
+    return status
+
+
 class WarningStatus(Status, RuntimeWarning):
     """
     Base warning class for when an NiFpga function returns a warning (> 0)
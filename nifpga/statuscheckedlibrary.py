@@ -78,6 +78,9 @@ class StatusCheckedFunctions(object):
         # dictionary of function names to a closure that wraps a
         # function with a status check
         self._wrapped_functions = {}
+        self._function_infos = {}
+        # (name, tolerated statuses) to closures built by tolerating()
+        self._tolerating_functions = {}
         for function_info in function_infos:
             decorator = check_status(function_info.function.__name__,
                                      function_info.argument_names)
@@ -89,6 +92,7 @@ class StatusCheckedFunctions(object):
 
             # Store closure this so __getitem__ can provide more convenience
             self._wrapped_functions[function_info.name] = closure
+            self._function_infos[function_info.name] = function_info
 
     def __getitem__(self, key):
         """
@@ -101,6 +105,64 @@ class StatusCheckedFunctions(object):
         """
         return self._wrapped_functions[key]
 
+    def tolerating(self, key, statuses):
+        """
+        Returns a variant of the wrapped function named 'key' that returns
+        any status code in 'statuses' instead of raising or warning it.
+        All other statuses are checked as usual, and None is returned.
+
+        Useful when a status is expected on a hot path, e.g. a FIFO read
+        with a zero timeout in a polling loop::
+
+            read = checked_functions.tolerating("ReadFifoU32",
+                                                [FifoTimeoutError.CODE])
+            if read(session, fifo, buf, n, 0, remaining) == FifoTimeoutError.CODE:
+                ...
+
+        The returned closures are cached, so calling this repeatedly is cheap.
+        """
+        statuses = frozenset(statuses)
+        try:
+            return self._tolerating_functions[(key, statuses)]
+        except KeyError:
+            pass
+        function_info = self._function_infos[key]
+        decorator = check_status(function_info.function.__name__,
+                                 function_info.argument_names,
+                                 tolerated_statuses=statuses)
+        closure = decorator(function_info.function)
+        self._tolerating_functions[(key, statuses)] = closure
+        return closure
+
+
+class _WrappedFunctions(StatusCheckedFunctions):
+    def __init__(self, functions, wrap):
+        """
+        The functions of another StatusCheckedFunctions, each called through
+        a wrapper, e.g. to record or time every call.
+
+        Args:
+            functions (StatusCheckedFunctions): the functions to wrap.
+            wrap: called with each function's FunctionInfo, returns the
+                function to call instead, which calls the original.  It's
+                given the original's __name__ and argtypes, so statuses
+                name the same function and argument counts are checked the
+                same way.
+
+        Wrappers are only in the way of sessions using this object, not of
+        other users of 'functions', and add nothing to calls otherwise.
+        """
+        self._functions = functions
+        function_infos = []
+        for function_info in functions._function_infos.values():
+            wrapper = wrap(function_info)
+            wrapper.__name__ = function_info.function.__name__
+            wrapper.argtypes = getattr(function_info.function, "argtypes", None)
+            function_infos.append(FunctionInfo(function=wrapper,
+                                               name=function_info.name,
+                                               argument_names=function_info.argument_names))
+        super(_WrappedFunctions, self).__init__(function_infos)
+
 
 class NamedArgtype(object):
     def __init__(self, name, argtype):
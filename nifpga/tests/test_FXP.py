@@ -1,8 +1,17 @@
 from decimal import Decimal, getcontext
-from nifpga import DataType
-from nifpga.bitfile import _FXP
+from nifpga import DataType, FixedPoint, FxpFormat
+from nifpga import bitfile
+from nifpga.bitfile import _BaseType, _FXP
+from nifpga.fxplookuptables import FxpLookupTables
 from nifpga.tests.test_nifpga import assert_warns
+from nose import SkipTest
+from random import Random
 import unittest
+import warnings
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 getcontext().prec = 100
 
@@ -13,6 +22,10 @@ class MockFxp(_FXP):
                  enableOverflowStatus,
                  word_length,
                  integer_word_length):
+        # skips _FXP.__init__, which parses XML, but types have __slots__,
+        # so the caches it would set up must be too
+        _BaseType.__init__(self, "MockFxp")
+        self._fixed_point_type = None
         self._signed = signed
         self._word_length = word_length
         self._integer_word_length = integer_word_length
@@ -281,3 +294,260 @@ class FXPRegister64bitWord64bitIntegerOverflow(FXPRegisterSharedTests):
         """(1) 0100 0101 1001 0010 0011 0001 0000 1100 0100 0101 1001 0010 0011 0001 0000 1100 """
         self.fxp_value = int('1' + binary_string_32bit + binary_string_32bit, 2)
         self.user_value = (True, Decimal(5013123263993360652))
+
+
+class FXPPackBatchTests(unittest.TestCase):
+    """ pack_batch must produce exactly what pack_data does per element. """
+    configurations = [
+        (signed, overflow, word_length, integer_word_length)
+        for signed in (False, True)
+        for overflow in (False, True)
+        for (word_length, integer_word_length) in ((1, 1), (4, 2), (16, 16), (16, 0),
+                                                   (16, 100), (16, -100), (32, 16),
+                                                   (53, 20), (63, 63), (64, 64), (64, 32))
+    ]
+
+    def _values(self, fxp):
+        random = Random(repr(fxp._type_signature))
+        delta = float(fxp._delta)
+        values = [0.0, -0.0, 1.0, -1.0, float(fxp._minimum), float(fxp._maximum),
+                  float(fxp._maximum) + delta, float(fxp._minimum) - delta,
+                  delta / 2, -delta / 2, delta * 1.5, float("inf"), float("-inf"),
+                  1e300, -1e300, 5e-324]
+        for _ in range(200):
+            code = random.randint(-(1 << fxp._word_length), 1 << fxp._word_length)
+            values.append(code * delta)
+            values.append((code + random.random()) * delta)
+        return values
+
+    def _assert_batch_matches_scalar(self, fxp, values):
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            expected = []
+            expected_coerced = 0
+            for value in values:
+                packed, coerced = fxp._pack_value(value)
+                expected.append(packed & 0xFFFFFFFFFFFFFFFF)
+                expected_coerced += coerced
+            buf, coerced = fxp.pack_batch(values)
+        self.assertEqual(expected, list(buf))
+        self.assertEqual(expected_coerced, coerced)
+
+    def test_floats_match_pack_data(self):
+        for configuration in self.configurations:
+            fxp = MockFxp(*configuration)
+            self._assert_batch_matches_scalar(fxp, self._values(fxp))
+
+    def test_numpy_arrays_match_pack_data(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        for configuration in self.configurations:
+            fxp = MockFxp(*configuration)
+            values = self._values(fxp)
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter("always")
+                expected, expected_coerced = fxp.pack_batch(values)
+                buf, coerced = fxp.pack_batch(numpy.array(values))
+            self.assertEqual(list(expected), list(buf))
+            self.assertEqual(expected_coerced, coerced)
+
+    def test_decimals_and_large_integers_match_pack_data(self):
+        fxp = MockFxp(signed=True, enableOverflowStatus=False,
+                      word_length=64, integer_word_length=64)
+        self._assert_batch_matches_scalar(fxp, [Decimal("0.5"), 2**62 + 1, -(2**63) + 1, 2**70])
+
+    def test_overflow_tuples_match_pack_data(self):
+        fxp = MockFxp(signed=True, enableOverflowStatus=True,
+                      word_length=16, integer_word_length=8)
+        self._assert_batch_matches_scalar(fxp, [(True, 1.5), -2.25, (False, 1000.0), (True, -0.5)])
+
+    def test_warns_once_for_all_coerced_values(self):
+        fxp = MockFxp(signed=False, enableOverflowStatus=False,
+                      word_length=8, integer_word_length=8)
+        with assert_warns(UserWarning):
+            _, coerced = fxp.pack_batch([0.5, 1000, -3, 4])
+        self.assertEqual(3, coerced)
+
+
+def raw_values(fxp):
+    """ Returns packed values of fxp to decode, including the extremes. """
+    random = Random(repr(fxp._type_signature))
+    size_mask = (1 << min(fxp._size_in_bits, 64)) - 1
+    return [0, size_mask, size_mask >> 1, (size_mask >> 1) + 1] + \
+        [random.randint(0, size_mask) for _ in range(200)]
+
+
+class FXPUnpackBatchTests(unittest.TestCase):
+    """ unpack_batch must agree with unpack_data per element. """
+
+    def _assert_batch_matches_scalar(self, fxp, output_format):
+        raw = raw_values(fxp)
+        expected = [fxp.unpack_data(element, output_format) for element in raw]
+        if fxp._overflow_enabled:
+            overflows, values = fxp.unpack_batch(raw, output_format)
+            self.assertEqual([overflow for overflow, _ in expected], list(overflows))
+            expected = [value for _, value in expected]
+        else:
+            values = fxp.unpack_batch(raw, output_format)
+        self.assertEqual(expected, list(values))
+
+    def test_float_and_mantissa_match_unpack_data(self):
+        for configuration in FXPPackBatchTests.configurations:
+            fxp = MockFxp(*configuration)
+            for output_format in (FxpFormat.Float, FxpFormat.Mantissa):
+                self._assert_batch_matches_scalar(fxp, output_format)
+
+    def test_unpack_formats_agree_with_decimal(self):
+        for configuration in FXPPackBatchTests.configurations:
+            fxp = MockFxp(*configuration)
+            for element in raw_values(fxp):
+                decimal_value = fxp.unpack_data(element)
+                float_value = fxp.unpack_data(element, FxpFormat.Float)
+                mantissa = fxp.unpack_data(element, FxpFormat.Mantissa)
+                if fxp._overflow_enabled:
+                    self.assertEqual(decimal_value[0], float_value[0])
+                    self.assertEqual(decimal_value[0], mantissa[0])
+                    decimal_value, float_value, mantissa = \
+                        decimal_value[1], float_value[1], mantissa[1]
+                self.assertEqual(float(decimal_value), float_value)
+                self.assertEqual(decimal_value, mantissa * fxp.delta)
+
+    def test_returns_numpy_arrays(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        fxp = MockFxp(signed=True, enableOverflowStatus=False,
+                      word_length=16, integer_word_length=8)
+        values = fxp.unpack_batch(numpy.array([0x180, 0xfe80], dtype=numpy.uint64))
+        self.assertEqual(numpy.float64, values.dtype)
+        self.assertEqual([1.5, -1.5], values.tolist())
+
+
+class FXPLookupTableTests(unittest.TestCase):
+    """ Decoding with lookup tables must agree with decoding arithmetically. """
+    def setUp(self):
+        self.previous_tables = bitfile.fxp_lookup_tables
+        # build tables on the first decode
+        bitfile.fxp_lookup_tables = FxpLookupTables(build_threshold=1 << 16)
+
+    def tearDown(self):
+        bitfile.fxp_lookup_tables = self.previous_tables
+
+    def _decode_all(self, fxp, output_format, batch):
+        codes = list(range(1 << fxp._size_in_bits))
+        if batch:
+            result = fxp.unpack_batch(codes, output_format)
+            if fxp._overflow_enabled:
+                return list(zip(list(result[0]), list(result[1])))
+            return list(result)
+        return [fxp.unpack_data(code, output_format) for code in codes]
+
+    def test_tables_match_arithmetic(self):
+        for signed in (False, True):
+            for overflow in (False, True):
+                for (word_length, integer_word_length) in ((1, 1), (4, 2), (8, -3), (12, 20)):
+                    fxp = MockFxp(signed, overflow, word_length, integer_word_length)
+                    for output_format in FxpFormat:
+                        for batch in (False, True):
+                            bitfile.fxp_lookup_tables.enabled = False
+                            expected = self._decode_all(fxp, output_format, batch)
+                            bitfile.fxp_lookup_tables.enabled = True
+                            # the first decode builds the table, the second uses it
+                            self._decode_all(fxp, output_format, batch)
+                            self.assertEqual(expected, self._decode_all(fxp, output_format, batch))
+        self.assertTrue(len(bitfile.fxp_lookup_tables) > 0)
+
+    def test_tables_are_shared_by_type_signature(self):
+        first = MockFxp(True, False, 8, 4)
+        second = MockFxp(True, False, 8, 4)
+        first.unpack_data(0x7f)
+        self.assertEqual(1, len(bitfile.fxp_lookup_tables))
+        self.assertEqual(Decimal("7.9375"), second.unpack_data(0x7f))
+        self.assertEqual(1, len(bitfile.fxp_lookup_tables))
+
+    def test_oversized_tables_are_not_rebuilt(self):
+        bitfile.fxp_lookup_tables.max_bytes = 1000
+        fxp = MockFxp(True, False, 16, 4)
+        built = []
+        build = fxp._build_lookup_table
+        fxp._build_lookup_table = lambda *args: built.append(args) or build(*args)
+        for code in range(10):
+            self.assertEqual(fxp._decode_word(code, FxpFormat.Decimal), fxp.unpack_data(code))
+        fxp.unpack_batch(list(range(10)))
+        self.assertEqual([], built)
+        self.assertEqual(0, len(bitfile.fxp_lookup_tables))
+
+    def test_tables_are_only_built_for_narrow_types(self):
+        MockFxp(True, False, 17, 4).unpack_data(0x7f)
+        self.assertEqual(0, len(bitfile.fxp_lookup_tables))
+
+    def test_tables_are_built_after_enough_decodes(self):
+        bitfile.fxp_lookup_tables.build_threshold = 8
+        fxp = MockFxp(False, False, 8, 8)
+        for code in range(31):
+            fxp.unpack_data(code)
+        self.assertEqual(0, len(bitfile.fxp_lookup_tables))
+        fxp.unpack_data(31)
+        self.assertEqual(1, len(bitfile.fxp_lookup_tables))
+
+    def test_oldest_tables_are_evicted_to_stay_under_max_bytes(self):
+        fxp = MockFxp(True, False, 8, 4)
+        fxp.unpack_data(0)
+        table_size = bitfile.fxp_lookup_tables.memory_usage()
+        bitfile.fxp_lookup_tables.max_bytes = table_size
+        MockFxp(True, False, 8, 2).unpack_data(0)
+        self.assertEqual(1, len(bitfile.fxp_lookup_tables))
+        self.assertTrue(bitfile.fxp_lookup_tables.memory_usage() <= table_size)
+        bitfile.fxp_lookup_tables.max_bytes = 0
+        fxp.unpack_data(0)
+        self.assertEqual(Decimal(-1), fxp.unpack_data(0xf0))
+        self.assertEqual(1, len(bitfile.fxp_lookup_tables))
+
+
+class FXPFixedPointTests(unittest.TestCase):
+    def test_unpack_matches_decimal(self):
+        for configuration in FXPPackBatchTests.configurations:
+            fxp = MockFxp(*configuration)
+            for element in raw_values(fxp):
+                expected = fxp.unpack_data(element)
+                value = fxp.unpack_data(element, FxpFormat.FixedPoint)
+                if fxp._overflow_enabled:
+                    self.assertEqual(expected[0], value[0])
+                    expected, value = expected[1], value[1]
+                self.assertIs(fxp.fixed_point_type, value.fxp_type)
+                self.assertEqual(expected, value.to_decimal())
+                self.assertEqual(str(expected), str(value))
+
+    def test_unpack_batch_returns_fixed_points(self):
+        fxp = MockFxp(signed=True, enableOverflowStatus=True,
+                      word_length=16, integer_word_length=8)
+        overflows, values = fxp.unpack_batch([0x180, 0x1fe80], FxpFormat.FixedPoint)
+        self.assertEqual([False, True], overflows)
+        self.assertEqual([1.5, -1.5], values)
+        self.assertIsInstance(values[0], FixedPoint)
+
+    def test_pack_round_trips(self):
+        for configuration in FXPPackBatchTests.configurations:
+            fxp = MockFxp(*configuration)
+            for element in raw_values(fxp):
+                value = fxp.unpack_data(element, FxpFormat.FixedPoint)
+                self.assertEqual(element & fxp._data_mask, fxp.pack_data(value, 0))
+
+    def test_pack_fixed_point_of_other_type(self):
+        fxp = MockFxp(signed=True, enableOverflowStatus=False,
+                      word_length=16, integer_word_length=8)
+        other = MockFxp(signed=False, enableOverflowStatus=False,
+                        word_length=8, integer_word_length=4)
+        self.assertEqual(0x180, fxp.pack_data(other.unpack_data(0x18, FxpFormat.FixedPoint), 0))
+        with assert_warns(UserWarning):
+            wide = MockFxp(False, False, 16, 0).unpack_data(1, FxpFormat.FixedPoint)
+            self.assertEqual(0, fxp.pack_data(wide, 0))
+
+    def test_pack_out_of_range_mantissa_is_coerced(self):
+        fxp = MockFxp(signed=True, enableOverflowStatus=False,
+                      word_length=16, integer_word_length=8)
+        for mantissa, expected in ((0x8000, 0x7fff), (-0x8001, 0x8000), (1 << 20, 0x7fff)):
+            with assert_warns(UserWarning):
+                self.assertEqual(expected, fxp.pack_data(fxp.fixed_point_type.from_mantissa(mantissa), 0))
+        unsigned = MockFxp(False, False, 8, 4)
+        with assert_warns(UserWarning):
+            self.assertEqual(0, unsigned.pack_data(unsigned.fixed_point_type.from_mantissa(-1), 0))
@@ -0,0 +1,182 @@
+import unittest
+from decimal import Decimal
+
+import mock
+from nose import SkipTest
+
+import nifpga
+from nifpga import DataType, Session
+from nifpga.nifpga import _SessionType
+from nifpga.statuscheckedlibrary import FunctionInfo, StatusCheckedFunctions
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BITFILE_ALL_REGISTERS = 'nifpga/tests/allregistertypes.lvbitx'
+
+
+class MemoryLibrary(object):
+    """
+    Pretends to be the register entry points of NiFpga, for every datatype,
+    backed by a dictionary of resource to value (or list of values).
+    FIFO entry points exist, but do nothing.
+    """
+    def __init__(self):
+        self.memory = {}
+        self.calls = 0
+
+    def read(self, session, indicator, value):
+        self.calls += 1
+        value.value = self.memory.get(indicator, 0)
+        return 0
+
+    def write(self, session, control, value):
+        self.calls += 1
+        self.memory[control] = value
+        return 0
+
+    def read_array(self, session, indicator, array, size):
+        self.calls += 1
+        for i, value in enumerate(self.memory.get(indicator, [0] * size)):
+            array[i] = value
+        return 0
+
+    def write_array(self, session, control, array, size):
+        self.calls += 1
+        self.memory[control] = [array[i] for i in range(size)]
+        return 0
+
+    def succeed(self, *args):
+        return 0
+
+    def functions(self):
+        function_infos = []
+        for datatype in DataType:
+            function_infos.extend([
+                FunctionInfo(self.read, "Read%s" % datatype, ["session", "indicator", "value"]),
+                FunctionInfo(self.write, "Write%s" % datatype, ["session", "control", "value"]),
+                FunctionInfo(self.read_array, "ReadArray%s" % datatype,
+                             ["session", "indicator", "array", "size"]),
+                FunctionInfo(self.write_array, "WriteArray%s" % datatype,
+                             ["session", "control", "array", "size"]),
+            ])
+            for name in ("ReadFifo", "WriteFifo", "AcquireFifoReadElements", "AcquireFifoWriteElements"):
+                function_infos.append(FunctionInfo(self.succeed, name + str(datatype), []))
+        function_infos.append(FunctionInfo(self.succeed, "ReleaseFifoElements", []))
+        return StatusCheckedFunctions(function_infos)
+
+
+class AccessPlanTests(unittest.TestCase):
+    names = ["Input I16", "Input Bool", "Input Array I16", "Input FXP 16-bit Signed Overflow"]
+
+    def setUp(self):
+        self.library = MemoryLibrary()
+        with mock.patch("nifpga.session._NiFpga", return_value=self.library.functions()):
+            self.session = Session(nifpga.Bitfile(BITFILE_ALL_REGISTERS), _SessionType())
+        self.values = [-7, True, [1, -2, 3], (True, Decimal("-1.5"))]
+
+    def test_write_then_read(self):
+        plan = self.session.access_plan(self.names)
+        self.assertEqual(tuple(self.names), plan.names)
+        plan.write(self.values)
+        self.assertEqual(tuple(self.values), plan.read(tuple))
+        self.assertEqual(dict(zip(self.names, self.values)), plan.read(dict))
+        self.assertEqual(-7, self.session.registers["Input I16"].read())
+
+    def test_write_mapping(self):
+        plan = self.session.access_plan(self.names)
+        plan.write(dict(zip(reversed(self.names), reversed(self.values))))
+        self.assertEqual(tuple(self.values), plan.read(tuple))
+
+    def test_one_call_per_register(self):
+        plan = self.session.access_plan(self.names)
+        self.library.calls = 0
+        plan.read(tuple)
+        plan.write(self.values)
+        self.assertEqual(2 * len(self.names), self.library.calls)
+
+    def test_read_many_and_write_many(self):
+        self.session.write_many(dict(zip(self.names, self.values)))
+        self.assertEqual(dict(zip(self.names, self.values)), self.session.read_many(self.names))
+        self.assertEqual((True, -7), self.session.read_many(["Input Bool", "Input I16"], tuple))
+        self.assertIs(self.session._cached_access_plan(self.names),
+                      self.session._cached_access_plan(list(self.names)))
+
+    def test_errors(self):
+        plan = self.session.access_plan(self.names)
+        self.assertRaises(ValueError, plan.write, self.values[:-1])
+        self.assertRaises(TypeError, plan.read, list)
+        self.assertRaises(KeyError, self.session.access_plan, ["Not a register"])
+
+    def test_read_ndarray(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        names = self.names + ["Input Error Cluster", "output cluster array"]
+        plan = self.session.access_plan(names)
+        clusters = [self.session.registers[name].read() for name in names[-2:]]
+        clusters[0]["code"] = -5
+        plan.write(self.values + clusters)
+        record = plan.read(numpy.ndarray)
+        self.assertEqual(plan.dtype, record.dtype)
+        self.assertEqual((), record.shape)
+        self.assertEqual(-7, record["Input I16"])
+        self.assertEqual([1, -2, 3], record["Input Array I16"].tolist())
+        self.assertEqual((True, -1.5), record["Input FXP 16-bit Signed Overflow"].tolist())
+        self.assertEqual(-5, record["Input Error Cluster"]["code"])
+        self.assertEqual(len(clusters[1]), len(record["output cluster array"]))
+        log = numpy.zeros(2, dtype=plan.dtype)
+        log[1] = record
+        self.assertEqual(record, log[1])
+
+
+class RegisterTableTests(unittest.TestCase):
+    def setUp(self):
+        self.library = MemoryLibrary()
+        self.bitfile = nifpga.Bitfile(BITFILE_ALL_REGISTERS)
+        with mock.patch("nifpga.session._NiFpga", return_value=self.library.functions()):
+            self.session = Session(self.bitfile, _SessionType())
+
+    def test_registers_are_created_on_first_use(self):
+        registers = self.session.registers
+        self.assertEqual([], registers.created())
+        register = registers["Input I16"]
+        self.assertIs(register, registers["Input I16"])
+        self.assertEqual([register], registers.created())
+        self.assertIn("Output I16", registers)
+        self.assertEqual([register], registers.created())
+
+    def test_mapping(self):
+        public = sorted(name for name, register in self.bitfile.registers.items() if not register.is_internal())
+        internal = sorted(name for name, register in self.bitfile.registers.items() if register.is_internal())
+        self.assertEqual(public, sorted(self.session.registers))
+        self.assertEqual(len(public), len(self.session.registers))
+        self.assertEqual(public, sorted(name for name, _ in self.session.registers.items()))
+        self.assertEqual(internal, sorted(self.session._internal_registers))
+        self.assertEqual(len(public), len(self.session.registers.created()))
+        for name in internal:
+            self.assertNotIn(name, self.session.registers)
+            self.assertRaises(KeyError, self.session.registers.__getitem__, name)
+        self.assertNotIn("not a register", self.session.registers)
+        self.assertIsNone(self.session.registers.get("not a register"))
+        self.assertRaises(KeyError, self.session.registers.__getitem__, "not a register")
+
+    def test_behaves_like_a_dict_before_registers_are_created(self):
+        registers = self.session.registers
+        copy = registers.copy()
+        self.assertEqual(sorted(registers), sorted(copy))
+        self.assertEqual(registers.created(), list(copy.values()))
+        self.assertEqual(copy, dict(registers))
+        with mock.patch("nifpga.session._NiFpga", return_value=self.library.functions()):
+            registers = Session(self.bitfile, _SessionType()).registers
+        self.assertNotEqual(registers, {})
+        self.assertEqual(registers, dict(registers))
+        self.assertFalse(hasattr(registers, "pop"))
+
+    def test_shadow_cache_applies_to_registers_created_later(self):
+        self.session.registers["Input Bool"].write(True)
+        self.session.enable_shadow_cache()
+        for _ in range(2):
+            self.session.registers["Input Bool"].write(True)
+            self.session.registers["Input I16"].write(3)
+        self.assertEqual(3, self.library.calls)
@@ -1,6 +1,13 @@
 import unittest
 import os
+import xml.etree.ElementTree as ElementTree
 import nifpga
+from nose import SkipTest
+from nifpga.bitfile import Register, _BaseType, _parse_type
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 BITFILE_ALL_REGISTERS = 'nifpga/tests/allregistertypes.lvbitx'
 
@@ -25,3 +32,129 @@ class BitfileTest(unittest.TestCase):
             bitfile = nifpga.Bitfile(f.read(), parse_contents=True)
             print(bitfile.registers)
             bitfile.registers["output fxp array"]
+
+
+class SharedTypeTest(unittest.TestCase):
+    def test_identical_types_are_shared(self):
+        first = nifpga.Bitfile(BITFILE_ALL_REGISTERS)
+        second = nifpga.Bitfile(BITFILE_ALL_REGISTERS)
+        for name in ("input cluster", "Input Array I16"):
+            first_type = first.registers[name].type
+            second_type = second.registers[name].type
+            # registers' own types are named after them, so aren't shared
+            self.assertIsNot(first_type, second_type)
+            for path, (member_type, offset) in first_type._member_offsets().items():
+                if path:
+                    self.assertIs(member_type, second_type._member_offsets()[path][0])
+        self.assertIs(first.fifos["FXP FIFO"].type, second.fifos["FXP FIFO"].type)
+
+    def test_different_types_are_not(self):
+        cluster = _parse_type(ElementTree.fromstring(dtype_cluster_xml))
+        self.assertIs(cluster, _parse_type(ElementTree.fromstring(dtype_cluster_xml)))
+        renamed = _parse_type(ElementTree.fromstring(dtype_cluster_xml.replace(">i16<", ">i32<")))
+        self.assertIsNot(cluster, renamed)
+        self.assertEqual("i32", renamed._children[2].name)
+        resized = _parse_type(ElementTree.fromstring(dtype_cluster_xml.replace("<Size>2<", "<Size>3<")))
+        self.assertEqual(cluster.size_in_bits + 32, resized.size_in_bits)
+        # members that are the same are shared
+        self.assertIs(cluster._children[0], resized._children[0])
+
+    def test_registers_have_no_dict(self):
+        bitfile = nifpga.Bitfile(BITFILE_ALL_REGISTERS)
+        for objects in (bitfile.registers, bitfile.fifos):
+            for value in objects.values():
+                self.assertFalse(hasattr(value, "__dict__"))
+                self.assertFalse(hasattr(value.type, "__dict__"))
+
+
+dtype_cluster_xml = """
+<Cluster>
+    <Name>cluster</Name>
+    <TypeList>
+        <Boolean><Name>bool</Name></Boolean>
+        <String><Name>string</Name></String>
+        <I16><Name>i16</Name></I16>
+        <FXP>
+            <Name>fxp</Name>
+            <Signed>false</Signed>
+            <WordLength>5</WordLength>
+            <IntegerWordLength>2</IntegerWordLength>
+            <IncludeOverflowStatus>true</IncludeOverflowStatus>
+        </FXP>
+        <Array>
+            <Name>array</Name>
+            <Size>2</Size>
+            <Type><SGL><Name></Name></SGL></Type>
+        </Array>
+    </TypeList>
+</Cluster>
+"""
+
+dtype_register_xml = """
+<Register>
+    <Name>register</Name>
+    <Indicator>true</Indicator>
+    <Datatype>%s</Datatype>
+    <Offset>0</Offset>
+    <Internal>false</Internal>
+    <AccessMayTimeout>false</AccessMayTimeout>
+</Register>
+""" % dtype_cluster_xml
+
+
+class DtypeTest(unittest.TestCase):
+    def setUp(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        self.register = Register(ElementTree.fromstring(dtype_register_xml))
+
+    def test_cluster_dtype(self):
+        expected = numpy.dtype([("bool", numpy.bool_),
+                                ("i16", numpy.int16),
+                                ("fxp", [("overflow", numpy.bool_), ("value", numpy.float64)]),
+                                ("array", numpy.float32, (2,))])
+        self.assertEqual(expected, self.register.to_dtype())
+
+    def test_cluster_bit_fields(self):
+        fields = [(field.path, field.kind, field.offset, field.size_in_bits)
+                  for field in self.register.type.bit_fields()]
+        self.assertEqual([(("bool",), "bool", 0, 1),
+                          (("i16",), "signed", 1, 16),
+                          (("fxp", "overflow"), "fxp overflow", 17, 1),
+                          (("fxp", "value"), "fxp", 18, 5),
+                          (("array", 0), "float", 23, 32),
+                          (("array", 1), "float", 55, 32)], fields)
+        # 87 bits are left justified in 3 words, so the register adds no padding
+        self.assertEqual(self.register.type.bit_fields(), self.register.bit_fields())
+
+    def test_types_without_bit_fields_raise(self):
+        with self.assertRaises(TypeError):
+            _BaseType("unknown").bit_fields()
+
+    def test_dtype_is_cached_and_carries_bit_fields(self):
+        dtype = self.register.to_dtype()
+        self.assertIs(dtype, self.register.type.to_dtype())
+        self.assertIs(self.register.type.bit_fields(), dtype.metadata["bit_fields"])
+
+    def test_single_word_values_are_right_justified(self):
+        fxp_xml = dtype_cluster_xml[dtype_cluster_xml.index("<FXP>"):dtype_cluster_xml.index("</FXP>") + 6]
+        register = Register(ElementTree.fromstring(dtype_register_xml.replace(dtype_cluster_xml, fxp_xml)))
+        self.assertEqual([("fxp overflow", 26), ("fxp", 27)],
+                         [(field.kind, field.offset) for field in register.bit_fields()])
+        self.assertEqual([0, 1], [field.offset for field in register.type.bit_fields()])
+
+    def test_fxp_fifo_values_are_right_justified_in_a_u64(self):
+        bitfile = nifpga.Bitfile(BITFILE_ALL_REGISTERS)
+        fifo = bitfile.fifos["FXP FIFO"]
+        field, = fifo.bit_fields()
+        self.assertEqual(64 - field.size_in_bits, field.offset)
+        self.assertEqual(numpy.dtype(numpy.float64), fifo.to_dtype())
+
+    def test_all_registers(self):
+        bitfile = nifpga.Bitfile(BITFILE_ALL_REGISTERS)
+        for register in bitfile.registers.values():
+            for field in register.bit_fields():
+                dtype = register.to_dtype()
+                for step in field.path:
+                    dtype = dtype.subdtype[0] if isinstance(step, int) else dtype.fields[step][0]
+                self.assertTrue(dtype.fields is None and dtype.subdtype is None)
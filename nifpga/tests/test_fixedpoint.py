@@ -0,0 +1,119 @@
+import gc
+import math
+import numbers
+import pickle
+import unittest
+from decimal import Decimal
+from fractions import Fraction
+
+from nifpga import FixedPoint, FixedPointType
+
+
+def signed_16_8(mantissa):
+    return FixedPointType(True, 16, 8).from_mantissa(mantissa)
+
+
+class FixedPointTypeTests(unittest.TestCase):
+    def test_types_are_interned(self):
+        self.assertIs(FixedPointType(True, 16, 8), FixedPointType(True, 16, 8))
+        self.assertIsNot(FixedPointType(True, 16, 8), FixedPointType(False, 16, 8))
+
+    def test_unused_types_are_freed(self):
+        fxp_type = FixedPointType(True, 37, -11)
+        self.assertIn((True, 37, -11), FixedPointType._interned)
+        del fxp_type
+        gc.collect()
+        self.assertNotIn((True, 37, -11), FixedPointType._interned)
+
+    def test_delta(self):
+        self.assertEqual(Fraction(1, 256), FixedPointType(True, 16, 8).delta)
+        self.assertEqual(4, FixedPointType(False, 8, 10).delta)
+
+    def test_pickled_types_are_interned(self):
+        fxp_type = FixedPointType(False, 12, 3)
+        self.assertIs(fxp_type, pickle.loads(pickle.dumps(fxp_type)))
+
+
+class FixedPointTests(unittest.TestCase):
+    def test_conversions(self):
+        value = signed_16_8(-385)
+        self.assertEqual(-1.50390625, float(value))
+        self.assertEqual(-1, int(value))
+        self.assertEqual(Decimal("-1.50390625"), value.to_decimal())
+        self.assertEqual(Fraction(-385, 256), Fraction(value))
+        self.assertEqual("-1.50390625", str(value))
+        self.assertEqual("-1.50", "{:.2f}".format(value))
+        self.assertFalse(signed_16_8(0))
+
+    def test_to_decimal_is_exact_for_long_words(self):
+        value = FixedPointType(False, 64, 0).from_mantissa((1 << 64) - 1)
+        self.assertEqual(Fraction((1 << 64) - 1, 1 << 64), Fraction(value.to_decimal()))
+
+    def test_comparisons(self):
+        value = signed_16_8(384)
+        self.assertEqual(value, 1.5)
+        self.assertEqual(value, Decimal("1.5"))
+        self.assertEqual(value, Fraction(3, 2))
+        self.assertEqual(value, FixedPointType(False, 4, 2).from_mantissa(6))
+        self.assertEqual(signed_16_8(512), 2)
+        self.assertTrue(value < 2 and value > 1 and value <= 1.5 and value >= Decimal(1))
+        self.assertTrue(value < float("inf") and value != float("nan"))
+        self.assertNotEqual(value, signed_16_8(385))
+
+    def test_hash_matches_equal_numbers(self):
+        self.assertEqual(hash(1.5), hash(signed_16_8(384)))
+        self.assertEqual(hash(2), hash(signed_16_8(512)))
+        self.assertEqual(1, len(set([signed_16_8(384), 1.5, Fraction(3, 2)])))
+
+    def test_exact_arithmetic(self):
+        a = signed_16_8(384)  # 1.5
+        b = FixedPointType(True, 8, 4).from_mantissa(-3)  # -0.1875
+        self.assertEqual(Fraction(21, 16), a + b)
+        self.assertEqual(Fraction(27, 16), a - b)
+        self.assertEqual(Fraction(-9, 32), a * b)
+        self.assertEqual(Fraction(-8), a / b)
+        self.assertEqual(Fraction(5, 2), 1 + a)
+        self.assertEqual(Fraction(-1, 2), 1 - a)
+        self.assertEqual(3, 2 * a)
+        self.assertEqual(Fraction(2, 3), 1 / a)
+        self.assertEqual(Fraction(3, 16), abs(b))
+        self.assertEqual(Fraction(-3, 2), -a)
+        self.assertIsInstance(a + b, FixedPoint)
+
+    def test_rational_operations(self):
+        a = signed_16_8(-385)  # -1.50390625
+        b = FixedPointType(True, 8, 4).from_mantissa(3)  # 0.1875
+        self.assertIsInstance(a, numbers.Rational)
+        fraction = Fraction(a)
+        self.assertEqual(math.floor(fraction), math.floor(a))
+        self.assertEqual(math.ceil(fraction), math.ceil(a))
+        self.assertEqual(-2, round(signed_16_8(-384)))
+        self.assertEqual(round(fraction, 2), round(a, 2))
+        for other in (2, b, Fraction(1, 3), 0.5):
+            self.assertEqual(fraction // other, a // other)
+            self.assertEqual(other // fraction, other // a)
+        self.assertEqual(a.to_decimal() // Decimal("0.75"), a // Decimal("0.75"))
+        self.assertEqual(fraction % 1, a % 1)
+        self.assertEqual(fraction % b, a % b)
+        self.assertEqual(1 % fraction, 1 % a)
+        self.assertIsInstance(a % b, FixedPoint)
+        self.assertEqual(divmod(fraction, b), divmod(a, b))
+        self.assertEqual(fraction ** 3, a ** 3)
+        self.assertIsInstance(a ** 3, FixedPoint)
+        self.assertEqual(fraction ** -2, a ** -2)
+        self.assertEqual(2 ** Fraction(3, 2), 2 ** FixedPointType(True, 8, 4).from_mantissa(24))
+        self.assertEqual(8, 2 ** signed_16_8(768))
+
+    def test_mixed_arithmetic(self):
+        a = signed_16_8(384)
+        self.assertEqual(2.0, a + 0.5)
+        self.assertIsInstance(a + 0.5, float)
+        self.assertEqual(Decimal("1.75"), a + Decimal("0.25"))
+        self.assertIsInstance(a + Decimal("0.25"), Decimal)
+        self.assertEqual(Fraction(11, 6), a + Fraction(1, 3))
+
+    def test_pickle(self):
+        value = signed_16_8(-7)
+        unpickled = pickle.loads(pickle.dumps(value))
+        self.assertEqual(value, unpickled)
+        self.assertIs(value.fxp_type, unpickled.fxp_type)
@@ -0,0 +1,159 @@
+import unittest
+import warnings
+import xml.etree.ElementTree as ElementTree
+from random import Random
+
+from nose import SkipTest
+
+from nifpga.bitfile import _parse_type
+try:
+    import numpy
+    from nifpga.layout import ElementLayout
+except ImportError:
+    numpy = None
+
+cluster_xml = """
+<Cluster>
+    <Name>everything</Name>
+    <TypeList>
+        <Boolean><Name>bool</Name></Boolean>
+        <I16><Name>i16</Name></I16>
+        <FXP>
+            <Name>fxp</Name>
+            <Signed>true</Signed>
+            <WordLength>40</WordLength>
+            <IntegerWordLength>12</IntegerWordLength>
+            <IncludeOverflowStatus>true</IncludeOverflowStatus>
+        </FXP>
+        <U64><Name>u64</Name></U64>
+        <Array>
+            <Name>array</Name>
+            <Size>3</Size>
+            <Type>
+                <Cluster>
+                    <Name>inner</Name>
+                    <TypeList>
+                        <I8><Name>i8</Name></I8>
+                        <SGL><Name>sgl</Name></SGL>
+                        <FXP>
+                            <Name>small fxp</Name>
+                            <Signed>false</Signed>
+                            <WordLength>5</WordLength>
+                            <IntegerWordLength>2</IntegerWordLength>
+                        </FXP>
+                    </TypeList>
+                </Cluster>
+            </Type>
+        </Array>
+        <DBL><Name>dbl</Name></DBL>
+        <I64><Name>i64</Name></I64>
+        <String><Name>string</Name></String>
+    </TypeList>
+</Cluster>
+"""
+
+small_cluster_xml = """
+<Cluster>
+    <Name>small</Name>
+    <TypeList>
+        <U8><Name>u8</Name></U8>
+        <Boolean><Name>bool</Name></Boolean>
+        <I8><Name>i8</Name></I8>
+    </TypeList>
+</Cluster>
+"""
+
+array_xml = """
+<Array>
+    <Name>array</Name>
+    <Size>3</Size>
+    <Type>
+        <I32><Name>i32</Name></I32>
+    </Type>
+</Array>
+"""
+
+
+def pack_words(composite, element, words_per_element):
+    """ Packs an element one value at a time, the way registers do. """
+    combined = composite.pack_data(element, 0)
+    if words_per_element > 1:
+        combined <<= 32 * words_per_element - composite.size_in_bits
+    return [(combined >> (32 * (words_per_element - 1 - index))) & 0xffffffff
+            for index in range(words_per_element)]
+
+
+def unpack_words(composite, words):
+    combined = 0
+    for word in words:
+        combined = (combined << 32) + word
+    if len(words) > 1:
+        combined >>= 32 * len(words) - composite.size_in_bits
+    return composite.unpack_data(combined)
+
+
+def to_python(value):
+    """ Converts a numpy element, or a register value, to comparable lists
+    of floats, ints and bools. """
+    if isinstance(value, dict):
+        # strings take no bits and have no field
+        return [to_python(member) for member in value.values() if member != ""]
+    if isinstance(value, (list, tuple)):
+        return [to_python(member) for member in value]
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return [to_python(member) for member in value.tolist()]
+    if isinstance(value, bool):
+        return value
+    return float(value)
+
+
+class ElementLayoutTests(unittest.TestCase):
+    def setUp(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        self.random = Random(0)
+
+    def random_words(self, layout, number_of_elements):
+        composite = layout._type
+        words = []
+        for _ in range(number_of_elements):
+            # go through unpack_data and pack_data so that padding is zero
+            raw = [self.random.getrandbits(32) for _ in range(layout.words_per_element)]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                words.extend(pack_words(composite, unpack_words(composite, raw),
+                                        layout.words_per_element))
+        return words
+
+    def assert_matches_unpack_data(self, type_xml):
+        composite = _parse_type(ElementTree.fromstring(type_xml))
+        layout = ElementLayout(composite)
+        words = self.random_words(layout, 50)
+        elements = layout.unpack(numpy.array(words, dtype=numpy.uint32))
+        # arrays of subarray dtypes are expanded into an extra dimension
+        self.assertEqual(numpy.zeros(len(elements), dtype=layout.dtype).dtype, elements.dtype)
+        self.assertEqual(len(words) // layout.words_per_element, len(elements))
+        per_element = layout.words_per_element
+        for index, element in enumerate(elements):
+            expected = unpack_words(composite, words[index * per_element:(index + 1) * per_element])
+            actual = element.tolist() if hasattr(element, "tolist") else element
+            self.assertEqual(to_python(expected), to_python(actual))
+        return layout, words, elements
+
+    def test_unpack_matches_unpack_data(self):
+        for type_xml in (cluster_xml, small_cluster_xml, array_xml):
+            self.assert_matches_unpack_data(type_xml)
+
+    def test_pack_round_trips(self):
+        for type_xml in (cluster_xml, small_cluster_xml, array_xml):
+            layout, words, elements = self.assert_matches_unpack_data(type_xml)
+            self.assertEqual(words, layout.pack(elements).tolist())
+
+    def test_words_per_element(self):
+        self.assertEqual(1, ElementLayout(_parse_type(ElementTree.fromstring(small_cluster_xml))).words_per_element)
+        self.assertEqual(3, ElementLayout(_parse_type(ElementTree.fromstring(array_xml))).words_per_element)
+
+    def test_unpack_rejects_partial_elements(self):
+        layout = ElementLayout(_parse_type(ElementTree.fromstring(array_xml)))
+        with self.assertRaises(ValueError):
+            layout.unpack([1, 2])
@@ -1,5 +1,6 @@
 import ctypes
 import mock
+import pickle
 import unittest
 import sys
 import warnings
@@ -80,6 +81,24 @@ class NiFpgaStatusExceptionTest(unittest.TestCase):
             else:
                 self.assertIn("a bogus string argument: b'I am a string'", exception_str)
 
+    def test_status_exceptions_can_be_pickled(self):
+        try:
+            raise_an_exception()
+            self.fail("An exception should have been raised")
+        except nifpga.FifoTimeoutError as e:
+            unpickled = pickle.loads(pickle.dumps(e))
+            self.assertIsInstance(unpickled, nifpga.FifoTimeoutError)
+            self.assertEqual(-50400, unpickled.get_code())
+            self.assertEqual("Dummy Function Name", unpickled.get_function_name())
+            self.assertEqual(e.get_args(), unpickled.get_args())
+            self.assertEqual(str(e), str(unpickled))
+
+    def test_unknown_status_exceptions_can_be_pickled(self):
+        error = nifpga.UnknownError(-1, "Fake Function Name", ["code"], (-1,))
+        unpickled = pickle.loads(pickle.dumps(error))
+        self.assertIsInstance(unpickled, nifpga.UnknownError)
+        self.assertEqual(str(error), str(unpickled))
+
     def test_status_exceptions_can_be_pickled_across_processes(self):
         try:
             import jobrunner
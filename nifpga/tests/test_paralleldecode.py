@@ -0,0 +1,156 @@
+import ctypes
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from random import Random
+
+import nifpga
+from nifpga import FxpFormat, ParallelDecoder
+from nifpga.layout import ElementLayout
+from nifpga.paralleldecode import shared_memory
+from nifpga.tests.test_FXP import MockFxp
+from nifpga.tests.test_session import load_bitfile
+from nifpga.tests.test_simulation import FIFO_BITFILE_XML
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# decodes on a process pool in a new interpreter, whose resource tracker
+# complains on stderr of shared memory it's told about inconsistently
+PROCESS_POOL_SCRIPT = """
+import multiprocessing
+from nifpga import FxpFormat, ParallelDecoder
+from nifpga.tests.test_FXP import MockFxp
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method(%r)
+    fxp = MockFxp(signed=True, enableOverflowStatus=False, word_length=24, integer_word_length=8)
+    with ParallelDecoder(max_workers=2, min_elements=10) as decoder:
+        for values in (list(range(100)), list(range(1000))):
+            assert decoder.unpack_batch(fxp, values, FxpFormat.Decimal) == fxp.unpack_batch(values, FxpFormat.Decimal)
+        assert decoder._process_pool is not None
+"""
+
+
+def as_lists(result):
+    if isinstance(result, tuple):
+        return tuple(list(part) for part in result)
+    return list(result)
+
+
+class ParallelDecoderTests(unittest.TestCase):
+    def setUp(self):
+        self.decoder = ParallelDecoder(max_workers=3, min_elements=10)
+        random = Random(0)
+        self.values = [random.getrandbits(25) for _ in range(1000)]
+
+    def tearDown(self):
+        self.decoder.close()
+
+    def assert_matches_unpack_batch(self, fxp, data):
+        for output_format in FxpFormat:
+            self.assertEqual(as_lists(fxp.unpack_batch(data, output_format)),
+                             as_lists(self.decoder.unpack_batch(fxp, data, output_format)))
+
+    def test_matches_unpack_batch(self):
+        for overflow in (False, True):
+            fxp = MockFxp(signed=True, enableOverflowStatus=overflow,
+                          word_length=24, integer_word_length=8)
+            self.assert_matches_unpack_batch(
+                fxp, (ctypes.c_uint64 * len(self.values))(*self.values))
+
+    def test_matches_unpack_batch_for_other_buffers(self):
+        fxp = MockFxp(signed=False, enableOverflowStatus=False,
+                      word_length=16, integer_word_length=4)
+        self.assert_matches_unpack_batch(fxp, self.values)
+        if numpy is not None:
+            self.assert_matches_unpack_batch(fxp, numpy.array(self.values, dtype=numpy.uint64))
+
+    def test_shared_memory_grows(self):
+        fxp = MockFxp(signed=True, enableOverflowStatus=False,
+                      word_length=24, integer_word_length=8)
+        for number_of_elements in (20, 1000, 30):
+            data = self.values[:number_of_elements]
+            self.assertEqual(fxp.unpack_batch(data, FxpFormat.Decimal),
+                             self.decoder.unpack_batch(fxp, data, FxpFormat.Decimal))
+
+    def test_small_buffers_are_decoded_on_the_calling_thread(self):
+        fxp = MockFxp(signed=True, enableOverflowStatus=False,
+                      word_length=24, integer_word_length=8)
+        for output_format in FxpFormat:
+            self.decoder.unpack_batch(fxp, self.values[:9], output_format)
+        self.assertIsNone(self.decoder._thread_pool)
+        self.assertIsNone(self.decoder._process_pool)
+
+
+@unittest.skipIf(shared_memory is None or os.name != "posix",
+                 "shared memory is only tracked by POSIX Python 3.8 and later")
+class ProcessPoolTests(unittest.TestCase):
+    def test_shared_memory_is_tracked_once(self):
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(nifpga.__file__)))
+        for start_method in multiprocessing.get_all_start_methods():
+            process = subprocess.Popen([sys.executable, "-c", PROCESS_POOL_SCRIPT % start_method],
+                                       env=environment, stderr=subprocess.PIPE)
+            _, errors = process.communicate()
+            self.assertEqual(0, process.returncode, errors)
+            self.assertEqual(b"", errors)
+
+
+@unittest.skipIf(numpy is None, "numpy is required to decode composite elements in blocks")
+class ParallelElementDecodeTests(unittest.TestCase):
+    def setUp(self):
+        self.decoder = ParallelDecoder(max_workers=3, min_elements=10)
+        self.bitfile = load_bitfile()
+        self.layouts = [ElementLayout(self.bitfile.registers[name].type)
+                        for name in ("output cluster 2", "output cluster array", "Input Array U16")]
+        self.random = Random(0)
+
+    def tearDown(self):
+        self.decoder.close()
+
+    def words(self, layout, number_of_elements):
+        return [self.random.getrandbits(32) for _ in range(number_of_elements * layout.words_per_element)]
+
+    def test_matches_unpack(self):
+        for layout in self.layouts:
+            words = self.words(layout, 100)
+            for data in (words, numpy.array(words, dtype=numpy.uint32),
+                         (ctypes.c_uint32 * len(words))(*words)):
+                expected = layout.unpack(data)
+                actual = self.decoder.unpack_elements(layout, data)
+                self.assertEqual(expected.dtype, actual.dtype)
+                self.assertEqual(expected.tobytes(), actual.tobytes())
+        self.assertIsNotNone(self.decoder._thread_pool)
+
+    def test_small_buffers_are_decoded_on_the_calling_thread(self):
+        layout = self.layouts[0]
+        words = self.words(layout, 9)
+        self.assertEqual(layout.unpack(words).tobytes(), self.decoder.unpack_elements(layout, words).tobytes())
+        self.assertIsNone(self.decoder._thread_pool)
+
+    def test_composite_fifo(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "fifos.lvbitx")
+            with open(path, "w") as f:
+                f.write(FIFO_BITFILE_XML)
+            bitfile = nifpga.Bitfile(path)
+            simulation = nifpga.SimulatedNiFpga(bitfile)
+            with nifpga.Session(bitfile, "RIO0", library=simulation) as session:
+                samples = session.fifos["Samples"]
+                words = self.words(samples._layout, 50)
+                simulation.fifos["Samples"].push(words)
+                samples.decoder = self.decoder
+                self.assertIs(self.decoder, samples.decoder)
+                data = samples.read(50).data
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(samples._layout.unpack(words).tobytes(), data.tobytes())
+        self.assertIsNotNone(self.decoder._thread_pool)
@@ -0,0 +1,201 @@
+import math
+import threading
+import time
+import unittest
+from decimal import Decimal
+
+import mock
+from nose import SkipTest
+
+import nifpga
+from nifpga import Poller, Session
+from nifpga.nifpga import _SessionType
+from nifpga._util import _monotonic_ns
+from nifpga.poller import Watch
+from nifpga.tests import test_accessplan
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BITFILE_ALL_REGISTERS = 'nifpga/tests/allregistertypes.lvbitx'
+
+
+class PollerTests(unittest.TestCase):
+    def setUp(self):
+        self.library = test_accessplan.MemoryLibrary()
+        with mock.patch("nifpga.session._NiFpga", return_value=self.library.functions()):
+            self.session = Session(nifpga.Bitfile(BITFILE_ALL_REGISTERS), _SessionType())
+        self.poller = Poller(self.session)
+
+    def tearDown(self):
+        self.poller.stop()
+
+    def poll(self, group, values):
+        for value in values:
+            self.session.registers["Input I16"].write(value)
+            group._poll(_monotonic_ns())
+
+    def check_last(self):
+        group = self.poller.add_group(["Input I16", "Input Bool"], rate_hz=10, capacity=3)
+        timestamps, values = self.poller.last("Input I16", 5)
+        self.assertEqual([], list(timestamps))
+        self.assertEqual([], list(values))
+        self.poll(group, [1, 2])
+        self.assertEqual([1, 2], list(self.poller.last("Input I16", 5)[1]))
+        self.poll(group, [3, 4, 5])
+        timestamps, values = self.poller.last("Input I16", 5)
+        self.assertEqual([3, 4, 5], list(values))
+        self.assertEqual(sorted(timestamps), list(timestamps))
+        self.assertEqual([5], list(self.poller.last("Input I16", 1)[1]))
+        _, records = group.last(2)
+        self.assertEqual([(4, False), (5, False)], [tuple(record) for record in records])
+
+    def test_last(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        self.check_last()
+        self.assertIsInstance(self.poller.last("Input I16", 2)[0], numpy.ndarray)
+
+    def test_last_without_numpy(self):
+        with mock.patch("nifpga.poller.numpy", None):
+            self.check_last()
+            self.assertIsInstance(self.poller.last("Input I16", 2)[0], list)
+
+    def test_overrun_skips_missed_polls(self):
+        group = self.poller.add_group(["Input I16"], rate_hz=1000)
+        now = _monotonic_ns()
+        next_due = group._poll(now - 10 * group.period_ns)
+        self.assertGreater(next_due, now)
+        # still on the grid of the original schedule
+        self.assertEqual(0, (next_due - now) % group.period_ns)
+        statistics = self.poller.statistics("Input I16")
+        self.assertEqual(1, statistics.samples)
+        self.assertEqual(1, statistics.overruns)
+        self.assertGreaterEqual(statistics.skipped, 10)
+        self.assertGreaterEqual(statistics.max_jitter_ns, 10 * group.period_ns)
+
+    def test_errors_are_counted(self):
+        group = self.poller.add_group(["Input I16"], rate_hz=1000)
+        error = RuntimeError("read failed")
+        with mock.patch.object(group, "_ring") as ring:
+            ring.append.side_effect = error
+            group._poll(_monotonic_ns())
+        statistics = group.statistics()
+        self.assertEqual((0, 1), (statistics.samples, statistics.errors))
+        self.assertIs(error, group.last_error)
+
+    def test_arguments(self):
+        self.poller.add_group(["Input I16"], rate_hz=10)
+        self.assertRaises(ValueError, self.poller.add_group, ["Input Bool", "Input I16"], 10)
+        self.assertRaises(ValueError, self.poller.add_group, ["Input Bool"], 0)
+        self.assertRaises(ValueError, self.poller.add_group, ["Input Bool"], 10, 0)
+        self.assertEqual(1, len(self.poller.groups))
+
+    def test_background_thread(self):
+        self.session.registers["Input I16"].write(42)
+        with self.poller:
+            fast = self.poller.add_group(["Input I16"], rate_hz=1000, capacity=16)
+            self.poller.start()
+            self.assertTrue(self.poller.running)
+            # added while running
+            slow = self.poller.add_group(["Input Bool"], rate_hz=20)
+            deadline = time.time() + 5
+            while slow.statistics().samples < 2 and time.time() < deadline:
+                time.sleep(0.01)
+        self.assertFalse(self.poller.running)
+        self.assertGreater(fast.statistics().samples, slow.statistics().samples)
+        self.assertGreaterEqual(slow.statistics().samples, 2)
+        self.assertEqual([42] * 3, list(self.poller.last("Input I16", 3)[1]))
+
+
+class WatchTests(unittest.TestCase):
+    def setUp(self):
+        self.library = test_accessplan.MemoryLibrary()
+        with mock.patch("nifpga.session._NiFpga", return_value=self.library.functions()):
+            self.session = Session(nifpga.Bitfile(BITFILE_ALL_REGISTERS), _SessionType())
+        self.changes = []
+
+    def tearDown(self):
+        if self.session._poller is not None:
+            self.session._poller.stop()
+
+    def callback(self, name, value):
+        self.changes.append((name, value))
+
+    def create_watch(self, name, min_interval=0.01, max_interval=None):
+        return Watch(self.session.registers[name], self.callback, min_interval, max_interval)
+
+    def test_calls_back_on_change(self):
+        register = self.session.registers["Input FXP 16-bit Signed Overflow"]
+        watch = self.create_watch(register.name)
+        register.write((False, Decimal("1.5")))
+        with mock.patch.object(register, "_decode", wraps=register._decode) as decode:
+            for value in [1.5, 1.5, 1.5, -2, -2]:
+                register.write((False, Decimal(value)))
+                watch._poll(_monotonic_ns())
+            self.assertEqual(2, decode.call_count)
+        self.assertEqual([(register.name, (False, Decimal("1.5"))),
+                          (register.name, (False, Decimal("-2")))], self.changes)
+        self.assertEqual((5, 2, 3, 0), watch.statistics()[:4])
+
+    def test_arrays_and_bools(self):
+        for name, values in [("Input Array I16", [[1, 2, 3], [1, 2, 3], [1, 2, 4]]),
+                             ("Input Bool", [True, True, False])]:
+            watch = self.create_watch(name)
+            for value in values:
+                self.session.registers[name].write(value)
+                watch._poll(_monotonic_ns())
+            self.assertEqual([(name, values[0]), (name, values[2])], self.changes)
+            del self.changes[:]
+
+    def test_nan_is_unchanged(self):
+        watch = self.create_watch("Input SGL")
+        for value in [float("nan"), float("nan"), 1.5, 1.5]:
+            self.session.registers["Input SGL"].write(value)
+            watch._poll(_monotonic_ns())
+        self.assertEqual(2, len(self.changes))
+        self.assertTrue(math.isnan(self.changes[0][1]))
+        self.assertEqual(("Input SGL", 1.5), self.changes[1])
+
+    def test_backs_off_when_quiet(self):
+        watch = self.create_watch("Input I16", min_interval=0.01, max_interval=0.04)
+        polls_per_doubling = Watch._backoff_after
+        watch._poll(_monotonic_ns())
+        for interval in [0.02, 0.04, 0.04]:
+            for i in range(polls_per_doubling):
+                watch._poll(_monotonic_ns())
+            self.assertAlmostEqual(interval, watch.statistics().interval)
+        self.session.registers["Input I16"].write(3)
+        due = _monotonic_ns()
+        self.assertEqual(due + 10000000, watch._poll(due))
+        self.assertAlmostEqual(0.01, watch.statistics().interval)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, self.create_watch, "Input I16", 0)
+        self.assertRaises(ValueError, self.create_watch, "Input I16", 0.1, 0.01)
+        self.assertRaises(KeyError, self.session.watch, "Not a register", self.callback)
+        error = RuntimeError("callback failed")
+        watch = Watch(self.session.registers["Input I16"], mock.Mock(side_effect=error), 0.01)
+        watch._poll(_monotonic_ns())
+        self.assertEqual(1, watch.statistics().callback_errors)
+        self.assertIs(error, watch.last_error)
+
+    def test_session_watch(self):
+        changed = threading.Event()
+
+        def callback(name, value):
+            self.callback(name, value)
+            if value == 5:
+                changed.set()
+        watch = self.session.watch("Input I16", callback, min_interval=0.001)
+        self.session.watch("Input Bool", self.callback, min_interval=0.001)
+        self.assertTrue(self.session._poller.running)
+        self.session.registers["Input I16"].write(5)
+        self.assertTrue(changed.wait(5))
+        watch.cancel()
+        self.assertIsNone(watch._poll(_monotonic_ns()))
+        with mock.patch.object(self.session, "_nifpga"):
+            self.session.close()
+        self.assertFalse(self.session._poller.running)
+        self.assertEqual(("Input I16", 5), [change for change in self.changes if change[0] == "Input I16"][-1])
@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import warnings
+
+import nifpga
+from nifpga import FxpFormat, Recorder, ReplayedNiFpga, SimulatedNiFpga, read_recording
+from nifpga.tests.test_session import load_bitfile
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class RecordingTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "calls.nirec")
+        self.bitfile = load_bitfile()
+        self.simulation = SimulatedNiFpga(self.bitfile, fifo_rate=float("inf"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, function, **kwargs):
+        """ Records function(session), for a session on the simulation,
+        returning what it returned. """
+        with Recorder(self.path, library=self.simulation, **kwargs) as recorder:
+            with nifpga.Session(self.bitfile, "RIO0", library=recorder) as session:
+                return function(session)
+
+    def replay(self, function):
+        library = ReplayedNiFpga(self.path)
+        with nifpga.Session(self.bitfile, "RIO0", library=library) as session:
+            result = function(session)
+        self.assertEqual(0, library.calls_remaining)
+        return result
+
+    def test_registers(self):
+        def use(session):
+            session.registers["Input U32"].write(0xfffffffe)
+            session.registers["Input Array I16"].write([1, -2, 3])
+            return (session.registers["Input U32"].read(),
+                    session.registers["Input Array I16"].read(),
+                    session.registers["Output FXP 16-bit Signed"].read(output_format=FxpFormat.Float))
+        recorded = self.record(use)
+        self.assertEqual((0xfffffffe, [1, -2, 3]), recorded[:2])
+        # what's read comes from the recording, not the writes
+        self.simulation = None
+        self.assertEqual(recorded, self.replay(use))
+
+    @unittest.skipIf(numpy is None, "numpy is required to write arrays in place")
+    def test_replay_leaves_written_data(self):
+        self.record(lambda session: session.registers["Input Array I16"].write(
+            numpy.array([1, 2, 3], dtype=numpy.int16)))
+        written = numpy.array([7, 8, 9], dtype=numpy.int16)
+        self.replay(lambda session: session.registers["Input Array I16"].write(written))
+        self.assertEqual([7, 8, 9], written.tolist())
+
+    def test_read_recording(self):
+        def use(session):
+            session.registers["Input U32"].write(7)
+        self.record(use)
+        calls = list(read_recording(self.path))
+        self.assertEqual(["Open", "WriteU32", "Close"], [call.name for call in calls])
+        write = calls[1]
+        self.assertEqual(threading.current_thread().name, write.thread)
+        self.assertEqual(0, write.status)
+        self.assertEqual(7, write.arguments[2])
+        self.assertEqual(self.bitfile.filepath.encode("ascii"), calls[0].arguments[0])
+        self.assertEqual(4, calls[0].arguments[4].size)
+        self.assertTrue(0 <= calls[0].start_ns <= write.start_ns <= calls[2].start_ns)
+
+    def test_fifo_data(self):
+        def read(session):
+            return session.fifos["FXP FIFO"].read(5, output_format=FxpFormat.Mantissa).data
+        self.record(read)
+        data = [call.arguments[2] for call in read_recording(self.path) if call.name == "ReadFifoU64"][0]
+        self.assertEqual(40, data.size)
+        self.assertIsNone(data.data)
+        self.assertEqual([0] * 5, [int(value) for value in self.replay(read)])
+
+        # the simulation carries on from the first recording's read
+        self.record(read, fifo_data=True)
+        self.assertEqual([5, 6, 7, 8, 9], [int(value) for value in self.replay(read)])
+
+    def test_statuses(self):
+        def use(session):
+            session.abort()
+            with self.assertRaises(nifpga.FifoTimeoutError):
+                session.fifos["FXP FIFO"].read(1, timeout_ms=0)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                session.run()
+                session.run()
+            self.assertIsInstance(w[0].message, nifpga.FpgaAlreadyRunningWarning)
+        self.record(use)
+        self.replay(use)
+
+    def test_irqs(self):
+        self.simulation.assert_irqs([3])
+
+        def wait(session):
+            return session.wait_on_irqs([3, 4], 0)
+        self.assertEqual(([3], False), self.record(wait))
+        self.assertEqual(([3], False), self.replay(wait))
+
+    def test_threads(self):
+        def use(session):
+            reader = threading.Thread(target=session.registers["Input U32"].read, name="reader")
+            reader.start()
+            reader.join()
+        self.record(use)
+        threads = dict((call.name, call.thread) for call in read_recording(self.path))
+        self.assertEqual("reader", threads["ReadU32"])
+        self.assertEqual(threading.current_thread().name, threads["Open"])
+
+    def test_replay_errors(self):
+        self.record(lambda session: None)
+        library = ReplayedNiFpga(self.path)
+        with nifpga.Session(self.bitfile, "RIO0", library=library) as session:
+            with self.assertRaises(nifpga.ReplayError):
+                session.registers["Input U32"].read()
+
+    def test_zero_copy_isnt_replayed(self):
+        self.record(lambda session: session.registers["Input U32"].read())
+        library = ReplayedNiFpga(self.path)
+        with nifpga.Session(self.bitfile, "RIO0", library=library) as session:
+            fifo = session.fifos["FXP FIFO"]
+            with self.assertRaises(nifpga.ReplayError):
+                fifo._acquire_read(1)
+            with self.assertRaises(nifpga.ReplayError):
+                library["ReleaseFifoElements"](session._session, fifo._number, 1)
+            session.registers["Input U32"].read()
+        self.assertEqual(0, library.calls_remaining)
+
+    def test_not_a_recording(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 16)
+        with self.assertRaises(nifpga.ReplayError):
+            ReplayedNiFpga(self.path)
@@ -0,0 +1,173 @@
+import ctypes
+import pickle
+import unittest
+from collections import OrderedDict
+from decimal import Decimal
+
+from nose import SkipTest
+
+from nifpga import ClusterFormat, FxpFormat, Record, RecordView
+from nifpga.accessplan import AccessPlan
+from nifpga.records import _field_names, _record_class
+from nifpga.session import _DataConvertingRegister
+from nifpga.tests.test_session import FakeRegisterLibrary, load_bitfile
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class RecordViewTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.library = FakeRegisterLibrary()
+
+    def create_register(self, name):
+        register = _DataConvertingRegister(ctypes.c_uint32(0),
+                                           self.library.functions(),
+                                           self.bitfile.registers[name],
+                                           self.bitfile.base_address_on_device())
+        # every other bit set, in every member
+        self.library.registers[register._resource] = [0xaaaaaaaa] * register._transfer_len
+        return register
+
+    def test_view_equals_dict(self):
+        register = self.create_register("input cluster")
+        expected = register.read()
+        view = register.read(cluster_format=ClusterFormat.View)
+        self.assertIsInstance(view, RecordView)
+        self.assertEqual(expected, view)
+        self.assertEqual(list(expected), list(view))
+        self.assertEqual(len(expected), len(view))
+        self.assertEqual(expected, view.to_dict())
+        self.assertIs(OrderedDict, type(view.to_dict()))
+        self.assertIs(OrderedDict, type(view.to_dict()["output cluster 2"]))
+        self.assertIsInstance(view["output cluster 2"], RecordView)
+        self.assertIsInstance(view["output cluster array"][0], RecordView)
+
+    def test_decodes_on_access_and_caches(self):
+        register = self.create_register("input cluster")
+        register.cluster_format = ClusterFormat.View
+        view = register.read()
+        self.assertEqual({}, view._values)
+        nested = view["output cluster 2"]
+        self.assertEqual(["output cluster 2"], list(view._values))
+        self.assertIs(nested, view["output cluster 2"])
+        self.assertEqual(register.read(cluster_format=ClusterFormat.Dict)["output cluster 2"]["Input Cluster I8"],
+                         nested["Input Cluster I8"])
+
+    def test_attribute_access(self):
+        register = self.create_register("Input Error Cluster")
+        view = register.read(cluster_format=ClusterFormat.View)
+        self.assertEqual(view["status"], view.status)
+        self.assertEqual(view["code"], view.code)
+        self.assertIn("code", view)
+        self.assertNotIn("not a member", view)
+        with self.assertRaises(AttributeError):
+            view.not_a_member
+        with self.assertRaises(KeyError):
+            view["not a member"]
+
+    def test_read_only(self):
+        view = self.create_register("Input Error Cluster").read(cluster_format=ClusterFormat.View)
+        with self.assertRaises(AttributeError):
+            view.code = 1
+        with self.assertRaises(TypeError):
+            view["code"] = 1
+
+    def test_write_view_back(self):
+        for name in ("input cluster", "output cluster array"):
+            register = self.create_register(name)
+            bits = register._read_value()
+            view = register.read(cluster_format=ClusterFormat.View)
+            self.library.registers[register._resource] = None
+            register.write(view)
+            self.assertEqual(bits, register._read_value())
+
+    def test_pickle(self):
+        view = self.create_register("input cluster").read(cluster_format=ClusterFormat.View)
+        self.assertEqual(view, pickle.loads(pickle.dumps(view)))
+
+    def test_only_clusters(self):
+        register = self.create_register("Output FXP 16-bit Signed")
+        with self.assertRaises(TypeError):
+            register.cluster_format = ClusterFormat.View
+        with self.assertRaises(TypeError):
+            register.read(cluster_format=ClusterFormat.View)
+        with self.assertRaises(TypeError):
+            register.cluster_format = FxpFormat.Float
+
+
+class RecordClassTests(unittest.TestCase):
+    formats = (ClusterFormat.NamedTuple, ClusterFormat.Record)
+
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.library = FakeRegisterLibrary()
+        self.register = self.create_register("input cluster")
+
+    create_register = RecordViewTests.__dict__["create_register"]
+
+    def written_words(self):
+        return self.library.registers[self.register._resource]
+
+    def test_read(self):
+        expected = self.register.read()
+        for cluster_format in self.formats:
+            value = self.register.read(cluster_format=cluster_format)
+            self.assertEqual(expected, value.to_dict())
+            self.assertEqual(list(expected.values())[0], value[0])
+            self.assertEqual(expected["output cluster 2"]["Input Cluster  U8"],
+                             value.output_cluster_2.Input_Cluster_U8)
+            self.assertIs(type(value.output_cluster_2), type(value[1]))
+            self.assertIs(type(value), type(self.register.read(cluster_format=cluster_format)))
+            self.assertEqual(("Input Cluster U16",) + tuple(expected)[1:], type(value)._member_names)
+        self.assertIsInstance(self.register.read(cluster_format=ClusterFormat.NamedTuple), tuple)
+        self.assertIsInstance(self.register.read(cluster_format=ClusterFormat.Record), Record)
+
+    def test_write_back(self):
+        # Decimals of 64 bit FXP members don't always round trip, so this
+        # uses a cluster without them
+        self.register = self.create_register("output cluster")
+        self.register.write(self.register.read())
+        words = self.written_words()
+        for cluster_format in self.formats:
+            value = self.register.read(cluster_format=cluster_format)
+            self.library.registers[self.register._resource] = None
+            self.register.write(value)
+            self.assertEqual(words, self.written_words())
+
+    def test_positional_values(self):
+        error_cluster = self.create_register("Input Error Cluster")
+        error_cluster.write((True, -5, ""))
+        self.assertEqual(OrderedDict([("status", True), ("code", -5), ("source", "")]), error_cluster.read())
+        error_cluster.write([False, 3, ""])
+        self.assertEqual(3, error_cluster.read()["code"])
+        self.assertRaises(ValueError, error_cluster.write, (True, -5))
+
+    def test_modify_record(self):
+        self.register = self.create_register("output cluster")
+        self.register.cluster_format = ClusterFormat.Record
+        value = self.register.read()
+        value.Input_Cluster_I8 = 7
+        value.Input_Cluster_FXP_4_bit_Signed = (False, Decimal("0.5"))
+        self.register.write(value)
+        self.assertEqual(value, self.register.read())
+        self.assertNotEqual(value, self.register.read(cluster_format=ClusterFormat.NamedTuple))
+        with self.assertRaises(AttributeError):
+            value.not_a_member = 1
+
+    def test_field_names(self):
+        cluster = self.bitfile.registers["Input Error Cluster"].type
+        self.assertEqual(["status", "code", "member_2", "member_3", "member_4", "member_5", "a_b"],
+                         _field_names(["status", "code", "code", "1st", "class", "self", "a b"]))
+        self.assertEqual(("status", "code", "source"), _record_class(cluster, ClusterFormat.Record)._fields)
+
+    def test_access_plan_ndarray(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        self.register.cluster_format = ClusterFormat.Record
+        expected = self.register.read(cluster_format=ClusterFormat.Dict)
+        record = AccessPlan({"input cluster": self.register}, ["input cluster"]).read(numpy.ndarray)
+        self.assertEqual(expected["output cluster 2"]["Input Cluster I8"],
+                         record["input cluster"]["output cluster 2"]["Input Cluster I8"])
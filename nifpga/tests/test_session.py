@@ -0,0 +1,525 @@
+import array
+import ctypes
+import os
+import threading
+import unittest
+import warnings
+import xml.etree.ElementTree as ElementTree
+from collections import OrderedDict
+from decimal import Decimal
+from nose import SkipTest
+
+import nifpga
+from nifpga import FixedPoint, FxpFormat, ParallelDecoder
+from nifpga.bitfile import Fifo
+from nifpga.session import (_ArrayRegister, _CompositeFIFO, _FIFO, _FxpFIFO, _DataConvertingRegister,
+                            _Register)
+from nifpga.statuscheckedlibrary import FunctionInfo, StatusCheckedFunctions
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BITFILE_ALL_REGISTERS = os.path.join(os.path.dirname(__file__), "allregistertypes.lvbitx")
+
+
+def load_bitfile():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return nifpga.Bitfile(BITFILE_ALL_REGISTERS)
+
+
+u32_fifo_xml = """
+<Channel name="U32 FIFO">
+    <DataType>
+        <SubType>U32</SubType>
+    </DataType>
+    <Number>1</Number>
+</Channel>
+"""
+
+fxp_fifo_xml = """
+<Channel name="FXP FIFO">
+    <DataType>
+        <IntegerWordLength>16</IntegerWordLength>
+        <Signed>true</Signed>
+        <SubType>FXP</SubType>
+        <WordLength>16</WordLength>
+    </DataType>
+    <Number>0</Number>
+</Channel>
+"""
+
+
+class FakeFifoLibrary(object):
+    """
+    Pretends to be the FIFO entry points of NiFpga for a single datatype.
+
+    Reads return 'elements' and writes append to 'written', unless 'status'
+    is set to a non-zero status code which is returned instead.
+    """
+    def __init__(self, datatype):
+        self.status = 0
+        self.elements = []
+        self.written = []
+        self.elements_remaining = 7
+        self._datatype = datatype
+
+    def read_fifo(self, session, fifo, data, number_of_elements, timeout_ms, elements_remaining):
+        elements_remaining.value = self.elements_remaining
+        if self.status:
+            return self.status
+        for i in range(number_of_elements):
+            data[i] = self.elements[i]
+        return 0
+
+    def write_fifo(self, session, fifo, data, number_of_elements, timeout_ms, elements_remaining):
+        elements_remaining.value = self.elements_remaining
+        if self.status:
+            return self.status
+        self.written.extend(data[i] for i in range(number_of_elements))
+        return 0
+
+    def succeed(self, *args):
+        return 0
+
+    def functions(self):
+        """ Returns StatusCheckedFunctions that can be passed to a _FIFO. """
+        fifo_args = ["session", "fifo", "data", "number of elements",
+                     "timeout ms", "elements remaining"]
+        names_to_functions = {
+            "ReadFifo%s" % self._datatype: (self.read_fifo, fifo_args),
+            "WriteFifo%s" % self._datatype: (self.write_fifo, fifo_args),
+            "AcquireFifoReadElements%s" % self._datatype: (self.succeed, []),
+            "AcquireFifoWriteElements%s" % self._datatype: (self.succeed, []),
+            "ReleaseFifoElements": (self.succeed, []),
+        }
+        return StatusCheckedFunctions(
+            [FunctionInfo(function=function, name=name, argument_names=argument_names)
+             for name, (function, argument_names) in names_to_functions.items()])
+
+
+class FifoTimeoutTests(unittest.TestCase):
+    def setUp(self):
+        self.library = FakeFifoLibrary(nifpga.DataType.U32)
+        bitfile_fifo = Fifo(ElementTree.fromstring(u32_fifo_xml))
+        self.fifo = _FIFO(ctypes.c_uint32(0), self.library.functions(), bitfile_fifo)
+
+    def test_read_raises_on_timeout_by_default(self):
+        self.library.status = nifpga.FifoTimeoutError.CODE
+        with self.assertRaises(nifpga.FifoTimeoutError):
+            self.fifo.read(2, timeout_ms=0)
+
+    def test_read_returns_timed_out_when_not_raising(self):
+        self.library.status = nifpga.FifoTimeoutError.CODE
+        result = self.fifo.read(2, timeout_ms=0, raise_on_timeout=False)
+        self.assertTrue(result.timed_out)
+        self.assertEqual([], result.data)
+        self.assertEqual(7, result.elements_remaining)
+
+    def test_read_succeeds_when_not_raising(self):
+        self.library.elements = [3, 4]
+        self.fifo.raise_on_timeout = False
+        result = self.fifo.read(2)
+        self.assertFalse(result.timed_out)
+        self.assertEqual([3, 4], result.data)
+
+    def test_other_errors_still_raise_when_not_raising(self):
+        self.library.status = nifpga.TransferAbortedError.CODE
+        self.fifo.raise_on_timeout = False
+        with self.assertRaises(nifpga.TransferAbortedError):
+            self.fifo.read(2)
+        with self.assertRaises(nifpga.TransferAbortedError):
+            self.fifo.write([1, 2])
+
+    def test_write_per_fifo_and_per_call(self):
+        self.library.status = nifpga.FifoTimeoutError.CODE
+        self.fifo.raise_on_timeout = False
+        result = self.fifo.write([1, 2])
+        self.assertTrue(result.timed_out)
+        self.assertEqual(7, result.elements_remaining)
+        with self.assertRaises(nifpga.FifoTimeoutError):
+            self.fifo.write([1, 2], raise_on_timeout=True)
+
+    def test_write_returns_elements_remaining_when_raising(self):
+        self.assertEqual(7, self.fifo.write([1, 2]))
+        self.assertEqual([1, 2], self.library.written)
+
+
+class FxpFifoTimeoutTests(unittest.TestCase):
+    def setUp(self):
+        self.library = FakeFifoLibrary(nifpga.DataType.U64)
+        bitfile_fifo = Fifo(ElementTree.fromstring(fxp_fifo_xml))
+        self.fifo = _FxpFIFO(ctypes.c_uint32(0), self.library.functions(), bitfile_fifo)
+
+    def test_read_returns_timed_out_when_not_raising(self):
+        self.library.status = nifpga.FifoTimeoutError.CODE
+        result = self.fifo.read(2, raise_on_timeout=False)
+        self.assertTrue(result.timed_out)
+        self.assertEqual([], result.data)
+
+    def test_read_decodes_when_not_raising(self):
+        self.library.elements = [1, 0xffff]
+        result = self.fifo.read(2, raise_on_timeout=False)
+        self.assertFalse(result.timed_out)
+        self.assertEqual([1, -1], result.data)
+
+    def test_write_encodes_values(self):
+        self.fifo.write([1, -1, 2.0])
+        self.assertEqual([1, 0xffff, 2], self.library.written)
+
+    def test_read_float_output_format(self):
+        self.library.elements = [1, 0xffff]
+        self.fifo.output_format = FxpFormat.Float
+        self.assertEqual([1.0, -1.0], list(self.fifo.read(2).data))
+        self.assertEqual([1, -1], list(self.fifo.read(2, output_format=FxpFormat.Mantissa).data))
+        self.assertEqual([1, -1], self.fifo.read(2, output_format=FxpFormat.Decimal).data)
+
+    def test_read_float_output_format_timed_out(self):
+        self.library.status = nifpga.FifoTimeoutError.CODE
+        result = self.fifo.read(2, raise_on_timeout=False, output_format=FxpFormat.Float)
+        self.assertTrue(result.timed_out)
+        self.assertEqual(0, len(result.data))
+
+    def test_fixed_point_values(self):
+        self.library.elements = [1, 0xffff]
+        data = self.fifo.read(2, output_format=FxpFormat.FixedPoint).data
+        self.assertEqual([1, -1], data)
+        self.assertIsInstance(data[0], FixedPoint)
+        self.fifo.write(data)
+        self.assertEqual([1, 0xffff], self.library.written)
+
+    def test_read_with_parallel_decoder(self):
+        self.library.elements = [1, 0xffff, 2, 0xfffe]
+        with ParallelDecoder(max_workers=2, min_elements=2) as decoder:
+            self.fifo.decoder = decoder
+            self.assertEqual([1, -1, 2, -2], self.fifo.read(4).data)
+            self.assertEqual([1.0, -1.0, 2.0, -2.0],
+                             list(self.fifo.read(4, output_format=FxpFormat.Float).data))
+
+    def test_output_format_must_be_an_fxp_format(self):
+        with self.assertRaises(TypeError):
+            self.fifo.output_format = "float"
+
+
+cluster_fifo_xml = """
+<Channel name="Cluster FIFO">
+    <DataType>
+        <Cluster>
+            <Name>Cluster FIFO</Name>
+            <TypeList>
+                <U16><Name>u16</Name></U16>
+                <FXP>
+                    <Name>fxp</Name>
+                    <Signed>true</Signed>
+                    <WordLength>24</WordLength>
+                    <IntegerWordLength>16</IntegerWordLength>
+                </FXP>
+                <Boolean><Name>bool</Name></Boolean>
+            </TypeList>
+        </Cluster>
+    </DataType>
+    <Number>2</Number>
+</Channel>
+"""
+
+
+class CompositeFifoTests(unittest.TestCase):
+    def setUp(self):
+        self.library = FakeFifoLibrary(nifpga.DataType.U32)
+        self.library.elements_remaining = 8
+        bitfile_fifo = Fifo(ElementTree.fromstring(cluster_fifo_xml))
+        self.fifo = _CompositeFIFO(ctypes.c_uint32(0), self.library.functions(), bitfile_fifo)
+        # u16 = 0x1234, fxp = -1.5, bool = True, left justified in 2 words
+        self.words = [0x1234fffe, 0x80800000]
+
+    def test_read_decodes_records(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        self.library.elements = self.words * 2
+        result = self.fifo.read(2)
+        self.assertEqual(4, result.elements_remaining)
+        self.assertEqual(self.fifo.dtype, result.data.dtype)
+        self.assertEqual([0x1234, 0x1234], result.data["u16"].tolist())
+        self.assertEqual([-1.5, -1.5], result.data["fxp"].tolist())
+        self.assertEqual([True, True], result.data["bool"].tolist())
+
+    def test_write_records_and_dictionaries(self):
+        element = OrderedDict([("u16", 0x1234), ("fxp", Decimal("-1.5")), ("bool", True)])
+        self.assertEqual(4, self.fifo.write([element]))
+        self.assertEqual(self.words, self.library.written)
+        if numpy is not None:
+            self.library.written = []
+            self.fifo.write(numpy.array([(0x1234, -1.5, True)], dtype=self.fifo.dtype))
+            self.assertEqual(self.words, self.library.written)
+
+    def test_read_timed_out(self):
+        self.library.status = nifpga.FifoTimeoutError.CODE
+        result = self.fifo.read(2, raise_on_timeout=False)
+        self.assertTrue(result.timed_out)
+        self.assertEqual(0, len(result.data))
+
+    def test_acquire_elements_is_not_supported(self):
+        self.assertRaises(TypeError, self.fifo._acquire_read, 2)
+        self.assertRaises(TypeError, self.fifo._acquire_write, 2)
+        self.assertRaises(TypeError, self.fifo._release_elements, 2)
+
+
+class FakeRegisterLibrary(object):
+    """
+    Pretends to be the ReadArrayU32 and WriteArrayU32 entry points of
+    NiFpga, backed by a dictionary of resource to list of U32s.
+    """
+    def __init__(self):
+        self.registers = {}
+
+    def read_array(self, session, indicator, array, size):
+        for i, value in enumerate(self.registers[indicator]):
+            array[i] = value
+        return 0
+
+    def write_array(self, session, control, array, size):
+        self.registers[control] = [array[i] for i in range(size)]
+        return 0
+
+    def functions(self):
+        argument_names = ["session", "indicator", "array", "size"]
+        return StatusCheckedFunctions([
+            FunctionInfo(self.read_array, "ReadArrayU32", argument_names),
+            FunctionInfo(self.write_array, "WriteArrayU32", argument_names)])
+
+
+class FakeArrayRegisterLibrary(object):
+    """ Pretends to be the ReadArray<Type> and WriteArray<Type> entry points
+    of NiFpga for a datatype, backed by a list of values. """
+    def __init__(self, datatype, values):
+        self.datatype = datatype
+        self.values = values
+        self.written = None
+        self.buffers = []
+
+    def read_array(self, session, indicator, array, size):
+        self.buffers.append(array)
+        for i, value in enumerate(self.values):
+            array[i] = value
+        return 0
+
+    def write_array(self, session, control, array, size):
+        self.buffers.append(array)
+        self.written = [array[i] for i in range(size)]
+        return 0
+
+    def functions(self):
+        argument_names = ["session", "indicator", "array", "size"]
+        return StatusCheckedFunctions([
+            FunctionInfo(self.read_array, "ReadArray%s" % self.datatype, argument_names),
+            FunctionInfo(self.write_array, "WriteArray%s" % self.datatype, argument_names)])
+
+
+class ArrayRegisterTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+
+    def create_register(self, name, values):
+        bitfile_register = self.bitfile.registers[name]
+        self.library = FakeArrayRegisterLibrary(bitfile_register.datatype, values)
+        return _ArrayRegister(ctypes.c_uint32(0),
+                              self.library.functions(),
+                              bitfile_register,
+                              self.bitfile.base_address_on_device())
+
+    def test_read_output_types(self):
+        register = self.create_register("Output Array I16", [-1, 2, -3])
+        self.assertEqual([-1, 2, -3], register.read())
+        result = register.read(output_type=array.array)
+        self.assertEqual(array.array("h", [-1, 2, -3]), result)
+        if numpy is not None:
+            result = register.read(output_type=numpy.ndarray)
+            self.assertEqual(numpy.int16, result.dtype)
+            self.assertEqual([-1, 2, -3], result.tolist())
+        self.assertRaises(TypeError, register.read, output_type=tuple)
+
+    def test_bool_read_output_types(self):
+        values = [i % 3 == 0 for i in range(33)]
+        register = self.create_register("Output Array Bool", values)
+        self.assertEqual(values, register.read())
+        self.assertEqual([int(value) for value in values], list(register.read(output_type=array.array)))
+        if numpy is not None:
+            self.assertEqual(values, register.read(output_type=numpy.ndarray).tolist())
+
+    def test_read_into_reuses_buffer(self):
+        register = self.create_register("Output Array U32", [1, 2, 0xffffffff])
+        buffer = array.array("I", [0, 0, 0])
+        self.assertIs(buffer, register.read_into(buffer))
+        register.read_into(buffer)
+        self.assertEqual(array.array("I", [1, 2, 0xffffffff]), buffer)
+        # the same ctypes array, sharing buffer's memory, is passed every time
+        self.assertIs(self.library.buffers[0], self.library.buffers[1])
+
+    def test_read_into_rejects_mismatched_buffers(self):
+        register = self.create_register("Output Array U32", [1, 2, 3])
+        self.assertRaises(TypeError, register.read_into, array.array("I", [0, 0]))
+        self.assertRaises(TypeError, register.read_into, array.array("i", [0, 0, 0]))
+        self.assertRaises(TypeError, register.read_into, array.array("f", [0, 0, 0]))
+        self.assertRaises(TypeError, register.read_into, bytes(12))
+        self.assertRaises(TypeError, register.read_into, [0, 0, 0])
+
+    def test_write_buffers(self):
+        register = self.create_register("Input Array I16", [])
+        register.write(array.array("h", [4, -5, 6]))
+        self.assertEqual([4, -5, 6], self.library.written)
+        # read only buffers are copied
+        register.write(memoryview(array.array("h", [7, 8, -9])).toreadonly())
+        self.assertEqual([7, 8, -9], self.library.written)
+        if numpy is not None:
+            register.write(numpy.array([1, 2, 3], dtype=numpy.int16))
+            self.assertEqual([1, 2, 3], self.library.written)
+            # other dtypes are converted value by value
+            register.write(numpy.array([4, 5, 6], dtype=numpy.int64))
+            self.assertEqual([4, 5, 6], self.library.written)
+        register.write([-1, -2, -3])
+        self.assertEqual([-1, -2, -3], self.library.written)
+
+
+class ScalarRegisterTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.buffers = []
+        self.value = 0
+
+    def read(self, session, indicator, value):
+        self.buffers.append(value)
+        value.value = self.value
+        return 0
+
+    def write(self, session, control, value):
+        self.value = value
+        return 0
+
+    def create_register(self, name):
+        bitfile_register = self.bitfile.registers[name]
+        argument_names = ["session", "indicator", "value"]
+        functions = StatusCheckedFunctions([
+            FunctionInfo(self.read, "Read%s" % bitfile_register.datatype, argument_names),
+            FunctionInfo(self.write, "Write%s" % bitfile_register.datatype, argument_names)])
+        return _Register(ctypes.c_uint32(0), functions, bitfile_register,
+                         self.bitfile.base_address_on_device())
+
+    def test_read_and_write(self):
+        register = self.create_register("Input I16")
+        register.write(-5)
+        self.assertEqual(-5, register.read())
+        register = self.create_register("Input Bool")
+        register.write(True)
+        self.assertIs(True, register.read())
+
+    def test_buffers_are_reused_per_thread(self):
+        register = self.create_register("Input U32")
+        register.read()
+        register.read()
+        thread = threading.Thread(target=register.read)
+        thread.start()
+        thread.join()
+        self.assertIs(self.buffers[0], self.buffers[1])
+        self.assertIsNot(self.buffers[0], self.buffers[2])
+
+
+class ClusterUpdateTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.library = FakeRegisterLibrary()
+        self.register = self.create_register("input cluster")
+        # every other bit set, in every member
+        self.library.registers[self.register._resource] = [0xaaaaaaaa] * self.register._transfer_len
+
+    def create_register(self, name):
+        return _DataConvertingRegister(ctypes.c_uint32(0),
+                                       self.library.functions(),
+                                       self.bitfile.registers[name],
+                                       self.bitfile.base_address_on_device())
+
+    def written_words(self):
+        return self.library.registers[self.register._resource]
+
+    def test_update_matches_writing_whole_value(self):
+        value = self.register.read()
+        self.register.update({("output cluster 2", "Input Cluster I8"): -3,
+                              ("output cluster array", 1, "Input Cluster Bool 2"): True,
+                              ("output cluster array", 0, "Input Cluster FXP 64-bit Signed Overflow 2"):
+                                  (False, Decimal("0.5"))},
+                             **{"Input Cluster U16": 7})
+        updated = self.written_words()
+        value["output cluster 2"]["Input Cluster I8"] = -3
+        value["output cluster array"][1]["Input Cluster Bool 2"] = True
+        value["output cluster array"][0]["Input Cluster FXP 64-bit Signed Overflow 2"] = (False, Decimal("0.5"))
+        value["Input Cluster U16"] = 7
+        self.assertEqual(value, self.register.read())
+        self.register.write(value)
+        self.assertEqual(updated, self.written_words())
+
+    def test_update_whole_nested_cluster(self):
+        nested = self.register.read()["output cluster 2"]
+        nested["Input Cluster U64"] = 2 ** 63
+        self.register.update({"output cluster 2": nested})
+        self.assertEqual(nested, self.register.read()["output cluster 2"])
+
+    def test_update_reads_once_then_reuses_last_value(self):
+        reads = []
+        read_array = self.library.read_array
+
+        def counting_read_array(*args):
+            reads.append(args)
+            return read_array(*args)
+        self.library.read_array = counting_read_array
+        self.register = self.create_register("input cluster")
+        self.register.update(**{"Input Cluster U16": 1})
+        self.register.update(**{"Input Cluster U16": 2})
+        self.assertEqual(1, len(reads))
+        self.assertEqual(2, self.register.read()["Input Cluster U16"])
+
+    def test_update_errors(self):
+        with self.assertRaises(KeyError):
+            self.register.update(**{"Not a member": 1})
+        with self.assertRaises(KeyError):
+            self.register.update({("output cluster array", 5): {}})
+        self.assertRaises(TypeError, self.create_register("Output FXP 16-bit Signed").update, value=1)
+
+
+class DataConvertingRegisterOutputFormatTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.library = FakeRegisterLibrary()
+
+    def create_register(self, name):
+        return _DataConvertingRegister(ctypes.c_uint32(0),
+                                       self.library.functions(),
+                                       self.bitfile.registers[name],
+                                       self.bitfile.base_address_on_device())
+
+    def test_fxp_register(self):
+        register = self.create_register("Output FXP 16-bit Signed")
+        register.write(Decimal(-1))
+        self.assertEqual(-1, register.read())
+        register.output_format = FxpFormat.Float
+        self.assertEqual(float(register.read(output_format=FxpFormat.Decimal)), register.read())
+        self.assertEqual(register.read(output_format=FxpFormat.Decimal),
+                         register.read(output_format=FxpFormat.Mantissa) * register._type.delta)
+
+    def test_fxp_array_register(self):
+        register = self.create_register("output fxp array")
+        register.write([Decimal("1.5"), Decimal("-0.25")])
+        self.assertEqual([1.5, -0.25], list(register.read(output_format=FxpFormat.Float)))
+
+    def test_fxp_register_fixed_point_values(self):
+        register = self.create_register("output fxp array")
+        register.output_format = FxpFormat.FixedPoint
+        register.write([Decimal("1.5"), Decimal("-0.25")])
+        values = register.read()
+        self.assertEqual([1.5, -0.25], values)
+        register.write(values)
+        self.assertEqual(values, register.read())
+
+    def test_cluster_register_only_supports_decimal(self):
+        register = self.create_register("output cluster")
+        with self.assertRaises(TypeError):
+            register.output_format = FxpFormat.Float
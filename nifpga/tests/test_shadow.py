@@ -0,0 +1,137 @@
+import unittest
+from decimal import Decimal
+
+import mock
+from nose import SkipTest
+
+import nifpga
+from nifpga import Session
+from nifpga.nifpga import _SessionType
+from nifpga.tests import test_accessplan
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BITFILE_ALL_REGISTERS = 'nifpga/tests/allregistertypes.lvbitx'
+
+
+class ShadowCacheTests(unittest.TestCase):
+    values = {
+        "Input I16": -7,
+        "Input Bool": True,
+        "Input Array I16": [1, -2, 3],
+        "Input FXP 16-bit Signed Overflow": (True, Decimal("-1.5")),
+        "Input Error Cluster": {"status": True, "code": -5, "source": ""},
+    }
+
+    def setUp(self):
+        self.library = test_accessplan.MemoryLibrary()
+        with mock.patch("nifpga.session._NiFpga", return_value=self.library.functions()):
+            self.session = Session(nifpga.Bitfile(BITFILE_ALL_REGISTERS), _SessionType())
+
+    def write_all(self):
+        for name, value in self.values.items():
+            self.session.registers[name].write(value)
+
+    def read_all(self):
+        return dict((name, self.session.registers[name].read()) for name in self.values)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.session.shadow_cache)
+        self.write_all()
+        self.library.calls = 0
+        self.write_all()
+        self.assertEqual(len(self.values), self.library.calls)
+
+    def test_suppresses_unchanged_writes(self):
+        cache = self.session.enable_shadow_cache()
+        self.assertIs(cache, self.session.shadow_cache)
+        self.write_all()
+        self.assertEqual(len(self.values), self.library.calls)
+        self.write_all()
+        self.assertEqual(len(self.values), self.library.calls)
+        self.assertEqual((len(self.values), len(self.values), 0, 0), cache.statistics())
+        self.session.registers["Input I16"].write(8)
+        self.assertEqual(len(self.values) + 1, self.library.calls)
+        # without serve_reads, reads still read the FPGA
+        self.assertEqual(8, self.session.registers["Input I16"].read())
+        self.assertEqual(len(self.values) + 2, self.library.calls)
+
+    def test_compares_encoded_values(self):
+        self.session.enable_shadow_cache()
+        register = self.session.registers["Input FXP 16-bit Signed Overflow"]
+        register.write((True, Decimal("-1.5")))
+        self.library.calls = 0
+        register.write((True, -1.5))
+        self.assertEqual(0, self.library.calls)
+        register.write((False, -1.5))
+        self.assertEqual(1, self.library.calls)
+
+    def test_serves_reads(self):
+        cache = self.session.enable_shadow_cache(serve_reads=True)
+        self.write_all()
+        self.library.calls = 0
+        self.assertEqual(self.values, self.read_all())
+        self.assertEqual(0, self.library.calls)
+        self.assertEqual(len(self.values), cache.statistics().reads_served)
+        # indicators are never cached
+        self.session.registers["Output I16"].read()
+        self.assertEqual(1, self.library.calls)
+
+    def test_array_reads_and_writes(self):
+        if numpy is None:
+            raise SkipTest("numpy not installed, skipping")
+        self.session.enable_shadow_cache(serve_reads=True)
+        register = self.session.registers["Input Array I16"]
+        register.write(numpy.array([4, 5, 6], dtype=numpy.int16))
+        self.library.calls = 0
+        register.write([4, 5, 6])
+        self.assertEqual([4, 5, 6], register.read(numpy.ndarray).tolist())
+        self.assertEqual([4, 5, 6], register.read_into(numpy.zeros(3, dtype=numpy.int16)).tolist())
+        self.assertEqual(0, self.library.calls)
+
+    def test_invalidation(self):
+        cache = self.session.enable_shadow_cache()
+        # the registers keep the library they're created with
+        self.write_all()
+        self.session._nifpga = mock.Mock()
+        for operation in ("reset", "abort", "download"):
+            self.write_all()
+            self.assertIn("Input I16", cache)
+            getattr(self.session, operation)()
+            getattr(self.session._nifpga, operation.capitalize()).assert_called_with(self.session._session)
+            self.assertNotIn("Input I16", cache)
+            self.library.calls = 0
+            self.write_all()
+            self.assertEqual(len(self.values), self.library.calls)
+        cache.invalidate("Input I16")
+        self.session.registers["Input I16"].write(-7)
+        self.assertEqual(len(self.values) + 1, self.library.calls)
+        self.assertEqual(4, cache.statistics().invalidations)
+
+    def test_failed_write_is_not_cached(self):
+        cache = self.session.enable_shadow_cache()
+        register = self.session.registers["Input I16"]
+        register._write_func = mock.Mock(side_effect=RuntimeError)
+        register._set_shadow_cache(cache)
+        self.assertRaises(RuntimeError, register.write, 3)
+        self.assertNotIn("Input I16", cache)
+
+    def test_access_plans(self):
+        names = list(self.values)
+        self.session.enable_shadow_cache(serve_reads=True)
+        plan = self.session.access_plan(names)
+        plan.write([self.values[name] for name in names])
+        self.library.calls = 0
+        self.session.write_many(self.values)
+        self.assertEqual(self.values, plan.read(dict))
+        self.assertEqual(0, self.library.calls)
+
+    def test_disable(self):
+        self.session.enable_shadow_cache()
+        self.write_all()
+        self.session.disable_shadow_cache()
+        self.library.calls = 0
+        self.write_all()
+        self.assertEqual(len(self.values), self.library.calls)
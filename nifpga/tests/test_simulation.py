@@ -0,0 +1,293 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import warnings
+from collections import OrderedDict
+
+import nifpga
+from nifpga import FpgaViState, FxpFormat, SimulatedNiFpga
+from nifpga.nifpga import INFINITE_TIMEOUT
+from nifpga._util import _monotonic
+from nifpga.tests.test_session import load_bitfile
+
+# a bitfile with a FIFO of each direction, the host to target one of I16s
+# and the target to host one of clusters of three words
+FIFO_BITFILE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Bitfile>
+   <SignatureRegister>0123456789ABCDEF0123456789ABCDEF</SignatureRegister>
+   <VI>
+      <RegisterList></RegisterList>
+   </VI>
+   <Project>
+      <CompilationResultsTree>
+         <CompilationResults>
+            <NiFpga>
+               <BaseAddressOnDevice>0</BaseAddressOnDevice>
+               <DmaChannelAllocationList>
+                  <Channel name="Commands">
+                     <DataType>
+                        <SubType>I16</SubType>
+                     </DataType>
+                     <Direction>HostToTarget</Direction>
+                     <Number>0</Number>
+                  </Channel>
+                  <Channel name="Samples">
+                     <DataType>
+                        <Cluster>
+                           <Name>Sample</Name>
+                           <TypeList>
+                              <Boolean><Name>Valid</Name></Boolean>
+                              <U32><Name>Count</Name></U32>
+                              <I32><Name>Value</Name></I32>
+                           </TypeList>
+                        </Cluster>
+                     </DataType>
+                     <Direction>TargetToHost</Direction>
+                     <Number>1</Number>
+                  </Channel>
+               </DmaChannelAllocationList>
+            </NiFpga>
+         </CompilationResults>
+      </CompilationResultsTree>
+   </Project>
+</Bitfile>
+"""
+
+
+class SessionLifecycleTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.simulation = SimulatedNiFpga(self.bitfile)
+
+    def open(self, **kwargs):
+        return nifpga.Session(self.bitfile, "RIO0", library=self.simulation, **kwargs)
+
+    def test_open_runs(self):
+        with self.open() as session:
+            self.assertEqual(FpgaViState.Running, session.fpga_vi_state)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                session.run()
+            self.assertIsInstance(w[0].message, nifpga.FpgaAlreadyRunningWarning)
+            session.abort()
+            self.assertEqual(FpgaViState.NotRunning, session.fpga_vi_state)
+            session.run(wait_until_done=True)
+            self.assertEqual(FpgaViState.NaturallyStopped, session.fpga_vi_state)
+
+    def test_no_run(self):
+        with self.open(no_run=True) as session:
+            self.assertEqual(FpgaViState.NotRunning, session.fpga_vi_state)
+
+    def test_signature_mismatch(self):
+        other = load_bitfile()
+        other._signature = "0" * 32
+        with self.assertRaises(nifpga.SignatureMismatchError):
+            nifpga.Session(other, "RIO0", library=self.simulation)
+
+    def test_closed_session(self):
+        session = self.open()
+        session.close()
+        with self.assertRaises(nifpga.InvalidSessionError) as context:
+            session.registers["Input U32"].read()
+        self.assertEqual("NiFpgaDll_ReadU32", context.exception.get_function_name())
+
+    def test_closing_last_session_resets(self):
+        first = self.open()
+        second = self.open()
+        first.registers["Input U32"].write(5)
+        first.close(reset_if_last_session=True)
+        self.assertEqual(5, second.registers["Input U32"].read())
+        second.close(reset_if_last_session=True)
+        self.assertEqual(0, self.simulation.registers["Input U32"].read())
+        self.assertEqual(FpgaViState.NotRunning, self.simulation.state)
+
+    def test_argument_count(self):
+        with self.assertRaises(TypeError):
+            self.simulation.Run(1)
+
+    def test_not_supported(self):
+        with self.open() as session:
+            with self.assertRaises(nifpga.FeatureNotSupportedError):
+                session.fifos["FXP FIFO"].get_peer_to_peer_endpoint()
+
+
+class RegisterTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.simulation = SimulatedNiFpga(self.bitfile)
+        self.session = nifpga.Session(self.bitfile, "RIO0", library=self.simulation)
+        self.fpga = self.simulation.registers
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_round_trips(self):
+        values = [("Input U32", 0xfffffffe), ("Input I64", -5), ("Input Bool", True),
+                  ("Input SGL", 0.5), ("Input Array I16", [1, -2, 3]),
+                  ("Input Error Cluster", OrderedDict([("status", True), ("code", -5), ("source", "")]))]
+        for name, value in values:
+            self.session.registers[name].write(value)
+            self.assertEqual(value, self.fpga[name].read())
+            self.fpga[name].write(value)
+            self.assertEqual(value, self.session.registers[name].read())
+
+    def test_fxp(self):
+        self.fpga["Output FXP 16-bit Signed"].write(-1)
+        self.assertEqual(-1, self.session.registers["Output FXP 16-bit Signed"].read(output_format=FxpFormat.Float))
+
+    def test_reset_zeroes(self):
+        self.session.registers["Input Array U8"].write([1, 2, 3, 4, 5, 6])
+        self.session.reset()
+        self.assertEqual([0] * 6, self.session.registers["Input Array U8"].read())
+
+    def test_update_after_reset(self):
+        register = self.session.registers["Input Error Cluster"]
+        for forget in (self.session.reset, self.session.abort, self.session.download):
+            register.update(code=-5)
+            forget()
+            # what the FPGA VI holds once it's reset, aborted or downloaded
+            self.fpga["Input Error Cluster"].write(OrderedDict([("status", False), ("code", 7), ("source", "")]))
+            register.update(status=True)
+            self.assertEqual(OrderedDict([("status", True), ("code", 7), ("source", "")]),
+                             self.fpga["Input Error Cluster"].read())
+
+    def test_unknown_resource(self):
+        with self.assertRaises(nifpga.ResourceNotFoundError):
+            self.simulation.ReadU32(self.session._session, 4, nifpga.nifpga.DataType.U32._return_ctype()())
+
+
+class FifoTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        path = os.path.join(cls.directory, "fifos.lvbitx")
+        with open(path, "w") as f:
+            f.write(FIFO_BITFILE_XML)
+        cls.bitfile = nifpga.Bitfile(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.simulation = SimulatedNiFpga(self.bitfile)
+        self.session = nifpga.Session(self.bitfile, "RIO0", library=self.simulation)
+        self.commands = self.session.fifos["Commands"]
+        self.samples = self.session.fifos["Samples"]
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_direction(self):
+        self.assertTrue(self.bitfile.fifos["Commands"].is_host_to_target())
+        self.assertFalse(self.bitfile.fifos["Samples"].is_host_to_target())
+        self.assertFalse(load_bitfile().fifos["FXP FIFO"].is_host_to_target())
+
+    def test_write_pop(self):
+        self.assertEqual(SimulatedNiFpga.DEFAULT_DEPTH - 3, self.commands.write([1, -2, 3]))
+        self.assertEqual([1, -2], self.simulation.fifos["Commands"].pop(2))
+        self.assertEqual([3], self.simulation.fifos["Commands"].pop(5))
+        with self.assertRaises(ValueError):
+            self.simulation.fifos["Samples"].pop(1)
+
+    def test_push_read_composite(self):
+        words = (self.samples._pack_element(OrderedDict([("Valid", True), ("Count", 2), ("Value", -3)]))
+                 + self.samples._pack_element(OrderedDict([("Valid", False), ("Count", 1), ("Value", 4)])))
+        self.assertEqual(6, self.simulation.fifos["Samples"].push(words))
+        self.assertEqual(6, len(self.simulation.fifos["Samples"]))
+        data = self.samples.read(2).data
+        self.assertEqual([True, False], [bool(sample["Valid"]) for sample in data])
+        self.assertEqual([2, 1], [int(sample["Count"]) for sample in data])
+        self.assertEqual([-3, 4], [int(sample["Value"]) for sample in data])
+
+    def test_read_timeout(self):
+        start = _monotonic()
+        with self.assertRaises(nifpga.FifoTimeoutError):
+            self.samples.read(1, timeout_ms=50)
+        self.assertGreaterEqual(_monotonic() - start, 0.05)
+        read = self.samples.read(1, timeout_ms=0, raise_on_timeout=False)
+        self.assertTrue(read.timed_out)
+        self.assertEqual(0, len(read.data))
+
+    def test_write_timeout(self):
+        self.commands.stop()
+        self.assertEqual(4, self.commands.configure(4))
+        self.commands.write([1, 2, 3])
+        self.assertTrue(self.commands.write([4, 5], raise_on_timeout=False).timed_out)
+        self.assertEqual([1, 2, 3], self.simulation.fifos["Commands"].pop(3))
+        self.assertEqual(2, self.commands.write([4, 5]))
+
+    def test_read_waits_for_push(self):
+        pusher = threading.Timer(0.02, self.simulation.fifos["Samples"].push, [[0] * 3])
+        pusher.start()
+        try:
+            self.assertEqual(1, len(self.samples.read(1, timeout_ms=INFINITE_TIMEOUT).data))
+        finally:
+            pusher.join()
+
+    def test_rate(self):
+        self.simulation.fifos["Commands"].rate = float("inf")
+        for _ in range(3):
+            self.assertEqual(SimulatedNiFpga.DEFAULT_DEPTH - 100, self.commands.write(list(range(100))))
+        samples = self.simulation.fifos["Samples"]
+        samples.rate = 1000
+        start = _monotonic()
+        self.samples.read(20, timeout_ms=1000)
+        # 60 words at 1000 per second
+        self.assertGreaterEqual(_monotonic() - start, 0.05)
+        with self.assertRaises(ValueError):
+            samples.push([0])
+        self.session.abort()
+        with self.assertRaises(nifpga.FifoTimeoutError):
+            self.samples.read(1, timeout_ms=20)
+
+    def test_rate_sequence(self):
+        bitfile = load_bitfile()
+        with nifpga.Session(bitfile, "RIO0", library=SimulatedNiFpga(bitfile, fifo_rate=float("inf"))) as session:
+            fifo = session.fifos["FXP FIFO"]
+            fifo.configure(8)
+            data = [fifo.read(6, output_format=FxpFormat.Mantissa).data for _ in range(2)]
+        self.assertEqual([0, 1, 2, 3, 4, 5, 6, 7, 0, 1, 2, 3], [int(value) for value in list(data[0]) + list(data[1])])
+
+    def test_configure_while_started(self):
+        self.commands.start()
+        with self.assertRaises(nifpga.OperationNotSupportedWhileStartedError):
+            self.commands.configure(100)
+        self.commands.stop()
+        with self.assertRaises(nifpga.BadDepthError):
+            self.commands.configure(0)
+        self.assertEqual(4, self.samples._get_fifo_property(nifpga.FifoProperty.BytesPerElement))
+        self.commands.buffer_size = 50
+        self.assertEqual(50, self.commands.buffer_size)
+        with self.assertRaises(nifpga.BadReadWriteCountError):
+            self.commands.write([0] * 51)
+
+
+class IrqTests(unittest.TestCase):
+    def setUp(self):
+        self.simulation = SimulatedNiFpga(load_bitfile())
+        self.session = nifpga.Session(load_bitfile(), "RIO0", library=self.simulation)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_wait(self):
+        self.simulation.assert_irqs([1, 5])
+        self.assertEqual(([5], False), self.session.wait_on_irqs([4, 5], 0))
+        self.session.acknowledge_irqs([5])
+        self.assertEqual([1], self.simulation.asserted_irqs)
+
+    def test_timeout(self):
+        start = _monotonic()
+        self.assertEqual(([], True), self.session.wait_on_irqs(0, 30))
+        self.assertGreaterEqual(_monotonic() - start, 0.03)
+
+    def test_wakes_waiter(self):
+        asserter = threading.Timer(0.01, self.simulation.assert_irqs, [2])
+        asserter.start()
+        try:
+            self.assertEqual(([2], False), self.session.wait_on_irqs(2, INFINITE_TIMEOUT))
+        finally:
+            asserter.join()
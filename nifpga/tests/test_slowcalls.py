@@ -0,0 +1,80 @@
+import ctypes
+import threading
+import time
+import unittest
+
+import nifpga
+from nifpga import SimulatedNiFpga, SlowCallDetector
+from nifpga.tests.test_session import load_bitfile
+
+
+class SlowCallDetectorTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.simulation = SimulatedNiFpga(self.bitfile)
+
+    def open(self, thresholds, **kwargs):
+        self.detector = SlowCallDetector(thresholds, library=self.simulation, bitfile=self.bitfile, **kwargs)
+        return nifpga.Session(self.bitfile, "RIO0", library=self.detector)
+
+    def test_fifo_timeout(self):
+        with self.open({"ReadFifo*": 0.01}) as session:
+            session.fifos["FXP FIFO"].read(2, timeout_ms=0, raise_on_timeout=False)
+            before = time.time()
+            session.fifos["FXP FIFO"].read(2, timeout_ms=30, raise_on_timeout=False)
+        calls = self.detector.slow_calls()
+        self.assertEqual(1, len(calls))
+        call = calls[0]
+        self.assertEqual("ReadFifoU64", call.name)
+        self.assertEqual("NiFpgaDll_ReadFifoU64", call.function_name)
+        self.assertEqual("FXP FIFO", call.resource)
+        self.assertEqual(threading.current_thread().name, call.thread)
+        self.assertEqual(nifpga.FifoTimeoutError.CODE, call.status)
+        self.assertGreaterEqual(call.duration, 0.03)
+        self.assertAlmostEqual(before, call.time, delta=0.01)
+        self.assertEqual(["session", "fifo", "data", "number of elements", "timeout ms", "elements remaining"],
+                         list(call.arguments))
+        self.assertEqual("%s[2]" % ctypes.c_uint64.__name__, call.arguments["data"])
+        self.assertEqual(30, call.arguments["timeout ms"])
+
+    def test_registers(self):
+        with self.open({"Read*": 0, "ReadFifo*": None}) as session:
+            session.registers["Input U32"].write(5)
+            session.registers["Input U32"].read()
+            session.registers["Input Array I16"].read()
+            session.fifos["FXP FIFO"].read(0, timeout_ms=0, raise_on_timeout=False)
+        self.assertEqual(["ReadU32", "ReadArrayI16"], [call.name for call in self.detector.slow_calls()])
+        self.assertEqual(["Input U32"], [call.resource for call in self.detector.slow_calls(name="ReadU*")])
+        self.assertEqual(1, len(self.detector.slow_calls(resource="Input Array I16")))
+        self.assertEqual([], self.detector.slow_calls(since=time.time() + 1))
+        self.assertEqual(5, self.detector.slow_calls()[0].arguments["value"])
+
+    def test_thresholds(self):
+        with self.open({"Read*": 1, "ReadU32": 0}) as session:
+            self.assertEqual(0, self.detector.thresholds["ReadU32"])
+            self.assertEqual(1, self.detector.thresholds["ReadI8"])
+            self.assertNotIn("WriteU32", self.detector.thresholds)
+            session.registers["Input U32"].read()
+            self.detector.set_thresholds({"ReadU32": None})
+            session.registers["Input U32"].read()
+            self.detector.set_thresholds({"Read*": 0})
+            session.registers["Input I64"].read()
+        self.assertEqual(["Input U32", "Input I64"], [call.resource for call in self.detector.slow_calls()])
+
+    def test_bounded(self):
+        with self.open({"ReadU32": 0}, capacity=3) as session:
+            for value in range(5):
+                session.registers["Input U32"].write(value)
+                session.registers["Input U32"].read()
+        self.assertEqual([2, 3, 4], [call.arguments["value"] for call in self.detector.slow_calls()])
+        self.assertEqual(5, self.detector.count)
+        self.detector.clear()
+        self.assertEqual(0, self.detector.count)
+        self.assertEqual([], self.detector.slow_calls())
+
+    def test_errors_still_raised(self):
+        with self.open({"*": 0}) as session:
+            session.abort()
+            with self.assertRaises(nifpga.FifoTimeoutError):
+                session.fifos["FXP FIFO"].read(1, timeout_ms=0)
+        self.assertIn("ReadFifoU64", [call.name for call in self.detector.slow_calls()])
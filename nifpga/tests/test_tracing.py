@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import nifpga
+from nifpga import SimulatedNiFpga, Tracer
+from nifpga.tests.test_session import load_bitfile
+
+
+class TracerTests(unittest.TestCase):
+    def setUp(self):
+        self.bitfile = load_bitfile()
+        self.simulation = SimulatedNiFpga(self.bitfile, fifo_rate=float("inf"))
+
+    def trace(self, function, **kwargs):
+        """ Calls function(session, tracer) for a session on a new Tracer,
+        returning the Tracer. """
+        tracer = Tracer(self.simulation, **kwargs)
+        with nifpga.Session(self.bitfile, "RIO0", library=tracer) as session:
+            function(session, tracer)
+        return tracer
+
+    def calls(self, tracer):
+        return [event for event in tracer.events() if event.get("cat") == "nifpga"]
+
+    def test_calls(self):
+        tracer = self.trace(lambda session, tracer: session.registers["Input U32"].read())
+        self.assertEqual(["Open", "ReadU32", "Close"], [event["name"] for event in self.calls(tracer)])
+        open_, read, close = self.calls(tracer)
+        self.assertTrue(0 <= open_["ts"] <= read["ts"] <= close["ts"])
+        self.assertGreaterEqual(read["dur"], 0)
+        self.assertEqual("X", read["ph"])
+
+    def test_statuses_still_raised(self):
+        def use(session, tracer):
+            with self.assertRaises(nifpga.FifoTimeoutError):
+                session.abort()
+                session.fifos["FXP FIFO"].read(1, timeout_ms=0)
+        tracer = self.trace(use)
+        self.assertIn("ReadFifoU64", [event["name"] for event in self.calls(tracer)])
+
+    def test_spans(self):
+        def use(session, tracer):
+            with tracer.span("outer", step=1):
+                with tracer.span("inner"):
+                    session.registers["Input U32"].read()
+        tracer = self.trace(use)
+        spans = dict((event["name"], event) for event in tracer.events() if event.get("cat") == "span")
+        read = [event for event in self.calls(tracer) if event["name"] == "ReadU32"][0]
+        self.assertEqual({"step": 1}, spans["outer"]["args"])
+        self.assertLessEqual(spans["outer"]["ts"], spans["inner"]["ts"])
+        self.assertLessEqual(spans["inner"]["ts"], read["ts"])
+        self.assertGreaterEqual(spans["outer"]["ts"] + spans["outer"]["dur"], read["ts"] + read["dur"])
+
+    def test_span_decorator(self):
+        tracer = Tracer(self.simulation)
+
+        @tracer.span("decorated")
+        def function():
+            return 5
+        self.assertEqual(5, function())
+        self.assertEqual(["decorated"], [event["name"] for event in tracer.events() if event["ph"] == "X"])
+
+    def test_threads(self):
+        def use(session, tracer):
+            reader = threading.Thread(target=session.registers["Input U32"].read, name="reader")
+            reader.start()
+            reader.join()
+        tracer = self.trace(use)
+        names = dict((event["tid"], event["args"]["name"]) for event in tracer.events() if event["ph"] == "M")
+        read = [event for event in self.calls(tracer) if event["name"] == "ReadU32"][0]
+        self.assertEqual("reader", names[read["tid"]])
+        self.assertEqual(2, len(names))
+
+    def test_bounded(self):
+        def use(session, tracer):
+            for _ in range(10):
+                session.registers["Input U32"].read()
+        tracer = self.trace(use, max_events=4)
+        self.assertEqual(["ReadU32"] * 3 + ["Close"], [event["name"] for event in self.calls(tracer)])
+        self.assertEqual(8, tracer.dropped)
+        tracer.clear()
+        self.assertEqual(0, tracer.dropped)
+        self.assertEqual([], self.calls(tracer))
+
+    def test_sampling(self):
+        def use(session, tracer):
+            for _ in range(10):
+                session.registers["Input U32"].read()
+        tracer = self.trace(use, sample_every=3)
+        # of the 12 calls, Open, 10 reads and Close, the 3rd, 6th, 9th and 12th are traced
+        self.assertEqual(4, len(self.calls(tracer)))
+        with self.assertRaises(ValueError):
+            Tracer(self.simulation, sample_every=0)
+
+    def test_write(self):
+        tracer = self.trace(lambda session, tracer: None)
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "trace.json")
+            tracer.write(path)
+            with open(path) as f:
+                trace = json.load(f)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(tracer.events(), trace["traceEvents"])
+        self.assertEqual(0, trace["otherData"]["dropped"])
@@ -0,0 +1,83 @@
+import unittest
+import warnings
+
+import nifpga
+from nifpga.warningaggregator import WarningAggregator
+from nifpga.tests.test_FXP import MockFxp
+
+
+def create_warning():
+    return UserWarning("something happened")
+
+
+class WarningAggregatorTests(unittest.TestCase):
+    def setUp(self):
+        self.aggregator = WarningAggregator()
+
+    def warn(self, times, key="key", count=1):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            for _ in range(times):
+                self.aggregator.warn(key, create_warning, count)
+        return [warning.message for warning in w]
+
+    def test_disabled_emits_and_counts_every_warning(self):
+        emitted = self.warn(5)
+        self.assertEqual(5, len(emitted))
+        self.assertEqual(5, self.aggregator.count("key"))
+
+    def test_enabled_emits_once_per_interval(self):
+        self.aggregator.enable(interval_s=3600)
+        emitted = self.warn(5)
+        self.assertEqual(1, len(emitted))
+        self.assertIsInstance(emitted[0], UserWarning)
+        self.assertEqual({"key": 5}, self.aggregator.counts())
+
+    def test_keys_are_rate_limited_separately(self):
+        self.aggregator.enable(interval_s=3600)
+        self.assertEqual(1, len(self.warn(3, key="a")))
+        self.assertEqual(1, len(self.warn(3, key="b")))
+
+    def test_suppressed_warnings_are_summarized(self):
+        self.aggregator.enable(interval_s=3600)
+        self.warn(4)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.aggregator.flush()
+        self.assertEqual(1, len(w))
+        summary = w[0].message
+        self.assertIsInstance(summary, nifpga.SuppressedWarningsSummary)
+        self.assertEqual(3, summary.count)
+
+    def test_emitting_with_count_summarizes_the_rest(self):
+        self.aggregator.enable(interval_s=3600)
+        emitted = self.warn(1, count=10)
+        self.assertEqual(2, len(emitted))
+        self.assertEqual(9, emitted[1].count)
+
+    def test_reset(self):
+        self.warn(2)
+        self.aggregator.reset()
+        self.assertEqual({}, self.aggregator.counts())
+
+
+class StatusAndFxpWarningCountTests(unittest.TestCase):
+    def setUp(self):
+        nifpga.warning_aggregator.reset()
+
+    def test_status_warnings_are_counted(self):
+        from nifpga.tests.test_nifpga import return_a_checked_status
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            return_a_checked_status(50400)
+            return_a_checked_status(50400)
+        self.assertEqual(2, nifpga.warning_aggregator.count((50400, "Fake Function Name")))
+
+    def test_fxp_coercions_are_counted_per_type(self):
+        fxp = MockFxp(signed=False, enableOverflowStatus=False,
+                      word_length=8, integer_word_length=8)
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            fxp.pack_data(1000, 0)
+            fxp.pack_data(0.5, 0)
+        self.assertEqual(2, nifpga.warning_aggregator.count(("FXP coerced", False, False, 8, 8)))
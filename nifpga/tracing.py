@@ -0,0 +1,170 @@
+"""
+Tracing where time goes, across threads, as a timeline.
+
+A Tracer is a library to open sessions with, which calls NiFpga and notes
+when each call began and how long it took, on which thread.  Spans of the
+application's own, e.g. decoding what it read, are noted with span()::
+
+    tracer = nifpga.Tracer()
+    with nifpga.Session(bitfile, "RIO0", library=tracer) as session:
+        fifo = session.fifos["Samples"]
+        for _ in range(1000):
+            data = fifo.read(1000).data
+            with tracer.span("process"):
+                process(data)
+    tracer.write("trace.json")
+
+write() saves the timeline in Chrome's trace event format, which Perfetto
+(ui.perfetto.dev, which also runs offline) and chrome://tracing open.  Each
+call and span is a complete event, so nested spans stack.
+
+Each thread notes its events in a buffer of its own, without locking, of
+at most max_events events: once full, the oldest are dropped, and counted.
+With sample_every n, only every nth call of each thread is traced, to
+trace long runs of frequent calls at less cost; spans are always traced.
+
+Copyright (c) 2017 National Instruments
+"""
+from .nifpga import _NiFpga
+from ._util import _monotonic_ns
+from .statuscheckedlibrary import _WrappedFunctions
+from collections import deque
+import contextlib
+import json
+import os
+import threading
+
+# the category of calls' events, and of spans'
+_CALL = "nifpga"
+_SPAN = "span"
+
+
+class _ThreadEvents(object):
+    """ The events a thread has noted, as (name, category, start ns,
+    duration ns, args) tuples. """
+    __slots__ = ("thread_id", "name", "events", "appended", "calls")
+
+    def __init__(self, thread_id, max_events):
+        self.thread_id = thread_id
+        self.name = threading.current_thread().name
+        self.events = deque(maxlen=max_events)
+        # how many events have been appended, including those dropped since
+        self.appended = 0
+        # how many calls have been made, traced or not, for sampling
+        self.calls = 0
+
+
+class Tracer(_WrappedFunctions):
+    """
+    A library that calls another, NiFpga by default, noting when every call
+    began and how long it took.  Pass it to Session() as library.
+    """
+    def __init__(self, library=None, max_events=100000, sample_every=1):
+        """
+        Args:
+            library (StatusCheckedFunctions): the library to call, or None
+                to load NiFpga.
+            max_events (int): the most events to keep per thread.
+            sample_every (int): trace every nth call of each thread.
+        """
+        if library is None:
+            library = _NiFpga()
+        if max_events < 1:
+            raise ValueError("max_events must be at least 1, not %d" % max_events)
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1, not %d" % sample_every)
+        self._max_events = max_events
+        self._sample_every = sample_every
+        self._start_ns = _monotonic_ns()
+        self._local = threading.local()
+        # every thread's _ThreadEvents, appended to under _lock as threads
+        # first note an event
+        self._threads = []
+        self._lock = threading.Lock()
+        super(Tracer, self).__init__(library, self._tracing)
+
+    def _tracing(self, function_info):
+        function = function_info.function
+        name = function_info.name
+        thread_events = self._thread_events
+        sample_every = self._sample_every
+
+        def tracing(*args):
+            events = thread_events()
+            events.calls += 1
+            if events.calls % sample_every:
+                return function(*args)
+            start = _monotonic_ns()
+            status = function(*args)
+            events.events.append((name, _CALL, start, _monotonic_ns() - start, None))
+            events.appended += 1
+            return status
+        return tracing
+
+    def _thread_events(self):
+        try:
+            return self._local.events
+        except AttributeError:
+            pass
+        with self._lock:
+            events = self._local.events = _ThreadEvents(len(self._threads), self._max_events)
+            self._threads.append(events)
+        return events
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """
+        Notes the time its with block, or a function it decorates, takes, as
+        an event of the given name, with args shown alongside it::
+
+            with tracer.span("decode", elements=len(data)):
+                ...
+        """
+        start = _monotonic_ns()
+        try:
+            yield
+        finally:
+            events = self._thread_events()
+            events.events.append((name, _SPAN, start, _monotonic_ns() - start, args or None))
+            events.appended += 1
+
+    @property
+    def dropped(self):
+        """ The number of events dropped because their thread's buffer was
+        full. """
+        return sum(events.appended - len(events.events) for events in list(self._threads))
+
+    def clear(self):
+        """ Drops every event noted so far. """
+        for events in list(self._threads):
+            events.events.clear()
+            events.appended = 0
+
+    def events(self):
+        """
+        Returns the events noted so far, as a list of Chrome trace events:
+        dicts with, for each call or span, its name, "cat" (category,
+        "nifpga" for calls and "span" for spans), "ts" and "dur" (when it
+        began, in microseconds since the Tracer was created, and how long it
+        took), and "tid" (a number per thread), preceded by an event naming
+        each thread.
+        """
+        pid = os.getpid()
+        trace = []
+        for events in list(self._threads):
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": events.thread_id,
+                          "args": {"name": events.name}})
+            for name, category, start, duration, args in list(events.events):
+                event = {"name": name, "cat": category, "ph": "X", "pid": pid, "tid": events.thread_id,
+                         "ts": (start - self._start_ns) / 1e3, "dur": duration / 1e3}
+                if args:
+                    event["args"] = args
+                trace.append(event)
+        return trace
+
+    def write(self, path):
+        """ Writes the events noted so far to path as a Chrome trace JSON
+        file. """
+        with open(path, "w") as trace:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ns",
+                       "otherData": {"dropped": self.dropped}}, trace)
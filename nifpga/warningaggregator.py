@@ -0,0 +1,136 @@
+"""
+Aggregated, rate-limited reporting of warnings raised on hot paths.
+
+Positive NiFpga statuses and coerced fixed point values are reported with
+warnings.warn, which is slow and can flood logs when it happens for every
+call or every element written to a FIFO.  warning_aggregator counts every
+occurrence by key, and once enabled, only emits the first warning for a
+key in each interval followed by a summary of how many were suppressed::
+
+    nifpga.warning_aggregator.enable(interval_s=5)
+    fifo.write(values_that_need_coercion)
+    print(nifpga.warning_aggregator.counts())
+
+Copyright (c) 2017 National Instruments
+"""
+import threading
+import warnings
+from ._util import _monotonic
+
+
+class SuppressedWarningsSummary(UserWarning):
+    """ Emitted by WarningAggregator to summarize warnings that were counted
+    but not emitted since the last warning with the same key. """
+    def __init__(self, key, count, interval_s):
+        self.key = key
+        self.count = count
+        self.interval_s = interval_s
+        super(SuppressedWarningsSummary, self).__init__(
+            "%d more warning(s) for %r were suppressed in the last %.3g s"
+            % (count, key, interval_s))
+
+
+class WarningAggregator(object):
+    """
+    Counts warnings by key and optionally rate-limits emitting them.
+
+    When disabled (the default), every warning is emitted as usual, but it
+    is still counted.  When enabled, at most one warning per key is emitted
+    each interval, and suppressed warnings are reported as a
+    SuppressedWarningsSummary the next time one is emitted for that key, or
+    when flush() is called.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._enabled = False
+        self._interval_s = 1.0
+        # key to total number of occurrences
+        self._counts = {}
+        # key to number of occurrences not emitted since the last emit
+        self._suppressed = {}
+        # key to the time the last warning for it was emitted
+        self._last_emitted = {}
+
+    def enable(self, interval_s=1.0):
+        """ Starts rate-limiting warnings to one per key per interval_s
+        seconds. """
+        with self._lock:
+            self._interval_s = interval_s
+            self._enabled = True
+
+    def disable(self):
+        """ Emits pending summaries and goes back to emitting every
+        warning. """
+        self.flush()
+        with self._lock:
+            self._enabled = False
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @property
+    def interval_s(self):
+        return self._interval_s
+
+    def warn(self, key, create_warning, count=1):
+        """ Counts 'count' occurrences of the warning identified by 'key',
+        and emits it unless it is being rate-limited.
+
+        Args:
+            key (hashable): identifies similar warnings, e.g.
+                (status code, function name).
+            create_warning (callable): takes no arguments and returns the
+                Warning instance to emit.  It is only called if the warning
+                is actually emitted, so suppressed warnings cost next to
+                nothing.
+            count (int): how many occurrences this call represents, e.g. the
+                number of coerced elements in a FIFO write.
+        """
+        summary = None
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + count
+            if self._enabled:
+                now = _monotonic()
+                last_emitted = self._last_emitted.get(key)
+                if last_emitted is not None and now - last_emitted < self._interval_s:
+                    self._suppressed[key] = self._suppressed.get(key, 0) + count
+                    return
+                self._last_emitted[key] = now
+                # this call's other occurrences are part of the summary too
+                suppressed = self._suppressed.pop(key, 0) + count - 1
+                if suppressed:
+                    summary = SuppressedWarningsSummary(key, suppressed, self._interval_s)
+        warnings.warn(create_warning(), stacklevel=3)
+        if summary is not None:
+            warnings.warn(summary, stacklevel=3)
+
+    def flush(self):
+        """ Emits a SuppressedWarningsSummary for every key with suppressed
+        warnings. """
+        with self._lock:
+            suppressed, self._suppressed = self._suppressed, {}
+            interval_s = self._interval_s
+        for key, count in suppressed.items():
+            warnings.warn(SuppressedWarningsSummary(key, count, interval_s), stacklevel=2)
+
+    def counts(self):
+        """ Returns a dictionary of key to the total number of occurrences
+        counted, whether or not they were emitted. """
+        with self._lock:
+            return dict(self._counts)
+
+    def count(self, key):
+        """ Returns the total number of occurrences counted for key. """
+        with self._lock:
+            return self._counts.get(key, 0)
+
+    def reset(self):
+        """ Forgets all counts, suppressed warnings, and emit times. """
+        with self._lock:
+            self._counts.clear()
+            self._suppressed.clear()
+            self._last_emitted.clear()
+
+
+warning_aggregator = WarningAggregator()
@@ -30,6 +30,7 @@ setup(name="nifpga",
       version=get_version(),
       packages=find_packages(),
       install_requires=['enum34;python_version<"3.4"', 'future'],
+      extras_require={'numpy': ['numpy']},
       package_data={'nifpga': ['VERSION']},
       author="National Instruments",
       url="https://github.com/ni/nifpga-python",